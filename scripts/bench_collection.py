@@ -0,0 +1,92 @@
+"""
+Benchmark: test discovery — the former two ``--collect-only`` passes vs. the single, cached pass.
+
+Generates a project of N test modules (each importing a shared helper and defining a few
+tests, some marked ``singleton``) and times discovery four ways:
+
+* **two passes** — ``pytest --collect-only -q`` and then ``-m singleton``, as discovery used to
+  (each in its own interpreter, like the former passes in the discovery subprocess)
+* **one pass, cold** — :class:`GetTests` with an empty collection cache
+* **warm, unchanged** — :class:`GetTests` again, nothing changed
+* **warm, one edit** — :class:`GetTests` after editing one test module
+
+Usage (from the repo root):
+
+    python scripts/bench_collection.py [--modules 500] [--tests-per-module 5]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from pytest_fly.paths import init_workspace  # noqa: E402  (sys.path mutation above is intentional)
+from pytest_fly.pytest_runner.test_list import GetTests  # noqa: E402
+
+
+def _make_project(project_root: Path, modules: int, tests_per_module: int) -> None:
+    Path(project_root, "pytest.ini").write_text("[pytest]\npythonpath = .\nmarkers =\n    singleton: run this module alone\n")
+    Path(project_root, "helpers.py").write_text("import json, decimal, fractions, statistics\n\ndef value(n):\n    return statistics.mean([n, n + 1])\n")
+    for index in range(modules):
+        package = Path(project_root, f"tests_{index // 50:03d}")
+        package.mkdir(exist_ok=True)
+        marker = "@pytest.mark.singleton\n" if index % 20 == 0 else ""
+        tests = "".join(f"{marker}@pytest.mark.parametrize('n', [1, 2])\ndef test_case_{case}(n):\n    assert value(n) > 0\n\n" for case in range(tests_per_module))
+        Path(package, f"test_module_{index:05d}.py").write_text(f"import pytest\nfrom helpers import value\n\n{tests}")
+
+
+def _two_passes(project_root: Path) -> None:
+    env = dict(os.environ, PYTEST_DISABLE_PLUGIN_AUTOLOAD="1")
+    for extra in ([], ["-m", "singleton"]):
+        subprocess.run([sys.executable, "-m", "pytest", "--collect-only", "-q", *extra, str(project_root)], cwd=project_root, env=env, stdout=subprocess.DEVNULL, check=False)
+
+
+def _get_tests(project_root: Path, cache_dir: Path) -> int:
+    get_tests = GetTests(test_dir=project_root, cache_dir=cache_dir)
+    get_tests.start()
+    get_tests.join()
+    return len(get_tests.get_tests())
+
+
+def _timed_s(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modules", type=int, default=500, help="test modules in the generated project")
+    parser.add_argument("--tests-per-module", type=int, default=5, help="test functions per module (each parametrized twice)")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="bench_collection_"))
+    init_workspace(Path(work_dir, "workspace"))
+    project_root = Path(work_dir, "project")
+    project_root.mkdir()
+    _make_project(project_root, args.modules, args.tests_per_module)
+    cache_dir = Path(work_dir, "cache")
+
+    print(f"{args.modules} modules, {args.modules * args.tests_per_module * 2} items")
+    two_passes_s = _timed_s(lambda: _two_passes(project_root))
+    timings = {"two passes": two_passes_s}
+    timings["one pass, cold"] = _timed_s(lambda: _get_tests(project_root, cache_dir))
+    timings["warm, unchanged"] = _timed_s(lambda: _get_tests(project_root, cache_dir))
+    edited = Path(project_root, "tests_000", "test_module_00001.py")
+    edited.write_text(edited.read_text() + "\ndef test_added():\n    assert True\n")
+    timings["warm, one edit"] = _timed_s(lambda: _get_tests(project_root, cache_dir))
+    discovered = _get_tests(project_root, cache_dir)
+    print(f"  {'discovery':<16} {'s':>7} {'speedup':>8}")
+    for label, seconds in timings.items():
+        print(f"  {label:<16} {seconds:>7.2f} {two_passes_s / seconds:>7.1f}x")
+    print(f"  ({discovered} modules discovered)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: the Coverage tab's combined coverage — full re-combination vs. the incremental union.
+
+Generates a project of N source modules and one per-test coverage file per module (each test
+executes its own module and a shared helper), then "finishes" the tests one at a time and
+updates the combined coverage after each, two ways:
+
+* **full** — what the coverage tracker used to do after every finished test: ``coverage combine``
+  over every coverage file so far, a total and a text ``coverage report``, and each finished
+  test's coverage file loaded again for its fraction (timed at a sample of steps)
+* **incremental** — :class:`CoverageUnion`, merging only the newly finished test
+
+Both must give the same totals.
+
+Usage (from the repo root):
+
+    python scripts/bench_coverage_union.py [--modules 500] [--samples 5]
+"""
+
+import argparse
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from coverage import Coverage, CoverageData  # noqa: E402
+
+from pytest_fly.coverage_union import CoverageUnion  # noqa: E402  (sys.path mutation above is intentional)
+from pytest_fly.file_util import sanitize_test_name  # noqa: E402
+
+_FUNCTIONS_PER_MODULE = 20
+
+
+def _make_project(work_dir: Path, modules: int) -> list[str]:
+    """Write the sources and the per-test coverage files; return the test names."""
+    source_dir = Path(work_dir, "src")
+    source_dir.mkdir()
+    helper = Path(source_dir, "helper.py")
+    helper.write_text("".join(f"def helper_{index}(x):\n    return x + {index}\n\n\n" for index in range(100)))
+    coverage_dir = Path(work_dir, "data", "coverage")
+    coverage_dir.mkdir(parents=True)
+    names = []
+    for index in range(modules):
+        source = Path(source_dir, f"module_{index:05d}.py")
+        source.write_text("".join(f"def function_{function}(x):\n    if x:\n        return x * {function}\n    return 0\n\n\n" for function in range(_FUNCTIONS_PER_MODULE)))
+        name = f"tests/test_module_{index:05d}.py"
+        names.append(name)
+        data = CoverageData(basename=str(Path(coverage_dir, f"{sanitize_test_name(name)}.coverage")))
+        executed = [line for function in range(_FUNCTIONS_PER_MODULE) for line in (function * 6 + 1, function * 6 + 2, function * 6 + 3)]
+        data.add_lines({str(source): executed, str(helper): [1 + 4 * (index % 100), 2 + 4 * (index % 100)]})
+        data.write()
+    return names
+
+
+def _full(data_dir: Path, finished: list[str]) -> int:
+    """One update as the tracker used to do it; return the covered statements."""
+    cov = Coverage(data_file=str(Path(data_dir, "combined.coverage")))
+    cov.combine([str(Path(data_dir, "coverage", f"{sanitize_test_name(name)}.coverage")) for name in finished], keep=True)
+    cov.save()
+    cov.report(ignore_errors=True, output_format="total", file=io.StringIO())
+    report = io.StringIO()
+    cov.report(ignore_errors=True, file=report)
+    for name in finished:
+        per_test = Coverage(Path(data_dir, "coverage", f"{sanitize_test_name(name)}.coverage"))
+        per_test.load()
+        data = per_test.get_data()
+        sum(len(data.lines(source) or []) for source in data.measured_files())
+    total_line = next(line for line in report.getvalue().splitlines() if line.startswith("TOTAL"))
+    statements, missing = (int(part) for part in total_line.split()[1:3])
+    return statements - missing
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modules", type=int, default=500, help="source modules (and tests) in the generated project")
+    parser.add_argument("--samples", type=int, default=5, help="steps at which the full re-combination is timed")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="bench_coverage_union_"))
+    names = _make_project(work_dir, args.modules)
+    data_dir = Path(work_dir, "data")
+    print(f"{args.modules} tests finishing one at a time")
+
+    union = CoverageUnion(data_dir)
+    incremental_s = []
+    for step in range(1, len(names) + 1):
+        start = time.perf_counter()
+        union.update(names[:step])
+        union.per_test_fractions(names[:step])
+        incremental_s.append(time.perf_counter() - start)
+
+    sample_steps = sorted({max(1, len(names) * sample // args.samples) for sample in range(1, args.samples + 1)})
+    print(f"  {'finished':>8} {'full s':>8} {'incremental s':>14}")
+    for step in sample_steps:
+        start = time.perf_counter()
+        covered = _full(data_dir, names[:step])
+        full_s = time.perf_counter() - start
+        if step == len(names):
+            assert covered == union.totals()[0], (covered, union.totals())
+        print(f"  {step:>8} {full_s:>8.3f} {incremental_s[step - 1]:>14.4f}")
+    print(f"  incremental, whole run: {sum(incremental_s):.2f} s ({union.totals()[0]}/{union.totals()[1]} statements covered, as coverage report)")
+
+
+if __name__ == "__main__":
+    main()
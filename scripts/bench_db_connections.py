@@ -0,0 +1,124 @@
+"""
+Benchmark: the cost of opening the results DB around every operation vs. the pooled, tuned connections.
+
+Times the operations the GUI tick, the stall watchdog and the result writer repeat, each on a
+database holding a realistic run (N tests, three records each):
+
+* **reader tick** — ``query_change_token`` plus ``query_since`` with nothing new, the GUI's
+  per-tick reads when nothing changed
+* **watchdog sample** — ``query(run_guid)`` without outputs, as the stall watchdog samples
+* **write 1 record** — one status record through :class:`PytestProcessInfoDB`
+* **write batch** — a result writer batch of 20 final records with output
+
+each two ways: **fresh**, where the pooled connections are closed after every operation (so
+each one opens the file, applies the pragmas and prepares its statements, as before pooling),
+and **pooled**, reusing the thread's connections.  A final pair of rows shows what
+``synchronous=NORMAL`` saves per write transaction under WAL, measured with plain commits.
+
+Usage (from the repo root):
+
+    python scripts/bench_db_connections.py [--tests 2000] [--repeat 200]
+"""
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from pytest_fly.__version__ import application_name  # noqa: E402  (sys.path mutation above is intentional)
+from pytest_fly.db import PytestProcessInfoDB, PytestProcessInfoReader, close_pooled_connections  # noqa: E402
+from pytest_fly.guid import generate_uuid  # noqa: E402
+from pytest_fly.interfaces import PyTestFlyExitCode, PytestProcessInfo  # noqa: E402
+
+
+def _median_us(fn, repeat: int, fresh: bool) -> float:
+    timings = []
+    for _ in range(repeat):
+        if fresh:
+            close_pooled_connections()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1e6
+
+
+def _commit_us(db_path: Path, synchronous: str, repeat: int) -> float:
+    """Median cost of a one-row write transaction with the given ``synchronous`` setting."""
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute(f"PRAGMA synchronous = {synchronous}")
+    conn.execute("CREATE TABLE IF NOT EXISTS bench_commit (value INTEGER)")
+    timings = []
+    for value in range(repeat):
+        start = time.perf_counter()
+        conn.execute("BEGIN")
+        conn.execute("INSERT INTO bench_commit (value) VALUES (?)", [value])
+        conn.execute("COMMIT")
+        timings.append(time.perf_counter() - start)
+    conn.close()
+    timings.sort()
+    return timings[len(timings) // 2] * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tests", type=int, default=2000, help="tests in the stored run")
+    parser.add_argument("--repeat", type=int, default=200, help="timings per operation (the median is reported)")
+    args = parser.parse_args()
+
+    data_dir = Path(tempfile.mkdtemp(prefix="bench_db_connections_"))
+    run_guid = generate_uuid()
+    names = [f"tests/test_{index:05d}.py" for index in range(args.tests)]
+    output = "".join(f"tests/test_module.py::test_case_{index} PASSED\n" for index in range(100))
+    with PytestProcessInfoDB(data_dir) as db:
+        for name in names:
+            db.write_many(
+                [
+                    PytestProcessInfo(run_guid, name, None, PyTestFlyExitCode.NONE, None, time.time()),
+                    PytestProcessInfo(run_guid, name, 1, PyTestFlyExitCode.NONE, None, time.time()),
+                    PytestProcessInfo(run_guid, name, 1, PyTestFlyExitCode.OK, output, time.time()),
+                ]
+            )
+    with PytestProcessInfoReader(data_dir) as reader:
+        _records, last_rowid = reader.query_since(run_guid, 0)
+
+    def reader_tick():
+        with PytestProcessInfoReader(data_dir) as reader:
+            reader.query_change_token()
+            reader.query_since(run_guid, last_rowid)
+
+    def watchdog_sample():
+        with PytestProcessInfoReader(data_dir) as reader:
+            reader.query(run_guid)
+
+    def write_one():
+        with PytestProcessInfoDB(data_dir) as db:
+            db.write(PytestProcessInfo(run_guid, names[0], 1, PyTestFlyExitCode.NONE, None, time.time()))
+
+    def write_batch():
+        with PytestProcessInfoDB(data_dir) as db:
+            db.write_many(PytestProcessInfo(run_guid, name, 1, PyTestFlyExitCode.OK, output, time.time()) for name in names[:20])
+
+    print(f"{args.tests} tests ({args.tests * 3} records), median of {args.repeat}")
+    print(f"  {'operation':<20} {'fresh us':>10} {'pooled us':>10} {'speedup':>8}")
+    operations = {"reader tick": reader_tick, "watchdog sample": watchdog_sample, "write 1 record": write_one, "write batch (20)": write_batch}
+    for label, fn in operations.items():
+        fresh_us = _median_us(fn, args.repeat, fresh=True)
+        pooled_us = _median_us(fn, args.repeat, fresh=False)
+        print(f"  {label:<20} {fresh_us:>10.0f} {pooled_us:>10.0f} {fresh_us / pooled_us:>7.1f}x")
+    close_pooled_connections()
+
+    commit_path = Path(data_dir, f"{application_name}.db")
+    full_us = _commit_us(commit_path, "FULL", args.repeat)
+    normal_us = _commit_us(commit_path, "NORMAL", args.repeat)
+    print(f"  {'commit, sync FULL':<20} {full_us:>10.0f}")
+    print(f"  {'commit, sync NORMAL':<20} {normal_us:>10.0f} {'':>10} {full_us / normal_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
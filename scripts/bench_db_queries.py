@@ -0,0 +1,215 @@
+"""
+Benchmark: the results DB's queries on a long history — the single-table schema (v1) vs. the normalized schema (v2).
+
+Builds a schema-version-1 database (one wide ``pytest_process_info`` table, as written by
+earlier pytest-fly versions) holding R runs of T tests each: per test a queued, a started
+and a final record, the final one with an output blob (the same every run while the test
+passes) and a peak-commit sample.  Every query the GUI and the runner issue is timed
+against it with the v1 SQL, then the file is migrated in place by opening
+:class:`PytestProcessInfoDB` (timed too, and the resulting output storage reported) and the
+same queries are timed through :class:`PytestProcessInfoReader` on the normalized tables.
+Both sides build :class:`PytestProcessInfo` records from the rows they read, as the callers do.
+
+The v1 ``query_last_pass`` self-join grows roughly quadratically with the history (seconds
+at 50 runs), so v1 queries are cut off after ``--v1-timeout`` seconds and reported as such.
+
+Usage (from the repo root):
+
+    python scripts/bench_db_queries.py [--runs 1000] [--tests 50] [--output-kb 1] [--repeat 3] [--v1-timeout 30]
+"""
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from pytest_fly.__version__ import application_name  # noqa: E402  (sys.path mutation above is intentional)
+from pytest_fly.db import PytestProcessInfoDB, PytestProcessInfoReader  # noqa: E402
+from pytest_fly.interfaces import PyTestFlyExitCode, PytestProcessInfo  # noqa: E402
+
+_V1_COLUMNS = "run_guid, name, pid, exit_code, output, time_stamp, cpu_percent, memory_percent, put_version, put_fingerprint, commit_bytes"
+_V1_NO_OUTPUT = _V1_COLUMNS.replace("output, ", "")
+_OK = int(PyTestFlyExitCode.OK)
+_NONE = int(PyTestFlyExitCode.NONE)
+
+
+def _build_v1(db_path: Path, runs: int, tests: int, output: str) -> list[str]:
+    """Write the v1 table the way earlier versions laid it out; return the run GUIDs, oldest first."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE pytest_process_info(run_guid TEXT, name TEXT, pid INTEGER, exit_code INTEGER, output TEXT, time_stamp REAL,"
+        " cpu_percent REAL, memory_percent REAL, put_version TEXT, put_fingerprint TEXT, commit_bytes INTEGER)"
+    )
+    conn.execute("CREATE INDEX pytest_process_info_run_guid_idx ON pytest_process_info(run_guid)")
+    conn.execute("CREATE INDEX pytest_process_info_exit_code_idx ON pytest_process_info(exit_code)")
+    run_guids = []
+    start = time.time() - runs * 600.0
+    for run_index in range(runs):
+        run_guid = str(uuid.UUID(int=(run_index + 1) << 64))  # increasing, like UUIDv7
+        run_guids.append(run_guid)
+        run_start = start + run_index * 600.0
+        rows = []
+        for test_index in range(tests):
+            name = f"tests/test_{test_index:04d}.py"
+            exit_code = _OK if (run_index + test_index) % 7 else int(PyTestFlyExitCode.TESTS_FAILED)
+            rows.append((run_guid, name, None, _NONE, None, run_start, None, None, "1.0", "fp", None))
+            rows.append((run_guid, name, 1000 + test_index, _NONE, None, run_start + test_index, None, None, "1.0", "fp", None))
+            # a passing test's output is the same every run; a failure's carries its run's details
+            test_output = f"{name}\n{output}" if exit_code == _OK else f"{name} (run {run_index})\n{output}"
+            rows.append((run_guid, name, 1000 + test_index, exit_code, test_output, run_start + test_index + 2.0, 50.0, 1.0, "1.0", "fp", 100_000 + test_index))
+        conn.executemany(f"INSERT INTO pytest_process_info ({_V1_COLUMNS}) VALUES ({', '.join(['?'] * 11)})", rows)
+    conn.commit()
+    conn.close()
+    return run_guids
+
+
+def _v1_records(rows: list[tuple]) -> list[PytestProcessInfo]:
+    """Records from rows selected as ``_V1_NO_OUTPUT``."""
+    names = _V1_NO_OUTPUT.split(", ")
+    return [PytestProcessInfo(output=None, **dict(zip(names, row))) for row in rows]
+
+
+def _v1_queries(conn: sqlite3.Connection, run_guid: str, names: list[str]) -> dict:
+    """The v1 query implementations, as the single-table schema ran them."""
+
+    def latest_run():
+        rows = conn.execute(f"SELECT {_V1_NO_OUTPUT} FROM pytest_process_info").fetchall()
+        latest = max(row[0] for row in rows)
+        return _v1_records([row for row in rows if row[0] == latest])
+
+    def last_pass():
+        return conn.execute(
+            """
+            SELECT p.name, s.start_ts, p.time_stamp FROM (
+                SELECT name, MAX(run_guid) AS run_guid FROM pytest_process_info WHERE exit_code = ? GROUP BY name
+            ) latest
+            JOIN pytest_process_info p ON p.name = latest.name AND p.run_guid = latest.run_guid AND p.exit_code = ?
+            JOIN (
+                SELECT name, run_guid, MIN(time_stamp) AS start_ts FROM pytest_process_info WHERE pid IS NOT NULL GROUP BY name, run_guid
+            ) s ON s.name = latest.name AND s.run_guid = latest.run_guid
+            """,
+            [_OK, _OK],
+        ).fetchall()
+
+    def peak_commit():
+        return conn.execute(
+            """
+            SELECT p.name, MAX(p.commit_bytes) FROM (
+                SELECT name, MAX(run_guid) AS run_guid FROM pytest_process_info WHERE commit_bytes > 0 GROUP BY name
+            ) latest
+            JOIN pytest_process_info p ON p.name = latest.name AND p.run_guid = latest.run_guid
+            GROUP BY p.name
+            """
+        ).fetchall()
+
+    def recent_runs():
+        run_guids = [row[0] for row in conn.execute("SELECT DISTINCT run_guid FROM pytest_process_info ORDER BY run_guid DESC LIMIT ?", [10])]
+        return [record for guid in run_guids for record in _v1_records(conn.execute(f"SELECT {_V1_NO_OUTPUT} FROM pytest_process_info WHERE run_guid = ?", [guid]).fetchall())]
+
+    def outputs():
+        placeholders = ", ".join(["?"] * len(names))
+        return conn.execute(f"SELECT name, time_stamp, output FROM pytest_process_info WHERE run_guid = ? AND output IS NOT NULL AND name IN ({placeholders})", [run_guid, *names]).fetchall()
+
+    return {
+        "query(run)": lambda: _v1_records(conn.execute(f"SELECT {_V1_NO_OUTPUT} FROM pytest_process_info WHERE run_guid = ?", [run_guid]).fetchall()),
+        "query(latest)": latest_run,
+        "query_last_pass": last_pass,
+        "query_peak_commit": peak_commit,
+        "query_ever_run_names": lambda: conn.execute("SELECT DISTINCT name FROM pytest_process_info WHERE pid IS NOT NULL").fetchall(),
+        "query_recent_runs(10)": recent_runs,
+        "query_outputs(20 tests)": outputs,
+        "query_change_token": lambda: conn.execute("SELECT COUNT(*), MAX(rowid) FROM pytest_process_info").fetchall(),
+    }
+
+
+def _v2_queries(reader: PytestProcessInfoReader, run_guid: str, names: list[str]) -> dict:
+    return {
+        "query(run)": lambda: reader.query(run_guid),
+        "query(latest)": lambda: reader.query(None),
+        "query_last_pass": reader.query_last_pass,
+        "query_peak_commit": reader.query_peak_commit,
+        "query_ever_run_names": reader.query_ever_run_names,
+        "query_recent_runs(10)": lambda: reader.query_recent_runs(10),
+        "query_outputs(20 tests)": lambda: reader.query_outputs(run_guid, names),
+        "query_change_token": reader.query_change_token,
+    }
+
+
+def _best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000.0
+
+
+def _best_ms_or_none(conn: sqlite3.Connection, fn, repeat: int, timeout: float) -> float | None:
+    """Like :func:`_best_ms`, but give up (``None``) once the timings together pass *timeout* seconds."""
+    deadline = time.perf_counter() + timeout
+    conn.set_progress_handler(lambda: int(time.perf_counter() > deadline), 10_000)
+    try:
+        return _best_ms(fn, repeat)
+    except sqlite3.OperationalError:  # interrupted by the progress handler
+        return None
+    finally:
+        conn.set_progress_handler(None, 0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=1000, help="runs in the history")
+    parser.add_argument("--tests", type=int, default=50, help="tests per run")
+    parser.add_argument("--output-kb", type=int, default=1, help="size of each final record's output blob")
+    parser.add_argument("--repeat", type=int, default=3, help="timings per query (best is reported)")
+    parser.add_argument("--v1-timeout", type=float, default=30.0, help="seconds after which a v1 query is cut off")
+    args = parser.parse_args()
+
+    data_dir = Path(tempfile.mkdtemp(prefix="bench_db_queries_"))
+    db_path = Path(data_dir, f"{application_name}.db")
+    output_lines = (f"tests/test_module.py::test_case_{index} PASSED [{index % 100:3d}%] {index * 7919 % 104729}\n" for index in range(1_000_000))
+    output = ""
+    while len(output) < args.output_kb * 1024:
+        output += next(output_lines)
+    run_guids = _build_v1(db_path, args.runs, args.tests, output)
+    run_guid = run_guids[len(run_guids) // 2]
+    names = [f"tests/test_{index:04d}.py" for index in range(min(20, args.tests))]
+    print(f"{args.runs} runs x {args.tests} tests ({args.runs * args.tests * 3} records, {args.output_kb} KB output per final record)")
+
+    conn = sqlite3.connect(db_path)
+    v1_ms = {label: _best_ms_or_none(conn, fn, args.repeat, args.v1_timeout) for label, fn in _v1_queries(conn, run_guid, names).items()}
+    conn.close()
+
+    start = time.perf_counter()
+    with PytestProcessInfoDB(data_dir):
+        pass
+    print(f"migration to the current schema: {time.perf_counter() - start:.1f} s, database {db_path.stat().st_size / 1e6:.1f} MB")
+
+    with PytestProcessInfoReader(data_dir) as reader:
+        storage = reader.query_output_storage()
+    print(
+        f"outputs: {storage.reference_count} records, {storage.output_count} stored; {storage.referenced_bytes / 1e6:.1f} MB of output in {storage.stored_bytes / 1e6:.3f} MB"
+        f" (compression {storage.compression_ratio:.1f}x, overall {storage.overall_ratio:.1f}x)"
+    )
+
+    with PytestProcessInfoReader(data_dir) as reader:
+        v2_ms = {label: _best_ms(fn, args.repeat) for label, fn in _v2_queries(reader, run_guid, names).items()}
+
+    print(f"  {'query':<24} {'v1 ms':>9} {'v2 ms':>9} {'speedup':>8}")
+    for label, old_ms in v1_ms.items():
+        new_ms = v2_ms[label]
+        if old_ms is None:
+            print(f"  {label:<24} {'> ' + str(int(args.v1_timeout * 1000)):>9} {new_ms:>9.2f} {'':>8}")
+        else:
+            print(f"  {label:<24} {old_ms:>9.2f} {new_ms:>9.2f} {old_ms / max(new_ms, 1e-6):>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
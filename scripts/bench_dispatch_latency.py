@@ -0,0 +1,118 @@
+"""
+Benchmark: how quickly the runner reacts — dispatch latency and stop latency.
+
+Runs a real :class:`PytestRunner` over stand-in test processes (a :class:`PytestProcess`
+subclass that just sleeps instead of running pytest, so the measurement is the runner's own
+supervision and not pytest start-up):
+
+* **dispatch latency** — with one worker, the time from a test process finishing its work to
+  the next test process being started.  This is the idle time a worker slot pays per test.
+* **stop latency** — the time from :meth:`PytestRunner.stop` to :meth:`PytestRunner.join`
+  returning while a long test is in flight.
+
+Both should be milliseconds regardless of the polling interval (``--update-rate``): the
+worker waits on the test process's sentinel and on a wakeup that every stop request sets.
+
+Usage (from the repo root):
+
+    python scripts/bench_dispatch_latency.py [--tests 30] [--test-seconds 0.05] [--update-rate 3.0]
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from pytest_fly.file_util import sanitize_test_name  # noqa: E402  (sys.path mutation above is intentional)
+from pytest_fly.guid import generate_uuid  # noqa: E402
+from pytest_fly.interfaces import ScheduledTest  # noqa: E402
+from pytest_fly.pytest_runner import PytestRunner  # noqa: E402
+from pytest_fly.pytest_runner import pytest_runner as pytest_runner_module  # noqa: E402
+from pytest_fly.pytest_runner.pytest_process import PytestProcess  # noqa: E402
+
+_start_times: dict[str, float] = {}  # controller side: test name -> when start() was called
+
+
+class _SleepProcess(PytestProcess):
+    """Stand-in test process: sleeps for the test's duration, records when it finished, and exits at once.
+
+    ``os._exit`` skips interpreter teardown, so the recorded time is (within a millisecond or so)
+    when the process sentinel becomes ready — the latency measured is then the runner's alone.
+    """
+
+    seconds = 0.05  # set by _run; copied to the instance so it reaches the spawned child
+
+    def start(self) -> None:
+        self.sleep_seconds = self.seconds
+        _start_times[self.name] = time.time()
+        super().start()
+
+    def run(self) -> None:
+        time.sleep(self.sleep_seconds)
+        Path(self.data_dir, f"{sanitize_test_name(self.name)}.done").write_text(repr(time.time()))
+        os._exit(0)
+
+
+def _run(tests: int, seconds: float, update_rate: float, workers: int, stop_after: float | None) -> tuple[Path, float | None]:
+    _SleepProcess.seconds = seconds
+    _start_times.clear()
+    data_dir = Path(tempfile.mkdtemp(prefix="bench_dispatch_latency_"))
+    scheduled = [ScheduledTest(node_id=f"tests/test_{index:04d}.py", singleton=False, duration=None, coverage=None) for index in range(tests)]
+    runner = PytestRunner(generate_uuid(), scheduled, workers, data_dir, update_rate)
+    runner.start()
+    stop_latency = None
+    if stop_after is not None:
+        time.sleep(stop_after)
+        stop_start = time.monotonic()
+        runner.stop()
+        runner.join(120.0)
+        stop_latency = time.monotonic() - stop_start
+    else:
+        runner.join(600.0)
+    return data_dir, stop_latency
+
+
+def _dispatch_latencies(data_dir: Path) -> list[float]:
+    order = sorted(_start_times, key=_start_times.get)
+    latencies = []
+    for previous, following in zip(order, order[1:]):
+        done_path = Path(data_dir, f"{sanitize_test_name(previous)}.done")
+        if done_path.exists():
+            latencies.append(_start_times[following] - float(done_path.read_text()))
+    return latencies
+
+
+def _report(title: str, latencies: list[float]) -> None:
+    print(f"{title} over {len(latencies)} hand-offs:")
+    print(f"  median {statistics.median(latencies) * 1000:8.1f} ms")
+    print(f"  p95    {statistics.quantiles(latencies, n=20)[-1] * 1000:8.1f} ms")
+    print(f"  max    {max(latencies) * 1000:8.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tests", type=int, default=30, help="short tests to dispatch back-to-back on one worker")
+    parser.add_argument("--test-seconds", type=float, default=0.05, help="how long each stand-in test runs")
+    parser.add_argument("--update-rate", type=float, default=3.0, help="the runner's polling interval in seconds")
+    args = parser.parse_args()
+
+    multiprocessing.set_start_method("spawn", force=True)  # as the application does
+    pytest_runner_module.resolve_process_class = lambda config: _SleepProcess  # run the stand-in instead of pytest
+
+    print(f"update rate {args.update_rate:.1f} s")
+    data_dir, _ = _run(args.tests, args.test_seconds, args.update_rate, workers=1, stop_after=None)
+    _report("dispatch latency", _dispatch_latencies(data_dir))
+
+    _, stop_latency = _run(1, 600.0, args.update_rate, workers=1, stop_after=2.0)
+    print(f"stop latency (stop() to join() with a test in flight): {stop_latency * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark per-test startup cost: spawn vs. the forkserver execution mode.
+
+Generates a directory of trivial test modules, runs each one in its own
+:class:`PytestProcess` (fresh ``spawn`` interpreter) and then in a
+:class:`ForkserverPytestProcess` (fork of the warm, preloaded template), one at a time, and
+reports the mean wall time per test module. The tests themselves do nothing, so the
+difference is the per-test startup saved.
+
+Usage (from the repo root):
+
+    python scripts/bench_forkserver_startup.py [--modules 20] [--preload some.put.module ...]
+"""
+
+import argparse
+import multiprocessing
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from pytest_fly.guid import generate_uuid  # noqa: E402  (sys.path mutation above is intentional)
+from pytest_fly.paths import init_workspace  # noqa: E402
+from pytest_fly.pytest_runner.forkserver import ForkserverPytestProcess, forkserver_available, start_forkserver  # noqa: E402
+from pytest_fly.pytest_runner.pytest_process import PytestProcess  # noqa: E402
+
+
+def _write_modules(test_dir: Path, count: int) -> list[Path]:
+    paths = []
+    for index in range(count):
+        path = Path(test_dir, f"test_bench_{index:03d}.py")
+        path.write_text(f"def test_bench_{index}():\n    assert True\n")
+        paths.append(path)
+    return paths
+
+
+def _time_runs(process_class: type[PytestProcess], modules: list[Path], data_dir: Path) -> list[float]:
+    data_dir.mkdir(parents=True, exist_ok=True)
+    run_guid = generate_uuid()
+    durations = []
+    for module in modules:
+        start = time.perf_counter()
+        process = process_class(run_guid, module, data_dir, 1.0)
+        process.start()
+        process.join()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modules", type=int, default=20, help="number of test modules to run per mode")
+    parser.add_argument("--preload", nargs="*", default=[], help="extra (PUT) modules to preload into the forkserver template")
+    args = parser.parse_args()
+
+    multiprocessing.set_start_method("spawn", force=True)  # match the application's controller
+    if not forkserver_available():
+        print("forkserver start method is not available on this platform — nothing to compare")
+        return
+
+    with tempfile.TemporaryDirectory() as temp:
+        init_workspace(Path(temp))  # keep the children's logs out of the real workspace
+        test_dir = Path(temp, "tests")
+        test_dir.mkdir()
+        modules = _write_modules(test_dir, args.modules)
+
+        spawn_durations = _time_runs(PytestProcess, modules, Path(temp, "spawn_data"))
+
+        template_start = time.perf_counter()
+        start_forkserver(args.preload)
+        template_seconds = time.perf_counter() - template_start
+        forkserver_durations = _time_runs(ForkserverPytestProcess, modules, Path(temp, "forkserver_data"))
+
+    spawn_mean = statistics.mean(spawn_durations)
+    forkserver_mean = statistics.mean(forkserver_durations)
+    print(f"modules per mode:          {args.modules}")
+    print(f"spawn mean per test:       {spawn_mean:.3f} s (median {statistics.median(spawn_durations):.3f} s)")
+    print(f"forkserver mean per test:  {forkserver_mean:.3f} s (median {statistics.median(forkserver_durations):.3f} s)")
+    print(f"forkserver template launch: {template_seconds:.3f} s (once per run; preload imports finish in the background)")
+    print(f"startup saved per test:    {spawn_mean - forkserver_mean:.3f} s ({1.0 - forkserver_mean / spawn_mean:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark: result-record throughput — per-process exclusive-lock writes vs. the central :class:`ResultWriter`.
+
+Starts N worker processes that each play back the records of a run of short tests: per test
+a RUNNING record, a final record carrying an output blob, and a function-durations set —
+what a :class:`PytestProcess` writes.  All workers are released together (as when many tests
+finish at once), and the time until every record is committed is measured two ways:
+
+* **direct** — each record opens its own :class:`PytestProcessInfoDB` /
+  :class:`FunctionDurationDB`, taking the database's EXCLUSIVE lock (the old per-child path)
+* **writer** — each worker sends its records down its own pipe to one :class:`ResultWriter`
+  thread, which commits them in batches; timed through the final :meth:`ResultWriter.flush`
+
+Usage (from the repo root):
+
+    python scripts/bench_result_writer.py [--workers 1 8 48] [--tests-per-worker 20] [--output-kb 32]
+"""
+
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from pytest_fly.db import PytestProcessInfoReader  # noqa: E402  (sys.path mutation above is intentional)
+from pytest_fly.guid import generate_uuid  # noqa: E402
+from pytest_fly.interfaces import PyTestFlyExitCode, PytestProcessInfo  # noqa: E402
+from pytest_fly.pytest_runner.result_writer import FunctionDurations, ResultWriter, send_result  # noqa: E402
+
+RECORDS_PER_TEST = 3  # RUNNING, final, function durations
+
+
+def _play_back(connection, data_dir: Path, run_guid: str, worker: int, tests: int, output: str, barrier, done, finish) -> None:
+    """Worker process: wait until every worker is up, then send one short test's records after another."""
+    barrier.wait()
+    for index in range(tests):
+        name = f"tests/test_{worker:03d}_{index:04d}.py"
+        send_result(connection, data_dir, PytestProcessInfo(run_guid, name, 1, PyTestFlyExitCode.NONE, None, time.time()))
+        send_result(connection, data_dir, PytestProcessInfo(run_guid, name, 1, PyTestFlyExitCode.OK, output, time.time(), 10.0, 1.0, commit_bytes=1 << 20))
+        send_result(connection, data_dir, FunctionDurations(run_guid, name, {f"{name}::test_a": 0.01, f"{name}::test_b": 0.02}))
+    done.wait()
+    finish.wait()  # exit only once timing is over, so no interpreter teardown competes with the commit
+    if connection is not None:
+        connection.close()
+
+
+def _run(workers: int, tests: int, output_kb: int, use_writer: bool) -> tuple[float, int]:
+    """Return ``(seconds, records committed)`` for one configuration."""
+    context = multiprocessing.get_context("spawn")
+    data_dir = Path(tempfile.mkdtemp(prefix="bench_result_writer_"))
+    run_guid = generate_uuid()
+    output = "x" * (output_kb * 1024)
+    barrier = context.Barrier(workers + 1)  # every worker, plus this process to start the clock
+    done = context.Barrier(workers + 1)  # every worker has sent (or, direct, committed) its records
+    finish = context.Event()
+    writer = ResultWriter(data_dir) if use_writer else None
+    if writer is not None:
+        writer.start()
+
+    processes = []
+    for worker in range(workers):
+        connection = writer.connect() if writer is not None else None
+        process = context.Process(target=_play_back, args=(connection, data_dir, run_guid, worker, tests, output, barrier, done, finish))
+        process.start()
+        if connection is not None:
+            connection.close()
+        processes.append(process)
+
+    barrier.wait()  # released together, as when many tests finish at once
+    start = time.perf_counter()
+    done.wait()
+    if writer is not None:
+        writer.flush()
+    seconds = time.perf_counter() - start  # process start-up and teardown are the same for both paths, so left out
+    finish.set()
+    for process in processes:
+        process.join()
+    if writer is not None:
+        writer.close()
+
+    with PytestProcessInfoReader(data_dir) as db:
+        committed = len(db.query(run_guid)) + len(db.query_function_durations()) // 2
+    return seconds, committed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8, 48], help="concurrent worker processes to measure")
+    parser.add_argument("--tests-per-worker", type=int, default=20, help="short tests each worker plays back")
+    parser.add_argument("--output-kb", type=int, default=32, help="size of each final record's output blob")
+    args = parser.parse_args()
+
+    print(f"{args.tests_per_worker} tests per worker, {RECORDS_PER_TEST} records per test, {args.output_kb} KB output per test")
+    print(f"  {'workers':>7} {'direct rec/s':>13} {'writer rec/s':>13} {'speedup':>8}")
+    for workers in args.workers:
+        expected = workers * args.tests_per_worker * RECORDS_PER_TEST
+        rates = []
+        for use_writer in (False, True):
+            seconds, committed = _run(workers, args.tests_per_worker, args.output_kb, use_writer)
+            if committed != expected:
+                print(f"  warning: {committed} of {expected} records committed ({'writer' if use_writer else 'direct'})")
+            rates.append(expected / seconds)
+        print(f"  {workers:>7} {rates[0]:>13.0f} {rates[1]:>13.0f} {rates[1] / rates[0]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: RESUME mode's carry-over of the prior run's passed tests — per-record writes vs. the in-database copy.
+
+Stores a prior run of N tests (a queued, a started and a passing record each, the passing
+one with output), then carries every test but the last few failures into a new run two ways:
+
+* **per record** — read the prior run with its outputs and write each record back with the
+  new run GUID, one ``write()`` at a time, as run preparation used to
+* **in database** — :meth:`PytestProcessInfoDB.copy_run_records`, one ``INSERT ... SELECT``
+  whose copies reference the stored outputs
+
+for a range of output sizes, so the per-record cost's dependence on the output shows.
+
+Usage (from the repo root):
+
+    python scripts/bench_resume_copy.py [--tests 5000] [--failed 5] [--output-kb 1 16 64]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from pytest_fly.db import PytestProcessInfoDB, PytestProcessInfoReader  # noqa: E402  (sys.path mutation above is intentional)
+from pytest_fly.guid import generate_uuid  # noqa: E402
+from pytest_fly.interfaces import PyTestFlyExitCode, PytestProcessInfo  # noqa: E402
+
+
+def _prior_run(data_dir: Path, names: list[str], output_kb: int) -> str:
+    """Write a run in which every test passed, each with its own output; return its GUID."""
+    run_guid = generate_uuid()
+    rng = random.Random(output_kb)
+    with PytestProcessInfoDB(data_dir) as db:
+        for name in names:
+            output = f"{name}\n" + "".join(f"test_case_{rng.randrange(10**9)} PASSED\n" for _ in range(output_kb * 1024 // 28))
+            db.write_many(
+                [
+                    PytestProcessInfo(run_guid, name, None, PyTestFlyExitCode.NONE, None, time.time()),
+                    PytestProcessInfo(run_guid, name, 1, PyTestFlyExitCode.NONE, None, time.time()),
+                    PytestProcessInfo(run_guid, name, 1, PyTestFlyExitCode.OK, output, time.time()),
+                ]
+            )
+    return run_guid
+
+
+def _per_record(data_dir: Path, skipped: set[str]) -> None:
+    with PytestProcessInfoReader(data_dir) as reader:
+        prior_results = reader.query(include_output=True)
+    run_guid = generate_uuid()
+    prior_by_name: dict[str, list] = {}
+    for record in prior_results:
+        prior_by_name.setdefault(record.name, []).append(record)
+    with PytestProcessInfoDB(data_dir) as db:
+        for record in (record for name in sorted(skipped) for record in prior_by_name.get(name, [])):
+            db.write(replace(record, run_guid=run_guid))
+
+
+def _in_database(data_dir: Path, skipped: set[str]) -> None:
+    with PytestProcessInfoReader(data_dir) as reader:
+        prior_results = reader.query()
+    with PytestProcessInfoDB(data_dir) as db:
+        db.copy_run_records(prior_results[0].run_guid, generate_uuid(), skipped)
+
+
+def _timed_s(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tests", type=int, default=5000, help="tests in the prior run")
+    parser.add_argument("--failed", type=int, default=5, help="tests not carried over (re-run)")
+    parser.add_argument("--output-kb", type=int, nargs="+", default=[1, 16, 64], help="output size per test")
+    args = parser.parse_args()
+
+    names = [f"tests/test_{index:05d}.py" for index in range(args.tests)]
+    skipped = set(names[: args.tests - args.failed])
+    print(f"{args.tests} tests, {len(skipped)} carried over ({len(skipped) * 3} records)")
+    print(f"  {'output KB':>9} {'per record s':>13} {'in database s':>14} {'speedup':>8}")
+    for output_kb in args.output_kb:
+        timings = []
+        for copy in (_per_record, _in_database):
+            data_dir = Path(tempfile.mkdtemp(prefix="bench_resume_copy_"))  # each way on its own copy of the prior run
+            _prior_run(data_dir, names, output_kb)
+            timings.append(_timed_s(lambda: copy(data_dir, skipped)))
+        per_record_s, in_database_s = timings
+        print(f"  {output_kb:>9} {per_record_s:>13.2f} {in_database_s:>14.3f} {per_record_s / in_database_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
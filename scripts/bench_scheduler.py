@@ -0,0 +1,134 @@
+"""
+Simulation benchmark: makespan of FIFO dispatch vs. the critical-path (LPT) scheduler.
+
+Generates synthetic suites (log-normal module durations, some never-run modules with no
+history, a few singletons), then replays each through a discrete-event model of the worker
+pool — the real :class:`DispatchScheduler` hands out the units and singletons run
+exclusively, as the :class:`SingletonCoordinator` enforces.  Actual durations deviate from
+the prior ones by random noise, so the scheduler works from imperfect predictions.
+
+Compared orders:
+
+* ``fifo default`` — FIFO in the default ordering-aspect order (failed / never-run first, then alphabetical)
+* ``fifo longest-prior`` — FIFO after the static LONGEST_PRIOR_FIRST sort
+* ``critical path`` — :class:`DispatchScheduler` with ``critical_path`` enabled
+
+Usage (from the repo root):
+
+    python scripts/bench_scheduler.py [--modules 200] [--workers 8] [--singletons 3] [--seeds 20]
+"""
+
+import argparse
+import heapq
+import random
+import statistics
+import sys
+from pathlib import Path
+from queue import Empty
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from pytest_fly.interfaces import OrderingAspect, ScheduledBatch, ScheduledTest  # noqa: E402  (sys.path mutation above is intentional)
+from pytest_fly.pytest_runner.ordering import OrderingContext, apply_ordering_aspects  # noqa: E402
+from pytest_fly.pytest_runner.scheduler import DispatchScheduler, SchedulerConfig  # noqa: E402
+
+
+def _make_suite(rng: random.Random, modules: int, singletons: int, never_run_fraction: float, noise: float) -> tuple[list[ScheduledTest], dict[str, float]]:
+    """Return the scheduled tests (with prior durations) and each test's actual duration this run."""
+    tests = []
+    actual = {}
+    for index in range(modules):
+        node_id = f"tests/test_{index:04d}.py"
+        true_duration = rng.lognormvariate(0.0, 1.2)  # median 1 s, long tail
+        prior = None if rng.random() < never_run_fraction else true_duration
+        singleton = index < singletons
+        tests.append(ScheduledTest(node_id=node_id, singleton=singleton, duration=prior, coverage=None))
+        actual[node_id] = true_duration * rng.uniform(1.0 - noise, 1.0 + noise)
+    return tests, actual
+
+
+def _unit_actual(unit, actual: dict[str, float]) -> float:
+    if isinstance(unit, ScheduledBatch):
+        return sum(actual[node_id] for node_id in unit.node_ids)
+    return actual[unit.node_id]
+
+
+def simulate(tests: list[ScheduledTest], actual: dict[str, float], workers: int, config: SchedulerConfig) -> float:
+    """Replay *tests* through a model of the worker pool and return the makespan in seconds."""
+    scheduler = DispatchScheduler(list(tests), workers, config)
+    now = 0.0
+    running: list[tuple[float, int, object]] = []  # heap of (end time, worker, unit)
+    waiting: list[tuple[int, object]] = []  # (worker, unit) dequeued but waiting for a coordinator slot
+    idle = list(range(workers))
+    exhausted = False
+
+    def is_singleton(unit) -> bool:
+        return isinstance(unit, ScheduledTest) and unit.singleton
+
+    while True:
+        # idle workers pull their next unit
+        while idle and not exhausted:
+            worker = idle.pop(0)
+            try:
+                waiting.append((worker, scheduler.get(False)))
+            except Empty:
+                exhausted = True  # real workers exit on an empty queue
+        # start whatever the coordinator would admit now (waiting singletons block new normal starts)
+        singleton_running = any(is_singleton(unit) for _end, _worker, unit in running)
+        for entry in list(waiting):
+            worker, unit = entry
+            if is_singleton(unit):
+                if not running:
+                    waiting.remove(entry)
+                    heapq.heappush(running, (now + _unit_actual(unit, actual), worker, unit))
+                    singleton_running = True
+            elif not singleton_running and not any(is_singleton(other) for _worker, other in waiting):
+                waiting.remove(entry)
+                heapq.heappush(running, (now + _unit_actual(unit, actual), worker, unit))
+        if not running:
+            return now
+        now, worker, unit = heapq.heappop(running)
+        scheduler.finished(unit)
+        idle.append(worker)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modules", type=int, default=200, help="test modules per synthetic suite")
+    parser.add_argument("--workers", type=int, default=8, help="worker processes")
+    parser.add_argument("--singletons", type=int, default=3, help="singleton modules per suite")
+    parser.add_argument("--never-run", type=float, default=0.1, help="fraction of modules with no prior duration")
+    parser.add_argument("--noise", type=float, default=0.2, help="actual duration = prior x uniform(1 - noise, 1 + noise)")
+    parser.add_argument("--seeds", type=int, default=20, help="number of synthetic suites to average over")
+    args = parser.parse_args()
+
+    makespans: dict[str, list[float]] = {"fifo default": [], "fifo longest-prior": [], "critical path": []}
+    lower_bounds = []
+    for seed in range(args.seeds):
+        rng = random.Random(seed)
+        tests, actual = _make_suite(rng, args.modules, args.singletons, args.never_run, args.noise)
+        prior_durations = {test.node_id: test.duration for test in tests if test.duration is not None}
+        context = OrderingContext(ever_run_names=set(prior_durations), prior_durations=prior_durations)
+        default_order = apply_ordering_aspects(tests, [OrderingAspect.FAILED_FIRST, OrderingAspect.NEVER_RUN_FIRST], context)
+        longest_order = apply_ordering_aspects(tests, [OrderingAspect.LONGEST_PRIOR_FIRST], context)
+
+        makespans["fifo default"].append(simulate(default_order, actual, args.workers, SchedulerConfig()))
+        makespans["fifo longest-prior"].append(simulate(longest_order, actual, args.workers, SchedulerConfig()))
+        makespans["critical path"].append(simulate(default_order, actual, args.workers, SchedulerConfig(critical_path=True)))
+
+        singleton_time = sum(actual[test.node_id] for test in tests if test.singleton)
+        normal = [actual[test.node_id] for test in tests if not test.singleton]
+        lower_bounds.append(singleton_time + max(sum(normal) / args.workers, max(normal)))
+
+    print(f"{args.modules} modules ({args.singletons} singletons, {args.never_run:.0%} never run), {args.workers} workers, ±{args.noise:.0%} noise, {args.seeds} suites")
+    baseline = statistics.mean(makespans["fifo default"])
+    bound = statistics.mean(lower_bounds)
+    print(f"  {'lower bound':<20} {bound:8.1f} s")
+    for name, values in makespans.items():
+        mean = statistics.mean(values)
+        print(f"  {name:<20} {mean:8.1f} s  ({mean / bound:5.3f}x bound, {(baseline - mean) / baseline:+6.1%} vs fifo default)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: the GUI tick's DB phase as a large run progresses — full re-query vs. the incremental :class:`RunRecordCache`.
+
+Writes a run of N queued tests, then completes them in steps (a RUNNING and a final record,
+with output, per test).  At each step a tick's worth of tests completes and that tick's DB
+work is timed two ways:
+
+* **full** — ``query(run_guid)`` of every record of the run, as each tick used to do
+* **incremental** — :meth:`RunRecordCache.refresh`, which reads only the rows written since
+  the previous tick, then a second refresh with nothing new written
+
+and the tick's data is built two ways: :func:`build_tick_data` over every record of the run
+(**build**) and :meth:`TickDataBuilder.update`, which applies only the tick's new records
+(**incr build**).
+
+Usage (from the repo root):
+
+    python scripts/bench_tick_query.py [--tests 10000] [--steps 5] [--per-tick 20] [--output-kb 4]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from pytest_fly.db import PytestProcessInfoDB, PytestProcessInfoReader  # noqa: E402  (sys.path mutation above is intentional)
+from pytest_fly.guid import generate_uuid  # noqa: E402
+from pytest_fly.interfaces import PyTestFlyExitCode, PytestProcessInfo  # noqa: E402
+from pytest_fly.run_records import RunRecordCache  # noqa: E402
+from pytest_fly.tick_data import TickDataBuilder, build_tick_data  # noqa: E402
+
+
+def _timed_ms(fn) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000.0, result
+
+
+def _complete(data_dir: Path, run_guid: str, names: list[str], output: str) -> None:
+    """Write the RUNNING and final (passing, with output) records of *names*."""
+    records = []
+    for name in names:
+        records.append(PytestProcessInfo(run_guid, name, 1, PyTestFlyExitCode.NONE, None, time.time()))
+        records.append(PytestProcessInfo(run_guid, name, 1, PyTestFlyExitCode.OK, output, time.time()))
+    with PytestProcessInfoDB(data_dir) as db:
+        db.write_many(records)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tests", type=int, default=10000, help="tests in the run")
+    parser.add_argument("--steps", type=int, default=5, help="progress points to measure")
+    parser.add_argument("--per-tick", type=int, default=20, help="tests completing between two ticks")
+    parser.add_argument("--output-kb", type=int, default=4, help="size of each final record's output blob")
+    args = parser.parse_args()
+
+    data_dir = Path(tempfile.mkdtemp(prefix="bench_tick_query_"))
+    run_guid = generate_uuid()
+    names = [f"tests/test_{index:05d}.py" for index in range(args.tests)]
+    output = "x" * (args.output_kb * 1024)
+    with PytestProcessInfoDB(data_dir) as db:
+        db.write_many(PytestProcessInfo(run_guid, name, None, PyTestFlyExitCode.NONE, None, time.time()) for name in names)
+
+    cache = RunRecordCache()
+    builder = TickDataBuilder()
+    with PytestProcessInfoReader(data_dir) as reader:
+        cache.refresh(reader, run_guid)
+    builder.update(cache.process_infos)
+
+    print(f"{args.tests} tests, {args.per_tick} completing per tick, {args.output_kb} KB output per completed test")
+    print(f"  {'completed':>9} {'rows':>6} {'full ms':>8} {'incr ms':>8} {'no-change ms':>13} {'build ms':>9} {'incr build ms':>14}")
+    per_step = args.tests // args.steps
+    for step in range(1, args.steps + 1):
+        step_names = names[(step - 1) * per_step : step * per_step]
+        _complete(data_dir, run_guid, step_names[: -args.per_tick], output)
+        with PytestProcessInfoReader(data_dir) as reader:
+            cache.refresh(reader, run_guid)  # catch up to the tick before the measured one
+        builder.update(cache.process_infos)
+        _complete(data_dir, run_guid, step_names[-args.per_tick :], output)
+        with PytestProcessInfoReader(data_dir) as reader:
+            full_ms, _ = _timed_ms(lambda: reader.query(run_guid))
+            incremental_ms, _ = _timed_ms(lambda: cache.refresh(reader, run_guid))
+            unchanged_ms, _ = _timed_ms(lambda: cache.refresh(reader, run_guid))
+        build_ms, _ = _timed_ms(lambda: build_tick_data(cache.process_infos))
+        incremental_build_ms, _ = _timed_ms(lambda: builder.update(cache.process_infos))
+        print(f"  {step * per_step:>9} {len(cache.process_infos):>6} {full_ms:>8.1f} {incremental_ms:>8.1f} {unchanged_ms:>13.2f} {build_ms:>9.1f} {incremental_build_ms:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
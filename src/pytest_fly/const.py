@@ -7,3 +7,8 @@ PYTEST_FLY_DATA_DIR_STRING = "PYTEST_FLY_DATA_DIR"
 # from) into spawned child processes, which re-import modules fresh and so lose the in-process
 # binding established by paths.init_workspace().
 PYTEST_FLY_WORKSPACE_STRING = "PYTEST_FLY_WORKSPACE"
+
+# Environment variable opting new test outputs into zstd compression (Python 3.14+).  Off by
+# default: the results DB is shared by every Python using the data directory, and an older one
+# cannot decompress what a newer one stored this way.
+PYTEST_FLY_OUTPUT_ZSTD_STRING = "PYTEST_FLY_OUTPUT_ZSTD"
@@ -0,0 +1,212 @@
+"""
+Incremental combined coverage — the union of the per-test coverage files, kept up to date as tests finish.
+
+Combining every per-test ``.coverage`` file again and running ``coverage report`` over the
+result after each finished test costs time proportional to the tests finished so far, so a
+run pays for it quadratically.  A :class:`CoverageUnion` instead reads each test's coverage
+file once, when it is new or was rewritten, and ORs the lines it executed into a persistent
+per-source-file line bitset (a numpy boolean array indexed by line number).
+
+The numbers are those ``coverage report`` gives for the combined data: each source file is
+parsed once (again only when it changes) with coverage's own Python parser and exclusion
+configuration, executed lines are mapped to the first line of their statement, and a source
+file that cannot be read or parsed is left out (as ``ignore_errors=True`` does).  Each test's
+fraction — the statements it executed over the statements of every measured file — is counted
+once when its data is merged.  Kept free of Qt so it can be tested headless.
+"""
+
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+from coverage import CoverageData
+from coverage.python import PythonFileReporter
+from typeguard import typechecked
+
+from .file_util import sanitize_test_name
+from .logger import get_logger
+from .pytest_runner.coverage import COVERAGE_READ_ERRORS, PytestFlyCoverage
+
+log = get_logger()
+
+
+@dataclass
+class _SourceLines:
+    """A measured source file's statements and the union of the lines the merged tests executed in it."""
+
+    signature: tuple[int, int] | None  # (mtime_ns, size) when parsed; None if the file is gone
+    statements: np.ndarray | None = None  # bool per line number; None if the file could not be parsed
+    first_lines: np.ndarray | None = None  # line number -> first line of the statement holding it
+    covered: np.ndarray | None = None  # bool per line number: a statement some merged test executed
+    statement_count: int = 0
+    covered_count: int = 0
+
+    def executed_statements(self, lines: np.ndarray) -> np.ndarray:
+        """The statements among the executed *lines*, as a bitset (the file must be parsed)."""
+        lines = lines[(lines > 0) & (lines < len(self.first_lines))]
+        executed = np.zeros(len(self.statements), dtype=bool)
+        executed[self.first_lines[lines]] = True
+        executed &= self.statements
+        return executed
+
+
+@dataclass
+class _TestLines:
+    """The lines one test executed, as read from its coverage file."""
+
+    signature: tuple[int, int]  # (mtime_ns, size) of the coverage file when read
+    executed: dict[str, np.ndarray]  # source file -> executed line numbers
+    statement_counts: dict[str, int] = field(default_factory=dict)  # source file -> statements executed in it
+
+
+class CoverageUnion:
+    """Combined and per-test coverage of the tests merged so far.
+
+    Not thread safe: one thread (the GUI's coverage worker) owns it.
+
+    :param data_dir: Directory holding the per-test coverage data (``data_dir/coverage``).
+    """
+
+    def __init__(self, data_dir: Path):
+        self.coverage_dir = Path(data_dir, "coverage")
+        self._coverage = PytestFlyCoverage(None)  # the exclusion configuration `coverage report` parses sources with
+        self._sources: dict[str, _SourceLines] = {}
+        self._tests: dict[str, _TestLines] = {}
+        self._tests_by_source: dict[str, set[str]] = {}
+
+    def reset(self) -> None:
+        """Forget the merged tests (a new run), keeping the parsed source files for when they are measured again."""
+        self._tests = {}
+        self._tests_by_source = {}
+        for source in self._sources.values():
+            if source.covered is not None:
+                source.covered[:] = False
+            source.covered_count = 0
+
+    @typechecked()
+    def update(self, test_names: Iterable[str]) -> None:
+        """Merge the coverage of those of *test_names* whose coverage file is new or was rewritten.
+
+        Source files changed since they were parsed are parsed again first.
+
+        :param test_names: Tests that finished (tests already merged and unchanged cost one ``stat``).
+        """
+        rebuild = self._refresh_sources()
+        for name in test_names:
+            path = Path(self.coverage_dir, f"{sanitize_test_name(name)}.coverage")
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            signature = (stat.st_mtime_ns, stat.st_size)
+            known = self._tests.get(name)
+            if known is not None and known.signature == signature:
+                continue
+            try:
+                data = CoverageData(basename=str(path))
+                data.read()
+                executed = {source: np.fromiter(data.lines(source) or (), dtype=np.int64) for source in data.measured_files()}
+            except COVERAGE_READ_ERRORS as e:
+                log.info(f"coverage of {name} unreadable: {e}")
+                continue
+            test = _TestLines(signature, executed)
+            if known is not None:  # run again: its earlier lines may no longer be in the union
+                rebuild.update(known.executed)
+                rebuild.update(executed)
+                for source in known.executed:
+                    self._tests_by_source[source].discard(name)
+            self._tests[name] = test
+            for source, lines in executed.items():
+                self._tests_by_source.setdefault(source, set()).add(name)
+                source_lines = self._sources.get(source)
+                if source_lines is None:
+                    source_lines = self._sources[source] = self._parse(source)
+                if source in rebuild or source_lines.statements is None:
+                    continue
+                statements = source_lines.executed_statements(lines)
+                test.statement_counts[source] = int(np.count_nonzero(statements))
+                new = statements & ~source_lines.covered
+                source_lines.covered |= new
+                source_lines.covered_count += int(np.count_nonzero(new))
+        for source in rebuild:
+            self._rebuild(source)
+
+    def totals(self) -> tuple[int, int]:
+        """``(covered, total)`` statements over the source files the merged tests measured (those that could be parsed)."""
+        covered = total = 0
+        for source, names in self._tests_by_source.items():
+            if names:
+                source_lines = self._sources[source]
+                covered += source_lines.covered_count
+                total += source_lines.statement_count
+        return covered, total
+
+    def fraction(self) -> float | None:
+        """Combined coverage (0.0-1.0) as ``coverage report`` gives it, or ``None`` with no data to report."""
+        if not any(self._tests_by_source.values()):
+            return None
+        covered, total = self.totals()
+        return covered / total if total > 0 else 1.0
+
+    def per_test_fractions(self, test_names: Iterable[str]) -> dict[str, float]:
+        """Each merged test's executed statements as a fraction of all the measured statements (tests not merged are omitted)."""
+        _, total = self.totals()
+        if total == 0:
+            return {}
+        return {name: sum(test.statement_counts.values()) / total for name in test_names if (test := self._tests.get(name)) is not None}
+
+    def _parse(self, source: str) -> _SourceLines:
+        """Read *source*'s statements (``coverage report`` skips a file it cannot read or parse; so does the union)."""
+        try:
+            stat = os.stat(source)
+        except OSError:
+            return _SourceLines(None)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        try:
+            reporter = PythonFileReporter(source, self._coverage)
+            statement_lines = reporter.lines()
+            multiline = reporter.multiline_map()
+        except COVERAGE_READ_ERRORS as e:
+            log.info(f'"{source}" not parsed for coverage: {e}')
+            return _SourceLines(signature)
+        size = max(max(statement_lines, default=0), max(multiline, default=0)) + 1
+        statements = np.zeros(size, dtype=bool)
+        statements[list(statement_lines)] = True
+        first_lines = np.arange(size)
+        if multiline:
+            first_lines[list(multiline)] = list(multiline.values())
+        return _SourceLines(signature, statements, first_lines, np.zeros(size, dtype=bool), len(statement_lines))
+
+    def _refresh_sources(self) -> set[str]:
+        """Parse the source files changed since they were parsed again; return them (their unions need rebuilding)."""
+        changed = set()
+        for source, source_lines in self._sources.items():
+            try:
+                stat = os.stat(source)
+                signature = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                signature = None
+            if signature != source_lines.signature:
+                changed.add(source)
+        for source in changed:
+            self._sources[source] = self._parse(source)
+        return changed
+
+    def _rebuild(self, source: str) -> None:
+        """Recompute *source*'s union and its tests' statement counts from the merged tests' lines."""
+        source_lines = self._sources[source]
+        names = self._tests_by_source.get(source, set())
+        if source_lines.statements is None:
+            source_lines.covered_count = 0
+            for name in names:
+                self._tests[name].statement_counts.pop(source, None)
+            return
+        source_lines.covered[:] = False
+        for name in names:
+            test = self._tests[name]
+            statements = source_lines.executed_statements(test.executed[source])
+            test.statement_counts[source] = int(np.count_nonzero(statements))
+            source_lines.covered |= statements
+        source_lines.covered_count = int(np.count_nonzero(source_lines.covered))
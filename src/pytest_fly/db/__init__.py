@@ -1,2 +1,11 @@
+from .db import DatabaseSize as DatabaseSize
+from .db import FunctionDurationDB as FunctionDurationDB
+from .db import OutputStorageStats as OutputStorageStats
 from .db import PytestProcessInfoDB as PytestProcessInfoDB
 from .db import PytestProcessInfoReader as PytestProcessInfoReader
+from .db import close_pooled_connections as close_pooled_connections
+from .db import compact_database as compact_database
+from .db import query_database_size as query_database_size
+from .retention import RetentionConfig as RetentionConfig
+from .retention import RetentionResult as RetentionResult
+from .retention import prune_results as prune_results
@@ -1,7 +1,7 @@
 """
 SQLite persistence layer for :class:`PytestProcessInfo` records.
 
-Two access classes share the same table and query logic:
+Two access classes share the same tables and query logic:
 
 - :class:`PytestProcessInfoDB` — read/write, built on
   `msqlite <https://pypi.org/project/msqlite/>`_, whose context manager holds the
@@ -13,31 +13,260 @@ Two access classes share the same table and query logic:
   writers.  Routing GUI reads through the msqlite class instead would contend
   for the exclusive lock several times per refresh tick — the main source of
   intermittent multi-second GUI freezes during a run.
+
+Schema (version 4, recorded in ``PRAGMA user_version``):
+
+- ``runs`` — one row per run GUID with its record count, so "most recent runs" is a
+  primary-key seek and the change token a sum over runs rather than scans of every record.
+- ``test_events`` — one row per :class:`PytestProcessInfo` state transition, without the
+  output.  Its rowid is the write order; it is indexed by run (rowid order within the run)
+  and by ``(run_guid, name, time_stamp)``, plus partial indexes for the cross-run queries.
+- ``outputs`` — the (potentially multi-megabyte) pytest output of a test's final record,
+  referenced by ``test_events.output_id``, so reading state transitions never pages
+  through output blobs.  Each distinct output is stored once, compressed, and keyed by a
+  hash of its content: a test whose output is the same run after run (the usual case for
+  a passing test) adds one reference per run, not another copy.  Outputs are decompressed
+  only by the queries that ask for them (see :func:`_decode_output`).
+- ``last_pass`` — each test's most recent passing run, maintained as records are written.
+- ``ever_run`` — the name of every test that has ever started, maintained as records are
+  written, so it outlives the records that put it there (see :mod:`pytest_fly.db.retention`).
+
+New files are created with ``auto_vacuum=INCREMENTAL``, so the space freed by pruning can be
+returned to the file system a step at a time (see :func:`compact_database`).
+
+Schema version 1 kept everything in one wide ``pytest_process_info`` table, version 2
+stored every output uncompressed and version 3 derived "ever run" from the records; a
+database in an earlier layout is migrated in place the first time :class:`PytestProcessInfoDB`
+opens it.
+
+A further table in the same file, written through :class:`FunctionDurationDB`, holds
+per-test-function durations; it feeds the automatic splitting of critical-path modules
+(see :mod:`pytest_fly.pytest_runner.sharding`).
+
+Connections are pooled: each thread keeps one long-lived read and one long-lived write
+connection per database file (see :func:`_pooled_connection`), so the GUI tick, the stall
+watchdog's samples and the result writer's batches reuse an open, tuned connection — and
+its cache of prepared statements — instead of opening the file every time.
 """
 
+import hashlib
+import os
+import random
 import sqlite3
+import threading
+import time
+import zlib
 from collections.abc import Callable, Iterable, Sequence
-from dataclasses import asdict
+from dataclasses import asdict, dataclass
 from enum import IntEnum, StrEnum
+from functools import cache
 from pathlib import Path
 
-from msqlite import MSQLite
+from msqlite import MSQLite, MSQLiteMaxRetriesError, type_to_sqlite_type
 from typeguard import typechecked
 
 from ..__version__ import application_name
+from ..const import PYTEST_FLY_OUTPUT_ZSTD_STRING
 from ..interfaces import PyTestFlyExitCode, PytestProcessInfo, is_terminal_exit_code, status_record
 from ..logger import get_logger
 
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    zstd = None
+
 log = get_logger()
 
-_TABLE_NAME = "pytest_process_info"
+_SCHEMA_VERSION = 4  # PRAGMA user_version of the layout below
+_LEGACY_TABLE_NAME = "pytest_process_info"  # schema version 1: records and outputs in one table
+_RUNS_TABLE_NAME = "runs"
+_EVENTS_TABLE_NAME = "test_events"
+_OUTPUTS_TABLE_NAME = "outputs"
+_V2_OUTPUTS_TABLE_NAME = "outputs_v2"  # schema version 2's uncompressed outputs, while being migrated
+_LAST_PASS_TABLE_NAME = "last_pass"
+_EVER_RUN_TABLE_NAME = "ever_run"
+_FUNCTION_DURATION_TABLE_NAME = "function_duration"
+
+# Partial indexes only serve queries whose WHERE clause repeats their condition literally
+# (a bound parameter does not count), so the exit code is spelled out in both places.
+_OK = int(PyTestFlyExitCode.OK)
+
+_INDEX_STATEMENTS = [
+    # One run's records in write order: SQLite appends the rowid to every index entry, so
+    # "run_guid = ? [AND rowid > ?] ORDER BY rowid" is a single range of this index.
+    f"CREATE INDEX IF NOT EXISTS {_EVENTS_TABLE_NAME}_run_guid_idx ON {_EVENTS_TABLE_NAME}(run_guid)",
+    # Per-test lookups within a run (latest record of a test, a test's start, outputs by name).
+    f"CREATE INDEX IF NOT EXISTS {_EVENTS_TABLE_NAME}_run_name_time_idx ON {_EVENTS_TABLE_NAME}(run_guid, name, time_stamp)",
+    # Cross-run queries, each covered by a partial index holding just the rows it reads.
+    f"CREATE INDEX IF NOT EXISTS {_EVENTS_TABLE_NAME}_pass_idx ON {_EVENTS_TABLE_NAME}(name, run_guid) WHERE exit_code = {_OK}",
+    f"CREATE INDEX IF NOT EXISTS {_EVENTS_TABLE_NAME}_commit_idx ON {_EVENTS_TABLE_NAME}(name, run_guid, commit_bytes) WHERE commit_bytes > 0",
+    # The references to an output, so deleting a run can keep the outputs other runs share.
+    f"CREATE INDEX IF NOT EXISTS {_EVENTS_TABLE_NAME}_output_idx ON {_EVENTS_TABLE_NAME}(output_id) WHERE output_id IS NOT NULL",
+]
+
+
+class _OutputCodec(IntEnum):
+    """How an ``outputs`` row's ``data`` is encoded (stored per row, so codecs can coexist in one file)."""
+
+    RAW = 0  # UTF-8, for outputs compression does not shrink
+    ZLIB = 1
+    ZSTD = 2  # opt-in, when the interpreter has compression.zstd
+
+
+def _output_codec() -> _OutputCodec:
+    """The codec for new outputs: zlib, which every supported Python reads, unless zstd is opted into (and available)."""
+    if zstd is not None and os.environ.get(PYTEST_FLY_OUTPUT_ZSTD_STRING, "") not in ("", "0"):
+        return _OutputCodec.ZSTD
+    return _OutputCodec.ZLIB
+
+
+@dataclass(frozen=True)
+class OutputStorageStats:
+    """How much space the stored test outputs take, and how much compression and deduplication save."""
+
+    output_count: int  # distinct outputs stored
+    reference_count: int  # records carrying an output
+    raw_bytes: int  # UTF-8 size of the distinct outputs
+    stored_bytes: int  # their size as stored (compressed)
+    referenced_bytes: int  # UTF-8 size of every record's output, as if each were stored separately
+
+    @property
+    def compression_ratio(self) -> float:
+        """Raw size of the distinct outputs over their stored size (``1.0`` when nothing is stored)."""
+        return self.raw_bytes / self.stored_bytes if self.stored_bytes > 0 else 1.0
+
+    @property
+    def overall_ratio(self) -> float:
+        """Size every record's output would take uncompressed over the space actually used (compression and deduplication)."""
+        return self.referenced_bytes / self.stored_bytes if self.stored_bytes > 0 else 1.0
+
+
+# run_guid: the run; name: the scheduled node id the function ran under (its module, class or itself);
+# function: function-level node id (parametrizations summed); duration: setup + call + teardown seconds.
+_FUNCTION_DURATION_SCHEMA: dict[str, type] = {"run_guid": str, "name": str, "function": str, "duration": float}
 
 # SQLite's default variable limit is 999; keep IN-clause chunks comfortably below it.
 _IN_CLAUSE_CHUNK = 500
 
+# Per-connection tuning.  A memory map serves reads straight from the OS page cache instead of
+# copying every page into SQLite's own cache; the page cache (negative = KiB) keeps the indexes
+# the per-tick queries walk resident between ticks.
+_MMAP_SIZE = 256 * 1024 * 1024
+_CACHE_SIZE_KIB = 16 * 1024
+_CACHED_STATEMENTS = 256  # prepared statements kept per connection (Python's default is 128)
+_READ_PRAGMAS = ["PRAGMA query_only = ON", f"PRAGMA mmap_size = {_MMAP_SIZE}", f"PRAGMA cache_size = -{_CACHE_SIZE_KIB}"]
+# Under WAL, synchronous=NORMAL syncs at checkpoints instead of at every commit: a power loss can
+# lose the last few commits but never corrupts the file, which suits results re-created by a re-run.
+_WRITE_PRAGMAS = ["PRAGMA synchronous = NORMAL", f"PRAGMA mmap_size = {_MMAP_SIZE}", f"PRAGMA cache_size = -{_CACHE_SIZE_KIB}"]
+_READ_TIMEOUT = 2.0  # seconds a reader waits on a lock (under WAL only while a checkpoint resets the log)
+_WRITE_TIMEOUT = 5.0  # seconds a writer's BEGIN EXCLUSIVE waits before msqlite-style retrying
+
+
+class _ConnectionPool(threading.local):
+    """The calling thread's long-lived connections, keyed by ``(database path, is_writer)``.
+
+    Each entry also records the file's identity and the owning process: a connection to a
+    file that has since been deleted or replaced, or one inherited across a fork, is never
+    reused.  A thread's connections are closed when the thread ends.
+    """
+
+    def __init__(self) -> None:
+        self.connections: dict[tuple[Path, bool], tuple[sqlite3.Connection, tuple[int, int] | None, int]] = {}
+
+
+_pool = _ConnectionPool()
+
+
+def _file_identity(db_path: Path) -> tuple[int, int] | None:
+    try:
+        stat = db_path.stat()
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+def _pooled_connection(db_path: Path, write: bool) -> sqlite3.Connection | None:
+    """Return the calling thread's connection to *db_path*, opening and tuning it on first use.
+
+    Checking the pooled connection costs one ``stat`` of the file; opening a new one costs the
+    open, the pragmas and re-preparing every statement.  Readers get ``None`` when the file does
+    not exist (they fail open); writers create it.  Reader connections are ``query_only`` and run
+    in autocommit mode, so between queries they hold no snapshot and never delay a checkpoint.
+    Writer connections follow msqlite's transaction handling (``isolation_level="EXCLUSIVE"``).
+    """
+    key = (db_path, write)
+    identity = _file_identity(db_path)
+    pooled = _pool.connections.pop(key, None)
+    if pooled is not None:
+        conn, pooled_identity, pid = pooled
+        if pid == os.getpid() and pooled_identity == identity:
+            _pool.connections[key] = pooled
+            return conn
+        if pid == os.getpid():
+            conn.close()  # the file was deleted or replaced (a connection inherited across a fork is left alone)
+    if identity is None and not write:
+        return None
+    if write:
+        conn = sqlite3.connect(db_path, timeout=_WRITE_TIMEOUT, isolation_level="EXCLUSIVE", cached_statements=_CACHED_STATEMENTS)
+    else:
+        conn = sqlite3.connect(db_path, timeout=_READ_TIMEOUT, cached_statements=_CACHED_STATEMENTS)
+    for pragma in _WRITE_PRAGMAS if write else _READ_PRAGMAS:
+        conn.execute(pragma).fetchall()
+    _pool.connections[key] = (conn, _file_identity(db_path), os.getpid())
+    return conn
+
+
+def close_pooled_connections() -> None:
+    """Close the calling thread's pooled connections (e.g. before the database files are removed)."""
+    connections, _pool.connections = _pool.connections, {}
+    for conn, _identity, pid in connections.values():
+        if pid == os.getpid():
+            conn.close()
+
+
+class _PooledMSQLite(MSQLite):
+    """:class:`MSQLite` on the calling thread's pooled write connection.
+
+    Same locking as msqlite — the ``with`` block is one EXCLUSIVE transaction, retried while
+    another connection holds the lock, and committed on exit (rolled back if the block raised) —
+    but the connection outlives the block instead of being opened and closed around every write.
+    """
+
+    def __enter__(self):
+        conn = _pooled_connection(self.db_path, write=True)
+        while True:
+            if self.retry_limit is not None and self.retry_count > self.retry_limit:
+                raise MSQLiteMaxRetriesError(f"Exceeded maximum retries of {self.retry_limit}")
+            try:
+                conn.execute("BEGIN EXCLUSIVE TRANSACTION")  # lock the database
+                break
+            except sqlite3.OperationalError as e:
+                if "database is locked" not in str(e).lower():
+                    raise
+                self.retry_count += 1
+                time.sleep(self.retry_scale * 2.0 * random.random())
+        self.conn = conn
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        conn, self.conn = self.conn, None
+        if exc_type is None:
+            conn.commit()
+        else:
+            conn.rollback()  # all or nothing, so a writer that retries the block does not store its records twice
+
 
 def _derive_schema() -> tuple[dict[str, type], list[str]]:
-    """Derive the SQLite schema and ordered column list from the :class:`PytestProcessInfo` dataclass."""
+    """Derive the SQLite schema and ordered column list from the :class:`PytestProcessInfo` dataclass.
+
+    Derived once per process (the dataclass does not change); each call returns fresh copies.
+    """
+    schema, columns = _derived_schema()
+    return dict(schema), list(columns)
+
+
+@cache
+def _derived_schema() -> tuple[dict[str, type], list[str]]:
     schema: dict[str, type] = {}
     columns: list[str] = []
     # fake to fill out all the fields since the underlying data structure is a dataclass
@@ -67,81 +296,319 @@ def _derive_schema() -> tuple[dict[str, type], list[str]]:
     return schema, columns
 
 
+def _event_schema() -> dict[str, type]:
+    """Columns of ``test_events``: every :class:`PytestProcessInfo` field but ``output``, plus the ``outputs`` reference."""
+    schema, _columns = _derive_schema()
+    del schema["output"]
+    schema["output_id"] = int
+    return schema
+
+
+def _create_schema(conn: sqlite3.Connection) -> None:
+    """Create any missing table or index of the current schema (idempotent).
+
+    Columns added to :class:`PytestProcessInfo` since ``test_events`` was created are
+    added to the existing table, so a new field never costs the stored history.
+    """
+    event_schema = _event_schema()
+    event_columns = ", ".join(f"{column} {type_to_sqlite_type[column_type]}" for column, column_type in event_schema.items())
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {_RUNS_TABLE_NAME} (run_guid TEXT PRIMARY KEY, start_time_stamp REAL, record_count INTEGER) WITHOUT ROWID")
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {_EVENTS_TABLE_NAME} ({event_columns})")
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {_OUTPUTS_TABLE_NAME} (output_id INTEGER PRIMARY KEY, digest BLOB UNIQUE, codec INTEGER, raw_size INTEGER, data BLOB)")
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {_LAST_PASS_TABLE_NAME} (name TEXT PRIMARY KEY, run_guid TEXT, start_time_stamp REAL, end_time_stamp REAL) WITHOUT ROWID")
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {_EVER_RUN_TABLE_NAME} (name TEXT PRIMARY KEY) WITHOUT ROWID")
+    existing_columns = {row[1] for row in conn.execute(f"PRAGMA table_info({_EVENTS_TABLE_NAME})").fetchall()}
+    for column, column_type in event_schema.items():
+        if column not in existing_columns:
+            log.info(f"adding column {column!r} to {_EVENTS_TABLE_NAME!r}")
+            conn.execute(f"ALTER TABLE {_EVENTS_TABLE_NAME} ADD COLUMN {column} {type_to_sqlite_type[column_type]}")
+    for statement in _INDEX_STATEMENTS:
+        conn.execute(statement)
+
+
+def _has_table(conn: sqlite3.Connection, table_name: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", [table_name]).fetchone() is not None
+
+
+def _encode_output(output: str) -> tuple[bytes, int, int, bytes]:
+    """Encode an output for the ``outputs`` table.
+
+    :return: ``(digest, codec, raw_size, data)`` — *digest* identifies the content, *data* is
+        the compressed UTF-8, or the UTF-8 itself when compressing would not make it smaller.
+    """
+    raw = output.encode("utf-8", errors="surrogatepass")
+    digest = hashlib.blake2b(raw, digest_size=16).digest()
+    codec = _output_codec()
+    data = zstd.compress(raw) if codec == _OutputCodec.ZSTD else zlib.compress(raw)
+    if len(data) >= len(raw):
+        codec, data = _OutputCodec.RAW, raw
+    return digest, int(codec), len(raw), data
+
+
+def _decode_output(codec: int, data: bytes | None) -> str | None:
+    """Inverse of :func:`_encode_output`."""
+    if data is None:
+        return None
+    if codec == _OutputCodec.ZLIB:
+        data = zlib.decompress(data)
+    elif codec == _OutputCodec.ZSTD:
+        if zstd is None:
+            log.warning("test output was stored zstd-compressed, which this Python cannot decompress (needs 3.14+)")
+            return "<output unavailable: stored zstd-compressed, which needs Python 3.14+>"
+        data = zstd.decompress(data)
+    return data.decode("utf-8", errors="surrogatepass")
+
+
+def _store_output(conn: sqlite3.Connection, output: str) -> int:
+    """Return the ``output_id`` of *output*, storing it first unless identical content is already stored."""
+    digest, codec, raw_size, data = _encode_output(output)
+    row = conn.execute(f"SELECT output_id FROM {_OUTPUTS_TABLE_NAME} WHERE digest = ?", [digest]).fetchone()
+    if row is not None:
+        return row[0]
+    return conn.execute(f"INSERT INTO {_OUTPUTS_TABLE_NAME} (digest, codec, raw_size, data) VALUES (?, ?, ?, ?)", [digest, codec, raw_size, data]).lastrowid
+
+
+def _restore_outputs(conn: sqlite3.Connection, old_outputs: Iterable[tuple[int, str]]) -> int:
+    """Store uncompressed outputs from an older schema and repoint ``test_events.output_id`` at them.
+
+    :param old_outputs: ``(old output_id, output)`` pairs; ``test_events.output_id`` holds the old ids.
+    :return: The number of outputs read.
+    """
+    conn.execute("CREATE TEMP TABLE output_map (old_id INTEGER PRIMARY KEY, new_id INTEGER)")
+    count = 0
+    for old_id, output in old_outputs:
+        conn.execute("INSERT INTO temp.output_map (old_id, new_id) VALUES (?, ?)", [old_id, _store_output(conn, output)])
+        count += 1
+    conn.execute(f"UPDATE {_EVENTS_TABLE_NAME} SET output_id = (SELECT new_id FROM temp.output_map WHERE old_id = {_EVENTS_TABLE_NAME}.output_id) WHERE output_id IS NOT NULL")
+    conn.execute("DROP TABLE temp.output_map")
+    return count
+
+
+def _migrate_v2_outputs(conn: sqlite3.Connection) -> None:
+    """Compress and deduplicate a schema-version-2 ``outputs`` table (renamed to ``outputs_v2`` by :func:`_prepare_database`)."""
+    if not _has_table(conn, _V2_OUTPUTS_TABLE_NAME):
+        return
+    # the rows are read through a second cursor while _restore_outputs writes through the connection
+    count = _restore_outputs(conn, conn.cursor().execute(f"SELECT output_id, output FROM {_V2_OUTPUTS_TABLE_NAME} WHERE output IS NOT NULL"))
+    conn.execute(f"DROP TABLE {_V2_OUTPUTS_TABLE_NAME}")
+    log.info(f"compressed {count} outputs to schema version {_SCHEMA_VERSION}")
+
+
+def _migrate_ever_run(conn: sqlite3.Connection) -> None:
+    """Fill ``ever_run`` from the records of a database from before schema version 4."""
+    conn.execute(f"INSERT OR IGNORE INTO {_EVER_RUN_TABLE_NAME} (name) SELECT DISTINCT name FROM {_EVENTS_TABLE_NAME} WHERE pid IS NOT NULL AND name IS NOT NULL")
+    conn.execute(f"DROP INDEX IF EXISTS {_EVENTS_TABLE_NAME}_started_idx")  # served query_ever_run_names before ever_run existed
+
+
+def _migrate_legacy_table(conn: sqlite3.Connection) -> None:
+    """Move a schema-version-1 ``pytest_process_info`` table's records into the current tables, then drop it.
+
+    Rowids are carried over, so the records keep their write order.  A legacy table lacking
+    the columns that identify a record cannot be migrated and is dropped, as every schema
+    change used to be.
+    """
+    legacy_columns = {row[1] for row in conn.execute(f"PRAGMA table_info({_LEGACY_TABLE_NAME})").fetchall()}
+    if not legacy_columns:
+        return
+    if {"run_guid", "name", "exit_code", "time_stamp"} <= legacy_columns:
+        copied_columns = ", ".join(column for column in _event_schema() if column in legacy_columns)
+        # each record's output is first referenced by its legacy rowid, then stored and repointed
+        output_id = "CASE WHEN output IS NULL THEN NULL ELSE rowid END" if "output" in legacy_columns else "NULL"
+        cursor = conn.execute(f"INSERT INTO {_EVENTS_TABLE_NAME} (rowid, {copied_columns}, output_id) SELECT rowid, {copied_columns}, {output_id} FROM {_LEGACY_TABLE_NAME} ORDER BY rowid")
+        if "output" in legacy_columns:
+            _restore_outputs(conn, conn.cursor().execute(f"SELECT rowid, output FROM {_LEGACY_TABLE_NAME} WHERE output IS NOT NULL"))
+        conn.execute(f"INSERT INTO {_RUNS_TABLE_NAME} (run_guid, start_time_stamp, record_count) SELECT run_guid, MIN(time_stamp), COUNT(*) FROM {_LEGACY_TABLE_NAME} GROUP BY run_guid")
+        _rebuild_last_pass(conn.execute)
+        log.info(f"migrated {cursor.rowcount} records from {_LEGACY_TABLE_NAME!r} to schema version {_SCHEMA_VERSION}")
+    else:
+        log.info(f"{_LEGACY_TABLE_NAME!r} has an unrecognized schema – dropping it")
+    conn.execute(f"DROP TABLE {_LEGACY_TABLE_NAME}")
+
+
+def _prepare_database(db_path: Path) -> None:
+    """Put the database file in WAL mode and bring its schema up to the current version.
+
+    Runs in one EXCLUSIVE transaction that reads the schema version inside it, so processes
+    opening the same file concurrently migrate it exactly once.
+    """
+    # Note: sqlite3 context manager only handles transactions, not closing — call close() explicitly
+    # to release the Windows file lock before MSQLite opens its own connection.
+    conn = sqlite3.connect(db_path, isolation_level=None)  # transactions are issued explicitly below
+    try:
+        # WAL is what makes PytestProcessInfoReader's lock-free reads possible: readers see a
+        # consistent snapshot and neither block nor are blocked by the (msqlite-serialized)
+        # writers.  WAL mode is a persistent per-file property that cannot change inside a
+        # transaction, so it is set first; re-issuing it on a WAL database is a no-op.
+        if conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] == 0:
+            # only possible before the first table is created; an older file is converted by compact_database()
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("BEGIN EXCLUSIVE")
+        try:
+            schema_version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if schema_version == 2 and _has_table(conn, _OUTPUTS_TABLE_NAME):
+                conn.execute(f"ALTER TABLE {_OUTPUTS_TABLE_NAME} RENAME TO {_V2_OUTPUTS_TABLE_NAME}")
+            _create_schema(conn)
+            if schema_version < _SCHEMA_VERSION:
+                _migrate_legacy_table(conn)
+                _migrate_v2_outputs(conn)
+                _migrate_ever_run(conn)
+                conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+
+
 # The shared query implementations take an executor callable so both access classes reuse
 # them: the writer passes MSQLite.execute (runs inside its exclusive transaction and
-# auto-creates the table), the reader passes its own fail-open SELECT runner.
+# auto-creates the tables), the reader passes its own fail-open SELECT runner.
 _ExecuteFn = Callable[[str, Sequence | None], Iterable]
 
 
-def _query_records(execute_fn: _ExecuteFn, columns: list[str], run_guid: str | None, include_output: bool) -> list[PytestProcessInfo]:
-    """Query records, optionally omitting the (potentially huge) ``output`` column.
+def _select_records(columns: list[str], include_output: bool, with_rowid: bool = False) -> tuple[list[str], str]:
+    """Build a ``SELECT ... FROM`` clause reading records from ``test_events`` (alias ``e``).
+
+    The output is joined in from ``outputs`` only when asked for — as its id, codec and
+    stored bytes, which :func:`_to_records` decodes; otherwise the records' ``output`` is
+    left ``None``.
 
-    ``run_guid=None`` returns only the most recent run, selected as the
-    lexicographically greatest GUID — valid because run GUIDs are UUIDv7
-    (time-ordered; see :func:`pytest_fly.guid.generate_uuid`).
+    :param columns: The record fields, as returned by :func:`_derive_schema`.
+    :param include_output: When ``True``, select the ``output`` too.
+    :param with_rowid: When ``True``, select ``e.rowid`` ahead of the fields.
+    :return: ``(selected_columns, statement)`` — the selected fields in order (without the
+        rowid); ``"output"``, when selected, is last and stands for the three output columns.
     """
-    selected_columns = columns if include_output else [c for c in columns if c != "output"]
-    statement = f"SELECT {', '.join(selected_columns)} FROM {_TABLE_NAME}"
-    if run_guid is None:
-        params = None
+    selected_columns = [column for column in columns if column != "output"]
+    select_list = ["e.rowid"] if with_rowid else []
+    select_list.extend(f"e.{column}" for column in selected_columns)
+    statement = f"SELECT {', '.join(select_list)}"
+    if include_output:
+        selected_columns.append("output")
+        statement += f", o.output_id, o.codec, o.data FROM {_EVENTS_TABLE_NAME} e LEFT JOIN {_OUTPUTS_TABLE_NAME} o ON o.output_id = e.output_id"
     else:
-        statement += " WHERE run_guid = ?"
-        params = [run_guid]
-    rows = []
-    for row in execute_fn(statement, params):
-        row_dict = dict(zip(selected_columns, row))
-        if not include_output:
-            row_dict["output"] = None
-        rows.append(PytestProcessInfo(**row_dict))
-
-    # if no run_guid specified, filter to most recent run
-    if run_guid is None:
+        statement += f" FROM {_EVENTS_TABLE_NAME} e"
+    return selected_columns, statement
+
+
+def _to_records(selected_columns: list[str], rows: Iterable[Sequence]) -> list[PytestProcessInfo]:
+    """Build records from rows selected by :func:`_select_records`, decoding each distinct output once."""
+    records = []
+    if selected_columns and selected_columns[-1] == "output":
+        fields = selected_columns[:-1]
+        outputs: dict[int, str | None] = {}  # output_id -> decoded output; records sharing an output share the str
         for row in rows:
-            if run_guid is None or row.run_guid > run_guid:
-                run_guid = row.run_guid
-        rows = [row for row in rows if row.run_guid == run_guid]
+            output_id, codec, data = row[len(fields) :]
+            if output_id is not None and output_id not in outputs:
+                outputs[output_id] = _decode_output(codec, data)
+            records.append(PytestProcessInfo(output=outputs.get(output_id), **dict(zip(fields, row))))
+    else:
+        for row in rows:
+            records.append(PytestProcessInfo(output=None, **dict(zip(selected_columns, row))))
+    return records
+
+
+def _query_records(execute_fn: _ExecuteFn, columns: list[str], run_guid: str | None, include_output: bool) -> list[PytestProcessInfo]:
+    """Query one run's records in write order, optionally omitting the (potentially huge) ``output`` column.
+
+    ``run_guid=None`` returns only the most recent run (see :func:`_query_recent_run_guids`).
+    """
+    if run_guid is None:
+        run_guids = _query_recent_run_guids(execute_fn, 1)
+        if not run_guids:
+            return []
+        run_guid = run_guids[0]
+    selected_columns, statement = _select_records(columns, include_output)
+    return _to_records(selected_columns, execute_fn(f"{statement} WHERE e.run_guid = ? ORDER BY e.rowid", [run_guid]))
+
 
-    return rows
+def _rebuild_last_pass(execute_fn: _ExecuteFn, names: list[str] | None = None) -> None:
+    """Recompute ``last_pass`` from ``test_events`` for *names* (``None``: every test).
+
+    Used when records are removed and by the schema migration; writes keep the table
+    current incrementally (see :meth:`PytestProcessInfoDB.write_many`).
+    """
+    chunks = [None] if names is None else [names[i : i + _IN_CLAUSE_CHUNK] for i in range(0, len(names), _IN_CLAUSE_CHUNK)]
+    for chunk in chunks:
+        name_filter = "" if chunk is None else f" AND name IN ({', '.join(['?'] * len(chunk))})"
+        parameters = [] if chunk is None else chunk
+        execute_fn(f"DELETE FROM {_LAST_PASS_TABLE_NAME} WHERE true{name_filter}", parameters)
+        execute_fn(
+            f"""
+            INSERT INTO {_LAST_PASS_TABLE_NAME} (name, run_guid, start_time_stamp, end_time_stamp)
+            SELECT latest.name, latest.run_guid,
+                (SELECT MIN(s.time_stamp) FROM {_EVENTS_TABLE_NAME} s
+                 WHERE s.run_guid = latest.run_guid AND s.name = latest.name AND s.pid IS NOT NULL),
+                (SELECT MAX(p.time_stamp) FROM {_EVENTS_TABLE_NAME} p
+                 WHERE p.run_guid = latest.run_guid AND p.name = latest.name AND p.exit_code = {_OK})
+            FROM (
+                SELECT name, MAX(run_guid) AS run_guid
+                FROM {_EVENTS_TABLE_NAME}
+                WHERE exit_code = {_OK}{name_filter}
+                GROUP BY name
+            ) latest
+            """,
+            parameters,
+        )
 
 
 def _query_last_pass(execute_fn: _ExecuteFn) -> dict[str, tuple[float, float]]:
     """For each test name, find the most recent run where the test passed.
 
-    Searches across all ``run_guid`` values to locate the latest passing
-    result (``exit_code == OK``) for every test.
+    Reads the maintained ``last_pass`` table: per test, its latest run with a passing
+    result (``exit_code == OK``), that run's first started record and its passing record.
 
     :return: Dictionary mapping test name to ``(start_timestamp, duration_seconds)``.
     """
-    ok_val = int(PyTestFlyExitCode.OK)
+    statement = f"SELECT name, start_time_stamp, end_time_stamp FROM {_LAST_PASS_TABLE_NAME} WHERE start_time_stamp IS NOT NULL AND end_time_stamp IS NOT NULL"
+    result = {}
+    try:
+        for name, start_ts, end_ts in execute_fn(statement, None):
+            result[name] = (start_ts, end_ts - start_ts)
+    except sqlite3.OperationalError as e:
+        log.debug(f"query_last_pass failed (table may not exist yet): {e}")
+    return result
+
+
+def _query_last_pass_runs(execute_fn: _ExecuteFn) -> dict[str, str]:
+    """For each test name, the GUID of the most recent run where the test passed (from the ``last_pass`` table)."""
+    try:
+        return dict(execute_fn(f"SELECT name, run_guid FROM {_LAST_PASS_TABLE_NAME}", None))
+    except sqlite3.OperationalError as e:
+        log.debug(f"query_last_pass_runs failed (table may not exist yet): {e}")
+        return {}
+
+
+def _query_peak_commit(execute_fn: _ExecuteFn) -> dict[str, int]:
+    """For each test name, its peak commit charge in the most recent run that measured one.
+
+    Both halves read only the ``commit_bytes > 0`` partial index.
+
+    :return: Dictionary mapping test name to peak commit charge in bytes.
+    """
     statement = f"""
-        SELECT p.name, s.start_ts, p.time_stamp AS end_ts
+        SELECT p.name, MAX(p.commit_bytes)
         FROM (
             SELECT name, MAX(run_guid) AS run_guid
-            FROM {_TABLE_NAME}
-            WHERE exit_code = ?
+            FROM {_EVENTS_TABLE_NAME}
+            WHERE commit_bytes > 0
             GROUP BY name
         ) latest
-        JOIN {_TABLE_NAME} p
+        JOIN {_EVENTS_TABLE_NAME} p
             ON p.name = latest.name
             AND p.run_guid = latest.run_guid
-            AND p.exit_code = ?
-        JOIN (
-            SELECT name, run_guid, MIN(time_stamp) AS start_ts
-            FROM {_TABLE_NAME}
-            WHERE pid IS NOT NULL
-            GROUP BY name, run_guid
-        ) s
-            ON s.name = latest.name
-            AND s.run_guid = latest.run_guid
+            AND p.commit_bytes > 0
+        GROUP BY p.name
     """
-    result = {}
+    result: dict[str, int] = {}
     try:
-        for row in execute_fn(statement, [ok_val, ok_val]):
-            name, start_ts, end_ts = row[0], row[1], row[2]
-            if start_ts is not None and end_ts is not None:
-                result[name] = (start_ts, end_ts - start_ts)
+        for name, peak in execute_fn(statement, None):
+            if peak is not None:
+                result[name] = int(peak)
     except sqlite3.OperationalError as e:
-        log.debug(f"query_last_pass failed (table may not exist yet): {e}")
+        log.debug(f"query_peak_commit failed (table may not exist yet): {e}")
     return result
 
 
@@ -151,7 +618,7 @@ def _query_recent_run_guids(execute_fn: _ExecuteFn, limit: int) -> list[str]:
     Recency ordering relies on run GUIDs being UUIDv7 (time-ordered; see
     :func:`pytest_fly.guid.generate_uuid`), the same rule ``run_guid=None`` queries use.
     """
-    statement = f"SELECT DISTINCT run_guid FROM {_TABLE_NAME} ORDER BY run_guid DESC LIMIT ?"
+    statement = f"SELECT run_guid FROM {_RUNS_TABLE_NAME} ORDER BY run_guid DESC LIMIT ?"
     try:
         return [row[0] for row in execute_fn(statement, [limit])]
     except sqlite3.OperationalError as e:
@@ -162,33 +629,138 @@ def _query_recent_run_guids(execute_fn: _ExecuteFn, limit: int) -> list[str]:
 def _query_ever_run_names(execute_fn: _ExecuteFn) -> set[str]:
     """Return the set of test node_ids that have ever been run, across all runs and PUT versions.
 
-    Filters out queued-but-never-started placeholder rows (``pid IS NULL``) — these are
-    written by :class:`PytestRunner` before a test actually spawns and at soft-stop
-    finalization when a run is stopped, so they do not count as "ever run."
+    Reads the maintained ``ever_run`` table.  Queued-but-never-started placeholder rows
+    (``pid IS NULL``) — written by :class:`PytestRunner` before a test actually spawns and at
+    soft-stop finalization when a run is stopped — do not count as "ever run."  Names stay in
+    the table when the records that put them there are pruned or deleted.
     """
-    statement = f"SELECT DISTINCT name FROM {_TABLE_NAME} WHERE pid IS NOT NULL"
+    statement = f"SELECT name FROM {_EVER_RUN_TABLE_NAME}"
     result: set[str] = set()
     try:
         for row in execute_fn(statement, None):
-            if row[0] is not None:
-                result.add(row[0])
+            result.add(row[0])
     except sqlite3.OperationalError as e:
         log.debug(f"query_ever_run_names failed (table may not exist yet): {e}")
     return result
 
 
+def _query_function_durations(execute_fn: _ExecuteFn) -> dict[str, float]:
+    """For each test function, its duration from the most recent run that recorded it passing.
+
+    :return: Mapping of function-level node id (``path::[Class::]function``) to seconds.
+    """
+    statement = f"""
+        SELECT f.function, f.duration
+        FROM {_FUNCTION_DURATION_TABLE_NAME} f
+        JOIN (
+            SELECT function, MAX(run_guid) AS run_guid
+            FROM {_FUNCTION_DURATION_TABLE_NAME}
+            GROUP BY function
+        ) latest
+            ON f.function = latest.function
+            AND f.run_guid = latest.run_guid
+    """
+    result: dict[str, float] = {}
+    try:
+        for function, duration in execute_fn(statement, None):
+            result[function] = duration
+    except sqlite3.OperationalError as e:
+        log.debug(f"query_function_durations failed (table may not exist yet): {e}")
+    return result
+
+
+def _query_output_storage(execute_fn: _ExecuteFn) -> OutputStorageStats:
+    """Measure the ``outputs`` table: see :class:`OutputStorageStats`.
+
+    Reads the outputs' sizes and the ``output_id`` index, never the stored output bytes.
+    """
+    try:
+        output_count, raw_bytes, stored_bytes = next(iter(execute_fn(f"SELECT COUNT(*), SUM(raw_size), SUM(LENGTH(data)) FROM {_OUTPUTS_TABLE_NAME}", None)), (0, 0, 0))
+        reference_count, referenced_bytes = next(
+            iter(
+                execute_fn(
+                    f"SELECT COUNT(*), SUM(o.raw_size) FROM {_EVENTS_TABLE_NAME} e JOIN {_OUTPUTS_TABLE_NAME} o ON o.output_id = e.output_id WHERE e.output_id IS NOT NULL",
+                    None,
+                )
+            ),
+            (0, 0),
+        )
+    except sqlite3.OperationalError as e:
+        log.debug(f"query_output_storage failed (table may not exist yet): {e}")
+        return OutputStorageStats(0, 0, 0, 0, 0)
+    return OutputStorageStats(output_count or 0, reference_count or 0, raw_bytes or 0, stored_bytes or 0, referenced_bytes or 0)
+
+
 def _db_path(db_dir: Path) -> Path:
     return Path(db_dir, f"{application_name}.db")
 
 
-class PytestProcessInfoDB(MSQLite):
+@dataclass(frozen=True)
+class DatabaseSize:
+    """The results database's footprint on disk."""
+
+    file_bytes: int  # the database file plus its WAL journal
+    used_bytes: int  # pages holding data (as of the latest commit, WAL included)
+    free_bytes: int  # pages on the freelist: space a compaction can return to the file system
+
+
+@typechecked()
+def query_database_size(db_dir: Path) -> DatabaseSize:
+    """Measure the results database in *db_dir* (zero for a missing file)."""
+    db_path = _db_path(db_dir)
+    if not db_path.exists():
+        return DatabaseSize(0, 0, 0)
+    file_bytes = db_path.stat().st_size
+    wal_path = Path(f"{db_path}-wal")
+    if wal_path.exists():
+        file_bytes += wal_path.stat().st_size
+    conn = sqlite3.connect(db_path, timeout=2.0)
+    try:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    finally:
+        conn.close()
+    return DatabaseSize(file_bytes, (page_count - free_pages) * page_size, free_pages * page_size)
+
+
+@typechecked()
+def compact_database(db_dir: Path, step_pages: int = 1024, should_stop: Callable[[], bool] | None = None) -> None:
+    """Return the results database's free pages to the file system.
+
+    Under ``auto_vacuum=INCREMENTAL`` (every file created since schema version 4) this frees
+    *step_pages* at a time, each step its own short write transaction, so a run starting
+    meanwhile waits at most one step for the write lock.  An older file is converted with a
+    one-time full ``VACUUM``.  The WAL is then checkpointed and truncated.
+
+    :param db_dir: Directory holding the results database.
+    :param step_pages: Pages freed per transaction.
+    :param should_stop: Polled between steps; returning ``True`` ends the compaction early.
+    """
+    db_path = _db_path(db_dir)
+    if not db_path.exists():
+        return
+    conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None)  # autocommit: every step is its own transaction
+    try:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:  # 2 = INCREMENTAL
+            log.info(f'converting "{db_path}" to incremental auto-vacuum (one-time full VACUUM)')
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+        else:
+            while conn.execute("PRAGMA freelist_count").fetchone()[0] > 0 and not (should_stop is not None and should_stop()):
+                conn.execute(f"PRAGMA incremental_vacuum({step_pages})").fetchall()  # the pragma frees one page per step of its statement
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    finally:
+        conn.close()
+
+
+class PytestProcessInfoDB(_PooledMSQLite):
     """
     Thread-safe SQLite store for :class:`PytestProcessInfo` records.
 
-    The table schema is derived automatically from the dataclass fields.
-    If a schema change is detected (columns differ from what is on disk),
-    the table is dropped and recreated — test results are ephemeral so data
-    loss is acceptable.
+    The ``test_events`` columns are derived automatically from the dataclass fields; fields
+    added later become new columns of the existing table, and a schema-version-1 database
+    is migrated in place (see :func:`_prepare_database`).
 
     Note: entering this context manager acquires the database's EXCLUSIVE write
     lock (msqlite) for the whole ``with`` block.  Pure reads on latency-sensitive
@@ -202,44 +774,21 @@ class PytestProcessInfoDB(MSQLite):
 
     @typechecked()
     def __init__(self, db_dir: Path):
-        self._schema, self._columns = _derive_schema()
+        _unused_schema, self._columns = _derive_schema()
+        self._event_columns = [column for column in self._columns if column != "output"]
 
         db_path = _db_path(db_dir)
 
         if db_path not in PytestProcessInfoDB._initialized_paths:
-            # Schema migration: if the table exists with a different set of columns, drop it so
-            # MSQLite recreates it with the current schema.  Test results are ephemeral, so data loss is acceptable.
-            # Note: sqlite3 context manager only handles transactions, not closing — call close() explicitly
-            # to release the Windows file lock before MSQLite opens its own connection below.
-            if db_path.exists():
-                _conn = sqlite3.connect(db_path)
-                try:
-                    existing_columns = {row[1] for row in _conn.execute(f"PRAGMA table_info({_TABLE_NAME})").fetchall()}
-                finally:
-                    _conn.close()
-                if existing_columns and existing_columns != set(self._columns):
-                    log.info(f"Schema change detected for {_TABLE_NAME!r} – dropping table to recreate with new schema")
-                    _conn = sqlite3.connect(db_path)
-                    try:
-                        _conn.execute(f"DROP TABLE IF EXISTS {_TABLE_NAME}")
-                        _conn.commit()
-                    finally:
-                        _conn.close()
-
-            # WAL is what makes PytestProcessInfoReader's lock-free reads possible: readers see a
-            # consistent snapshot and neither block nor are blocked by the (msqlite-serialized)
-            # writers.  WAL mode is a persistent per-file property, but re-issuing the pragma
-            # on a WAL database is a no-op, so the one-shot guard is sufficient.
-            _conn = sqlite3.connect(db_path)
-            try:
-                _conn.execute("PRAGMA journal_mode=WAL")
-                _conn.commit()
-            finally:
-                _conn.close()
-
+            _prepare_database(db_path)
             PytestProcessInfoDB._initialized_paths.add(db_path)
 
-        super().__init__(db_path, _TABLE_NAME, self._schema, indexes=["run_guid", "exit_code"])
+        super().__init__(db_path, _EVENTS_TABLE_NAME, _event_schema())
+
+    def create_table(self):
+        """Create the whole schema; msqlite calls this when a statement hits a missing table (e.g. after :meth:`delete`)."""
+        _create_schema(self.conn)
+        self.conn.commit()
 
     @typechecked()
     def write(self, pytest_process_info: PytestProcessInfo) -> None:
@@ -248,14 +797,114 @@ class PytestProcessInfoDB(MSQLite):
 
         :param pytest_process_info: the pytest process info to save
         """
+        log.debug(f"{pytest_process_info=}")
+        self.write_many([pytest_process_info])
+
+    def write_many(self, pytest_process_infos: Iterable[PytestProcessInfo]) -> None:
+        """
+        Write several pytest process infos in this context's single transaction.
 
-        insert_statement = f"INSERT INTO {self.table_name} ({', '.join(self._columns)}) VALUES ({', '.join(['?'] * len(self._columns))})"
-        parameters = list(asdict(pytest_process_info).values())
-        log.debug(f"{insert_statement=}, {parameters=}")
+        Used by the batched :class:`~pytest_fly.pytest_runner.result_writer.ResultWriter`; one
+        ``executemany`` per table with no per-record logging, as records may carry large output
+        blobs.  Also registers new runs and keeps ``last_pass`` and ``ever_run`` current.  An output identical to
+        one already stored (typically the same test's output in an earlier run) is referenced
+        rather than stored again.  A database error is logged and raised, and the transaction
+        rolled back, so the caller can retry the whole batch.
+
+        :param pytest_process_infos: the pytest process infos to save
+        """
+        pytest_process_infos = list(pytest_process_infos)
+        if not pytest_process_infos:
+            return
+        by_run: dict[str, list] = {}  # run_guid -> [run_guid, earliest time_stamp, record count]
+        for info in pytest_process_infos:
+            run_row = by_run.setdefault(info.run_guid, [info.run_guid, info.time_stamp, 0])
+            run_row[1] = min(run_row[1], info.time_stamp)
+            run_row[2] += 1
+        runs_statement = (
+            f"INSERT INTO {_RUNS_TABLE_NAME} (run_guid, start_time_stamp, record_count) VALUES (?, ?, ?)"
+            " ON CONFLICT (run_guid) DO UPDATE SET record_count = record_count + excluded.record_count"
+        )
+        events_statement = f"INSERT INTO {_EVENTS_TABLE_NAME} ({', '.join(self._event_columns)}, output_id) VALUES ({', '.join(['?'] * (len(self._event_columns) + 1))})"
+        log.debug(f"writing {len(pytest_process_infos)} records to {self.table_name}")
         try:
-            self.execute(insert_statement, parameters)
+            run_rows = list(by_run.values())
+            self.execute(runs_statement, run_rows[0])  # creates the tables on first use
+            self.conn.executemany(runs_statement, run_rows[1:])
+            event_rows = []
+            for info in pytest_process_infos:
+                output_id = None if info.output is None else _store_output(self.conn, info.output)
+                event_rows.append([getattr(info, column) for column in self._event_columns] + [output_id])
+            self.conn.executemany(events_statement, event_rows)
+            self.conn.executemany(f"INSERT OR IGNORE INTO {_EVER_RUN_TABLE_NAME} (name) VALUES (?)", [(name,) for name in {info.name for info in pytest_process_infos if info.pid is not None}])
+            self._update_last_pass(pytest_process_infos)
         except sqlite3.OperationalError as e:
             log.error(f'"{self.db_path}",{self.table_name=},{e}')
+            raise  # so the transaction is rolled back rather than committed half written
+
+    def _update_last_pass(self, pytest_process_infos: list[PytestProcessInfo]) -> None:
+        """Fold just-written records into ``last_pass`` (their rows are already in ``test_events``)."""
+        # A started record that lands after its run's pass was recorded can only move the start earlier.
+        started = [(info.time_stamp, info.name, info.run_guid) for info in pytest_process_infos if info.pid is not None and info.exit_code != PyTestFlyExitCode.OK]
+        self.conn.executemany(f"UPDATE {_LAST_PASS_TABLE_NAME} SET start_time_stamp = MIN(COALESCE(start_time_stamp, ?1), ?1) WHERE name = ?2 AND run_guid = ?3", started)
+        passed = [(info.name, info.run_guid, info.time_stamp) for info in pytest_process_infos if info.exit_code == PyTestFlyExitCode.OK]
+        self.conn.executemany(
+            f"""
+            INSERT INTO {_LAST_PASS_TABLE_NAME} (name, run_guid, start_time_stamp, end_time_stamp)
+            SELECT ?1, ?2, (SELECT MIN(time_stamp) FROM {_EVENTS_TABLE_NAME} WHERE run_guid = ?2 AND name = ?1 AND pid IS NOT NULL), ?3
+            WHERE true
+            ON CONFLICT (name) DO UPDATE SET
+                run_guid = excluded.run_guid, start_time_stamp = excluded.start_time_stamp, end_time_stamp = excluded.end_time_stamp
+            WHERE excluded.run_guid >= {_LAST_PASS_TABLE_NAME}.run_guid
+            """,
+            passed,
+        )
+
+    @typechecked()
+    def copy_run_records(self, source_run_guid: str, target_run_guid: str, names: Iterable[str]) -> int:
+        """Copy the records of *names* from one run into another, entirely inside the database.
+
+        Used by RESUME mode to carry the prior run's passed tests into the new run.  The copies
+        keep every field but the run GUID, including their original timestamps, and reference
+        the same stored outputs rather than duplicating them, so the cost does not depend on the
+        size of the output.  Like :meth:`write_many`, it registers the target run — started now,
+        not at the copies' historical timestamps, so retention does not judge a new run by its
+        oldest carried-over record — and keeps ``last_pass`` and ``ever_run`` current.
+
+        :param source_run_guid: The run to copy from.
+        :param target_run_guid: The run to copy into.
+        :param names: The test names whose records are copied (in name order, each test's in write order).
+        :return: The number of records copied.
+        """
+        names = sorted(set(names))
+        other_columns = [column for column in self._event_columns if column != "run_guid"]
+        column_list = ", ".join([*other_columns, "output_id"])
+        copied = 0
+        copied_at = time.time()
+        for i in range(0, len(names), _IN_CLAUSE_CHUNK):
+            chunk = names[i : i + _IN_CLAUSE_CHUNK]
+            placeholders = ", ".join(["?"] * len(chunk))
+            count = self.execute(f"SELECT COUNT(*) FROM {_EVENTS_TABLE_NAME} WHERE run_guid = ? AND name IN ({placeholders})", [source_run_guid, *chunk]).fetchone()[0]
+            if count == 0:
+                continue
+            self.execute(
+                f"INSERT INTO {_RUNS_TABLE_NAME} (run_guid, start_time_stamp, record_count) VALUES (?, ?, ?)"
+                " ON CONFLICT (run_guid) DO UPDATE SET record_count = record_count + excluded.record_count",
+                [target_run_guid, copied_at, count],
+            )
+            self.execute(
+                f"INSERT INTO {_EVENTS_TABLE_NAME} (run_guid, {column_list})"
+                f" SELECT ?, {column_list} FROM {_EVENTS_TABLE_NAME} WHERE run_guid = ? AND name IN ({placeholders}) ORDER BY name, rowid",
+                [target_run_guid, source_run_guid, *chunk],
+            )
+            self.execute(
+                f"INSERT OR IGNORE INTO {_EVER_RUN_TABLE_NAME} (name) SELECT DISTINCT name FROM {_EVENTS_TABLE_NAME} WHERE run_guid = ? AND name IN ({placeholders}) AND pid IS NOT NULL",
+                [target_run_guid, *chunk],
+            )
+            _rebuild_last_pass(self.execute, chunk)  # the copies are now each test's latest records
+            copied += count
+        log.info(f"copied {copied} records of {len(names)} tests from run {source_run_guid} to run {target_run_guid}")
+        return copied
 
     def query(self, run_guid: str | None = None) -> list[PytestProcessInfo]:
         """
@@ -282,10 +931,16 @@ class PytestProcessInfoDB(MSQLite):
         :param test_name: The test node_id to mark.
         :return: ``True`` if a TERMINATED record was written, ``False`` otherwise.
         """
-        infos = [info for info in self.query(run_guid) if info.name == test_name]
-        if not infos:
+        if run_guid is None:
+            run_guids = _query_recent_run_guids(self.execute, 1)
+            if not run_guids:
+                return False
+            run_guid = run_guids[0]
+        selected_columns, statement = _select_records(self._columns, include_output=False)
+        latest_records = _to_records(selected_columns, self.execute(f"{statement} WHERE e.run_guid = ? AND e.name = ? ORDER BY e.time_stamp DESC, e.rowid LIMIT 1", [run_guid, test_name]))
+        if not latest_records:
             return False
-        latest = max(infos, key=lambda info: info.time_stamp)
+        latest = latest_records[0]
         if is_terminal_exit_code(latest.exit_code):
             return False  # already terminal — a real result must not be overwritten
         self.write(status_record(latest.run_guid, test_name, PyTestFlyExitCode.TERMINATED, latest.put_version, latest.put_fingerprint))
@@ -295,28 +950,138 @@ class PytestProcessInfoDB(MSQLite):
         """For each test name, ``(start_timestamp, duration_seconds)`` of its most recent passing run."""
         return _query_last_pass(self.execute)
 
+    def query_last_pass_runs(self) -> dict[str, str]:
+        """For each test name, the GUID of its most recent passing run (whose records are still stored)."""
+        return _query_last_pass_runs(self.execute)
+
     def query_ever_run_names(self) -> set[str]:
         """Return the set of test node_ids that have ever been run, across all runs and PUT versions."""
         return _query_ever_run_names(self.execute)
 
+    def query_peak_commit(self) -> dict[str, int]:
+        """For each test name, its peak commit charge (bytes) in the most recent run that measured one."""
+        return _query_peak_commit(self.execute)
+
+    def query_output_storage(self) -> OutputStorageStats:
+        """Size of the stored test outputs, raw and compressed (see :class:`OutputStorageStats`)."""
+        return _query_output_storage(self.execute)
+
     def delete(self, run_guid: str | None = None):
         """
-        Delete records.  If *run_guid* is ``None`` the entire table is dropped;
-        otherwise only records matching the GUID are removed.
+        Delete records.  If *run_guid* is ``None`` every table is dropped (and recreated
+        empty on next use); otherwise only the run's records, and the outputs no other run
+        references, are removed.  Deleting a run leaves ``ever_run`` as it is.
         """
         if run_guid is None:
-            self.execute(f"DROP TABLE {self.table_name}")
+            for table_name in (_EVER_RUN_TABLE_NAME, _LAST_PASS_TABLE_NAME, _OUTPUTS_TABLE_NAME, _EVENTS_TABLE_NAME, _RUNS_TABLE_NAME):
+                self.execute(f"DROP TABLE IF EXISTS {table_name}")
         else:
-            self.execute(f"DELETE FROM {self.table_name} WHERE run_guid = ?", (run_guid,))
+            passed_names = [row[0] for row in self.execute(f"SELECT name FROM {_LAST_PASS_TABLE_NAME} WHERE run_guid = ?", (run_guid,))]
+            self._delete_run_records(run_guid, keep_last_pass=False)
+            self.execute(f"DELETE FROM {_RUNS_TABLE_NAME} WHERE run_guid = ?", (run_guid,))
+            _rebuild_last_pass(self.execute, passed_names)  # fall back to each test's previous passing run
+
+    @typechecked()
+    def prune_run(self, run_guid: str, keep_last_pass: bool = True) -> int:
+        """Remove an expired run's records (see :mod:`pytest_fly.db.retention`).
+
+        With *keep_last_pass*, the records of the tests whose most recent pass is in this run
+        are kept, so ``last_pass`` is unaffected; the run itself goes once none are left (a
+        later pass of each of its tests makes them prunable).  Without it, this is
+        :meth:`delete` of the run.  Its function durations are pruned separately (see
+        :meth:`prune_run_durations`).
+
+        :param run_guid: The run to prune.
+        :param keep_last_pass: Keep the records ``last_pass`` is derived from.
+        :return: The number of records removed.
+        """
+        if not keep_last_pass:
+            rows = self.execute(f"SELECT record_count FROM {_RUNS_TABLE_NAME} WHERE run_guid = ?", (run_guid,)).fetchall()
+            self.delete(run_guid)
+            return rows[0][0] if rows else 0
+        deleted = self._delete_run_records(run_guid, keep_last_pass=True)
+        if deleted > 0:
+            self.execute(f"UPDATE {_RUNS_TABLE_NAME} SET record_count = record_count - ? WHERE run_guid = ?", (deleted, run_guid))
+        self.execute(f"DELETE FROM {_RUNS_TABLE_NAME} WHERE run_guid = ? AND record_count <= 0", (run_guid,))
+        return deleted
+
+    @typechecked()
+    def prune_run_durations(self, run_guid: str) -> int:
+        """Remove an expired run's function durations, keeping each function's latest (the one sharding reads).
+
+        :param run_guid: The run to prune.
+        :return: The number of function durations removed.
+        """
+        if not _has_table(self.conn, _FUNCTION_DURATION_TABLE_NAME):
+            return 0
+        statement = f"""
+            DELETE FROM {_FUNCTION_DURATION_TABLE_NAME}
+            WHERE run_guid = ?1
+            AND EXISTS (SELECT 1 FROM {_FUNCTION_DURATION_TABLE_NAME} f WHERE f.function = {_FUNCTION_DURATION_TABLE_NAME}.function AND f.run_guid > ?1)
+            """
+        return self.execute(statement, (run_guid,)).rowcount
+
+    def _delete_run_records(self, run_guid: str, keep_last_pass: bool) -> int:
+        """Delete a run's records and the outputs only they reference; with *keep_last_pass*, spare the tests whose last pass is this run.
+
+        :return: The number of records deleted.
+        """
+        kept_names = f"SELECT name FROM {_LAST_PASS_TABLE_NAME} WHERE run_guid = ?1"
+        doomed = f" AND name NOT IN ({kept_names})" if keep_last_pass else ""
+        surviving = f"e.run_guid != ?1 OR e.name IN ({kept_names})" if keep_last_pass else "e.run_guid != ?1"
+        # outputs other records also reference (deduplicated, see write_many) are kept
+        self.execute(
+            f"""
+            DELETE FROM {_OUTPUTS_TABLE_NAME}
+            WHERE output_id IN (SELECT output_id FROM {_EVENTS_TABLE_NAME} WHERE run_guid = ?1 AND output_id IS NOT NULL{doomed})
+            AND NOT EXISTS (SELECT 1 FROM {_EVENTS_TABLE_NAME} e WHERE e.output_id = {_OUTPUTS_TABLE_NAME}.output_id AND ({surviving}))
+            """,
+            (run_guid,),
+        )
+        return self.execute(f"DELETE FROM {_EVENTS_TABLE_NAME} WHERE run_guid = ?1{doomed}", (run_guid,)).rowcount
+
+
+class FunctionDurationDB(_PooledMSQLite):
+    """Read/write store for per-test-function durations (one row per passing function per run).
+
+    Shares the database file (and its WAL journal mode) with :class:`PytestProcessInfoDB`;
+    like that class, entering the context manager takes the exclusive write lock.
+    """
+
+    @typechecked()
+    def __init__(self, db_dir: Path):
+        super().__init__(_db_path(db_dir), _FUNCTION_DURATION_TABLE_NAME, _FUNCTION_DURATION_SCHEMA, indexes=["function"])
+
+    @typechecked()
+    def write(self, run_guid: str, name: str, durations: dict[str, float]) -> None:
+        """Record the durations of the functions that passed while running *name*.
+
+        :param run_guid: The run.
+        :param name: The scheduled node id the functions ran under.
+        :param durations: Function-level node id → seconds.
+        """
+        insert_statement = f"INSERT INTO {self.table_name} ({', '.join(_FUNCTION_DURATION_SCHEMA)}) VALUES (?, ?, ?, ?)"
+        try:
+            for function, duration in durations.items():
+                self.execute(insert_statement, [run_guid, name, function, duration])
+        except sqlite3.OperationalError as e:
+            log.error(f'"{self.db_path}",{self.table_name=},{e}')
+            raise
+
+    def query_function_durations(self) -> dict[str, float]:
+        """For each test function, its duration from the most recent run that recorded it passing."""
+        return _query_function_durations(self.execute)
 
 
 class PytestProcessInfoReader:
     """Read-only query access that never takes the database's write lock.
 
-    Opens a plain connection and only issues SELECTs; under WAL these read a
-    consistent snapshot without blocking (or being blocked by) writers.  Every
-    method fails open: a missing database file, an unopenable connection, or a
-    not-yet-created table all yield empty results.
+    Uses the calling thread's pooled read-only connection (see :func:`_pooled_connection`)
+    and only issues SELECTs; under WAL these read a consistent snapshot without blocking
+    (or being blocked by) writers.  Every method fails open: a missing database file, an
+    unopenable connection, or a not-yet-created table all yield empty results.  A
+    schema-version-1 file reads as empty until a :class:`PytestProcessInfoDB` has opened —
+    and so migrated — it.
     """
 
     @typechecked()
@@ -326,18 +1091,15 @@ class PytestProcessInfoReader:
         self._conn: sqlite3.Connection | None = None
 
     def __enter__(self) -> "PytestProcessInfoReader":
-        if self.db_path.exists():
-            try:
-                self._conn = sqlite3.connect(self.db_path, timeout=2.0)
-            except sqlite3.OperationalError as e:
-                log.debug(f'could not open "{self.db_path}" for reading: {e}')
-                self._conn = None
+        try:
+            self._conn = _pooled_connection(self.db_path, write=False)
+        except sqlite3.OperationalError as e:
+            log.debug(f'could not open "{self.db_path}" for reading: {e}')
+            self._conn = None
         return self
 
     def __exit__(self, exc_type, exc_value, traceback) -> None:
-        if self._conn is not None:
-            self._conn.close()
-            self._conn = None
+        self._conn = None  # the connection stays open in the pool for the thread's next reader
 
     def _execute(self, statement: str, parameters: Sequence | None = None) -> list[tuple]:
         """Run a SELECT and return all rows; empty on a missing file/table (fail-open)."""
@@ -352,7 +1114,7 @@ class PytestProcessInfoReader:
     def query(self, run_guid: str | None = None, include_output: bool = False) -> list[PytestProcessInfo]:
         """Query records; by default the ``output`` column is omitted (``output=None`` on the records).
 
-        Completed tests' output blobs dominate the row size; per-tick GUI queries leave them
+        Completed tests' output blobs dominate the record size; per-tick GUI queries leave them
         out and fetch them once per completed test via :meth:`query_outputs`.
 
         :param run_guid: the run GUID to filter on, or None to get the most recent run.
@@ -361,6 +1123,30 @@ class PytestProcessInfoReader:
         """
         return _query_records(self._execute, self._columns, run_guid, include_output)
 
+    def query_since(self, run_guid: str, after_rowid: int, include_output: bool = False) -> tuple[list[PytestProcessInfo], int]:
+        """Query one run's records written after *after_rowid*, in write order.
+
+        Lets a per-tick consumer read only what was added since its previous tick instead of
+        the whole run.  ``(run_guid, rowid)`` is a range of the ``run_guid`` index (SQLite
+        appends the rowid to every index entry), so the cost follows the number of new rows,
+        not the size of the run.
+
+        :param run_guid: The run to read.
+        :param after_rowid: Return only rows with a greater rowid; ``0`` returns the whole run.
+        :param include_output: When ``True``, include the full ``output`` column.
+        :return: ``(records, max_rowid)`` — *max_rowid* is the greatest rowid returned, or
+            *after_rowid* when there are no new rows; pass it back as the next *after_rowid*.
+        """
+        selected_columns, statement = _select_records(self._columns, include_output, with_rowid=True)
+        rows = self._execute(f"{statement} WHERE e.run_guid = ? AND e.rowid > ? ORDER BY e.rowid", [run_guid, after_rowid])
+        max_rowid = rows[-1][0] if rows else after_rowid
+        return _to_records(selected_columns, (row[1:] for row in rows)), max_rowid
+
+    def query_latest_run_guid(self) -> str | None:
+        """Return the most recent run's GUID (the one ``query(None)`` selects), or ``None`` when there are no runs."""
+        run_guids = _query_recent_run_guids(self._execute, 1)
+        return run_guids[0] if run_guids else None
+
     def query_outputs(self, run_guid: str, names: Iterable[str]) -> dict[str, tuple[float, str]]:
         """Fetch the latest stored output for specific tests of one run.
 
@@ -368,49 +1154,83 @@ class PytestProcessInfoReader:
         :param names: Test node_ids to fetch outputs for.
         :return: Mapping of test name to ``(record_time_stamp, output)`` for its most recent
             record carrying an output.  Tests with no stored output are omitted.
+
+        The records are looked up first and only the outputs returned are then read and
+        decompressed.
         """
-        result: dict[str, tuple[float, str]] = {}
+        latest: dict[str, tuple[float, int]] = {}  # name -> (time_stamp, output_id) of its latest record with an output
         names = list(names)
         for chunk_start in range(0, len(names), _IN_CLAUSE_CHUNK):
             chunk = names[chunk_start : chunk_start + _IN_CLAUSE_CHUNK]
             placeholders = ", ".join(["?"] * len(chunk))
-            statement = f"SELECT name, time_stamp, output FROM {_TABLE_NAME} WHERE run_guid = ? AND output IS NOT NULL AND name IN ({placeholders})"
-            for name, time_stamp, output in self._execute(statement, [run_guid, *chunk]):
-                prior = result.get(name)
+            statement = f"SELECT name, time_stamp, output_id FROM {_EVENTS_TABLE_NAME} WHERE run_guid = ? AND name IN ({placeholders}) AND output_id IS NOT NULL"
+            for name, time_stamp, output_id in self._execute(statement, [run_guid, *chunk]):
+                prior = latest.get(name)
                 if prior is None or time_stamp >= prior[0]:
-                    result[name] = (time_stamp, output)
-        return result
+                    latest[name] = (time_stamp, output_id)
+        # only the outputs returned are read from the outputs table and decompressed, each distinct one once
+        output_ids = sorted({output_id for _time_stamp, output_id in latest.values()})
+        outputs: dict[int, str | None] = {}
+        for chunk_start in range(0, len(output_ids), _IN_CLAUSE_CHUNK):
+            chunk = output_ids[chunk_start : chunk_start + _IN_CLAUSE_CHUNK]
+            statement = f"SELECT output_id, codec, data FROM {_OUTPUTS_TABLE_NAME} WHERE output_id IN ({', '.join(['?'] * len(chunk))})"
+            for output_id, codec, data in self._execute(statement, chunk):
+                outputs[output_id] = _decode_output(codec, data)
+        return {name: (time_stamp, outputs[output_id]) for name, (time_stamp, output_id) in latest.items() if outputs.get(output_id) is not None}
 
     def query_last_pass(self) -> dict[str, tuple[float, float]]:
         """For each test name, ``(start_timestamp, duration_seconds)`` of its most recent passing run."""
         return _query_last_pass(self._execute)
 
+    def query_last_pass_runs(self) -> dict[str, str]:
+        """For each test name, the GUID of its most recent passing run (whose records are still stored)."""
+        return _query_last_pass_runs(self._execute)
+
     def query_ever_run_names(self) -> set[str]:
         """Return the set of test node_ids that have ever been run, across all runs and PUT versions."""
         return _query_ever_run_names(self._execute)
 
+    def query_peak_commit(self) -> dict[str, int]:
+        """For each test name, its peak commit charge (bytes) in the most recent run that measured one."""
+        return _query_peak_commit(self._execute)
+
+    def query_function_durations(self) -> dict[str, float]:
+        """For each test function, its duration from the most recent run that recorded it passing."""
+        return _query_function_durations(self._execute)
+
     def query_recent_runs(self, limit: int) -> list[PytestProcessInfo]:
         """Return the records of the *limit* most recent runs, with the ``output`` column omitted.
 
-        Used by the History tab; group the result by ``run_guid`` for per-run views.
+        Used by the History tab; group the result by ``run_guid`` for per-run views.  One
+        query: the runs come from the ``runs`` primary key, their records from the
+        ``run_guid`` index.
 
         :param limit: Maximum number of distinct runs to include.
-        :return: The runs' records (``output=None``); empty when there are no runs yet.
+        :return: The runs' records (``output=None``), newest run first and each run in write
+            order; empty when there are no runs yet.
         """
-        result: list[PytestProcessInfo] = []
-        for run_guid in _query_recent_run_guids(self._execute, limit):
-            result.extend(_query_records(self._execute, self._columns, run_guid, include_output=False))
-        return result
+        selected_columns, statement = _select_records(self._columns, include_output=False)
+        recent_runs = f"SELECT run_guid FROM {_RUNS_TABLE_NAME} ORDER BY run_guid DESC LIMIT ?"
+        return _to_records(selected_columns, self._execute(f"{statement} WHERE e.run_guid IN ({recent_runs}) ORDER BY e.run_guid DESC, e.rowid", [limit]))
+
+    def query_output_storage(self) -> OutputStorageStats:
+        """Size of the stored test outputs, raw and compressed (see :class:`OutputStorageStats`)."""
+        return _query_output_storage(self._execute)
+
+    def query_runs(self) -> list[tuple[str, float]]:
+        """Return every run as ``(run_guid, start_time_stamp)``, newest first (the ``runs`` primary key, no record is read)."""
+        return [(run_guid, start) for run_guid, start in self._execute(f"SELECT run_guid, start_time_stamp FROM {_RUNS_TABLE_NAME} ORDER BY run_guid DESC")]
 
     def query_change_token(self) -> tuple[int, int]:
-        """Return a cheap ``(row_count, max_rowid)`` token that changes whenever the table's content changes.
+        """Return a cheap ``(row_count, max_rowid)`` token that changes whenever the records change.
 
         Lets per-tick consumers (the History tab) skip re-querying and rebuilding when
-        nothing was written since the previous tick.  ``COUNT(*)`` runs off an index scan and
-        ``MAX(rowid)`` is an O(log n) b-tree seek, so this stays cheap even with large output
-        blobs in the table.
+        nothing was written since the previous tick.  The row count is the sum of the
+        per-run counts kept in ``runs`` (one row per run, where ``COUNT(*)`` would visit every
+        record) and ``MAX(rowid)`` is an O(log n) b-tree seek, so this stays cheap however
+        much history the database holds.
         """
-        rows = self._execute(f"SELECT COUNT(*), MAX(rowid) FROM {_TABLE_NAME}")
+        rows = self._execute(f"SELECT (SELECT SUM(record_count) FROM {_RUNS_TABLE_NAME}), (SELECT MAX(rowid) FROM {_EVENTS_TABLE_NAME})")
         if not rows:
             return (0, 0)
         count, max_rowid = rows[0]
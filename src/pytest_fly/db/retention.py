@@ -0,0 +1,137 @@
+"""
+Retention for the results database — prunes expired runs, enforces a size budget and compacts the file.
+
+Every run adds its records to ``pytest-fly.db`` and nothing else ever removes them, so without
+a policy the file (and every query over the whole history) grows without bound.  A
+:class:`RetentionConfig` keeps the most recent runs by count and/or age; the runs outside that
+window are pruned.  By default a pruned run keeps the records of the tests whose most recent
+pass it holds, so the last-pass durations that drive the ETA and the ordering survive any
+amount of pruning.  Likewise a pruned run's function durations go, but for each function's
+latest, which sizes the shards.  The names of the tests that ever ran live in their own table and are not
+affected by pruning at all.
+
+An optional size cap prunes further, oldest run first, while the data still exceeds it.  The
+freed pages are finally returned to the file system (see :func:`compact_database`).
+
+:func:`prune_results` runs on the runner thread once a run's results are committed, i.e.
+between runs.  Every run is pruned in its own short write transaction and every compaction
+step in another, so a run starting meanwhile never waits long for the write lock.
+"""
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from typeguard import typechecked
+
+from ..logger import get_logger
+from .db import PytestProcessInfoDB, PytestProcessInfoReader, compact_database, query_database_size
+
+log = get_logger()
+
+_SECONDS_PER_DAY = 24 * 60 * 60
+_BYTES_PER_MB = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class RetentionConfig:
+    """Which runs the results database keeps.
+
+    Disabled by default, so the history is kept in full until retention is explicitly
+    enabled.  A run is kept while it is one of the ``keep_runs`` most recent runs *or*
+    started within the last ``keep_days`` days; a limit of ``0`` is not applied, and with
+    both at ``0`` only the size cap prunes.  The most recent run is always kept.
+    """
+
+    enabled: bool = False
+    keep_runs: int = 100  # keep the most recent runs (0 = no count window)
+    keep_days: float = 0.0  # keep runs younger than this many days (0 = no age window)
+    keep_last_pass: bool = True  # beyond the window, keep each test's latest passing records
+    max_db_mb: float = 0.0  # prune the oldest runs while the data exceeds this many MB (0 = no cap)
+
+
+@dataclass(frozen=True)
+class RetentionResult:
+    """What one :func:`prune_results` pass did."""
+
+    runs_pruned: int = 0
+    records_deleted: int = 0
+    bytes_before: int = 0  # database file (and WAL) size before the pass
+    bytes_after: int = 0
+    durations_deleted: int = 0  # function durations superseded by a later run's
+
+
+@typechecked()
+def expired_runs(runs: list[tuple[str, float]], config: RetentionConfig, now: float) -> list[str]:
+    """Select the runs outside the retention window.
+
+    :param runs: ``(run_guid, start_time_stamp)`` of every run, newest first (see
+        :meth:`PytestProcessInfoReader.query_runs`).
+    :param config: The retention policy.
+    :param now: The current time (seconds since the epoch).
+    :return: The expired run GUIDs, oldest first (the order to prune them in).
+    """
+    if config.keep_runs <= 0 and config.keep_days <= 0:
+        return []
+    expired = []
+    for index, (run_guid, start_time_stamp) in enumerate(runs):
+        kept_by_count = index < max(config.keep_runs, 1)  # the most recent run is always kept
+        kept_by_age = config.keep_days > 0 and start_time_stamp is not None and now - start_time_stamp < config.keep_days * _SECONDS_PER_DAY
+        if not (kept_by_count or kept_by_age):
+            expired.append(run_guid)
+    return expired[::-1]
+
+
+@typechecked()
+def prune_results(data_dir: Path, config: RetentionConfig, should_stop: Callable[[], bool] | None = None) -> RetentionResult:
+    """Apply *config* to the results database in *data_dir*: prune, enforce the size cap, compact.
+
+    :param data_dir: Directory holding the results database.
+    :param config: The retention policy; nothing is done unless it is enabled.
+    :param should_stop: Polled between runs and compaction steps; returning ``True`` ends the
+        pass early (e.g. the application is closing).
+    :return: What was pruned and the file size before and after.
+    """
+    if not config.enabled:
+        return RetentionResult()
+
+    def stopping() -> bool:
+        return should_stop is not None and should_stop()
+
+    bytes_before = query_database_size(data_dir).file_bytes
+    with PytestProcessInfoReader(data_dir) as reader:
+        runs = reader.query_runs()
+    runs_pruned = 0
+    records_deleted = 0
+    durations_deleted = 0
+
+    def prune(run_guid: str) -> None:
+        nonlocal runs_pruned, records_deleted, durations_deleted
+        with PytestProcessInfoDB(data_dir) as db:  # one transaction per run
+            records_deleted += db.prune_run(run_guid, config.keep_last_pass)
+            durations_deleted += db.prune_run_durations(run_guid)
+        runs_pruned += 1
+
+    expired = expired_runs(runs, config, time.time())
+    for run_guid in expired:
+        if stopping():
+            break
+        prune(run_guid)
+
+    if config.max_db_mb > 0:
+        max_bytes = config.max_db_mb * _BYTES_PER_MB
+        expired_set = set(expired)
+        for run_guid, _start in reversed(runs[1:]):  # oldest first, never the most recent run
+            if stopping() or query_database_size(data_dir).used_bytes <= max_bytes:
+                break
+            if run_guid not in expired_set:
+                prune(run_guid)
+
+    if runs_pruned > 0 and not stopping():
+        compact_database(data_dir, should_stop=should_stop)
+
+    result = RetentionResult(runs_pruned, records_deleted, bytes_before, query_database_size(data_dir).file_bytes, durations_deleted)
+    if runs_pruned > 0:
+        log.info(f"retention: pruned {records_deleted} records and {durations_deleted} function durations from {runs_pruned} runs, database {bytes_before} -> {result.bytes_after} bytes")
+    return result
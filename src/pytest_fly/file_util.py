@@ -1,7 +1,13 @@
-"""File-system utility functions (name sanitization, recent-file lookup)."""
+"""File-system utility functions (name sanitization, recent-file lookup, project walk, atomic writes)."""
 
+import os
+import uuid
+from collections.abc import Iterator
 from pathlib import Path
 
+# Directories pytest does not recurse into by default (its ``norecursedirs``), plus caches.
+_SKIPPED_DIR_NAMES = {"__pycache__", "build", "dist", "node_modules", "venv", "CVS", "_darcs", "{arch}"}
+
 
 def sanitize_test_name(name: str) -> str:
     """Convert a test node_id into a safe filesystem filename."""
@@ -10,6 +16,21 @@ def sanitize_test_name(name: str) -> str:
     return name.replace("/", "_").replace("\\", "_").replace(":", "_")
 
 
+def write_atomically(path: Path, data: bytes) -> None:
+    """Write *data* to *path* (creating its directory) so a concurrent reader sees the whole file or none of it.
+
+    The temporary file's name is unique, so writers on several hosts sharing the directory do not collide.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        temp_path.write_bytes(data)
+        os.replace(temp_path, path)
+    except OSError:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
 def find_most_recent_file(directory: Path, pattern: str) -> Path | None:
     """
     Find the most recently modified file matching a glob pattern under a directory.
@@ -30,3 +51,40 @@ def find_most_recent_file(directory: Path, pattern: str) -> Path | None:
                 best_path = file_path
                 best_mtime = mtime
     return best_path
+
+
+def is_skipped_directory(path: str) -> bool:
+    """``True`` for a directory :func:`iter_project_files` does not walk into (hidden, an egg, a virtual environment, or one pytest does not recurse into)."""
+    name = os.path.basename(path)
+    return name.startswith(".") or name.endswith(".egg") or name in _SKIPPED_DIR_NAMES or os.path.exists(os.path.join(path, "pyvenv.cfg"))
+
+
+def iter_project_files(project_root: Path, suffixes: set[str], names: set[str] = frozenset()) -> Iterator[os.DirEntry]:
+    """
+    Yield the project's files with one of *suffixes* or *names*, in a deterministic order.
+
+    Skips hidden directories, virtual environments and the directories pytest does not
+    recurse into by default, and follows no directory symlinks.  Files or directories
+    removed while walking are skipped.
+
+    :param project_root: Directory to walk.
+    :param suffixes: File suffixes to yield (e.g. ``{".py"}``).
+    :param names: Additional file names to yield (e.g. ``{"pytest.ini"}``).
+    :return: The matching directory entries (``entry.stat()`` is cached by :func:`os.scandir`).
+    """
+    directories = [str(project_root)]
+    while directories:
+        directory = directories.pop()
+        try:
+            entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not is_skipped_directory(entry.path):
+                        directories.append(entry.path)
+                elif entry.name in names or os.path.splitext(entry.name)[1] in suffixes:
+                    yield entry
+            except OSError:
+                continue  # removed while walking
@@ -10,6 +10,7 @@ from PySide6.QtCore import QObject, QThread, Signal
 from PySide6.QtWidgets import QSizePolicy, QVBoxLayout, QWidget
 
 from ...__version__ import application_name
+from ...db import PytestProcessInfoReader
 from ...logger import get_log_directory
 from ...platform.platform_info import get_performance_core_count, get_platform_info
 from ...preferences import get_active_put_path, get_preferences_db_path
@@ -79,6 +80,12 @@ class AboutDataWorker(QObject):
         text_lines.append("")
         text_lines.append(f"log_directory: {get_log_directory()}")
         text_lines.append(f"test_results_db: {Path(self._data_dir, f'{application_name}.db')}")
+        with PytestProcessInfoReader(self._data_dir) as reader:
+            storage = reader.query_output_storage()
+        text_lines.append(
+            f"stored test output: {naturalsize(storage.stored_bytes)} for {naturalsize(storage.referenced_bytes)} of output"
+            f" (compression {storage.compression_ratio:.1f}x, with deduplication {storage.overall_ratio:.1f}x)"
+        )
         text_lines.append(f"preferences_db: {get_preferences_db_path()}")
 
         text_lines.append("")
@@ -27,13 +27,17 @@ from tobool import to_bool_strict
 from pytest_fly.colors import ERROR_ACCENT
 from pytest_fly.gui.configuration_tab.ordering_aspects_widget import OrderingAspectsWidget
 from pytest_fly.gui.gui_util import get_text_dimensions
-from pytest_fly.interfaces import RunMode
+from pytest_fly.interfaces import ExecutionMode, RunMode, SchedulingGranularity
 from pytest_fly.logger import get_logger
 from pytest_fly.paths import get_default_data_dir
 from pytest_fly.platform.platform_info import get_performance_core_count
 from pytest_fly.preferences import (
     TIME_UNITS,
     auto_force_stop_on_stall_default,
+    auto_split_critical_modules_default,
+    batch_short_tests_default,
+    batch_target_seconds_default,
+    cache_collection_default,
     chart_window_minutes_default,
     commit_gate_enabled_default,
     commit_gate_threshold_default,
@@ -41,18 +45,34 @@ from pytest_fly.preferences import (
     cpu_active_epsilon_default,
     cpu_gate_enabled_default,
     cpu_gate_threshold_default,
+    critical_path_scheduling_default,
     duration_to_seconds,
+    execution_mode_default,
+    forkserver_preload_modules_default,
     get_active_put_path,
     get_pref,
     graph_font_size_default,
     history_run_limit_default,
     log_tab_line_limit_default,
     max_descendant_processes_default,
+    memory_budget_gate_enabled_default,
+    memory_budget_gb_default,
+    pre_plan_runs_default,
     process_count_gate_enabled_default,
     refresh_rate_default,
     resource_guard_commit_threshold_default,
     resource_guard_enabled_default,
     resource_guard_min_free_disk_gb_default,
+    result_cache_default,
+    result_cache_max_mb_default,
+    retention_enabled_default,
+    retention_keep_days_default,
+    retention_keep_last_pass_default,
+    retention_keep_runs_default,
+    retention_max_db_mb_default,
+    scheduling_granularity_default,
+    session_max_modules_default,
+    session_max_rss_growth_mb_default,
     set_active_put_path,
     stall_detection_enabled_default,
     stall_kill_unit_default,
@@ -62,8 +82,10 @@ from pytest_fly.preferences import (
     tooltip_line_limit_default,
     utilization_high_threshold_default,
     utilization_low_threshold_default,
+    watch_mode_default,
 )
 from pytest_fly.project_info import get_project_info
+from pytest_fly.pytest_runner.forkserver import forkserver_available
 
 log = get_logger()
 
@@ -258,6 +280,87 @@ class Configuration(QWidget):
             ),
         )
 
+        self.pre_plan_runs_checkbox = _add_pref_checkbox(
+            layout,
+            "Pre-plan Runs While Idle (default: on)",
+            pref.pre_plan_runs,
+            self.update_pre_plan_runs,
+            tooltip=(
+                "While no run is active, pytest-fly discovers the tests and orders the next run in\n"
+                "the background, and keeps that plan current as files and results change. Run then\n"
+                "starts dispatching right away when nothing changed since the plan was made.\n"
+                "When unchecked, every Run discovers the tests afresh."
+            ),
+        )
+
+        self.cache_collection_checkbox = _add_pref_checkbox(
+            layout,
+            "Cache Test Collection (default: on)",
+            pref.cache_collection,
+            self.update_cache_collection,
+            tooltip=(
+                "Test discovery remembers the tests collected from each test module and collects\n"
+                "only the modules that changed since. A conftest.py or pytest configuration change\n"
+                "collects everything again. Uncheck if tests are generated from files other than\n"
+                "the test modules themselves (e.g. parametrized from a data file)."
+            ),
+        )
+
+        self.result_cache_checkbox = _add_pref_checkbox(
+            layout,
+            "Cache Passed Test Results (default: off)",
+            pref.result_cache,
+            self.update_result_cache,
+            tooltip=(
+                "A test that passed is not run again while its module, conftest.py files, pytest\n"
+                "configuration, the source files it executed and the installed packages are all\n"
+                "unchanged: its passing result is carried over instead (shown as Cached in the\n"
+                "Status panel). Applies in every run mode except Restart. Leave unchecked if tests\n"
+                "read data files or environment variables that should trigger a rerun."
+            ),
+        )
+
+        # Result store directory — empty keeps it in the data directory; a shared directory (e.g. a
+        # network mount) makes a test that passed on one machine a cache hit on the others.
+        layout.addWidget(QLabel("Result Cache Directory (empty = default: in the test results DB directory)"))
+        result_cache_dir_row = QHBoxLayout()
+        self.result_cache_dir_lineedit = QLineEdit()
+        self.result_cache_dir_lineedit.setText(pref.result_cache_dir)
+        self.result_cache_dir_lineedit.setToolTip(
+            "Where passed test results are stored, by the hash of their inputs. Point several machines\n"
+            "at one shared directory (e.g. a network mount) so a test that passed on one of them is\n"
+            "not run again on the others. Leave empty to keep the results with the test results DB."
+        )
+        self.result_cache_dir_lineedit.editingFinished.connect(lambda: self.update_result_cache_dir(self.result_cache_dir_lineedit.text()))
+        result_cache_dir_row.addWidget(self.result_cache_dir_lineedit)
+        self.result_cache_dir_browse = QPushButton("Browse…")
+        self.result_cache_dir_browse.clicked.connect(self._browse_result_cache_dir)
+        result_cache_dir_row.addWidget(self.result_cache_dir_browse)
+        layout.addLayout(result_cache_dir_row)
+
+        self.result_cache_max_mb_lineedit = _add_labeled_lineedit(
+            layout,
+            f"Result Cache Size Cap (MB, default: {_format_number(result_cache_max_mb_default)}, 0 = no cap)",
+            _format_number(pref.result_cache_max_mb),
+            QDoubleValidator(),
+            self.update_result_cache_max_mb,
+            char_width=7,
+            tooltip="While the result cache directory holds more than this many MB, the least recently used results are deleted.",
+        )
+
+        self.watch_mode_checkbox = _add_pref_checkbox(
+            layout,
+            "Watch Mode (default: off)",
+            pref.watch_mode,
+            self.update_watch_mode,
+            tooltip=(
+                "Watch the target project for saved changes to Python files and pytest configuration.\n"
+                "While idle, a change starts an Affected run. During a run, the tests a change affects\n"
+                "are run again ahead of the queue: the affected ones in progress are stopped and\n"
+                "requeued, the others keep running."
+            ),
+        )
+
         layout.addWidget(QLabel(""))  # space
 
         self.ordering_aspects_widget = OrderingAspectsWidget(self)
@@ -618,6 +721,32 @@ class Configuration(QWidget):
             ),
         )
 
+        self.memory_budget_gate_enabled_checkbox = _add_pref_checkbox(
+            gates_layout,
+            "Memory-budget Gate (default: off)",
+            pref.memory_budget_gate_enabled,
+            self.update_memory_budget_gate_enabled,
+            tooltip=(
+                "Predictive memory admission. Before starting a test, pytest-fly adds the test's peak\n"
+                "commit from its most recent run (plus a 25% safety margin) to the predicted footprint of\n"
+                "the tests already running, and starts it only if the total fits the budget below. A test\n"
+                "that doesn't fit is passed over for the next queued test that does, rather than idling the\n"
+                "worker. Tests with no history are predicted at the average of the others.\n\n"
+                "Unlike the commit-charge gate it acts before memory runs short, not after. Only defers\n"
+                "new tests, and at least one always runs. Off by default."
+            ),
+        )
+
+        self.memory_budget_gb_lineedit = _add_labeled_lineedit(
+            gates_layout,
+            f"Memory Budget (GB, {memory_budget_gb_default} = physical RAM)",
+            str(pref.memory_budget_gb),
+            QDoubleValidator(),
+            self.update_memory_budget_gb,
+            char_width=7,
+            tooltip=("The total predicted memory the running tests may hold, in GB. 0 uses the machine's\nphysical RAM. Only used when the Memory-budget Gate is enabled."),
+        )
+
         right_column.addWidget(gates_group)
 
         # Resource guard group — background low-resource monitor that automatically soft-stops
@@ -679,6 +808,221 @@ class Configuration(QWidget):
 
         right_column.addWidget(resource_guard_group)
 
+        # Results retention group — keeps the test-results DB (and every query over its history)
+        # from growing without bound. Applied between runs, after a run's results are committed.
+        retention_group = QGroupBox("Results Retention")
+        retention_group.setToolTip("Prunes old runs from the test-results DB after each run and returns the freed space to\nthe file system. Off by default: the whole history is kept.")
+        retention_layout = QVBoxLayout()
+        retention_group.setLayout(retention_layout)
+
+        self.retention_enabled_checkbox = _add_pref_checkbox(
+            retention_layout,
+            "Prune Old Runs (default: off)",
+            pref.retention_enabled,
+            self.update_retention_enabled,
+            tooltip=(
+                "When enabled, runs outside the window below are pruned from the test-results DB\n"
+                "once a run finishes. A run is kept while it is one of the most recent runs or is\n"
+                "younger than the age limit; the most recent run is always kept. Tests that ran\n"
+                "in pruned runs still count as having run (Never-run First ordering)."
+            ),
+        )
+
+        self.retention_keep_runs_lineedit = _add_labeled_lineedit(
+            retention_layout,
+            f"Keep Most Recent Runs ({retention_keep_runs_default} default, 0 = no count limit)",
+            str(pref.retention_keep_runs),
+            QIntValidator(),
+            self.update_retention_keep_runs,
+            char_width=6,
+            tooltip="Runs among this many most recent are kept. Only used when Prune Old Runs is enabled.",
+        )
+
+        self.retention_keep_days_lineedit = _add_labeled_lineedit(
+            retention_layout,
+            f"Keep Runs Younger Than (days, {_format_number(retention_keep_days_default)} default = no age limit)",
+            _format_number(pref.retention_keep_days),
+            QDoubleValidator(),
+            self.update_retention_keep_days,
+            char_width=6,
+            tooltip="Runs started within this many days are kept. Only used when Prune Old Runs is enabled.",
+        )
+
+        self.retention_keep_last_pass_checkbox = _add_pref_checkbox(
+            retention_layout,
+            "Keep Each Test's Last Pass (default: on)",
+            pref.retention_keep_last_pass,
+            self.update_retention_keep_last_pass,
+            tooltip=(
+                "When a pruned run holds a test's most recent pass, keep that test's records from\n"
+                "the run, so its last passing duration (used for the ETA, ordering and scheduling)\n"
+                "is not lost. Off prunes whole runs."
+            ),
+        )
+
+        self.retention_max_db_mb_lineedit = _add_labeled_lineedit(
+            retention_layout,
+            f"Size Cap (MB, {_format_number(retention_max_db_mb_default)} default = no cap)",
+            _format_number(pref.retention_max_db_mb),
+            QDoubleValidator(),
+            self.update_retention_max_db_mb,
+            char_width=7,
+            tooltip=(
+                "While the test-results DB holds more than this many MB, runs are pruned oldest first,\n"
+                "beyond the window above (never the most recent run). Only used when Prune Old Runs\n"
+                "is enabled."
+            ),
+        )
+
+        right_column.addWidget(retention_group)
+
+        # Execution group — how each test's process is started. Spawn and Forkserver are a pure
+        # speed trade-off (one process per module); Session Reuse also trades some isolation.
+        execution_group = QGroupBox("Execution")
+        execution_group.setToolTip("What pytest-fly schedules as one unit, and how it starts the process each unit runs in. Applies on the next run.")
+        execution_layout = QVBoxLayout()
+        execution_group.setLayout(execution_layout)
+
+        execution_layout.addWidget(QLabel(f"Scheduling Granularity (default: {scheduling_granularity_default.name.title()})"))
+        self.scheduling_granularity_combo = QComboBox()
+        for granularity in SchedulingGranularity:
+            self.scheduling_granularity_combo.addItem(granularity.name.title(), int(granularity))
+        self.scheduling_granularity_combo.setCurrentIndex(self.scheduling_granularity_combo.findData(int(pref.scheduling_granularity)))
+        self.scheduling_granularity_combo.setToolTip(
+            "The unit of work that is scheduled across the worker processes.\n\n"
+            "Module: each test module runs as one unit (fewest process starts).\n"
+            "Class: each test class runs as one unit; functions outside a class run individually.\n"
+            "Function: each test function (with all its parametrizations) runs as one unit.\n\n"
+            "Finer units let one long module's tests spread across the pool, at the cost of one\n"
+            "process start (and module-level setup) per unit. Results are recorded per unit, so\n"
+            "changing this starts Resume/Check from scratch."
+        )
+        self.scheduling_granularity_combo.currentIndexChanged.connect(self.update_scheduling_granularity)
+        execution_layout.addWidget(self.scheduling_granularity_combo)
+
+        self.auto_split_critical_modules_checkbox = _add_pref_checkbox(
+            execution_layout,
+            "Auto-split Critical-path Modules (default: off)",
+            pref.auto_split_critical_modules,
+            self.update_auto_split_critical_modules,
+            tooltip=(
+                "At Module granularity, a module whose last passing run took longer than its fair\n"
+                "share of the run (total prior time ÷ processes) sets the critical path on its own.\n"
+                "When enabled, only those modules are split — into class-level shards, or\n"
+                "function-level shards if a class is still too long — sized from each test\n"
+                "function's recorded duration. All other modules stay whole, so they pay no extra\n"
+                "process start. Shards are grouped under their module in the Graph tab."
+            ),
+        )
+
+        self.critical_path_scheduling_checkbox = _add_pref_checkbox(
+            execution_layout,
+            "Critical-path Scheduling (default: off)",
+            pref.critical_path_scheduling,
+            self.update_critical_path_scheduling,
+            tooltip=(
+                "Off: tests are started in the order set by the Test Ordering list.\n\n"
+                "On: each time a worker is free it starts the test with the longest predicted\n"
+                "duration (its last passing run; tests with no history are predicted at the average),\n"
+                "which shortens the total run. The Test Ordering list then only breaks ties.\n"
+                "Singletons are started while nothing else is running, so no worker sits idle\n"
+                "waiting for exclusive access, and batches are split when workers would otherwise idle."
+            ),
+        )
+
+        execution_layout.addWidget(QLabel(f"Execution Mode (default: {execution_mode_default.name.title()})"))
+        self.execution_mode_combo = QComboBox()
+        for mode in ExecutionMode:
+            self.execution_mode_combo.addItem(mode.name.title(), int(mode))
+        self.execution_mode_combo.setCurrentIndex(self.execution_mode_combo.findData(int(pref.execution_mode)))
+        self.execution_mode_combo.setToolTip(
+            "Spawn: every test module starts a brand-new Python interpreter that re-imports pytest,\n"
+            "coverage and the program under test. Works everywhere.\n\n"
+            "Forkserver: a warm template process imports those modules once per run, and each test\n"
+            "module starts as a cheap fork of it — still one process per module, so isolation is\n"
+            "unchanged. Much faster on suites with many small modules. POSIX only (Linux/macOS);\n"
+            "falls back to Spawn elsewhere.\n\n"
+            "Session Reuse: each worker keeps one long-lived process and runs module after module\n"
+            "in a single pytest session, so session-scoped fixtures are built once per worker.\n"
+            "Each module still gets its own result, output and coverage, but modules sharing a\n"
+            "worker share process state. Workers are recycled per the limits below."
+        )
+        self.execution_mode_combo.currentIndexChanged.connect(self.update_execution_mode)
+        execution_layout.addWidget(self.execution_mode_combo)
+        if not forkserver_available():
+            forkserver_hint = QLabel("Forkserver is not available on this platform; runs use Spawn.")
+            forkserver_hint.setStyleSheet("color: gray;")
+            execution_layout.addWidget(forkserver_hint)
+
+        execution_layout.addWidget(QLabel("Forkserver Preload Modules (comma-separated)"))
+        self.forkserver_preload_modules_lineedit = QLineEdit()
+        self.forkserver_preload_modules_lineedit.setText(pref.forkserver_preload_modules)
+        self.forkserver_preload_modules_lineedit.setPlaceholderText("e.g. mypackage, mypackage.models")
+        self.forkserver_preload_modules_lineedit.setToolTip(
+            "Program-under-test modules the forkserver template imports up front, in addition to\n"
+            "pytest, coverage and pytest-fly itself. List the heavy, import-time-expensive ones.\n\n"
+            "Modules must be importable from pytest-fly's environment (e.g. installed with\n"
+            "pip install -e); ones that fail to import are skipped. Their module-level lines run\n"
+            "before per-test coverage starts, so they are not attributed to individual tests.\n"
+            "Only used in Forkserver mode."
+        )
+        self.forkserver_preload_modules_lineedit.editingFinished.connect(self.update_forkserver_preload_modules)
+        execution_layout.addWidget(self.forkserver_preload_modules_lineedit)
+
+        self.session_max_modules_lineedit = _add_labeled_lineedit(
+            execution_layout,
+            f"Session Worker Max Modules ({session_max_modules_default} default, 0 = no limit)",
+            str(pref.session_max_modules),
+            QIntValidator(),
+            self.update_session_max_modules,
+            char_width=7,
+            tooltip=(
+                "In Session Reuse mode, a worker's process is replaced with a fresh one after it has\nrun this many test modules, bounding leaks and state build-up. 0 disables the limit."
+            ),
+        )
+
+        self.session_max_rss_growth_mb_lineedit = _add_labeled_lineedit(
+            execution_layout,
+            f"Session Worker Max Memory Growth (MB, {session_max_rss_growth_mb_default} default, 0 = no limit)",
+            str(pref.session_max_rss_growth_mb),
+            QIntValidator(),
+            self.update_session_max_rss_growth_mb,
+            char_width=7,
+            tooltip=(
+                "In Session Reuse mode, a worker's process is replaced with a fresh one once its\n"
+                "resident memory has grown this many MB past its level after the first module.\n"
+                "0 disables the limit."
+            ),
+        )
+
+        self.batch_short_tests_checkbox = _add_pref_checkbox(
+            execution_layout,
+            "Batch Short Tests (default: off)",
+            pref.batch_short_tests,
+            self.update_batch_short_tests,
+            tooltip=(
+                "Runs of consecutive short tests (judged by their last passing duration) are run\n"
+                "one after another in a single process instead of one process each, saving the\n"
+                "per-process startup. Every test still gets its own row, result, output and\n"
+                "coverage; tests in a batch share process state. Tests that have never passed and\n"
+                "singletons are never batched. Not used in Session Reuse mode."
+            ),
+        )
+
+        self.batch_target_seconds_lineedit = _add_labeled_lineedit(
+            execution_layout,
+            f"Batch Target (seconds, {batch_target_seconds_default:g} default)",
+            str(pref.batch_target_seconds),
+            QDoubleValidator(),
+            self.update_batch_target_seconds,
+            char_width=7,
+            tooltip=(
+                "How much predicted work (sum of last passing durations) is packed into one batch.\nOnly tests shorter than this are batched. Only used when Batch Short Tests is enabled."
+            ),
+        )
+
+        right_column.addWidget(execution_group)
+
         # Expert group — settings most users should not need to change. Lives at the bottom of
         # the right column (last position, to de-emphasize) rather than the left column, which
         # is the taller of the two and drives the tab's overall height.
@@ -752,9 +1096,25 @@ class Configuration(QWidget):
         pref = get_pref()
         checked = self.resume_skip_put_check_checkbox.isChecked()
         pref.resume_skip_put_check = checked
-        if pref.run_mode != RunMode.RESTART:
+        if pref.run_mode in (RunMode.RESUME, RunMode.CHECK):
             pref.run_mode = RunMode.RESUME if checked else RunMode.CHECK
 
+    def update_pre_plan_runs(self):
+        """Persist the pre-plan-runs checkbox."""
+        self._set_bool_pref("pre_plan_runs", self.pre_plan_runs_checkbox)
+
+    def update_cache_collection(self):
+        """Persist the cache-test-collection checkbox."""
+        self._set_bool_pref("cache_collection", self.cache_collection_checkbox)
+
+    def update_result_cache(self):
+        """Persist the cache-passed-test-results checkbox."""
+        self._set_bool_pref("result_cache", self.result_cache_checkbox)
+
+    def update_watch_mode(self):
+        """Persist the watch-mode checkbox."""
+        self._set_bool_pref("watch_mode", self.watch_mode_checkbox)
+
     def update_processes(self, value: str):
         """Persist the process-count value (minimum 1 — 0 workers would make a run do nothing)."""
         self._set_int_pref("processes", value, minimum=1)
@@ -851,6 +1211,14 @@ class Configuration(QWidget):
         """Persist the CPU-utilization admission threshold (fraction of total system CPU, clamped 0.0-1.0)."""
         self._set_fraction_pref("cpu_gate_threshold", value)
 
+    def update_memory_budget_gate_enabled(self):
+        """Persist the predictive memory-budget admission gate enable checkbox."""
+        self._set_bool_pref("memory_budget_gate_enabled", self.memory_budget_gate_enabled_checkbox)
+
+    def update_memory_budget_gb(self, value: str):
+        """Persist the memory-budget admission budget in GB (0 = physical RAM, clamped non-negative)."""
+        self._set_float_pref("memory_budget_gb", value, minimum=0.0)
+
     def update_resource_guard_enabled(self):
         """Persist the resource-guard (low-resource automatic soft stop) enable checkbox."""
         self._set_bool_pref("resource_guard_enabled", self.resource_guard_enabled_checkbox)
@@ -863,6 +1231,80 @@ class Configuration(QWidget):
         """Persist the resource-guard commit-space stop threshold (fraction of the commit limit, clamped 0.0-1.0)."""
         self._set_fraction_pref("resource_guard_commit_threshold", value)
 
+    def update_retention_enabled(self):
+        """Persist the results-retention enable checkbox."""
+        self._set_bool_pref("retention_enabled", self.retention_enabled_checkbox)
+
+    def update_retention_keep_runs(self, value: str):
+        """Persist the number of most recent runs retention keeps (0 = no count window)."""
+        self._set_int_pref("retention_keep_runs", value, minimum=0)
+
+    def update_retention_keep_days(self, value: str):
+        """Persist the age, in days, under which retention keeps a run (0 = no age window)."""
+        self._set_float_pref("retention_keep_days", value, minimum=0.0)
+
+    def update_retention_keep_last_pass(self):
+        """Persist the keep-each-test's-last-pass retention checkbox."""
+        self._set_bool_pref("retention_keep_last_pass", self.retention_keep_last_pass_checkbox)
+
+    def update_result_cache_dir(self, value: str):
+        """Persist the result cache directory (empty = in the test-results DB directory)."""
+        pref = get_pref()
+        pref.result_cache_dir = value.strip()
+
+    def _browse_result_cache_dir(self):
+        """Open a directory picker to choose the result cache directory."""
+        pref = get_pref()
+        start = pref.result_cache_dir or str(get_default_data_dir())
+        selected = QFileDialog.getExistingDirectory(self, "Select result cache directory", start)
+        if selected:
+            self.result_cache_dir_lineedit.setText(selected)
+            self.update_result_cache_dir(selected)
+
+    def update_result_cache_max_mb(self, value: str):
+        """Persist the result cache size cap in MB (0 = no cap)."""
+        self._set_float_pref("result_cache_max_mb", value, minimum=0.0)
+
+    def update_retention_max_db_mb(self, value: str):
+        """Persist the results-DB size cap in MB (0 = no cap)."""
+        self._set_float_pref("retention_max_db_mb", value, minimum=0.0)
+
+    def update_scheduling_granularity(self, _index: int = 0):
+        """Persist the selected scheduling granularity."""
+        get_pref().scheduling_granularity = SchedulingGranularity(self.scheduling_granularity_combo.currentData())
+
+    def update_auto_split_critical_modules(self):
+        """Persist the auto-split-critical-path-modules checkbox."""
+        self._set_bool_pref("auto_split_critical_modules", self.auto_split_critical_modules_checkbox)
+
+    def update_critical_path_scheduling(self):
+        """Persist the critical-path-scheduling checkbox."""
+        self._set_bool_pref("critical_path_scheduling", self.critical_path_scheduling_checkbox)
+
+    def update_execution_mode(self, _index: int = 0):
+        """Persist the selected execution mode."""
+        get_pref().execution_mode = ExecutionMode(self.execution_mode_combo.currentData())
+
+    def update_forkserver_preload_modules(self):
+        """Persist the forkserver preload module list (free text; parsed at Run time)."""
+        get_pref().forkserver_preload_modules = self.forkserver_preload_modules_lineedit.text().strip()
+
+    def update_session_max_modules(self, value: str):
+        """Persist the session-reuse worker module limit (0 = no limit)."""
+        self._set_int_pref("session_max_modules", value, minimum=0)
+
+    def update_session_max_rss_growth_mb(self, value: str):
+        """Persist the session-reuse worker RSS-growth limit in MB (0 = no limit)."""
+        self._set_int_pref("session_max_rss_growth_mb", value, minimum=0)
+
+    def update_batch_short_tests(self):
+        """Persist the batch-short-tests checkbox."""
+        self._set_bool_pref("batch_short_tests", self.batch_short_tests_checkbox)
+
+    def update_batch_target_seconds(self, value: str):
+        """Persist the per-batch predicted-work target in seconds (clamped to >= 0)."""
+        self._set_float_pref("batch_target_seconds", value, minimum=0.0)
+
     def update_tooltip_line_limit(self, value: str):
         """Persist the tooltip line limit (clamped to *minimum_tooltip_line_limit*)."""
         self._set_int_pref("tooltip_line_limit", value, minimum=minimum_tooltip_line_limit)
@@ -907,12 +1349,22 @@ class Configuration(QWidget):
 
         checkbox_defaults: list[tuple[str, QCheckBox, bool]] = [
             ("resume_skip_put_check", self.resume_skip_put_check_checkbox, False),
+            ("pre_plan_runs", self.pre_plan_runs_checkbox, pre_plan_runs_default),
+            ("cache_collection", self.cache_collection_checkbox, cache_collection_default),
+            ("result_cache", self.result_cache_checkbox, result_cache_default),
+            ("watch_mode", self.watch_mode_checkbox, watch_mode_default),
             ("stall_detection_enabled", self.stall_detection_enabled_checkbox, stall_detection_enabled_default),
             ("auto_force_stop_on_stall", self.auto_force_stop_on_stall_checkbox, auto_force_stop_on_stall_default),
             ("process_count_gate_enabled", self.process_count_gate_enabled_checkbox, process_count_gate_enabled_default),
             ("commit_gate_enabled", self.commit_gate_enabled_checkbox, commit_gate_enabled_default),
             ("cpu_gate_enabled", self.cpu_gate_enabled_checkbox, cpu_gate_enabled_default),
+            ("memory_budget_gate_enabled", self.memory_budget_gate_enabled_checkbox, memory_budget_gate_enabled_default),
             ("resource_guard_enabled", self.resource_guard_enabled_checkbox, resource_guard_enabled_default),
+            ("retention_enabled", self.retention_enabled_checkbox, retention_enabled_default),
+            ("retention_keep_last_pass", self.retention_keep_last_pass_checkbox, retention_keep_last_pass_default),
+            ("auto_split_critical_modules", self.auto_split_critical_modules_checkbox, auto_split_critical_modules_default),
+            ("batch_short_tests", self.batch_short_tests_checkbox, batch_short_tests_default),
+            ("critical_path_scheduling", self.critical_path_scheduling_checkbox, critical_path_scheduling_default),
             ("verbose", self.verbose_checkbox, False),
             ("perf_logging", self.perf_logging_checkbox, False),
         ]
@@ -920,7 +1372,7 @@ class Configuration(QWidget):
             setattr(pref, pref_name, default)
             checkbox.setChecked(default)
         # Mirror the resume-checkbox slot's run_mode coupling for the default (unchecked) state.
-        if pref.run_mode != RunMode.RESTART:
+        if pref.run_mode in (RunMode.RESUME, RunMode.CHECK):
             pref.run_mode = RunMode.CHECK
 
         field_defaults: list[tuple[str, QLineEdit, float | int]] = [
@@ -938,8 +1390,16 @@ class Configuration(QWidget):
             ("max_descendant_processes", self.max_descendant_processes_lineedit, max_descendant_processes_default),
             ("commit_gate_threshold", self.commit_gate_threshold_lineedit, commit_gate_threshold_default),
             ("cpu_gate_threshold", self.cpu_gate_threshold_lineedit, cpu_gate_threshold_default),
+            ("memory_budget_gb", self.memory_budget_gb_lineedit, memory_budget_gb_default),
             ("resource_guard_min_free_disk_gb", self.resource_guard_min_free_disk_gb_lineedit, resource_guard_min_free_disk_gb_default),
             ("resource_guard_commit_threshold", self.resource_guard_commit_threshold_lineedit, resource_guard_commit_threshold_default),
+            ("retention_keep_runs", self.retention_keep_runs_lineedit, retention_keep_runs_default),
+            ("retention_keep_days", self.retention_keep_days_lineedit, retention_keep_days_default),
+            ("retention_max_db_mb", self.retention_max_db_mb_lineedit, retention_max_db_mb_default),
+            ("result_cache_max_mb", self.result_cache_max_mb_lineedit, result_cache_max_mb_default),
+            ("session_max_modules", self.session_max_modules_lineedit, session_max_modules_default),
+            ("session_max_rss_growth_mb", self.session_max_rss_growth_mb_lineedit, session_max_rss_growth_mb_default),
+            ("batch_target_seconds", self.batch_target_seconds_lineedit, batch_target_seconds_default),
         ]
         for pref_name, lineedit, default in field_defaults:
             setattr(pref, pref_name, default)
@@ -955,6 +1415,14 @@ class Configuration(QWidget):
         self.stall_kill_value_lineedit.setText(_format_number(stall_kill_value_default))
         self.stall_kill_unit_combo.setCurrentText(stall_kill_unit_default)
 
+        # Scheduling granularity, execution mode and the forkserver preload list.
+        pref.scheduling_granularity = scheduling_granularity_default
+        self.scheduling_granularity_combo.setCurrentIndex(self.scheduling_granularity_combo.findData(int(scheduling_granularity_default)))
+        pref.execution_mode = execution_mode_default
+        self.execution_mode_combo.setCurrentIndex(self.execution_mode_combo.findData(int(execution_mode_default)))
+        pref.forkserver_preload_modules = forkserver_preload_modules_default
+        self.forkserver_preload_modules_lineedit.setText(forkserver_preload_modules_default)
+
         # Test-ordering aspects back to the built-in seed.
         self.ordering_aspects_widget.reset_to_defaults()
 
@@ -963,6 +1431,8 @@ class Configuration(QWidget):
         self.refresh_target_project_path()
         pref.test_results_db_dir = ""
         self.test_results_db_dir_lineedit.setText("")
+        pref.result_cache_dir = ""
+        self.result_cache_dir_lineedit.setText("")
 
         # The defaults satisfy both cross-field invariants; clear any shown warnings.
         self._validate_utilization_thresholds()
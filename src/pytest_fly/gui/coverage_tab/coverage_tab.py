@@ -16,7 +16,7 @@ from ...pytest_runner.coverage import calculate_coverage
 from ...tick_data import TickData
 from ..charts import paint_chart_frame
 from ..graph_tab.time_axis import Y_GRID_PCTS, TimeAxisMapping
-from ..gui_util import count_test_states, get_text_dimensions, window_text_color
+from ..gui_util import get_text_dimensions, window_text_color
 from ..view_coverage import ViewCoverage
 
 log = get_logger()
@@ -193,7 +193,7 @@ class CoverageTab(QGroupBox):
         # Compute status indicator from run states
         if tick.run_states:
             total = len(tick.run_states)
-            counts = count_test_states(tick.run_states)
+            counts = tick.get_state_counts()
             running = counts[PytestRunnerState.RUNNING]
             queued = counts[PytestRunnerState.QUEUED]
             if running > 0 or queued > 0:
@@ -5,24 +5,22 @@ Extracted from :class:`FlyAppMainWindow` to keep coverage bookkeeping
 separate from the GUI window lifecycle.  The main window creates one
 instance and calls :meth:`CoverageTracker.update` on each refresh tick.
 
-Coverage combination is expensive — it re-combines every per-test ``.coverage``
-file and runs two full report passes over the PUT's sources — so it runs on a
-dedicated background thread.  :meth:`update` only *submits* work (coalescing:
-the worker always processes the latest completed-test set) and
-:meth:`apply_to_tick` publishes the most recently finished results, so the GUI
-tick never blocks on coverage.
+Coverage is combined incrementally by a :class:`~pytest_fly.coverage_union.CoverageUnion`,
+which merges only the coverage files of the tests that finished since the last
+calculation.  That still reads files and parses sources, so it runs on a dedicated
+background thread.  :meth:`update` only *submits* work (coalescing: the worker always
+processes the latest completed-test set) and :meth:`apply_to_tick` publishes the most
+recently finished results, so the GUI tick never blocks on coverage.
 """
 
 import time
 from pathlib import Path
 from threading import Event, Lock, Thread
 
-from coverage import Coverage
-
-from ..file_util import sanitize_test_name
+from ..coverage_union import CoverageUnion
 from ..interfaces import PytestRunnerState
 from ..logger import get_logger
-from ..pytest_runner.coverage import COVERAGE_READ_ERRORS, calculate_coverage
+from ..pytest_runner.coverage import COVERAGE_READ_ERRORS
 from ..tick_data import TickData
 
 log = get_logger()
@@ -39,6 +37,8 @@ class CoverageTracker:
         self._last_run_guid: str | None = None
         self._worker: Thread | None = None
         self._work_available = Event()
+        self._union = CoverageUnion(data_dir)  # owned by the worker thread
+        self._union_generation = 0  # the generation whose tests the union holds
 
         self._lock = Lock()
         # All state below is guarded by _lock (shared between the GUI thread and the worker).
@@ -78,6 +78,8 @@ class CoverageTracker:
 
         :param tick: Pre-computed data for this refresh cycle.
         """
+        if tick.changed_names is not None and not tick.changed_names:
+            return  # no test changed state, so the completed set is the one already submitted
         current_completed = {name for name, rs in tick.run_states.items() if rs.get_state() in (PytestRunnerState.PASS, PytestRunnerState.FAIL)}
         if not current_completed:
             return
@@ -93,13 +95,15 @@ class CoverageTracker:
     def apply_to_tick(self, tick: TickData) -> None:
         """Stamp the most recently computed coverage state onto *tick* so tabs can read it.
 
-        Copies are handed out so the tabs can iterate while the worker publishes new results.
+        The worker publishes each result as new containers and never mutates published ones,
+        so the tabs can iterate them without a per-tick copy — and can tell from the object
+        identity that nothing changed.
 
         :param tick: The tick data bundle to update in-place.
         """
         with self._lock:
-            tick.coverage_history = list(self._coverage_history)
-            tick.per_test_coverage = dict(self._per_test_coverage)
+            tick.coverage_history = self._coverage_history
+            tick.per_test_coverage = self._per_test_coverage
             tick.covered_lines = self._covered_lines
             tick.total_lines = self._total_lines
 
@@ -146,31 +150,21 @@ class CoverageTracker:
     def _calculate(self, completed: set[str], generation: int, run_start: float | None) -> None:
         """Recalculate combined and per-test coverage for *completed* and publish the results.
 
-        Results are discarded if a new run started (generation changed) while computing.
+        Only the tests not merged yet (or run again) are read.  Results are discarded if a new
+        run started (generation changed) while computing.
         """
+        if generation != self._union_generation:
+            self._union.reset()  # a new run: its tests' coverage starts from nothing
+            self._union_generation = generation
         try:
-            coverage_pct, covered_lines, total_lines = calculate_coverage("current", self._data_dir, write_report=False)
+            self._union.update(completed)
         except COVERAGE_READ_ERRORS as e:
             log.warning(f"coverage calculation failed: {e}")
             return
-
-        # Recompute per-test coverage for ALL completed tests since the denominator
-        # (total_lines) may have changed as new tests discover new source files.
-        per_test_coverage: dict[str, float] = {}
-        if total_lines > 0:
-            coverage_dir = Path(self._data_dir, "coverage")
-            for test_name in completed:
-                safe_name = sanitize_test_name(test_name)
-                cov_file = coverage_dir / f"{safe_name}.coverage"
-                if cov_file.exists():
-                    try:
-                        cov = Coverage(cov_file)
-                        cov.load()
-                        data = cov.get_data()
-                        executed = sum(len(data.lines(f) or []) for f in data.measured_files())
-                        per_test_coverage[test_name] = executed / total_lines
-                    except COVERAGE_READ_ERRORS as e:
-                        log.info(f"per-test coverage for {test_name} failed: {e}")
+        coverage_pct = self._union.fraction()
+        covered_lines, total_lines = self._union.totals()
+        # Every fraction is published again: the denominator grows as tests measure new source files.
+        per_test_coverage = self._union.per_test_fractions(completed)
 
         with self._lock:
             if generation != self._generation:
@@ -181,8 +175,7 @@ class CoverageTracker:
                 # Seed the first data point at the run start so the chart always has
                 # at least two points — needed for a visible line/fill, especially in RESUME
                 # mode when no new tests run and only one calculation happens this run.
-                if not self._coverage_history and run_start is not None:
-                    self._coverage_history.append((run_start, coverage_pct))
-                self._coverage_history.append((time.time(), coverage_pct))
+                seed = [(run_start, coverage_pct)] if not self._coverage_history and run_start is not None else []
+                self._coverage_history = [*self._coverage_history, *seed, (time.time(), coverage_pct)]  # new list: published ones are shared with the tabs
             if per_test_coverage:
                 self._per_test_coverage = per_test_coverage
@@ -1,12 +1,36 @@
 """Graph tab — horizontal progress bars showing test execution timelines."""
 
 from PySide6.QtCore import Qt
-from PySide6.QtWidgets import QGroupBox, QScrollArea, QVBoxLayout, QWidget
+from PySide6.QtWidgets import QGroupBox, QLabel, QScrollArea, QVBoxLayout, QWidget
 
+from ...preferences import get_pref
+from ...pytest_runner.test_list import NODE_ID_DELIMITER, module_of
 from ...tick_data import TickData
+from ..gui_util import apply_graph_font
 from .progress_bar import PytestProgressBar
 from .time_axis import TimeAxisWidget
 
+_HEADER = "header"
+_BAR = "bar"
+
+
+def grouped_layout(names: list[str]) -> list[tuple[str, str]]:
+    """Return the graph's rows for *names*: ``("bar", name)`` entries plus ``("header", module)`` group headers.
+
+    Names keep their order, except that every sub-module node id (a class/function shard,
+    e.g. from an automatically split module) is gathered under a header for its module, at
+    the position of the module's first row.
+    """
+    groups: dict[str, list[str]] = {}
+    for name in names:
+        groups.setdefault(module_of(name), []).append(name)
+    rows: list[tuple[str, str]] = []
+    for module, members in groups.items():
+        if any(NODE_ID_DELIMITER in member for member in members):
+            rows.append((_HEADER, module))
+        rows.extend((_BAR, member) for member in members)
+    return rows
+
 
 class GraphTab(QGroupBox):
     """Tab displaying a horizontal progress bar for each test module with a shared time axis."""
@@ -15,7 +39,9 @@ class GraphTab(QGroupBox):
         super().__init__()
         self.setTitle("Progress")
         self.progress_bars: dict[str, PytestProgressBar] = {}
-        self._layout_order: list[str] = []
+        self.group_headers: dict[str, QLabel] = {}  # module -> header above its shards
+        self._layout_order: list[tuple[str, str]] = []
+        self._bar_inputs: tuple | None = None  # the previous tick's inputs shared by every bar
 
         outer_layout = QVBoxLayout()
         outer_layout.setContentsMargins(0, 0, 0, 0)
@@ -48,6 +74,19 @@ class GraphTab(QGroupBox):
 
         self.time_axis.update_time_window(effective_min, tick.max_time_stamp)
 
+        # A bar depends on its own records plus the time window, the singleton set and the
+        # graph font.  When none of those shared inputs changed and no test was added, only the
+        # bars of tests whose records changed (and of running tests, which grow) need a visit.
+        bar_inputs = (effective_min, tick.max_time_stamp, tick.singleton_names, get_pref().graph_font_size)
+        same_inputs = self._bar_inputs is not None and all(new is old or new == old for new, old in zip(bar_inputs, self._bar_inputs))
+        self._bar_inputs = bar_inputs
+        if same_inputs and tick.changed_names is not None and len(self.progress_bars) == len(tick.infos_by_name) and all(name in self.progress_bars for name in tick.changed_names):
+            for test_name in tick.changed_names.union(tick.get_running_names()):
+                self.progress_bars[test_name].update_pytest_process_info(
+                    tick.infos_by_name[test_name], effective_min, tick.max_time_stamp, tick.run_states[test_name], test_name in tick.singleton_names
+                )
+            return
+
         # Remove bars for tests no longer in the current tick
         removed_names = set(self.progress_bars) - set(tick.infos_by_name)
         for name in removed_names:
@@ -66,13 +105,27 @@ class GraphTab(QGroupBox):
                 progress_bar = PytestProgressBar(infos, effective_min, tick.max_time_stamp, run_state, is_singleton)
                 self.progress_bars[test_name] = progress_bar
 
-        # Ensure layout order matches tick.infos_by_name order (same as table tab).
-        # In steady state the order doesn't change — skip the takeAt/addWidget churn
-        # (and associated layout invalidation) when the order is already correct.
-        desired_order = list(tick.infos_by_name)
+        # Ensure layout order matches tick.infos_by_name order (same as table tab), with
+        # shards grouped under their module's header.  In steady state the order doesn't
+        # change — skip the takeAt/addWidget churn (and associated layout invalidation)
+        # when the order is already correct.
+        desired_order = grouped_layout(list(tick.infos_by_name))
         if desired_order != self._layout_order:
+            wanted_headers = {key for kind, key in desired_order if kind == _HEADER}
+            for module in set(self.group_headers) - wanted_headers:
+                header = self.group_headers.pop(module)
+                self._bar_layout.removeWidget(header)
+                header.deleteLater()
             while self._bar_layout.count():
                 self._bar_layout.takeAt(0)
-            for test_name in desired_order:
-                self._bar_layout.addWidget(self.progress_bars[test_name])
+            for kind, key in desired_order:
+                if kind == _HEADER:
+                    if key not in self.group_headers:
+                        header = QLabel(key)
+                        apply_graph_font(header)
+                        header.setStyleSheet("font-weight: bold;")
+                        self.group_headers[key] = header
+                    self._bar_layout.addWidget(self.group_headers[key])
+                else:
+                    self._bar_layout.addWidget(self.progress_bars[key])
             self._layout_order = desired_order
@@ -8,7 +8,6 @@ GUI tabs.
 """
 
 import time
-from dataclasses import replace
 from pathlib import Path
 from queue import Empty
 
@@ -25,13 +24,15 @@ from typeguard import typechecked
 
 from ..__version__ import application_name
 from ..db import PytestProcessInfoDB, PytestProcessInfoReader
-from ..interfaces import PyTestFlyExitCode, PytestRunnerState
+from ..interfaces import PytestRunnerState
 from ..logger import EVENT_EXTRA, get_logger
 from ..preferences import get_pref
 from ..project_info import get_project_info
 from ..pytest_runner.run_state import TERMINAL_STATES
 from ..pytest_runner.system_monitor import SystemMonitor, SystemMonitorSample
-from ..tick_data import build_tick_data
+from ..run_records import RunRecordCache
+from ..tick_data import TickDataBuilder
+from ..tick_data import build_tick_data as build_tick_data  # re-export: callers historically import it from here
 from .about_tab.about import About
 from .configuration_tab.configuration import Configuration
 from .coverage_tab import CoverageTab
@@ -117,19 +118,18 @@ class FlyAppMainWindow(QMainWindow):
 
         self._coverage_tracker = CoverageTracker(self.data_dir)
 
+        # The displayed run's records, read incrementally: each tick reads only the rows written
+        # since the previous one (and skips the query when nothing was written).
+        self._run_records = RunRecordCache()
+        # Tick data kept across ticks; each tick applies only the records the cache just read.
+        self._tick_builder = TickDataBuilder()
+
         # query_last_pass scans the full DB history — cache its result and only
         # re-query when the set of passing tests in the current run has grown.
         self._last_pass_cache: dict[str, tuple[float, float]] = {}
         self._last_pass_cache_run_guid: str | None = None
         self._last_pass_cache_pass_count: int = -1
 
-        # The per-tick query omits the output column (completed tests' output blobs dominate
-        # the row size and would be re-read every tick); outputs are fetched once per completed
-        # test and cached here for the rest of the run.  None marks a test whose final record
-        # carries no output (e.g. TERMINATED status records) so it is not re-queried each tick.
-        self._output_cache: dict[str, tuple[float, str] | None] = {}
-        self._output_cache_run_guid: str | None = None
-
         self.table_tab.force_stop_test_requested.connect(self._force_stop_single_test)
 
         self.setCentralWidget(self.tab_widget)
@@ -177,9 +177,11 @@ class FlyAppMainWindow(QMainWindow):
         # persistence used for the Run-tab splitters.
         pref.window_geometry = qt_state_to_hex(self.saveGeometry())
 
-        # Abort any in-flight run preparation, then deliver a just-finished preparation's
-        # queued adoption so a runner it already started is stopped by the path below
-        # instead of outliving the window.
+        # Stop background run planning and watch mode, and abort any in-flight run preparation, then deliver a
+        # just-finished preparation's queued adoption so a runner it already started is stopped
+        # by the path below instead of outliving the window.
+        control.stop_run_planner()
+        control.stop_watch()
         control.abort_run_preparation()
         QCoreApplication.processEvents()
         pytest_runner = control.pytest_runner
@@ -221,42 +223,14 @@ class FlyAppMainWindow(QMainWindow):
         if samples:
             self.run_tab.system_metrics_window.ingest_samples(samples)
 
-    def _attach_completed_outputs(self, db: PytestProcessInfoReader, run_guid: str | None, process_infos: list) -> list:
-        """Rehydrate the ``output`` column onto completed tests' final records.
-
-        The per-tick query omits ``output`` so completed tests' full pytest output is not
-        re-read from the DB on every tick.  Each completed test's output is fetched once,
-        cached for the rest of the run, and re-attached to the record it came from (matched
-        by timestamp) so downstream consumers (tooltips, failed-test output, graph hover)
-        see the records exactly as if they had been queried whole.
-        """
-        # The tick may query with run_guid=None (no active run: "most recent run") — resolve
-        # the actual GUID from the records so the cache keys stay consistent either way.
-        effective_guid = run_guid if run_guid is not None else (process_infos[0].run_guid if process_infos else None)
-        if effective_guid != self._output_cache_run_guid:
-            self._output_cache = {}
-            self._output_cache_run_guid = effective_guid
-        if effective_guid is None:
-            return process_infos
-
-        completed_names = {info.name for info in process_infos if info.exit_code != PyTestFlyExitCode.NONE}
-        missing = completed_names - self._output_cache.keys()
-        if missing:
-            self._output_cache.update(db.query_outputs(effective_guid, sorted(missing)))
-            for name in missing - self._output_cache.keys():
-                self._output_cache[name] = None  # no stored output for this test — don't re-query every tick
-
-        if not any(self._output_cache.values()):
-            return process_infos
-        return [replace(info, output=cached[1]) if (cached := self._output_cache.get(info.name)) is not None and info.time_stamp == cached[0] else info for info in process_infos]
-
     def _update_tick(self):
         """Timer event handler — query the DB and refresh all tabs.
 
-        The query runs synchronously on the GUI thread (sub-millisecond for
-        typical result sets).  Grouping, time-window, and run-state computation
-        happen once in :func:`build_tick_data` and the resulting :class:`TickData`
-        is shared across all tabs.
+        The query runs synchronously on the GUI thread and reads only the rows written
+        since the previous tick (:class:`RunRecordCache`), so its cost follows the
+        run's write rate rather than its size.  :class:`TickDataBuilder` applies just those
+        rows to the grouping, run states and aggregates, and the resulting :class:`TickData`
+        — with the set of tests that changed — is shared across all tabs.
 
         Per-phase wall-clock timings are captured via :class:`PhaseTimer` and
         emitted once per tick to help diagnose UI lag.  Logged at ``info`` when
@@ -270,13 +244,11 @@ class FlyAppMainWindow(QMainWindow):
         # so a test process mid-write can no longer stall this (GUI-thread) tick.
         with PytestProcessInfoReader(self.data_dir) as db:
             with timer.time("db_query"):
-                process_infos = db.query(run_guid)
-            with timer.time("db_outputs"):
-                process_infos = self._attach_completed_outputs(db, run_guid, process_infos)
+                self._run_records.refresh(db, run_guid)
             with timer.time("db_last_pass"):
                 # query_last_pass scans the full DB — only re-run when the set of
                 # passing tests for the current run has grown, or on run change.
-                pass_count = sum(1 for info in process_infos if info.exit_code == PyTestFlyExitCode.OK)
+                pass_count = self._run_records.pass_count
                 if run_guid != self._last_pass_cache_run_guid or pass_count != self._last_pass_cache_pass_count:
                     self._last_pass_cache = db.query_last_pass()
                     self._last_pass_cache_run_guid = run_guid
@@ -288,16 +260,18 @@ class FlyAppMainWindow(QMainWindow):
 
         control = self.run_tab.control_window
         with timer.time("build"):
-            tick = build_tick_data(
-                process_infos,
+            tick = self._tick_builder.update(
+                self._run_records.process_infos,
                 prior_durations=control.prior_durations,
                 num_processes=control.num_processes,
                 current_run_start=control.current_run_start,
                 singleton_names=control.singleton_names,
                 put_version_info=control.put_version_info,
+                reset=self._run_records.reloaded,
             )
             tick.last_pass_data = last_pass_data
             tick.soft_stop_requested = control._soft_stop_requested
+            tick.cache_hits = control.cache_hits
             tick.run_prep_active = control.is_run_preparation_active()
             runner = control.pytest_runner
             if runner is not None:
@@ -306,7 +280,11 @@ class FlyAppMainWindow(QMainWindow):
                 # Part D completion, derived from this tick's already-queried records rather
                 # than re-querying the DB (get_run_completion) — the tick query and the
                 # completion view are the same data.
-                stuck = sorted(name for name, run_state in tick.run_states.items() if run_state.get_state() not in TERMINAL_STATES)
+                counts = tick.get_state_counts()
+                if counts[PytestRunnerState.QUEUED] + counts[PytestRunnerState.RUNNING] > 0:
+                    stuck = sorted(name for name, run_state in tick.run_states.items() if run_state.get_state() not in TERMINAL_STATES)
+                else:
+                    stuck = []  # every test is terminal — skip the scan
                 tick.user_complete = runner.was_force_stopped() or (bool(tick.run_states) and not stuck)
                 # When a run has finished but some tests never reached a terminal state
                 # (e.g. singletons that were blocked behind a wedged slot), surface them.
@@ -333,8 +311,13 @@ class FlyAppMainWindow(QMainWindow):
             self.log_tab.update_tick()
 
         total_ms = (time.perf_counter() - tick_start) * 1000.0
-        n_completed = sum(1 for rs in tick.run_states.values() if rs.get_state() in (PytestRunnerState.PASS, PytestRunnerState.FAIL))
-        message = f"tick total={total_ms:.1f}ms {timer.format()} n_rows={len(process_infos)} n_tests={len(tick.infos_by_name)} n_completed={n_completed}"
+        counts = tick.get_state_counts()
+        n_completed = counts[PytestRunnerState.PASS] + counts[PytestRunnerState.FAIL]
+        n_changed = len(tick.changed_names) if tick.changed_names is not None else len(tick.infos_by_name)
+        message = (
+            f"tick total={total_ms:.1f}ms {timer.format()} n_rows={len(tick.process_infos)} n_new_rows={len(self._run_records.new_infos)} "
+            f"n_changed={n_changed} n_tests={len(tick.infos_by_name)} n_completed={n_completed}"
+        )
         if get_pref().perf_logging:
             log.info(message)
         else:
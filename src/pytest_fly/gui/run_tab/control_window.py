@@ -9,8 +9,18 @@ Run preparation is slow — git-based PUT detection, winding down a prior runner
 on a background thread (:meth:`ControlWindow._prepare_run`); the Run click only
 validates, disables the controls, and hands off.  The prepared
 :class:`PytestRunner` is adopted back on the GUI thread via a queued signal.
+
+Most of that work does not change between runs, so while the app is idle a
+:class:`~pytest_fly.run_plan.RunPlanner` keeps the next run's plan (discovered tests,
+resolved mode, ordered schedule) warm in the background; Run starts from it when the
+project and the results DB are unchanged (see :mod:`pytest_fly.run_plan`).
+
+In watch mode a :class:`~pytest_fly.watch.ProjectWatcher` follows the project: a change while
+idle starts an AFFECTED run, and a change during a run requeues the tests it affects ahead of
+the rest (see :mod:`pytest_fly.watch`).
 """
 
+import os
 import shutil
 import sqlite3
 import time
@@ -22,19 +32,25 @@ from PySide6.QtCore import Qt, Signal
 from PySide6.QtWidgets import QGroupBox, QSizePolicy, QVBoxLayout
 from typeguard import typechecked
 
-from ...db import PytestProcessInfoDB, PytestProcessInfoReader
+from ...db import PytestProcessInfoDB, RetentionConfig
+from ...file_util import sanitize_test_name
 from ...guid import generate_uuid
-from ...interfaces import OrderingAspect, PutVersionInfo, PyTestFlyExitCode, RunMode, ScheduledTest
+from ...impact import ImpactIndex, SourceSnapshots
+from ...interfaces import ExecutionMode, PutVersionInfo, RunMode, SchedulingGranularity
 from ...logger import get_logger
-from ...preferences import ParallelismControl, duration_to_seconds, get_ordering_aspects_ordered, get_pref
-from ...put_version import detect_put_version
+from ...preferences import ParallelismControl, duration_to_seconds, get_active_put_path, get_ordering_aspects_ordered, get_pref
 from ...pytest_runner.admission import AdmissionGateConfig
-from ...pytest_runner.coverage import compute_per_test_coverage
-from ...pytest_runner.ordering import OrderingContext, apply_ordering_aspects
+from ...pytest_runner.const import FAIL_OPEN_ERRORS
+from ...pytest_runner.execution import ExecutionConfig
+from ...pytest_runner.forkserver import parse_module_list
 from ...pytest_runner.pytest_runner import PytestRunner
 from ...pytest_runner.resource_guard import ResourceGuardConfig
+from ...pytest_runner.scheduler import SchedulerConfig, memory_budget_bytes
+from ...pytest_runner.sharding import ShardingConfig
 from ...pytest_runner.stall_watchdog import StallConfig
-from ...pytest_runner.test_list import GetTests
+from ...result_cache import ResultCacheConfig, carry_over_hits
+from ...run_plan import CARRY_OVER_MODES, RunPlanner, RunPrepConfig, filter_for_resume, resolve_check_mode
+from ...watch import ProjectWatcher, affected_tests
 from ..target_path_dialog import ensure_valid_target_project_path
 from .control_pushbutton import ControlButton
 from .parallelism_control_box import ParallelismControlBox
@@ -43,23 +59,7 @@ from .run_mode_control_box import RunModeControlBox
 log = get_logger()
 
 
-@dataclass(frozen=True)
-class _RunPrepConfig:
-    """Everything run preparation needs, gathered on the GUI thread at Run-click time.
-
-    The background prep thread works only from this snapshot (plus the data dir), so it
-    never touches preferences or Qt.
-    """
-
-    project_root: Path
-    run_guid: str
-    refresh_rate: float
-    run_mode: RunMode
-    processes: int
-    enabled_aspects: list[OrderingAspect]
-    gate_config: AdmissionGateConfig
-    stall_config: StallConfig
-    resource_guard_config: ResourceGuardConfig
+_RUN_PLANNER_UPDATE_SECONDS = 5.0  # how often an idle window hands the run planner its current configuration
 
 
 @dataclass
@@ -71,6 +71,7 @@ class _RunPrepResult:
     num_processes: int = 1
     singleton_names: set[str] = field(default_factory=set)
     put_version_info: PutVersionInfo | None = None
+    cache_hits: dict[str, float] = field(default_factory=dict)
 
 
 class ControlWindow(QGroupBox):
@@ -80,6 +81,9 @@ class ControlWindow(QGroupBox):
     # _RunPrepResult, or None on abort/failure). Cross-thread, so Qt queues the
     # delivery onto the GUI thread.
     run_prep_finished = Signal(object)
+    # Emitted by the watch thread for a change no running run took (payload: the changed
+    # files); the GUI thread starts an AFFECTED run for it once idle.
+    watch_change = Signal(object)
 
     @typechecked()
     def __init__(self, parent, data_dir: Path):
@@ -127,6 +131,8 @@ class ControlWindow(QGroupBox):
         self._run_prep_abort = Event()
         self._run_prep_active: bool = False
         self.run_prep_finished.connect(self._on_run_prep_finished)
+        self.run_planner = RunPlanner(data_dir)
+        self._run_planner_updated = time.monotonic()  # first hand-off after a few idle seconds
         # Restore the most recent run's start so the Progress Graph keeps its time-axis origin
         # after an app restart — RESUME-carried records (with genuine historical timestamps) are
         # shifted onto this origin at render time in build_tick_data.
@@ -134,6 +140,12 @@ class ControlWindow(QGroupBox):
         self.current_run_start: float | None = restored_run_start if restored_run_start > 0.0 else None
         self.singleton_names: set[str] = set()
         self.put_version_info: PutVersionInfo | None = None
+        self.cache_hits: dict[str, float] = {}  # tests the result cache passed this run -> seconds saved (their last pass's duration)
+        self._watcher: ProjectWatcher | None = None
+        self._watch_root: Path | None = None  # the directory watch mode follows (None: watch mode off)
+        self._watch_pending: bool = False  # a change waits for an AFFECTED run
+        self._watch_index = ImpactIndex(data_dir)  # the watch thread's own: reads only the coverage files that changed
+        self.watch_change.connect(self._on_watch_change)
 
         self.set_fixed_width()  # calculate and set the widget width
 
@@ -251,7 +263,10 @@ class ControlWindow(QGroupBox):
         if project_root is None:
             log.info("Run aborted: target project path is not set to an existing directory.")
             return
+        self._start_run(project_root, get_pref().run_mode)
 
+    def _start_run(self, project_root: Path, run_mode: RunMode) -> None:
+        """Hand preparation of a run of *project_root* in *run_mode* to the prep thread (see :meth:`run`)."""
         # Disable the controls immediately.  Previously this happened at the END of the
         # (synchronous) preparation, so a second click during discovery re-entered run().
         self._run_prep_active = True
@@ -271,9 +286,18 @@ class ControlWindow(QGroupBox):
 
         # Snapshot everything preparation needs while still on the GUI thread — the
         # prep thread must not touch preferences or Qt.
-        config = _RunPrepConfig(
+        config = replace(self._snapshot_run_config(project_root, self.run_guid), run_mode=run_mode)
+        self.run_planner.set_idle_config(None)  # no background planning while this run is prepared and runs
+        self._run_prep_abort.clear()
+        self._run_prep_thread = Thread(target=self._prepare_run, args=(config, self.pytest_runner), name="run_prep", daemon=True)
+        self._run_prep_thread.start()
+
+    def _snapshot_run_config(self, project_root: Path, run_guid: str) -> RunPrepConfig:
+        """Gather the run configuration from the preferences (GUI thread)."""
+        pref = get_pref()
+        return RunPrepConfig(
             project_root=project_root,
-            run_guid=self.run_guid,
+            run_guid=run_guid,
             refresh_rate=pref.refresh_rate,
             run_mode=pref.run_mode,
             processes=self._desired_process_count(),
@@ -298,10 +322,104 @@ class ControlWindow(QGroupBox):
                 min_free_disk_gb=pref.resource_guard_min_free_disk_gb,
                 commit_threshold=pref.resource_guard_commit_threshold,
             ),
+            execution_config=ExecutionConfig(
+                mode=ExecutionMode(pref.execution_mode),
+                preload_modules=tuple(parse_module_list(pref.forkserver_preload_modules)),
+                session_max_modules=pref.session_max_modules,
+                session_max_rss_growth_mb=pref.session_max_rss_growth_mb,
+                batch_target_seconds=pref.batch_target_seconds if pref.batch_short_tests else 0.0,
+            ),
+            granularity=SchedulingGranularity(pref.scheduling_granularity),
+            sharding_config=ShardingConfig(enabled=pref.auto_split_critical_modules),
+            scheduler_config=SchedulerConfig(
+                critical_path=pref.critical_path_scheduling,
+                memory_budget_bytes=memory_budget_bytes(pref.memory_budget_gb) if pref.memory_budget_gate_enabled else 0,
+            ),
+            retention_config=RetentionConfig(
+                enabled=pref.retention_enabled,
+                keep_runs=pref.retention_keep_runs,
+                keep_days=pref.retention_keep_days,
+                keep_last_pass=pref.retention_keep_last_pass,
+                max_db_mb=pref.retention_max_db_mb,
+            ),
+            reuse_plan=pref.pre_plan_runs,
+            cache_collection=pref.cache_collection,
+            result_cache_config=ResultCacheConfig(
+                enabled=pref.result_cache,
+                directory=Path(pref.result_cache_dir) if pref.result_cache_dir else None,
+                max_mb=pref.result_cache_max_mb,
+            ),
         )
-        self._run_prep_abort.clear()
-        self._run_prep_thread = Thread(target=self._prepare_run, args=(config, self.pytest_runner), name="run_prep", daemon=True)
-        self._run_prep_thread.start()
+
+    def update_run_planner(self) -> None:
+        """Keep the background run plan current while idle (called every GUI tick).
+
+        Every few seconds an idle window hands the planner the configuration a Run click would
+        use now; during a run, or with pre-planning turned off, the planner is left idle.
+        """
+        now = time.monotonic()
+        if now - self._run_planner_updated < _RUN_PLANNER_UPDATE_SECONDS:
+            return
+        self._run_planner_updated = now
+        runner = self.pytest_runner
+        idle = not self._run_prep_active and (runner is None or not runner.is_running())
+        project_root = get_active_put_path()
+        if idle and get_pref().pre_plan_runs and project_root.is_dir():
+            self.run_planner.set_idle_config(self._snapshot_run_config(project_root, ""))
+        else:
+            self.run_planner.set_idle_config(None)
+
+    def update_watch(self) -> None:
+        """Start or stop watch mode as the preferences say, and start a run a change left pending (called every GUI tick)."""
+        project_root = get_active_put_path()
+        watch_root = Path(os.path.realpath(project_root)) if get_pref().watch_mode and project_root.is_dir() else None
+        if watch_root != self._watch_root:
+            self.stop_watch()
+            self._watch_root = watch_root
+            if watch_root is not None:
+                watcher = ProjectWatcher(watch_root, self._on_watched_files_changed)
+                try:
+                    watcher.start()
+                    self._watcher = watcher
+                except FAIL_OPEN_ERRORS as e:
+                    log.warning(f"watch mode could not watch {watch_root}: {e}")
+        self._start_watch_run_if_idle()
+
+    def stop_watch(self) -> None:
+        """Stop watch mode's watcher (the main window's ``closeEvent``, or the preference turned off)."""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        self._watch_root = None
+        self._watch_pending = False
+
+    def _on_watched_files_changed(self, changed: set[Path]) -> None:
+        """Watch thread: requeue the running run's tests *changed* affects, or hand the change to the GUI thread for a new run."""
+        runner = self.pytest_runner
+        watch_root = self._watch_root
+        if runner is not None and runner.is_running() and not self._run_prep_active and watch_root is not None:
+            affected = affected_tests(changed, [test.node_id for test in runner.tests], self._watch_index, watch_root)
+            if runner.requeue_tests(affected):
+                log.info(f"watch: {len(changed)} files changed, {len(affected)} tests affected")
+                return
+        self.watch_change.emit(changed)  # idle, or the run is winding down
+
+    def _on_watch_change(self, changed: set[Path]) -> None:
+        """Start an AFFECTED run for *changed* as soon as the app is idle (GUI thread; queued from the watch thread)."""
+        log.info(f"watch: {len(changed)} files changed")
+        self._watch_pending = True
+        self._start_watch_run_if_idle()
+
+    def _start_watch_run_if_idle(self) -> None:
+        """Start the AFFECTED run a watched change is waiting for, unless a run is being prepared or running."""
+        runner = self.pytest_runner
+        if self._watch_pending and self._watch_root is not None and not self._run_prep_active and (runner is None or not runner.is_running()):
+            self._watch_pending = False
+            self._start_run(self._watch_root, RunMode.AFFECTED)
+
+    def stop_run_planner(self) -> None:
+        """Stop background run planning (the main window's ``closeEvent``)."""
+        self.run_planner.stop()
 
     def is_run_preparation_active(self) -> bool:
         """Return ``True`` while run preparation is in flight on the background thread."""
@@ -333,7 +451,7 @@ class ControlWindow(QGroupBox):
         thread.join(timeout)
         return not thread.is_alive()
 
-    def _prepare_run(self, config: _RunPrepConfig, prior_runner: PytestRunner | None) -> None:
+    def _prepare_run(self, config: RunPrepConfig, prior_runner: PytestRunner | None) -> None:
         """Background thread body: build and start the runner, then hand it to the GUI thread.
 
         The ``finally`` guarantees the finished signal is emitted even if preparation
@@ -347,120 +465,78 @@ class ControlWindow(QGroupBox):
         finally:
             self.run_prep_finished.emit(result)
 
-    def _build_runner(self, config: _RunPrepConfig, prior_runner: PytestRunner | None) -> "_RunPrepResult | None":
-        """Prepare a run: discovery, RESUME handling, ordering — and start the runner.
+    def _build_runner(self, config: RunPrepConfig, prior_runner: PytestRunner | None) -> "_RunPrepResult | None":
+        """Prepare a run: take the plan (discovery, RESUME handling, ordering) — and start the runner.
 
         Runs on the prep thread.  Returns ``None`` if aborted (the runner, if it was
         already started, is stopped again).
         """
-        put_version_info = detect_put_version(config.project_root)
-        log.info(f"PUT detected: {put_version_info}")
-
-        get_tests = GetTests(test_dir=config.project_root)
-        get_tests.start()
-
-        # Wind down any previous runner while discovery proceeds. Bounded join: a wedged
-        # worker thread must not hang preparation forever (and since this is no longer on
-        # the GUI thread, it cannot freeze the UI either way).
+        # Wind down any previous runner first, so its last writes are in the DB the plan is
+        # validated against. Bounded join: a wedged worker thread must not hang preparation
+        # forever (and since this is no longer on the GUI thread, it cannot freeze the UI either way).
         if prior_runner is not None and prior_runner.is_running():
             prior_runner.stop()
             if not prior_runner.join(120.0):
                 log.warning(f"previous run did not wind down within 120 s; starting the new run anyway ({config.run_guid=})")
 
-        while get_tests.is_alive():
-            get_tests.join(1.0)
-            if self._run_prep_abort.is_set():
-                get_tests.terminate()
-                get_tests.join(5.0)
-                return None
-        get_tests.join()
-
-        tests = get_tests.get_tests()
-
-        # Query prior results once (used by RESUME filtering, failed-first ordering, and
-        # never-run prioritization). Read-only access; outputs are included because RESUME
-        # mode copies these records — output and all — into the new run below.
-        with PytestProcessInfoReader(self.data_dir) as db:
-            prior_results = db.query(include_output=True)  # most recent run
-            last_pass_data = db.query_last_pass()  # most recent passing run per test
-            ever_run = db.query_ever_run_names()  # names of tests that have ever run (any PUT version)
-
-        # CHECK mode: behave like RESUME if the PUT fingerprint matches the prior run, else RESTART.
-        effective_mode = config.run_mode
-        if config.run_mode == RunMode.CHECK:
-            effective_mode = self._resolve_check_mode(prior_results, put_version_info)
+        # The background planner's plan when nothing changed since it was made; otherwise
+        # the stale parts (PUT detection and discovery, prior-run queries, ordering) are
+        # redone here.
+        plan = self.run_planner.take(config, self._run_prep_abort.is_set)
+        if plan is None:
+            return None
+        put_version_info = plan.put_version_info
+        tests = list(plan.tests)  # the plan is kept for the next run; the runner gets its own list
 
         # Clear stale coverage data before any PytestProcess starts writing into
         # coverage/. Done here (before pytest_runner.start) rather than from a periodic
         # GUI tick so we cannot delete the directory while a still-running PytestProcess
         # is mid-coverage.save().
-        if effective_mode != RunMode.RESUME:
+        # The coverage of the tests the result cache passes is kept: it is still theirs.
+        if plan.effective_mode not in CARRY_OVER_MODES:
             coverage_dir = Path(self.data_dir, "coverage")
-            if coverage_dir.exists():
+            if plan.cache_hits:
+                kept = {f"{sanitize_test_name(name)}.coverage" for name in plan.cache_hits}
+                for coverage_path in coverage_dir.glob("*"):
+                    if coverage_path.name not in kept and coverage_path.is_file():
+                        coverage_path.unlink(missing_ok=True)
+            elif coverage_dir.exists():
                 shutil.rmtree(coverage_dir, ignore_errors=True)
 
-        all_node_ids = {t.node_id for t in tests}
-        tests = self._filter_for_resume(tests, prior_results, effective_mode)
+        # The sources this run's tests execute, the baseline a later AFFECTED run diffs against.
+        try:
+            SourceSnapshots(self.data_dir).take(config.project_root)
+        except FAIL_OPEN_ERRORS as e:
+            log.warning(f"source snapshot failed, a later AFFECTED run will rerun more tests: {e}")
 
-        # In RESUME mode (or CHECK-as-RESUME), copy the complete prior-run records for
+        # In RESUME or AFFECTED mode (or CHECK-as-RESUME), copy the complete prior-run records for
         # previously-passed tests into the current run so they appear in all GUI tabs
         # (table, graph, status) with their original data (runtime, CPU, memory, output, etc.).
         # The copies retain their genuine historical timestamps so query_last_pass — and thus
         # the table's "Last Pass Start" column — reports real wall-clock times.  The Progress
         # Graph, which uses current_run_start as its time-axis origin, shifts these carried-over
         # records onto the current timeline at render time (see build_tick_data); the DB is left
-        # truthful rather than rewritten with synthetic timestamps.
-        if effective_mode == RunMode.RESUME:
-            skipped_node_ids = all_node_ids - {t.node_id for t in tests}
-            if skipped_node_ids:
-                prior_by_name: dict[str, list] = {}
-                for r in prior_results:
-                    prior_by_name.setdefault(r.name, []).append(r)
-                records_to_copy = [rec for nid in sorted(skipped_node_ids) for rec in prior_by_name.get(nid, [])]
-                if records_to_copy:
-                    with PytestProcessInfoDB(self.data_dir) as db:
-                        for record in records_to_copy:
-                            db.write(replace(record, run_guid=config.run_guid))
-
-        # Use last-pass durations for ETA estimation (from the most recent passing run)
-        prior_durations = {name: duration for name, (_unused_start, duration) in last_pass_data.items()}
-
-        # Apply the user's ordered list of ordering aspects (see Configuration tab).
-        # Prior-run data still informs execution *order* even in RESTART mode — RESTART only
-        # means "rerun every test," not "forget the durations/failures we know about."
-        per_test_cov: dict[str, float] = {}
-        if OrderingAspect.COVERAGE_EFFICIENCY in config.enabled_aspects:
-            per_test_cov = compute_per_test_coverage(self.data_dir, [t.node_id for t in tests])
-            # Coverage-efficiency reads duration/coverage off the ScheduledTest
-            # itself, so rebuild the list with those fields populated.
-            tests = [
-                ScheduledTest(
-                    node_id=t.node_id,
-                    singleton=t.singleton,
-                    duration=prior_durations.get(t.node_id),
-                    coverage=per_test_cov.get(t.node_id),
-                )
-                for t in tests
-            ]
-
-        failed_names: set[str] = set()
-        if prior_results:
-            passed = {r.name for r in prior_results if r.exit_code == PyTestFlyExitCode.OK}
-            failed_names = {r.name for r in prior_results} - passed
-
-        ctx = OrderingContext(
-            failed_names=failed_names,
-            ever_run_names=ever_run,
-            prior_durations=prior_durations,
-            per_test_coverage=per_test_cov,
-        )
-        tests = apply_ordering_aspects(tests, config.enabled_aspects, ctx)
+        # truthful rather than rewritten with synthetic timestamps.  The copy is one
+        # INSERT ... SELECT whose rows reference the prior run's stored outputs, so it costs the
+        # same however large those outputs are.
+        if plan.carried_over and plan.prior_run_guid is not None:
+            with PytestProcessInfoDB(self.data_dir) as db:
+                db.copy_run_records(plan.prior_run_guid, config.run_guid, plan.carried_over)
+
+        # Result cache hits are carried over the same way, each from the run of its last pass;
+        # a pass published to the result store by another machine is written as a passing record.
+        put_label = put_version_info.short_label() if put_version_info else ""
+        put_fp = put_version_info.fingerprint() if put_version_info else ""
+        if plan.cache_hits:
+            with PytestProcessInfoDB(self.data_dir) as db:
+                carry_over_hits(db, config.run_guid, plan.cache_hits, put_label, put_fp)
+            considered = len(plan.cache_hits) + len(tests)
+            saved = sum(hit.duration for hit in plan.cache_hits.values())
+            log.info(f"result cache: {len(plan.cache_hits)} of {considered} tests passed unchanged ({len(plan.cache_hits) / considered:.1%}), saving {saved:.1f} s of test time")
 
         if self._run_prep_abort.is_set():
             return None
 
-        put_label = put_version_info.short_label() if put_version_info else ""
-        put_fp = put_version_info.fingerprint() if put_version_info else ""
         runner = PytestRunner(
             config.run_guid,
             tests,
@@ -472,6 +548,9 @@ class ControlWindow(QGroupBox):
             gate_config=config.gate_config,
             stall_config=config.stall_config,
             resource_guard_config=config.resource_guard_config,
+            execution_config=config.execution_config,
+            scheduler_config=config.scheduler_config,
+            retention_config=config.retention_config,
         )
         runner.start()
 
@@ -483,10 +562,11 @@ class ControlWindow(QGroupBox):
 
         return _RunPrepResult(
             runner=runner,
-            prior_durations=prior_durations,
+            prior_durations=dict(plan.prior_durations),
             num_processes=config.processes,
             singleton_names={t.node_id for t in tests if t.singleton},
             put_version_info=put_version_info,
+            cache_hits={name: hit.duration for name, hit in plan.cache_hits.items()},
         )
 
     def _on_run_prep_finished(self, result: "_RunPrepResult | None") -> None:
@@ -504,6 +584,7 @@ class ControlWindow(QGroupBox):
         self.num_processes = result.num_processes
         self.singleton_names = result.singleton_names
         self.put_version_info = result.put_version_info
+        self.cache_hits = result.cache_hits
 
         self.run_button.setEnabled(False)
         self.stop_button.setEnabled(True)
@@ -512,52 +593,18 @@ class ControlWindow(QGroupBox):
         self._update_stop_button_label()
 
     def _filter_for_resume(self, tests, prior_results, effective_mode):
-        """Filter out already-passed tests when running in RESUME mode.
-
-        :param tests: List of scheduled tests.
-        :param prior_results: List of prior PytestProcessInfo records.
-        :param effective_mode: The resolved RunMode (CHECK has already been collapsed
-            to RESUME or RESTART by :meth:`_resolve_check_mode`).
-        :return: Filtered list of tests.
-        """
-        original_count = len(tests)
-        if effective_mode == RunMode.RESUME:
-            passed = {r.name for r in prior_results if r.exit_code == PyTestFlyExitCode.OK}
-            tests = [t for t in tests if t.node_id not in passed]
-            log.info(f"RESUME filter: {original_count} discovered, {len(passed)} passed in prior run, {len(tests)} to re-run")
-        else:
-            log.info(f"run_mode={effective_mode!r} (not RESUME), skipping filter — all {original_count} tests will run")
-        return tests
+        """Filter out already-passed tests when running in RESUME mode (see :func:`filter_for_resume`)."""
+        return filter_for_resume(tests, prior_results, effective_mode)
 
     def _resolve_check_mode(self, prior_results, put_version_info: PutVersionInfo | None = None) -> RunMode:
-        """Collapse :attr:`RunMode.CHECK` into either RESUME or RESTART based on the PUT fingerprint.
-
-        If the prior run's PUT fingerprint matches the current one, behave like RESUME;
-        otherwise restart.  A dirty working tree always changes the fingerprint (because
-        :meth:`PutVersionInfo.fingerprint` incorporates ``git_dirty``) so developers
-        iterating on code get fresh runs.
+        """Collapse :attr:`RunMode.CHECK` into either RESUME or RESTART (see :func:`resolve_check_mode`).
 
         :param prior_results: Records from the most recent prior run, or an empty list.
         :param put_version_info: PUT metadata for the run being prepared; ``None`` falls back
             to :attr:`put_version_info` (the last adopted run's).
         :return: Either :attr:`RunMode.RESUME` or :attr:`RunMode.RESTART`.
         """
-        if put_version_info is None:
-            put_version_info = self.put_version_info
-        current_fp = put_version_info.fingerprint() if put_version_info else ""
-        prior_fp = None
-        for record in prior_results:
-            if record.put_fingerprint:
-                prior_fp = record.put_fingerprint
-                break
-        if prior_fp is None:
-            log.info("CHECK: no prior PUT fingerprint recorded, restarting")
-            return RunMode.RESTART
-        if prior_fp != current_fp:
-            log.info(f"CHECK: PUT fingerprint changed ({prior_fp!r} -> {current_fp!r}), restarting")
-            return RunMode.RESTART
-        log.info(f"CHECK: PUT fingerprint unchanged ({current_fp!r}), resuming")
-        return RunMode.RESUME
+        return resolve_check_mode(prior_results, put_version_info if put_version_info is not None else self.put_version_info)
 
     def _on_stop_clicked(self):
         """Stop-button dispatcher — request a soft stop, or cancel the pending one."""
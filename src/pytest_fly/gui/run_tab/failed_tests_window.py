@@ -51,6 +51,8 @@ class FailedTestsWindow(QGroupBox):
 
     def update_tick(self, tick: TickData):
         """Rebuild the failed test list from pre-computed tick data, preserving selection by name."""
+        if tick.changed_names is not None and not tick.changed_names:
+            return  # no test changed state since the previous tick
         failed_names = [test_name for test_name, run_state in tick.run_states.items() if run_state.get_state() in _FAILED_STATES]
 
         if failed_names == self._failed_names:
@@ -7,7 +7,6 @@ from PySide6.QtGui import QFontDatabase
 from PySide6.QtWidgets import QCheckBox, QComboBox, QGroupBox, QHBoxLayout, QLabel, QPlainTextEdit, QProgressBar, QSizePolicy, QVBoxLayout
 from typeguard import typechecked
 
-from ...interfaces import PytestRunnerState
 from ...pytest_runner.live_output import read_live_output
 from ...tick_data import TickData
 from ..gui_util import first_start_timestamp, format_runtime, resolve_test_output
@@ -132,7 +131,7 @@ class LiveOutputWindow(QGroupBox):
             self._render_pinned()
             return
 
-        running_names = [name for name, run_state in tick.run_states.items() if run_state.get_state() == PytestRunnerState.RUNNING]
+        running_names = tick.get_running_names()
 
         if running_names != self._running_names or self._force_selector_rebuild:
             self._force_selector_rebuild = False
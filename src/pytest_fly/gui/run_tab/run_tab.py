@@ -79,3 +79,5 @@ class RunTab(QWidget):
         self.system_metrics_window.update_tick(tick)
         self.control_window.reconcile_process_count()
         self.control_window.refresh_button_state(tick.user_complete)
+        self.control_window.update_run_planner()
+        self.control_window.update_watch()
@@ -6,7 +6,7 @@ from PySide6.QtWidgets import QGroupBox, QLabel, QProgressBar, QSizePolicy, QVBo
 
 from ...interfaces import PytestRunnerState
 from ...tick_data import TickData
-from ..gui_util import PlainTextWidget, count_test_states, first_start_timestamp, format_runtime, get_font, set_banner
+from ..gui_util import PlainTextWidget, first_start_timestamp, format_runtime, get_font, set_banner
 
 
 def _put_header_lines(tick: TickData) -> list[str]:
@@ -62,7 +62,7 @@ class StatusWindow(QGroupBox):
         :param tick: Pre-computed data for this refresh cycle.
         """
 
-        counts = count_test_states(tick.run_states)
+        counts = tick.get_state_counts()
 
         min_time_stamp = tick.min_time_stamp_started
         max_time_stamp = tick.max_time_stamp_started
@@ -101,9 +101,15 @@ class StatusWindow(QGroupBox):
             else:
                 self.pass_rate_label.setStyleSheet("")
 
+            # Result cache hits are passes too, but listed apart from the tests that actually ran and passed.
+            cached_count = sum(1 for name in tick.cache_hits if name in tick.run_states and tick.run_states[name].get_state() == PytestRunnerState.PASS)
             for state in [PytestRunnerState.PASS, PytestRunnerState.FAIL, PytestRunnerState.QUEUED, PytestRunnerState.RUNNING, PytestRunnerState.TERMINATED, PytestRunnerState.STOPPED]:
-                count = counts[state]
+                count = counts[state] - (cached_count if state == PytestRunnerState.PASS else 0)
                 lines.append(f"{state}: {count} ({count / total_tests:.2%})")
+                if state == PytestRunnerState.PASS and tick.cache_hits:
+                    lines.append(f"Cached: {cached_count} ({cached_count / total_tests:.2%})")
+            if tick.cache_hits:
+                lines.append(f"Cache hit rate: {cached_count}/{total_tests} ({cached_count / total_tests:.2%}), saved {format_runtime(sum(tick.cache_hits.values()))}")
 
             # add total time so far to status
             if min_time_stamp is not None and max_time_stamp is not None:
@@ -201,9 +207,7 @@ class StatusWindow(QGroupBox):
         now = time.time()
         max_remaining = 0.0
         any_estimated = False
-        for test_name, run_state in tick.run_states.items():
-            if run_state.get_state() != PytestRunnerState.RUNNING:
-                continue
+        for test_name in tick.get_running_names():
             prior = tick.prior_durations.get(test_name)
             if prior is None or prior <= 0.0:
                 continue
@@ -221,6 +225,8 @@ class StatusWindow(QGroupBox):
         :param tick: Pre-computed data for this refresh cycle.
         :return: Estimated remaining seconds of CPU work.
         """
+        if (precomputed := tick.get_remaining_work_seconds()) is not None:
+            return precomputed  # kept as a running sum by TickDataBuilder
         remaining_seconds = 0.0
         now = time.time()
         for test_name, run_state in tick.run_states.items():
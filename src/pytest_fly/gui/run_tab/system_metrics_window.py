@@ -317,7 +317,7 @@ class SystemMetricsWindow(QGroupBox):
         run is active and stall detection is enabled. When there is no watchdog data the sample is
         simply ``idle == 0`` and not stalled.
         """
-        running = sum(1 for rs in tick.run_states.values() if rs.get_state() == PytestRunnerState.RUNNING)
+        running = tick.get_state_counts()[PytestRunnerState.RUNNING]
         stall_info = tick.stall_info
         idle = len(getattr(stall_info, "idle_pids", []) or []) if stall_info is not None else 0
         stalled = bool(getattr(stall_info, "stalled", False)) if stall_info is not None else False
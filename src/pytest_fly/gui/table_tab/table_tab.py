@@ -4,6 +4,7 @@ coverage, and last-pass information.
 """
 
 import time
+from collections.abc import Iterable
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
@@ -97,6 +98,7 @@ class TableTab(QGroupBox):
         self._current_run_states: dict = {}
         self._current_infos_by_name: dict = {}  # test node_id -> list[PytestProcessInfo]; source for full (untruncated) copy-to-clipboard
         self._row_by_name: dict[str, int] = {}  # test_name -> row index, for in-place updates
+        self._row_inputs: tuple | None = None  # the previous tick's inputs shared by every row; see _names_to_refresh
         self._sort_column: int | None = None
         self._sort_order: Qt.SortOrder = Qt.SortOrder.AscendingOrder
 
@@ -172,6 +174,22 @@ class TableTab(QGroupBox):
                     selected_text.append(",".join(row_data))
             clipboard.setText("\n".join(selected_text))
 
+    def _names_to_refresh(self, tick: TickData, row_inputs: tuple) -> Iterable[str]:
+        """Tests whose rows this tick must visit: every test, or just the changed and running ones.
+
+        Every row is visited on the builder's first tick or a rebuild, when new tests appear
+        (rows are appended in display order), after the rows were cleared, and when an input
+        shared by all rows changed (coverage, last-pass data, singletons, display prefs).
+        """
+        same_inputs = self._row_inputs is not None and all(new is old or new == old for new, old in zip(row_inputs, self._row_inputs))
+        self._row_inputs = row_inputs
+        if tick.changed_names is None or not same_inputs or len(self._row_by_name) != len(tick.infos_by_name):
+            return tick.infos_by_name
+        names = tick.changed_names.union(tick.get_running_names())
+        if any(name not in self._row_by_name for name in names):
+            return tick.infos_by_name
+        return names
+
     def reset(self):
         """Clear all table rows."""
         self.table_widget.setRowCount(0)
@@ -252,7 +270,9 @@ class TableTab(QGroupBox):
         ``_row_by_name``. Only cells whose text or tooltip actually changed
         are rewritten; ``resizeColumnsToContents()`` runs only when new rows
         are appended. If the set of tests shrinks (e.g., after a reset) the
-        table is fully rebuilt.
+        table is fully rebuilt.  Between full passes only the rows of tests
+        whose records changed (:attr:`TickData.changed_names`) and of running
+        tests (live runtime and output) are visited.
         """
 
         self._current_run_states = tick.run_states
@@ -272,13 +292,16 @@ class TableTab(QGroupBox):
         new_rows_added = False
         sort_column = self._sort_column
         sort_dirty = False
+        row_inputs = (tick.per_test_coverage, tick.last_pass_data, tick.singleton_names, utilization_high_threshold, utilization_low_threshold, tooltip_line_limit)
+        names_to_refresh = self._names_to_refresh(tick, row_inputs)
 
         self.table_widget.setUpdatesEnabled(False)
         try:
             if self.table_widget.rowCount() < len(tick.infos_by_name):
                 self.table_widget.setRowCount(len(tick.infos_by_name))
 
-            for test_name, process_infos in tick.infos_by_name.items():
+            for test_name in names_to_refresh:
+                process_infos = tick.infos_by_name[test_name]
                 row_number = self._row_by_name.get(test_name)
                 if row_number is None:
                     row_number = len(self._row_by_name)
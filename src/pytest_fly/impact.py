@@ -0,0 +1,342 @@
+"""
+Coverage-based test impact analysis — the tests an edit can affect, for :attr:`RunMode.AFFECTED`.
+
+Every run starts by snapshotting the project's Python sources (:meth:`SourceSnapshots.take`):
+a manifest of each file's size, modification time and content digest.  The content itself is
+stored once per digest (compressed), so later runs can diff against it.  Each test's per-test
+``.coverage`` file (``data_dir/coverage/<safe>.coverage``) records the lines it executed; the
+snapshot it ran against is the last one taken before that file was written.
+
+:class:`ImpactIndex` turns the coverage files into a reverse index — source file → the tests
+that executed it, with the lines each executed — reloading only coverage files that changed.
+:meth:`ImpactIndex.select_affected` diffs every executed source file against each test's
+snapshot and selects a test when:
+
+- a line it executed changed (inserting lines between two lines changes both of them);
+- a top-level line of a file it executed changed — imports, definitions and constants run at
+  import time, which the fork server keeps out of the per-test coverage;
+- a file it executed changed while its run was in progress (the executed line numbers may
+  belong to either version), or was deleted;
+- a file it executed outside the snapshot (e.g. an installed dependency) was modified after
+  its run started.
+
+Inputs other than Python source (data files, the environment) are not tracked.  Kept free of
+Qt so it can be tested headless.
+"""
+
+import difflib
+import hashlib
+import json
+import os
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+from coverage import CoverageData
+from typeguard import typechecked
+
+from .file_util import iter_project_files, sanitize_test_name, write_atomically
+from .logger import get_logger
+from .pytest_runner.coverage import COVERAGE_READ_ERRORS
+
+log = get_logger()
+
+_IMPACT_DIR_NAME = "impact"
+
+
+@dataclass(frozen=True)
+class FileState:
+    """A source file's size, modification time and content digest when a snapshot was taken."""
+
+    size: int
+    mtime_ns: int
+    digest: str
+
+
+@dataclass(frozen=True)
+class SourceSnapshot:
+    """The project's Python sources as a run started."""
+
+    taken_ns: int  # time.time_ns() when the snapshot was taken
+    files: dict[str, FileState]  # real path -> state (coverage records real paths)
+
+
+@dataclass(frozen=True)
+class TestCoverage:
+    """What one test executed in its most recent run."""
+
+    written_ns: int  # when its coverage file was written, i.e. when its run ended
+    lines: dict[str, frozenset[int]]  # source file -> executed lines
+
+
+@dataclass(frozen=True)
+class _Change:
+    everything: bool  # a top-level line changed, or the old version is not available
+    lines: frozenset[int]  # the old version's changed lines
+
+
+_UNCHANGED = _Change(False, frozenset())
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+@typechecked()
+def changed_lines(old: list[str], new: list[str]) -> tuple[frozenset[int], bool]:
+    """The lines of *old* (1-based) that an edit to *new* touched, and whether it touched top-level code.
+
+    A replaced or deleted line is touched; an insertion touches the lines on either side of it.
+    Top-level code is a non-blank, unindented line that is not a comment, on either side of the edit.
+
+    :param old: The previous version's lines.
+    :param new: The current version's lines.
+    :return: ``(touched old lines, touched top-level code)``.
+    """
+    touched: set[int] = set()
+    top_level = False
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, old, new, autojunk=False).get_opcodes():
+        if tag == "equal":
+            continue
+        if tag == "insert":
+            touched.update((i1, i1 + 1))  # old lines i1 and i1 + 1 (1-based) surround the insertion
+        else:
+            touched.update(range(i1 + 1, i2 + 1))
+        top_level = top_level or any(line.strip() and not line[0].isspace() and not line.startswith("#") for line in (*old[i1:i2], *new[j1:j2]))
+    return frozenset(touched), top_level
+
+
+class SourceSnapshots:
+    """The source snapshots taken as runs started, in ``data_dir/impact``.
+
+    :param data_dir: Directory holding the results database and the per-test coverage data.
+    """
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = data_dir
+        self._snapshot_dir = Path(data_dir, _IMPACT_DIR_NAME, "snapshots")
+        self._source_dir = Path(data_dir, _IMPACT_DIR_NAME, "sources")
+        self._loaded: dict[int, SourceSnapshot] = {}
+
+    def taken(self) -> list[int]:
+        """When each stored snapshot was taken (``time.time_ns()``), oldest first."""
+        try:
+            return sorted(int(path.stem) for path in self._snapshot_dir.glob("*.json") if path.stem.isdigit())
+        except OSError:
+            return []
+
+    def load(self, taken_ns: int) -> SourceSnapshot | None:
+        """The snapshot taken at *taken_ns*, or ``None`` if it is gone or unreadable."""
+        if (snapshot := self._loaded.get(taken_ns)) is None:
+            try:
+                files = json.loads(Path(self._snapshot_dir, f"{taken_ns}.json").read_text(encoding="utf-8"))
+                snapshot = SourceSnapshot(taken_ns, {path: FileState(*state) for path, state in files.items()})
+            except (OSError, ValueError, TypeError) as e:
+                log.info(f"source snapshot {taken_ns} unusable: {e}")
+                return None
+            self._loaded[taken_ns] = snapshot
+        return snapshot
+
+    def baseline(self, time_ns: int, taken: list[int] | None = None) -> SourceSnapshot | None:
+        """The snapshot a test whose run ended at *time_ns* ran against: the last one taken before then.
+
+        :param time_ns: When the test's run ended (its coverage file's modification time).
+        :param taken: :meth:`taken`, when the caller already listed it.
+        """
+        earlier = [taken_ns for taken_ns in (self.taken() if taken is None else taken) if taken_ns <= time_ns]
+        return self.load(earlier[-1]) if earlier else None
+
+    def source(self, digest: str) -> list[str] | None:
+        """The lines of the stored content with *digest*, or ``None`` if it is not stored."""
+        try:
+            return zlib.decompress(Path(self._source_dir, digest).read_bytes()).decode("utf-8", errors="replace").splitlines()
+        except (OSError, zlib.error):
+            return None
+
+    @typechecked()
+    def take(self, project_root: Path) -> SourceSnapshot:
+        """Snapshot the Python sources under *project_root* — call as a run starts, before any of its tests.
+
+        Files unchanged since the previous snapshot (same size and modification time) are not
+        read again, and only content not stored yet is written.  Snapshots no longer needed as
+        a baseline, and the content only they referenced, are deleted.
+
+        :param project_root: The program under test's root directory.
+        :return: The new snapshot.
+        """
+        start = time.monotonic()
+        taken_ns = time.time_ns()
+        taken = self.taken()
+        previous = self.load(taken[-1]) if taken else None
+        files = {}
+        stored = 0
+        for entry in iter_project_files(Path(os.path.realpath(project_root)), {".py"}):
+            try:
+                stat = entry.stat()
+                known = previous.files.get(entry.path) if previous is not None else None
+                if known is not None and (known.size, known.mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+                    files[entry.path] = known
+                    continue
+                data = Path(entry.path).read_bytes()
+                state = FileState(stat.st_size, stat.st_mtime_ns, _digest(data))
+                if not Path(self._source_dir, state.digest).exists():
+                    write_atomically(Path(self._source_dir, state.digest), zlib.compress(data))
+                    stored += 1
+            except OSError:
+                continue  # removed while walking
+            files[entry.path] = state
+        write_atomically(Path(self._snapshot_dir, f"{taken_ns}.json"), json.dumps({path: [s.size, s.mtime_ns, s.digest] for path, s in files.items()}).encode())
+        snapshot = SourceSnapshot(taken_ns, files)
+        self._loaded[taken_ns] = snapshot
+        self._prune()
+        log.info(f"source snapshot: {len(files)} files, {stored} stored ({time.monotonic() - start:.2f} s)")
+        return snapshot
+
+    def _prune(self) -> None:
+        """Delete the snapshots no coverage file needs as its baseline (except the newest), and unreferenced content."""
+        taken = self.taken()
+        keep = set(taken[-1:])
+        coverage_dir = Path(self.data_dir, "coverage")
+        if coverage_dir.is_dir():
+            for coverage_path in coverage_dir.glob("*.coverage"):
+                try:
+                    written_ns = coverage_path.stat().st_mtime_ns
+                except OSError:
+                    continue
+                earlier = [taken_ns for taken_ns in taken if taken_ns <= written_ns]
+                if earlier:
+                    keep.add(earlier[-1])
+        referenced: set[str] = set()
+        for taken_ns in taken:
+            if taken_ns in keep and (snapshot := self.load(taken_ns)) is not None:
+                referenced.update(state.digest for state in snapshot.files.values())
+            elif taken_ns not in keep:
+                Path(self._snapshot_dir, f"{taken_ns}.json").unlink(missing_ok=True)
+                self._loaded.pop(taken_ns, None)
+        if len(keep) < len(taken):
+            for source_path in self._source_dir.iterdir():
+                if source_path.name not in referenced and not source_path.name.endswith(".tmp"):
+                    source_path.unlink(missing_ok=True)
+
+
+class ImpactIndex:
+    """Reverse index from source files to the tests that executed them, for selecting the tests an edit affects.
+
+    Kept across plans: a coverage file is only read again when it changed.
+
+    :param data_dir: Directory holding the per-test coverage data and the source snapshots.
+    """
+
+    def __init__(self, data_dir: Path):
+        self.coverage_dir = Path(data_dir, "coverage")
+        self.snapshots = SourceSnapshots(data_dir)
+        self._coverage: dict[str, tuple[tuple[int, int], TestCoverage]] = {}  # test -> ((mtime_ns, size) of its file, coverage)
+        self._external: list[str] = []  # executed files outside the snapshots, as of the last selection
+
+    def coverage(self, test_names: list[str]) -> dict[str, TestCoverage]:
+        """What each of *test_names* executed in its most recent run (tests without a readable coverage file are omitted)."""
+        result = {}
+        for name in test_names:
+            path = Path(self.coverage_dir, f"{sanitize_test_name(name)}.coverage")
+            try:
+                stat = path.stat()
+            except OSError:
+                self._coverage.pop(name, None)
+                continue
+            file_key = (stat.st_mtime_ns, stat.st_size)
+            cached = self._coverage.get(name)
+            if cached is None or cached[0] != file_key:
+                try:
+                    data = CoverageData(basename=str(path))
+                    data.read()
+                    lines = {source: frozenset(data.lines(source) or ()) for source in data.measured_files()}
+                except COVERAGE_READ_ERRORS as e:
+                    log.info(f"coverage of {name} unreadable: {e}")
+                    continue
+                cached = (file_key, TestCoverage(stat.st_mtime_ns, lines))
+                self._coverage[name] = cached
+            result[name] = cached[1]
+        return result
+
+    def external_stamp(self) -> tuple:
+        """The modification times of the executed files outside the snapshots (seen by the last selection).
+
+        Edits inside the project change the planner's tree signature; this catches the rest
+        (e.g. an upgraded dependency).
+        """
+        stamp = []
+        for path in self._external:
+            try:
+                stamp.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    @typechecked()
+    def select_affected(self, candidates: list[str]) -> set[str]:
+        """The tests among *candidates* that the changes since their last run can affect.
+
+        A test without coverage data, or without a snapshot older than its coverage data, is
+        always selected: there is nothing to show it unaffected.
+
+        :param candidates: Tests that passed in their most recent run.
+        :return: The candidates to run again.
+        """
+        coverage = self.coverage(candidates)
+        affected = {name for name in candidates if name not in coverage}
+        taken = self.snapshots.taken()
+        baselines: dict[str, SourceSnapshot] = {}
+        for name, test_coverage in coverage.items():
+            if (baseline := self.snapshots.baseline(test_coverage.written_ns, taken)) is None:
+                affected.add(name)
+            else:
+                baselines[name] = baseline
+
+        executed_by: dict[str, list[tuple[str, frozenset[int]]]] = {}  # source file -> (test, executed lines)
+        for name in baselines:
+            for source, lines in coverage[name].lines.items():
+                executed_by.setdefault(source, []).append((name, lines))
+
+        external = []
+        for source, executions in executed_by.items():
+            try:
+                current = os.stat(source)
+            except OSError:
+                current = None
+            changes: dict[int, _Change] = {}  # snapshot -> the change since it
+            for name, lines in executions:
+                if name in affected:
+                    continue
+                baseline = baselines[name]
+                known = baseline.files.get(source)
+                if current is None:
+                    affected.add(name)  # deleted
+                elif known is None:
+                    external.append(source)
+                    if current.st_mtime_ns > baseline.taken_ns:
+                        affected.add(name)
+                elif (current.st_size, current.st_mtime_ns) != (known.size, known.mtime_ns):
+                    if baseline.taken_ns not in changes:
+                        changes[baseline.taken_ns] = self._change(source, known)
+                    change = changes[baseline.taken_ns]
+                    if change is _UNCHANGED:
+                        continue
+                    if change.everything or current.st_mtime_ns <= coverage[name].written_ns or not change.lines.isdisjoint(lines):
+                        affected.add(name)  # (a change no later than the test's run ended may have happened while it ran)
+        self._external = sorted(set(external))
+        return affected
+
+    def _change(self, source: str, known: FileState) -> _Change:
+        """How *source* changed since it was in state *known*."""
+        try:
+            data = Path(source).read_bytes()
+        except OSError:
+            return _Change(True, frozenset())
+        if _digest(data) == known.digest:
+            return _UNCHANGED  # touched, not changed
+        old = self.snapshots.source(known.digest)
+        if old is None:
+            return _Change(True, frozenset())
+        lines, top_level = changed_lines(old, data.decode("utf-8", errors="replace").splitlines())
+        return _Change(top_level, lines)
@@ -2,8 +2,9 @@
 Core data structures and enumerations shared across the application.
 
 Defines the fundamental types used by the runner, database, and GUI layers:
-:class:`ScheduledTest`, :class:`PytestProcessInfo`, :class:`PytestRunnerState`,
-:class:`RunMode`, :class:`OrderingAspect`, and :class:`PyTestFlyExitCode`.
+:class:`ScheduledTest`, :class:`ScheduledBatch`, :class:`PytestProcessInfo`, :class:`PytestRunnerState`,
+:class:`RunMode`, :class:`ExecutionMode`, :class:`SchedulingGranularity`, :class:`OrderingAspect`,
+and :class:`PyTestFlyExitCode`.
 """
 
 import time
@@ -39,6 +40,7 @@ class ScheduledTest:
     singleton: bool  # True if the test is a singleton
     duration: float | None  # duration of the most recent passing run (seconds)
     coverage: float | None  # coverage of the most recent run, between 0.0 and 1.0 (1.0 = this tests covers all the code)
+    peak_commit: int | None = None  # peak commit charge of the test's process subtree in its most recent measured run (bytes)
 
     def __eq__(self, other):
         """Return True if both tests have the same node_id."""
@@ -51,6 +53,34 @@ class ScheduledTest:
         return hash(self.node_id)
 
 
+@dataclass(frozen=True)
+class ScheduledBatch:
+    """
+    Several short, non-singleton tests dispatched together to one test process.
+
+    The batch is only a dispatch unit: each member still gets its own records, output and
+    coverage, exactly as if it had been scheduled on its own.
+    """
+
+    tests: tuple[ScheduledTest, ...]
+
+    @property
+    def node_ids(self) -> list[str]:
+        """Node ids of the member tests, in run order."""
+        return [test.node_id for test in self.tests]
+
+    @property
+    def duration(self) -> float:
+        """Predicted duration of the whole batch (sum of the members' prior durations)."""
+        return sum(test.duration or 0.0 for test in self.tests)
+
+    @property
+    def peak_commit(self) -> int | None:
+        """Predicted peak commit of the batch process (the largest member peak; members run one at a time)."""
+        peaks = [test.peak_commit for test in self.tests if test.peak_commit is not None]
+        return max(peaks) if peaks else None
+
+
 class OrderingAspect(StrEnum):
     """An aspect that contributes to the execution order of scheduled tests.
 
@@ -70,6 +100,23 @@ class RunMode(IntEnum):
     RESTART = 0  # rerun all tests
     RESUME = 1  # resume test run, and run tests that either failed or were not run
     CHECK = 2  # resume if program under test has not changed, otherwise restart
+    AFFECTED = 3  # resume, and also rerun the passed tests whose covered code changed since (see pytest_fly.impact)
+
+
+class ExecutionMode(IntEnum):
+    """How each test's :class:`PytestProcess` is started."""
+
+    SPAWN = 0  # a brand-new interpreter per test (the default; works on every platform)
+    FORKSERVER = 1  # fork each test from a warm template process with pytest, coverage and PUT modules preloaded (POSIX only)
+    SESSION_REUSE = 2  # a long-lived process per worker runs many modules back-to-back in one pytest session
+
+
+class SchedulingGranularity(IntEnum):
+    """The unit of parallelism — what one scheduled test (one node id) covers."""
+
+    MODULE = 0  # a whole test module (``tests/test_a.py``) — the default
+    CLASS = 1  # a test class (``tests/test_a.py::TestA``); functions outside any class are scheduled individually
+    FUNCTION = 2  # a test function (``tests/test_a.py::test_a``), with all of its parametrizations
 
 
 class PytestRunnerState(StrEnum):
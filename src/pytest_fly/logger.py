@@ -44,8 +44,8 @@ def _resolve_log_directory() -> Path:
 def _purge_process_monitor_logs(log_dir: Path) -> None:
     """Delete stale ``process_monitor-<pid>.log`` files left by prior runs.
 
-    One of these is created per monitored PID (:meth:`ProcessMonitor.run`), but the
-    monitor itself logs almost nothing, so they accumulate as thousands of orphaned
+    Older versions created one of these per monitored PID (a monitor process per test),
+    but the monitor logged almost nothing, so they accumulate as thousands of orphaned
     near-empty files that slow every directory scan.  They are per-run ephemeral debug
     files, so a fresh parent launch can clear them.  Files still held open by a
     concurrently running instance raise on unlink and are skipped.
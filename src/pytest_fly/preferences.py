@@ -14,7 +14,7 @@ from attr import attrib, attrs
 from pref import Pref, PrefOrderedSet
 
 from .__version__ import application_name, author
-from .interfaces import OrderingAspect, RunMode
+from .interfaces import ExecutionMode, OrderingAspect, RunMode, SchedulingGranularity
 from .paths import get_preferences_db_path, get_workspace_dir, preferences_file_name
 from .platform import get_performance_core_count
 
@@ -58,10 +58,33 @@ commit_gate_enabled_default = False  # opt-in: throttle dispatch on system commi
 commit_gate_threshold_default = 0.90  # defer dispatch while system commit charge exceeds this fraction of the limit
 cpu_gate_enabled_default = False  # opt-in: throttle dispatch on system-wide CPU utilization
 cpu_gate_threshold_default = 0.90  # defer dispatch while system CPU utilization exceeds this fraction (0.0-1.0)
+memory_budget_gate_enabled_default = False  # opt-in: admit a test only if its historical peak commit fits the memory budget
+memory_budget_gb_default = 0.0  # predictive memory admission budget in GB (0 = total physical RAM)
 resource_guard_enabled_default = False  # opt-in: automatically soft-stop the run when the system is low on resources
 resource_guard_min_free_disk_gb_default = 10.0  # soft-stop when free disk space on the data-dir drive drops below this many GB (0 disables the disk check)
 resource_guard_commit_threshold_default = 0.95  # soft-stop when system commit charge exceeds this fraction of the commit limit
 
+# Execution mode (how each test's process is started).
+execution_mode_default = ExecutionMode.SPAWN  # a fresh interpreter per test
+forkserver_preload_modules_default = ""  # comma-separated PUT modules the forkserver template imports up front
+session_max_modules_default = 50  # recycle a session-reuse worker after this many modules (0 = no limit)
+session_max_rss_growth_mb_default = 1024  # recycle a session-reuse worker after this much RSS growth in MB (0 = no limit)
+scheduling_granularity_default = SchedulingGranularity.MODULE  # the unit of parallelism: whole modules
+auto_split_critical_modules_default = False  # opt-in: split modules longer than the per-worker share into class/function shards
+critical_path_scheduling_default = False  # opt-in: pick the longest predicted test at dispatch time (else FIFO in ordering-aspect order)
+batch_short_tests_default = False  # opt-in: run consecutive short tests together in one process
+batch_target_seconds_default = 2.0  # predicted work (prior passing durations) packed into one batch
+retention_enabled_default = False  # opt-in: prune old runs from the results DB after each run
+retention_keep_runs_default = 100  # keep the most recent runs (0 = no count window)
+retention_keep_days_default = 0.0  # keep runs younger than this many days (0 = no age window)
+retention_keep_last_pass_default = True  # beyond the window, keep each test's latest passing records (preserves pass durations)
+retention_max_db_mb_default = 0.0  # prune the oldest runs while the results DB holds more than this many MB (0 = no cap)
+pre_plan_runs_default = True  # keep the next run's plan (discovered tests, ordered schedule) warm while idle
+cache_collection_default = True  # reuse the collected tests of unchanged test modules
+result_cache_default = False  # carry over the passes of tests whose inputs (module, conftest files, executed sources, environment) are unchanged
+result_cache_max_mb_default = 1024.0  # evict the least recently used results while the result store holds more than this many MB (0 = no cap)
+watch_mode_default = False  # rerun the tests a saved change affects (a new run while idle, requeued ahead during a run)
+
 
 class ParallelismControl(IntEnum):
     """How test parallelism is determined."""
@@ -128,14 +151,33 @@ class FlyPreferences(Pref):
     commit_gate_threshold: float = attrib(default=commit_gate_threshold_default)  # defer dispatch above this fraction of the commit limit
     cpu_gate_enabled: bool = attrib(default=cpu_gate_enabled_default)  # opt-in CPU-utilization admission gate
     cpu_gate_threshold: float = attrib(default=cpu_gate_threshold_default)  # defer dispatch above this fraction of system CPU utilization
+    memory_budget_gate_enabled: bool = attrib(default=memory_budget_gate_enabled_default)  # opt-in predictive memory admission
+    memory_budget_gb: float = attrib(default=memory_budget_gb_default)  # predictive memory admission budget (0 = total physical RAM)
     resource_guard_enabled: bool = attrib(default=resource_guard_enabled_default)  # opt-in automatic soft stop when the system is low on resources
     resource_guard_min_free_disk_gb: float = attrib(default=resource_guard_min_free_disk_gb_default)  # soft-stop below this many GB free on the data-dir drive (0 disables)
     resource_guard_commit_threshold: float = attrib(default=resource_guard_commit_threshold_default)  # soft-stop above this fraction of the system commit limit
 
-    run_mode: RunMode = attrib(default=RunMode.CHECK)  # RESTART=0, RESUME=1, CHECK=2 (Resume with PUT-change check — see resume_skip_put_check)
+    execution_mode: ExecutionMode = attrib(default=execution_mode_default)  # SPAWN=0, FORKSERVER=1, SESSION_REUSE=2
+    forkserver_preload_modules: str = attrib(default=forkserver_preload_modules_default)  # comma-separated PUT modules preloaded into the forkserver template
+    session_max_modules: int = attrib(default=session_max_modules_default)  # recycle a session-reuse worker after this many modules (0 = no limit)
+    session_max_rss_growth_mb: int = attrib(default=session_max_rss_growth_mb_default)  # recycle a session-reuse worker after this much RSS growth (0 = no limit)
+    scheduling_granularity: SchedulingGranularity = attrib(default=scheduling_granularity_default)  # MODULE=0, CLASS=1, FUNCTION=2
+    auto_split_critical_modules: bool = attrib(default=auto_split_critical_modules_default)  # split critical-path modules into shards at run preparation
+    critical_path_scheduling: bool = attrib(default=critical_path_scheduling_default)  # longest-predicted-first dispatch with singleton windows
+    batch_short_tests: bool = attrib(default=batch_short_tests_default)  # pack consecutive short tests into one process (not in Session Reuse mode)
+    batch_target_seconds: float = attrib(default=batch_target_seconds_default)  # predicted seconds of work per batch
+
+    run_mode: RunMode = attrib(default=RunMode.CHECK)  # RESTART=0, RESUME=1, CHECK=2 (Resume with PUT-change check — see resume_skip_put_check), AFFECTED=3
 
     resume_skip_put_check: bool = attrib(default=False)  # when True, Resume forces a resume even if the PUT has changed; when False, a PUT change triggers a Restart
 
+    pre_plan_runs: bool = attrib(default=pre_plan_runs_default)  # plan the next run in the background while idle, and start from that plan when still valid
+    cache_collection: bool = attrib(default=cache_collection_default)  # re-collect only changed test modules during discovery
+    result_cache: bool = attrib(default=result_cache_default)  # skip the tests whose inputs are unchanged since they passed (not in Restart mode)
+    result_cache_dir: str = attrib(default="")  # result store directory, may be shared by several machines (e.g. a network mount); empty means the data directory
+    result_cache_max_mb: float = attrib(default=result_cache_max_mb_default)  # result store size budget in MB (0 = no cap)
+    watch_mode: bool = attrib(default=watch_mode_default)  # watch the PUT for changes and rerun the tests they affect
+
     # True once the ordering-aspect PrefOrderedSet has been seeded with defaults.
     # Guards against re-seeding a set the user has intentionally emptied.
     ordering_aspects_seeded: bool = attrib(default=False)
@@ -161,6 +203,13 @@ class FlyPreferences(Pref):
 
     history_run_limit: int = attrib(default=history_run_limit_default)  # number of recent runs summarized in the History tab
 
+    # Results-DB retention, applied between runs (see pytest_fly.db.retention).
+    retention_enabled: bool = attrib(default=retention_enabled_default)  # opt-in pruning of old runs
+    retention_keep_runs: int = attrib(default=retention_keep_runs_default)  # keep the most recent runs (0 = no count window)
+    retention_keep_days: float = attrib(default=retention_keep_days_default)  # keep runs younger than this many days (0 = no age window)
+    retention_keep_last_pass: bool = attrib(default=retention_keep_last_pass_default)  # keep each test's latest passing records beyond the window
+    retention_max_db_mb: float = attrib(default=retention_max_db_mb_default)  # size cap in MB (0 = no cap)
+
     # Wall-clock start of the most recent run; the Progress Graph time-axis origin, restored on
     # restart so RESUME-carried records still shift onto the run timeline (0.0 = none).
     last_run_start: float = attrib(default=0.0)
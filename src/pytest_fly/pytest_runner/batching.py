@@ -0,0 +1,74 @@
+"""
+Adaptive batching of short tests into a single test process.
+
+Every scheduled test normally pays a full process start, coverage start/save and its own
+RUNNING/final DB writes.  For a module that runs in a few hundred milliseconds that overhead
+dominates.  :func:`plan_batches` packs runs of consecutive short tests (by their prior passing
+duration) into :class:`ScheduledBatch` dispatch units of up to a target amount of predicted
+work; a worker runs a batch's members back-to-back in one short-lived module-stream process
+(:mod:`.module_stream`), so each member still gets its own result record, output and coverage
+file.
+
+Only tests with a known prior duration are batched — a never-passed test's cost is unknown —
+and singletons never are.  Packing preserves the order chosen by the ordering aspects.
+"""
+
+from typeguard import typechecked
+
+from ..interfaces import ScheduledBatch, ScheduledTest
+from ..logger import get_logger
+
+log = get_logger()
+
+# A queue item: one test, or a batch of short tests run in one process.
+DispatchUnit = ScheduledTest | ScheduledBatch
+
+
+def _batchable(test: ScheduledTest, target_seconds: float) -> bool:
+    return not test.singleton and test.duration is not None and test.duration < target_seconds
+
+
+@typechecked()
+def plan_batches(tests: list[ScheduledTest], target_seconds: float) -> list[DispatchUnit]:
+    """Group consecutive short tests into batches of up to *target_seconds* predicted work.
+
+    :param tests: Scheduled tests in run order, with :attr:`ScheduledTest.duration` set from the prior passing run.
+    :param target_seconds: Predicted work per batch; ``0`` (or less) disables batching.
+    :return: Dispatch units in run order — a lone short test stays a plain :class:`ScheduledTest`.
+    """
+    if target_seconds <= 0.0:
+        return list(tests)
+
+    units: list[DispatchUnit] = []
+    pending: list[ScheduledTest] = []
+    pending_seconds = 0.0
+
+    def flush() -> None:
+        nonlocal pending_seconds
+        if len(pending) > 1:
+            units.append(ScheduledBatch(tuple(pending)))
+        else:
+            units.extend(pending)
+        pending.clear()
+        pending_seconds = 0.0
+
+    for test in tests:
+        if not _batchable(test, target_seconds):
+            flush()
+            units.append(test)
+            continue
+        if pending and pending_seconds + test.duration > target_seconds:
+            flush()
+        pending.append(test)
+        pending_seconds += test.duration
+    flush()
+
+    batches = [unit for unit in units if isinstance(unit, ScheduledBatch)]
+    if batches:
+        log.info(f"batched {sum(len(batch.tests) for batch in batches)} short tests into {len(batches)} processes (target {target_seconds:g}s)")
+    return units
+
+
+def unit_node_ids(unit: DispatchUnit) -> list[str]:
+    """Node ids of the tests in a dispatch unit."""
+    return unit.node_ids if isinstance(unit, ScheduledBatch) else [unit.node_id]
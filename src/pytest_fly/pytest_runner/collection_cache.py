@@ -0,0 +1,336 @@
+"""
+Single-pass, cached test collection for :class:`~pytest_fly.pytest_runner.test_list.GetTests`.
+
+:class:`CollectionPlugin` is registered with an in-process ``pytest --collect-only``.  It records
+every collected item together with whether it is marked ``singleton`` (read off the item's
+markers, so one pass replaces a second ``-m singleton`` collection), plus the test modules and
+directories pytest visited and the configuration that shaped the collection.
+
+:class:`CollectionCache` keeps that on disk, one file per test directory.  The next discovery
+reuses the items of every unchanged test module and re-collects only the modules that changed
+or appeared.  A module counts as changed when its size or modification time differs and its
+content hash does too.  The whole cache is dropped, and the tree collected afresh, when any of
+these change: a ``conftest.py``, pytest's configuration files, ``PYTEST_ADDOPTS``, the pytest or
+Python version, or the directory layout (a new directory pytest would recurse into).
+
+Only the test modules themselves are tracked: a test module whose items are generated from
+another file (e.g. parametrized from a data file or a helper module) is re-collected when the
+module itself changes, not when that other file does.
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pytest
+from typeguard import typechecked
+
+from ..logger import get_logger
+from .const import FAIL_OPEN_ERRORS
+
+log = get_logger()
+
+_CACHE_VERSION = 1
+SINGLETON_MARKER = "singleton"
+# Files that decide pytest's rootdir and configuration (searched in the test dir and its parents).
+_CONFIGURATION_FILE_NAMES = ("pytest.ini", ".pytest.ini", "pyproject.toml", "tox.ini", "setup.cfg", "setup.py", "conftest.py")
+# Directories pytest recurses into without ever collecting from them.
+_UNCOLLECTED_DIR_NAMES = {"__pycache__"}
+
+
+@dataclass
+class CollectedModule:
+    """A test module's collected items, and the file state they were collected from."""
+
+    size: int
+    mtime_ns: int
+    digest: str
+    items: list[tuple[str, bool]]  # (item node id, marked singleton), in collection order
+
+
+@dataclass
+class CollectedDirectory:
+    """A directory pytest recursed into: its modification time and its subdirectories then."""
+
+    mtime_ns: int
+    subdirectories: list[str]
+
+
+@dataclass
+class Collection:
+    """The result of a collection (fresh, cached or a mix of both)."""
+
+    rootdir: Path
+    inifile: Path | None
+    python_files: list[str]
+    norecursedirs: list[str]
+    modules: dict[Path, CollectedModule] = field(default_factory=dict)
+    directories: dict[Path, CollectedDirectory] = field(default_factory=dict)
+
+    def items(self) -> list[tuple[str, bool]]:
+        """Every collected item, module by module in path order."""
+        return [item for path in sorted(self.modules) for item in self.modules[path].items]
+
+
+def _file_digest(path: Path) -> str:
+    return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+
+
+def _collected_module(path: Path, items: list[tuple[str, bool]]) -> CollectedModule | None:
+    """The module's current file state with its items, or ``None`` if the file is gone."""
+    try:
+        stat = path.stat()
+        return CollectedModule(stat.st_size, stat.st_mtime_ns, _file_digest(path), items)
+    except OSError:
+        return None
+
+
+def _collected_directory(path: Path) -> CollectedDirectory | None:
+    try:
+        with os.scandir(path) as entries:
+            subdirectories = sorted(entry.name for entry in entries if entry.is_dir(follow_symlinks=False))
+        return CollectedDirectory(path.stat().st_mtime_ns, subdirectories)
+    except OSError:
+        return None
+
+
+class CollectionPlugin:
+    """In-process pytest plugin recording what ``pytest --collect-only`` collected.
+
+    :param test_dir: The directory being collected; only directories at or below it are recorded.
+    :param new_modules: Files passed to pytest explicitly although it has not collected them before.
+        pytest does not apply ``collect_ignore`` (and the like) to explicit paths, so the plugin
+        asks the ignore hooks itself and drops the items of an ignored file.
+    """
+
+    def __init__(self, test_dir: Path, new_modules: set[Path] | None = None):
+        self.test_dir = test_dir
+        self.new_modules = new_modules or set()
+        self.collection: Collection | None = None
+        self._modules: dict[Path, list[tuple[str, bool]]] = {}
+        self._directories: set[Path] = set()
+        self._module_paths: dict[str, Path] = {}  # node id -> path
+        self.failed_modules: set[Path] = set()  # modules that could not be collected (e.g. an import error)
+
+    def pytest_collectstart(self, collector: pytest.Collector) -> None:
+        if isinstance(collector, pytest.Module):
+            self._modules.setdefault(Path(collector.path), [])
+            self._module_paths[collector.nodeid] = Path(collector.path)
+        elif isinstance(collector, pytest.Directory) and Path(collector.path).is_relative_to(self.test_dir):
+            self._directories.add(Path(collector.path))
+
+    def pytest_collectreport(self, report: pytest.CollectReport) -> None:
+        if report.failed and report.nodeid in self._module_paths:
+            self.failed_modules.add(self._module_paths[report.nodeid])
+
+    def pytest_collection_finish(self, session: pytest.Session) -> None:
+        config = session.config
+        for item in session.items:
+            self._modules.setdefault(Path(item.path), []).append((item.nodeid, item.get_closest_marker(SINGLETON_MARKER) is not None))
+        collection = Collection(Path(config.rootpath), Path(config.inipath) if config.inipath else None, list(config.getini("python_files")), list(config.getini("norecursedirs")))
+        for path, items in self._modules.items():
+            if path in self.new_modules and session.gethookproxy(path).pytest_ignore_collect(collection_path=path, config=config):
+                items = []  # ignored by the project's configuration: remembered as a module without tests
+            if (module := _collected_module(path, items)) is not None:
+                collection.modules[path] = module
+        # Taken after collection, so the __pycache__ directories collection created are included.
+        for path in self._directories:
+            if (directory := _collected_directory(path)) is not None:
+                collection.directories[path] = directory
+        self.collection = collection
+
+
+@typechecked()
+def configuration_key(test_dir: Path, directories: list[Path]) -> str:
+    """A digest of everything besides the test modules themselves that shapes what pytest collects.
+
+    :param test_dir: The directory being collected.
+    :param directories: The directories pytest recursed into (their ``conftest.py`` files count).
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{_CACHE_VERSION}\0{pytest.__version__}\0{sys.version}\0{sys.executable}\0{os.environ.get('PYTEST_ADDOPTS', '')}\0{test_dir}\n".encode())
+    candidates = [Path(directory, name) for directory in (test_dir, *test_dir.parents) for name in _CONFIGURATION_FILE_NAMES]
+    candidates.extend(Path(directory, "conftest.py") for directory in sorted(directories))
+    for path in candidates:
+        try:
+            digest.update(f"{path}\0{_file_digest(path)}\n".encode())
+        except OSError:
+            continue  # not present
+    return digest.hexdigest()
+
+
+class CollectionCache:
+    """The cached collection of one test directory, in *cache_dir*.
+
+    :param cache_dir: Directory holding the cache files (created on :meth:`save`).
+    :param test_dir: The directory being collected.
+    """
+
+    def __init__(self, cache_dir: Path, test_dir: Path):
+        self.test_dir = test_dir
+        self.path = Path(cache_dir, f"{hashlib.blake2b(str(test_dir).encode(), digest_size=8).hexdigest()}.json")
+
+    def load(self) -> Collection | None:
+        """The cached collection, or ``None`` if there is none or pytest's configuration has changed since."""
+        try:
+            cached = json.loads(self.path.read_text(encoding="utf-8"))
+            if cached.get("version") != _CACHE_VERSION:
+                return None
+            collection = Collection(
+                rootdir=Path(cached["rootdir"]),
+                inifile=Path(cached["inifile"]) if cached["inifile"] else None,
+                python_files=cached["python_files"],
+                norecursedirs=cached["norecursedirs"],
+                modules={Path(path): CollectedModule(m["size"], m["mtime_ns"], m["digest"], [tuple(item) for item in m["items"]]) for path, m in cached["modules"].items()},
+                directories={Path(path): CollectedDirectory(d["mtime_ns"], d["subdirectories"]) for path, d in cached["directories"].items()},
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if cached["key"] != configuration_key(self.test_dir, list(collection.directories)):
+            log.info("collection cache: pytest configuration changed")
+            return None
+        return collection
+
+    def save(self, collection: Collection) -> None:
+        """Write *collection* atomically (a concurrent reader sees the old or the new cache, never part of one)."""
+        cached = {
+            "version": _CACHE_VERSION,
+            "key": configuration_key(self.test_dir, list(collection.directories)),
+            "rootdir": str(collection.rootdir),
+            "inifile": str(collection.inifile) if collection.inifile else None,
+            "python_files": collection.python_files,
+            "norecursedirs": collection.norecursedirs,
+            "modules": {str(path): {"size": m.size, "mtime_ns": m.mtime_ns, "digest": m.digest, "items": m.items} for path, m in collection.modules.items()},
+            "directories": {str(path): {"mtime_ns": d.mtime_ns, "subdirectories": d.subdirectories} for path, d in collection.directories.items()},
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        temp_path.write_text(json.dumps(cached), encoding="utf-8")
+        os.replace(temp_path, self.path)
+
+
+@typechecked()
+def stale_modules(collection: Collection) -> tuple[set[Path], set[Path]] | None:
+    """Bring a cached collection up to date with the file system, except for the modules to re-collect.
+
+    Unchanged modules are kept, removed ones dropped, and a module whose file was touched
+    without changing its content gets its new file state.  Directories whose listing changed
+    are rescanned for new test modules.
+
+    :param collection: The cached collection; updated in place.
+    :return: The changed modules and the new ones, both to be re-collected, or ``None`` if the tree
+        must be collected afresh (a new directory appeared, or pytest's configuration could change
+        for the files passed explicitly).
+    """
+    changed: set[Path] = set()
+    for path, module in list(collection.modules.items()):
+        try:
+            stat = path.stat()
+        except OSError:
+            del collection.modules[path]  # removed
+            continue
+        if (stat.st_size, stat.st_mtime_ns) == (module.size, module.mtime_ns):
+            continue
+        try:
+            same_content = _file_digest(path) == module.digest
+        except OSError:
+            same_content = False
+        if same_content:
+            module.size, module.mtime_ns = stat.st_size, stat.st_mtime_ns
+        else:
+            changed.add(path)
+
+    new: set[Path] = set()
+    for path, directory in list(collection.directories.items()):
+        current = _collected_directory(path)
+        if current is None:
+            del collection.directories[path]  # removed, with the modules in it
+            continue
+        if current.mtime_ns == directory.mtime_ns:
+            continue
+        for name in sorted(set(current.subdirectories) - set(directory.subdirectories)):
+            if not (name in _UNCOLLECTED_DIR_NAMES or any(fnmatch.fnmatch(name, pattern) for pattern in collection.norecursedirs) or Path(path, name, "pyvenv.cfg").exists()):
+                log.info(f'collection cache: new directory "{Path(path, name)}"')
+                return None
+        with os.scandir(path) as entries:
+            for entry in entries:
+                candidate = Path(entry.path)
+                if entry.name.endswith(".py") and candidate not in collection.modules and entry.is_file() and any(fnmatch.fnmatch(entry.name, pattern) for pattern in collection.python_files):
+                    new.add(candidate)
+        collection.directories[path] = current
+
+    if collection.inifile is None and (changed or new):
+        # Without an ini file pytest looks for one from the files passed explicitly upwards, so one
+        # between those files and the test dir (ignored when the test dir itself is collected) would
+        # change the configuration.
+        for path in changed | new:
+            for directory in path.parents:
+                if directory == collection.rootdir or not directory.is_relative_to(collection.rootdir):
+                    break
+                if any(Path(directory, name).exists() for name in ("pytest.ini", ".pytest.ini", "pyproject.toml", "tox.ini", "setup.cfg")):
+                    return None
+    return changed, new
+
+
+@typechecked()
+def collect_tests(test_dir: Path, cache_dir: Path | None) -> list[tuple[str, bool]]:
+    """Collect the test items under *test_dir* in one ``pytest --collect-only`` pass, reusing *cache_dir*'s cache.
+
+    Runs pytest in this process, so call it at most once per process (from the discovery subprocess).
+
+    :param test_dir: Directory in which to collect tests.
+    :param cache_dir: Directory holding the collection cache, or ``None`` to collect without one.
+    :return: (item node id, marked singleton) for every collected item.
+    """
+    test_dir = Path(os.path.abspath(test_dir))  # as pytest makes the paths it collects absolute
+    cache = CollectionCache(cache_dir, test_dir) if cache_dir is not None else None
+    collection = None
+    stale = None
+    if cache is not None:
+        try:
+            collection = cache.load()
+            stale = stale_modules(collection) if collection is not None else None
+        except FAIL_OPEN_ERRORS as e:
+            log.warning(f"collection cache: unusable, collecting afresh ({e})")
+
+    failed_modules: set[Path] = set()
+    if collection is None or stale is None:
+        plugin = CollectionPlugin(test_dir)
+        pytest.main(["--collect-only", "-q", str(test_dir)], plugins=[plugin])
+        collection = plugin.collection
+        failed_modules = plugin.failed_modules
+        log.info(f"collection cache: collected {len(collection.modules) if collection else 0} modules afresh")
+    elif changed_or_new := stale[0] | stale[1]:
+        # Pin the rootdir and the ini file, so the node ids and the configuration match the full collection's.
+        arguments = ["--collect-only", "-q", f"--rootdir={collection.rootdir}"]
+        if collection.inifile is not None:
+            arguments.append(f"--config-file={collection.inifile}")
+        plugin = CollectionPlugin(test_dir, stale[1])
+        pytest.main([*arguments, *(str(path) for path in sorted(changed_or_new))], plugins=[plugin])
+        failed_modules = plugin.failed_modules
+        for path in changed_or_new:
+            collection.modules.pop(path, None)
+        if plugin.collection is not None:
+            collection.modules.update((path, module) for path, module in plugin.collection.modules.items() if path in changed_or_new)
+        log.info(f"collection cache: re-collected {len(changed_or_new)} of {len(collection.modules)} modules")
+    else:
+        log.info(f"collection cache: all {len(collection.modules)} modules unchanged")
+
+    if collection is None:
+        return []  # collection did not even start (e.g. a usage error)
+    if cache is not None:
+        try:
+            if failed_modules:
+                # Whether a module imports can depend on the other modules collected with it (e.g. two
+                # test modules of the same name), so only a full collection is authoritative for them.
+                log.info(f"collection cache: not kept, {len(failed_modules)} modules failed to collect")
+                cache.path.unlink(missing_ok=True)
+            else:
+                cache.save(collection)
+        except OSError as e:
+            log.warning(f"collection cache: could not write {cache.path} ({e})")
+    return collection.items()
@@ -20,6 +20,7 @@ from dataclasses import dataclass
 import psutil
 
 from ..logger import get_logger
+from .process_table import process_table
 
 log = get_logger()
 
@@ -154,12 +155,21 @@ PSUTIL_READ_ERRORS = (psutil.NoSuchProcess, psutil.AccessDenied, ValueError)
 
 
 def subtree_processes(pid: int) -> list[psutil.Process]:
-    """Return *pid*'s process plus all its descendants; empty when the tree can't be read (fail-open)."""
+    """Return *pid*'s process plus all its descendants; empty when the tree can't be read (fail-open).
+
+    Descendants come from the shared :func:`process_table` snapshot, so they may lag the live
+    tree by up to :data:`~.process_table.PROCESS_TABLE_MAX_AGE`; ones that have exited since are skipped.
+    """
     try:
-        proc = psutil.Process(pid)
-        return [proc, *proc.children(recursive=True)]
+        processes = [psutil.Process(pid)]
     except PSUTIL_READ_ERRORS:
         return []
+    for child_pid in process_table().descendants(pid):
+        try:
+            processes.append(psutil.Process(child_pid))
+        except PSUTIL_READ_ERRORS:
+            continue
+    return processes
 
 
 def subtree_commit(pid: int) -> int:
@@ -186,9 +196,10 @@ def subtree_process_count(pid: int) -> int:
 
     Counts grandchildren the controller never spawned directly — the spawn-explosion signal
     the commit-charge gate misses.  Fails open — returns ``0`` (i.e. "below any ceiling", so
-    admit) if the tree can't be read.
+    admit) if the tree can't be read.  Counted from the shared :func:`process_table` snapshot
+    without opening a handle per process.
     """
-    return len(subtree_processes(pid))
+    return len(process_table().subtree(pid))
 
 
 def commit_warning_active(commit_percent: float, commit_total_gb: float, threshold_fraction: float) -> bool:
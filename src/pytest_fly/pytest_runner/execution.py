@@ -0,0 +1,59 @@
+"""
+Execution-mode configuration — how the runner starts each test's process.
+
+:class:`ExecutionConfig` is snapshotted from preferences at Run-click time (like the
+admission-gate and stall configs) and resolved once per run, on the runner thread, into the
+:class:`PytestProcess` class the workers instantiate.
+"""
+
+from dataclasses import dataclass
+
+from ..interfaces import ExecutionMode
+from ..logger import get_logger
+from .forkserver import ForkserverPytestProcess, start_forkserver
+from .pytest_process import PytestProcess
+from .session_worker import SESSION_MAX_MODULES_DEFAULT, SESSION_MAX_RSS_GROWTH_MB_DEFAULT
+
+log = get_logger()
+
+
+@dataclass(frozen=True)
+class ExecutionConfig:
+    """Configuration for how test processes are started.
+
+    The default (``SPAWN``) is today's behavior: a fresh interpreter per test.
+    """
+
+    mode: ExecutionMode = ExecutionMode.SPAWN
+    preload_modules: tuple[str, ...] = ()  # PUT modules the forkserver template imports up front (FORKSERVER only)
+    session_max_modules: int = SESSION_MAX_MODULES_DEFAULT  # recycle a session worker after this many modules (SESSION_REUSE only; 0 = no limit)
+    session_max_rss_growth_mb: int = SESSION_MAX_RSS_GROWTH_MB_DEFAULT  # ... or after this much RSS growth (SESSION_REUSE only; 0 = no limit)
+    batch_target_seconds: float = 0.0  # pack consecutive short tests into one process up to this much predicted work (0 = off; not used in SESSION_REUSE)
+
+    @property
+    def session_reuse(self) -> bool:
+        """``True`` when workers run modules in long-lived :class:`SessionWorkerProcess` sessions."""
+        return self.mode == ExecutionMode.SESSION_REUSE
+
+    @property
+    def batching(self) -> bool:
+        """``True`` when short tests are packed into :class:`ScheduledBatch` units (see :mod:`.batching`).
+
+        Session reuse already runs every module of a worker in one process, so it never batches.
+        """
+        return self.batch_target_seconds > 0.0 and not self.session_reuse
+
+
+def resolve_process_class(config: ExecutionConfig) -> type[PytestProcess]:
+    """Prepare the configured execution mode and return the process class workers should use.
+
+    Falls back to :class:`PytestProcess` (``spawn``) when the requested mode cannot be set up
+    on this platform, so a run is never blocked by an unavailable mode.  ``SESSION_REUSE``
+    does not use a per-test process class (workers drive a :class:`SessionWorker` instead);
+    :class:`PytestProcess` is returned for it.
+    """
+    if config.mode == ExecutionMode.FORKSERVER:
+        if start_forkserver(config.preload_modules):
+            return ForkserverPytestProcess
+        log.warning(f"execution mode {config.mode.name} unavailable; falling back to {ExecutionMode.SPAWN.name}")
+    return PytestProcess
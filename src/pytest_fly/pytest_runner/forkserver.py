@@ -0,0 +1,131 @@
+"""
+Forkserver execution mode — start each test from a warm, preloaded template process.
+
+With the default ``spawn`` start method every :class:`PytestProcess` is a brand-new
+interpreter that re-imports pytest, coverage, psutil, pytest-fly's child machinery and the
+whole program under test (PUT) before its first assertion runs.  On suites with many small
+modules that startup dominates the wall time.
+
+In :attr:`ExecutionMode.FORKSERVER` the children come from ``multiprocessing``'s forkserver
+instead: a single-threaded template process, started once per run, imports those modules up
+front and then ``fork()``\\ s a copy-on-write child for each test.  Each test still runs in its
+own process (same per-module isolation as ``spawn``) — it just starts warm.
+
+Because the template is single-threaded, forking from it does not have the inherited-lock
+hazard that makes the multi-threaded controller itself unsafe to fork (see ``main.py``).
+The forkserver start method is POSIX-only; elsewhere the runner falls back to ``spawn``.
+
+Caveat: module-level lines of a preloaded PUT module execute in the template, before any
+test's coverage starts, so those import-time lines are not attributed to individual tests.
+"""
+
+import multiprocessing
+from collections.abc import Iterable
+
+from typeguard import typechecked
+
+from ..logger import EVENT_EXTRA, get_logger
+from .pytest_process import PytestProcess
+
+log = get_logger()
+
+FORKSERVER_START_METHOD = "forkserver"
+
+# Always preloaded into the template: the heavy imports every PytestProcess performs.
+BASE_PRELOAD_MODULES = ("pytest", "coverage", "psutil", "pytest_fly.pytest_runner.pytest_process")
+
+_configured_preload: tuple[str, ...] | None = None
+
+
+def forkserver_available() -> bool:
+    """Return ``True`` if this platform supports the ``forkserver`` start method (POSIX)."""
+    return FORKSERVER_START_METHOD in multiprocessing.get_all_start_methods()
+
+
+def parse_module_list(text: str) -> list[str]:
+    """Split a comma- (or whitespace-) separated module list into module names, dropping blanks and duplicates."""
+    modules: list[str] = []
+    for token in text.replace(",", " ").split():
+        if token not in modules:
+            modules.append(token)
+    return modules
+
+
+@typechecked()
+def preload_modules(put_modules: Iterable[str] = ()) -> list[str]:
+    """Return the full template preload list: :data:`BASE_PRELOAD_MODULES` followed by *put_modules*."""
+    modules = list(BASE_PRELOAD_MODULES)
+    for module in put_modules:
+        if module not in modules:
+            modules.append(module)
+    return modules
+
+
+@typechecked()
+def start_forkserver(put_modules: Iterable[str] = ()) -> bool:
+    """Configure the forkserver preload list and start the warm template process.
+
+    Called once per run, before the first test is dispatched, so the template's import
+    cost is paid up front rather than by the first test.  If the template is already
+    running with a different preload list (the PUT module list changed between runs) it is
+    restarted so the new list takes effect.
+
+    A PUT module that fails to import in the template is skipped by ``multiprocessing``
+    itself; the test then simply imports it normally after the fork.
+
+    :param put_modules: PUT module names to preload in addition to :data:`BASE_PRELOAD_MODULES`.
+    :return: ``True`` if the template is running, ``False`` if forkserver is unavailable or failed to start (callers fall back to ``spawn``).
+    """
+    global _configured_preload
+    if not forkserver_available():
+        log.warning(f"{FORKSERVER_START_METHOD} start method is not available on this platform; using spawn")
+        return False
+
+    from multiprocessing import forkserver  # POSIX-only module
+
+    modules = tuple(preload_modules(put_modules))
+    try:
+        if _configured_preload is not None and _configured_preload != modules and not _stop_forkserver(forkserver):
+            modules = _configured_preload  # the running template keeps its preload list
+        multiprocessing.get_context(FORKSERVER_START_METHOD).set_forkserver_preload(list(modules))
+        forkserver.ensure_running()
+    except (OSError, RuntimeError, ValueError) as e:
+        log.warning(f"could not start the {FORKSERVER_START_METHOD} template process ({e}); using spawn", exc_info=True)
+        _configured_preload = None
+        return False
+    _configured_preload = modules
+    log.info(f"{FORKSERVER_START_METHOD} template running with preloaded modules: {', '.join(modules)}", extra=EVENT_EXTRA)
+    return True
+
+
+def _stop_forkserver(forkserver_module) -> bool:
+    """Stop the running template, so the next ``ensure_running()`` starts one with the new preload list.
+
+    ``multiprocessing`` has no public way to restart the forkserver, so this calls the
+    CPython-internal ``ForkServer._stop()`` (checked against CPython 3.7 through 3.13) — and only
+    if it is there.
+
+    :param forkserver_module: The ``multiprocessing.forkserver`` module.
+    :return: ``False`` if the template could not be stopped (it keeps running with its current preload list).
+    """
+    stop = getattr(getattr(forkserver_module, "_forkserver", None), "_stop", None)
+    if not callable(stop):
+        log.warning(f"cannot restart the {FORKSERVER_START_METHOD} template on this Python; the changed preload list applies after restarting pytest-fly")
+        return False
+    stop()
+    return True
+
+
+class ForkserverPytestProcess(PytestProcess):
+    """A :class:`PytestProcess` started as a fork of the warm forkserver template.
+
+    Overrides the start method for just this class (mirroring how ``multiprocessing``'s own
+    context-specific ``Process`` classes do it), so the controller's global ``spawn`` default —
+    and every other process pytest-fly starts — is unchanged.
+    """
+
+    _start_method = FORKSERVER_START_METHOD
+
+    @staticmethod
+    def _Popen(process_obj):
+        return multiprocessing.get_context(FORKSERVER_START_METHOD).Process._Popen(process_obj)
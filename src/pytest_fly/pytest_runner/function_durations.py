@@ -0,0 +1,53 @@
+"""
+Per-test-function duration recording.
+
+:class:`FunctionDurationRecorder` is a small pytest plugin installed by every test process
+(:class:`PytestProcess`, and per module in the session-reuse stream). It sums each test
+function's setup + call + teardown time — parametrized cases are summed into their function —
+and, once the scheduled test finishes, the durations of the functions that passed are stored
+via :class:`FunctionDurationDB` (through the run's :class:`ResultWriter` when there is one). Those durations size the shards when a critical-path module
+is split (see :mod:`.sharding`).
+"""
+
+from multiprocessing.connection import Connection
+from pathlib import Path
+
+import pytest
+
+from ..interfaces import SchedulingGranularity
+from ..logger import get_logger
+from .result_writer import FunctionDurations, send_result
+from .test_list import scheduling_node_id
+
+log = get_logger()
+
+
+class FunctionDurationRecorder:
+    """pytest plugin accumulating per-function durations for the scheduled test being run."""
+
+    def __init__(self) -> None:
+        self._durations: dict[str, float] = {}
+        self._failed: set[str] = set()
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        function = scheduling_node_id(report.nodeid, SchedulingGranularity.FUNCTION)
+        self._durations[function] = self._durations.get(function, 0.0) + report.duration
+        if report.failed:
+            self._failed.add(function)
+
+    def take_passed(self) -> dict[str, float]:
+        """Return the durations of the functions that passed (every phase of every case) and reset."""
+        passed = {function: duration for function, duration in self._durations.items() if function not in self._failed}
+        self._durations = {}
+        self._failed = set()
+        return passed
+
+    def save(self, data_dir: Path, run_guid: str, name: str, result_connection: Connection | None = None) -> None:
+        """Store the passed functions' durations for scheduled test *name*, then reset. Fail-open.
+
+        :param result_connection: The process's channel to the run's :class:`ResultWriter`; ``None`` writes directly.
+        """
+        durations = self.take_passed()
+        if not durations:
+            return
+        send_result(result_connection, data_dir, FunctionDurations(run_guid, name, durations))
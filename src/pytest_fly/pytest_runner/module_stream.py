@@ -0,0 +1,363 @@
+"""
+Run several test modules back-to-back inside one pytest session.
+
+:class:`PytestProcess` runs exactly one module per ``pytest.main`` call, so session-scoped
+fixtures are rebuilt for every module.  :class:`ModuleStreamPlugin` instead takes over
+pytest's collection and run loop: it pulls module node ids from an iterator, collects and
+runs each one in the *same* session, and tears down only down to the session between
+modules — so session-scoped fixtures are built once per session.
+
+Each module still gets everything a standalone :class:`PytestProcess` would produce
+(:class:`ModuleRecorder`): a RUNNING record at start, its own live-output file, its own
+coverage data file, peak CPU/memory/commit, and a final record with its own output and
+exit code.
+
+Coverage caveat: code that only runs once per process (module import, session fixture
+setup) is attributed to the first module that triggers it.
+"""
+
+import os
+import shutil
+import time
+import traceback
+from collections.abc import Callable, Iterable
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import TextIO
+
+import pytest
+from coverage import Coverage
+
+from ..file_util import sanitize_test_name
+from ..interfaces import PyTestFlyExitCode, PytestProcessInfo
+from ..logger import get_logger
+from .function_durations import FunctionDurationRecorder
+from .live_output import live_output_path
+from .process_monitor import ResourcePeaks, final_peaks
+from .result_writer import send_result
+
+log = get_logger()
+
+
+class SwitchableStream:
+    """A text stream proxy whose target can be swapped between modules.
+
+    Installed as ``sys.stdout``/``sys.stderr`` *before* ``pytest.main`` so pytest's terminal
+    writer — which binds to the stream object once, at configure time — follows each switch.
+    """
+
+    def __init__(self, target: TextIO) -> None:
+        self.target = target
+
+    def write(self, text: str) -> int:
+        return self.target.write(text)
+
+    def flush(self) -> None:
+        self.target.flush()
+
+    def isatty(self) -> bool:
+        return False
+
+    def __getattr__(self, name: str):
+        return getattr(self.target, name)
+
+
+# Called after each module's final record is written: (node_id, exit_code, session_usable).
+ModuleFinishedCallback = Callable[[str, PyTestFlyExitCode, bool], None]
+
+
+class ModuleRecorder:
+    """Per-module bookkeeping for modules run inside a shared pytest session.
+
+    Writes the RUNNING and final :class:`PytestProcessInfo` records, points the shared
+    :class:`SwitchableStream` at the module's live-output file, and wraps the module in its
+    own :class:`Coverage` data file — matching what :class:`PytestProcess` does for one module
+    (including its per-function durations, via :attr:`function_durations`).
+    The controller's :class:`ResourceSampler` samples the whole process into one
+    :class:`ResourcePeaks`, which is reset at each module start so every module gets the
+    peaks observed while it ran.
+    """
+
+    def __init__(
+        self,
+        run_guid: str,
+        data_dir: Path,
+        update_rate: float,
+        stream: SwitchableStream,
+        put_version: str = "",
+        put_fingerprint: str = "",
+        on_finished: ModuleFinishedCallback | None = None,
+        resource_peaks: ResourcePeaks | None = None,
+        result_connection: Connection | None = None,
+    ) -> None:
+        self.run_guid = run_guid
+        self.data_dir = data_dir
+        self.update_rate = update_rate
+        self.put_version = put_version
+        self.put_fingerprint = put_fingerprint
+        self._stream = stream
+        self._idle_target = stream.target  # where output goes between modules
+        self._on_finished = on_finished
+        self.function_durations = FunctionDurationRecorder()  # must be registered as a pytest plugin by the caller
+        self._peaks = resource_peaks or ResourcePeaks()
+        self._result_connection = result_connection  # to the run's ResultWriter; None writes directly
+        self._current: str | None = None
+        self._live_file: TextIO | None = None
+        self._live_path: Path | None = None
+        self._coverage: Coverage | None = None
+        self._coverage_temp_path: Path | None = None
+        self._coverage_path: Path | None = None
+        self.modules_started = 0
+
+    @property
+    def current(self) -> str | None:
+        """Node id of the module currently being recorded, or ``None`` between modules."""
+        return self._current
+
+    def start(self, node_id: str) -> None:
+        """Begin recording *node_id*: RUNNING record, live-output file, coverage. Idempotent for the current module."""
+        if self._current == node_id:
+            return
+        self._current = node_id
+        self.modules_started += 1
+        self._peaks.take(reset=True)  # samples taken between modules belong to no module
+        self.function_durations.take_passed()  # likewise any reports from between modules
+
+        send_result(
+            self._result_connection,
+            self.data_dir,
+            PytestProcessInfo(
+                self.run_guid,
+                node_id,
+                os.getpid(),
+                PyTestFlyExitCode.NONE,
+                None,
+                time_stamp=time.time(),
+                put_version=self.put_version,
+                put_fingerprint=self.put_fingerprint,
+            ),
+        )
+
+        live_path = live_output_path(self.data_dir, node_id)
+        live_path.parent.mkdir(parents=True, exist_ok=True)
+        self._live_path = live_path
+        self._live_file = open(live_path, "w", buffering=1, encoding="utf-8", errors="replace", newline="")
+        self._stream.target = self._live_file
+
+        coverage_dir = Path(self.data_dir, "coverage")
+        coverage_dir.mkdir(parents=True, exist_ok=True)
+        safe_name = sanitize_test_name(node_id)
+        self._coverage_path = Path(coverage_dir, f"{safe_name}.coverage")
+        self._coverage_temp_path = Path(coverage_dir, f"{safe_name}.temp")
+        self._coverage_temp_path.unlink(missing_ok=True)
+        self._coverage = Coverage(self._coverage_temp_path)
+        self._coverage.start()
+
+    def write(self, text: str) -> None:
+        """Append *text* to the current module's output (best effort)."""
+        try:
+            self._stream.write(text)
+        except (ValueError, OSError):
+            pass  # the test may have closed or redirected the stream
+
+    def finish(self, exit_code: PyTestFlyExitCode, session_usable: bool = True) -> None:
+        """Finish the current module: save coverage, collect output and peaks, write the final record."""
+        node_id = self._current
+        if node_id is None:
+            return
+
+        if self._coverage is not None:
+            self._coverage.stop()
+            self._coverage.save()
+            self._coverage_path.unlink(missing_ok=True)
+            shutil.move(self._coverage_temp_path, self._coverage_path)
+            self._coverage = None
+
+        self._stream.target = self._idle_target
+        if self._live_file is not None:
+            self._live_file.close()
+            self._live_file = None
+        output = self._live_path.read_text(encoding="utf-8", errors="replace") if self._live_path is not None else ""
+        self.function_durations.save(self.data_dir, self.run_guid, node_id, self._result_connection)
+
+        peak_cpu, peak_memory, peak_commit = final_peaks(os.getpid(), self._peaks)
+        send_result(
+            self._result_connection,
+            self.data_dir,
+            PytestProcessInfo(
+                self.run_guid,
+                node_id,
+                os.getpid(),
+                exit_code,
+                output,
+                time.time(),
+                peak_cpu,
+                peak_memory,
+                put_version=self.put_version,
+                put_fingerprint=self.put_fingerprint,
+                commit_bytes=peak_commit,
+            ),
+        )
+        self._current = None
+        log.debug(f"{node_id=},{exit_code=},{session_usable=}")
+        if self._on_finished is not None:
+            self._on_finished(node_id, exit_code, session_usable)
+
+
+class ModuleStreamPlugin:
+    """pytest plugin that runs a stream of module node ids in one session.
+
+    Replaces the default collection (nothing is collected up front) and run loop: for each
+    node id pulled from *node_ids* it collects just that module, runs its items, and ends
+    the module with teardown down to — but not including — the session, so session-scoped
+    fixtures survive into the next module.
+
+    The stream stops early when the session can no longer be trusted (``-x`` / ``--maxfail``
+    tripped, or an internal error); the caller is told via ``session_usable=False``.
+    """
+
+    def __init__(self, node_ids: Iterable[str], recorder: ModuleRecorder) -> None:
+        self._node_ids = node_ids
+        self._recorder = recorder
+        self._failed = False
+        self._collect_errors = 0
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_collection(self, session: pytest.Session) -> bool:
+        return True  # collection happens per module, in pytest_runtestloop
+
+    def pytest_collectreport(self, report: pytest.CollectReport) -> None:
+        if report.failed:
+            self._collect_errors += 1
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        if report.failed:
+            self._failed = True
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtestloop(self, session: pytest.Session) -> bool:
+        reporter = session.config.pluginmanager.get_plugin("terminalreporter")
+        _reuse_directory_collectors(session)
+        for node_id in self._node_ids:
+            self._recorder.start(node_id)
+            if self._recorder.modules_started > 1 and reporter is not None:
+                reporter.write_sep("=", f"{node_id} (module {self._recorder.modules_started} of this session)")
+            self._failed = False
+            self._collect_errors = 0
+            module_start = time.perf_counter()
+            session_usable = True
+            try:
+                exit_code = self._run_module(session, node_id)
+            except Exception:  # deliberate broad catch — see PytestProcess.run
+                # Arbitrary user/plugin code runs here; an escaping exception would leave this
+                # module "Running" forever. The session may now be inconsistent, so end it.
+                exit_code = PyTestFlyExitCode.INTERNAL_ERROR
+                session_usable = False
+                self._recorder.write(f"\n\nmodule run raised an exception:\n{traceback.format_exc()}")
+            if reporter is not None:
+                self._write_module_summary(reporter, session, exit_code, time.perf_counter() - module_start)
+            session_usable = session_usable and not (session.shouldfail or session.shouldstop)
+            self._recorder.finish(exit_code, session_usable)
+            if not session_usable:
+                break
+        return True
+
+    def _run_module(self, session: pytest.Session, node_id: str) -> PyTestFlyExitCode:
+        """Collect and run one module; return its pytest-equivalent exit code."""
+        try:
+            items = session.perform_collect([node_id])
+        except pytest.UsageError as e:
+            self._recorder.write(f"ERROR: {e}\n")
+            return PyTestFlyExitCode.USAGE_ERROR
+        if self._collect_errors:
+            return PyTestFlyExitCode.INTERRUPTED  # what pytest.main returns for collection errors
+        if not items:
+            return PyTestFlyExitCode.NO_TESTS_COLLECTED
+        for index, item in enumerate(items):
+            # The last item's "next item" is the session itself: teardown_exact keeps only the
+            # nodes in nextitem.listchain() — [session] — so module/class fixtures are torn down
+            # but session-scoped fixtures stay alive for the next module.
+            next_item = items[index + 1] if index + 1 < len(items) else session
+            item.config.hook.pytest_runtest_protocol(item=item, nextitem=next_item)
+            if session.shouldfail or session.shouldstop:
+                break
+        return PyTestFlyExitCode.TESTS_FAILED if self._failed else PyTestFlyExitCode.OK
+
+    @staticmethod
+    def _write_module_summary(reporter, session: pytest.Session, exit_code: PyTestFlyExitCode, seconds: float) -> None:
+        """Write the per-module terminal summary (``-rA`` sections + stats line) and reset the reporter's tallies."""
+        config = session.config
+        config.hook.pytest_terminal_summary(terminalreporter=reporter, exitstatus=int(exit_code), config=config)
+        parts, _unused_color = reporter.build_summary_stats_line()
+        reporter.write_sep("=", f"{', '.join(text for text, _unused_markup in parts)} in {seconds:.2f}s")
+        reporter.stats.clear()
+        reporter.currentfspath = None  # so the next module prints its own path prefix
+        if hasattr(reporter, "_numcollected"):
+            reporter._numcollected = 0  # "collected N items" is per module, not cumulative
+
+
+def _reuse_directory_collectors(session: pytest.Session) -> None:
+    """Make every per-module ``perform_collect`` share one tree of directory/package collectors.
+
+    Newer pytest binds a conftest's fixtures to the :class:`pytest.Directory` node that
+    collected it, and each ``perform_collect`` normally builds a fresh node tree — so the
+    second module would not see conftest fixtures registered while collecting the first.
+    Caching the directory-level collection keeps one tree for the whole session (and avoids
+    re-listing directories for every module).  Module collectors are still built per module.
+
+    This wraps two private :class:`pytest.Session` methods; if a pytest version lacks them it
+    is a no-op (older versions match conftest fixtures by node id, which needs no reuse).
+    """
+    collect_path = getattr(session, "_collect_path", None)
+    collect_one_node = getattr(session, "_collect_one_node", None)
+    if collect_path is None or collect_one_node is None:
+        return
+    path_cache: dict = {}
+    directory_reports: dict = {}
+
+    def cached_collect_path(path, _per_call_path_cache):
+        return collect_path(path, path_cache)
+
+    def cached_collect_one_node(node, handle_dupes: bool = True):
+        if not isinstance(node, pytest.Directory):
+            return collect_one_node(node, handle_dupes)
+        if node in directory_reports:
+            return directory_reports[node], True
+        report, duplicate = collect_one_node(node, handle_dupes)
+        directory_reports[node] = report
+        return report, duplicate
+
+    session._collect_path = cached_collect_path
+    session._collect_one_node = cached_collect_one_node
+
+
+def run_module_stream(first_node_id: str, node_ids: Iterable[str], recorder: ModuleRecorder, stream: SwitchableStream) -> int:
+    """Run *node_ids* (which must start with *first_node_id*) in one pytest session.
+
+    *first_node_id* is passed to ``pytest.main`` as the positional argument so rootdir and
+    ini-file discovery match a standalone :class:`PytestProcess` run of that module. The
+    caller must already have installed *stream* as ``sys.stdout``/``sys.stderr``.
+
+    :return: ``pytest.main``'s overall exit code.
+    """
+    recorder.start(first_node_id)  # so the session header lands in the first module's output
+    plugin = ModuleStreamPlugin(node_ids, recorder)
+    try:
+        # -rA: show full short test summary (all outcomes, untruncated assertion messages)
+        # -s: disable pytest capture so stdout/stderr stream live to the log file
+        session_exit_code = int(pytest.main([first_node_id, "-rA", "-s"], plugins=[plugin, recorder.function_durations]))
+    except Exception:  # deliberate broad catch — see PytestProcess.run
+        session_exit_code = int(PyTestFlyExitCode.INTERNAL_ERROR)
+        recorder.write(f"\n\npytest.main raised an exception:\n{traceback.format_exc()}")
+    if recorder.current is not None:
+        # The session ended before the module was finalized (e.g. a conftest failed to import
+        # during configuration, so the run loop never started) — report pytest's own exit code.
+        recorder.finish(_to_fly_exit_code(session_exit_code), session_usable=False)
+    return session_exit_code
+
+
+def _to_fly_exit_code(exit_code: int) -> PyTestFlyExitCode:
+    try:
+        return PyTestFlyExitCode(exit_code)
+    except ValueError:
+        return PyTestFlyExitCode.INTERNAL_ERROR
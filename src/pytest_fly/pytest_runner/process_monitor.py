@@ -1,32 +1,20 @@
 """
-Resource monitor subprocess — periodically samples CPU and memory usage
-of a target process and makes readings available via a shared queue.
+Per-test resource monitoring — peak CPU, memory and commit charge of each test process.
+
+One :class:`ResourceSampler` thread in the controller samples every in-flight test process
+each interval and raises the peaks in that test's :class:`ResourcePeaks`, a small block of
+shared memory the test process reads when it writes its final record.
 """
 
-import time
-from dataclasses import dataclass
-from multiprocessing import Event, Process, Queue
+from math import isnan, nan
+from multiprocessing import get_context
+from threading import Event, Lock, Thread
 
 import psutil
-from psutil import NoSuchProcess
-from psutil import Process as PsutilProcess
 from typeguard import typechecked
 
-from ..logger import configure_child_logger
 from .commit_memory import subtree_commit
-
-
-@dataclass(frozen=True)
-class PytestProcessMonitorInfo:
-    """A single CPU/memory sample captured by :class:`ProcessMonitor`."""
-
-    run_guid: str  # pytest run GUID
-    name: str  # process name
-    pid: int | None  # process ID from the OS
-    cpu_percent: float | None  # CPU usage percent of the process subtree (raw psutil scale: one full core == 100, so a multi-core subtree can exceed 100)
-    memory_percent: float | None  # Memory usage percent
-    time_stamp: float  # time stamp of the info update
-    commit_bytes: int | None = None  # commit charge of the process subtree in bytes (Windows: pagefile)
+from .process_table import process_table
 
 
 @typechecked()
@@ -50,11 +38,12 @@ class SubtreeCpuSampler:
     meaningless first-call ``0.0``, silently dropping the CPU of any subprocess/.exe a
     test spawns (a test that offloads its work to a child would always read idle).
     Newly-seen descendants are primed (they contribute ``0.0`` that sample, real readings
-    thereafter); handles whose process has exited are dropped.
+    thereafter); handles whose process has exited are dropped.  Descendants are looked up in
+    the shared :func:`process_table` snapshot rather than by walking the live tree.
 
     :meth:`sample` returns ``None`` when the root pid is newly seen (its first reading is
     meaningless) or unreadable — callers must treat ``None`` as "unknown", never "idle".
-    Shared by :class:`ProcessMonitor` (raw totals) and the stall watchdog (which
+    Shared by :class:`ResourceSampler` (raw totals) and the stall watchdog (which
     normalizes via :func:`normalize_cpu_percent`).
     """
 
@@ -71,81 +60,128 @@ class SubtreeCpuSampler:
                 self._procs[pid] = root
                 root.cpu_percent(interval=None)  # prime; the first reading is meaningless
             total = 0.0 if first_sight else root.cpu_percent(interval=None)
-            for child in root.children(recursive=True):
-                cached = self._procs.get(child.pid)
-                try:
-                    if cached is None:
-                        # New descendant: cache + prime now so the next sample reads real usage.
-                        self._procs[child.pid] = child
-                        child.cpu_percent(interval=None)
-                    else:
-                        total += cached.cpu_percent(interval=None)
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    self._procs.pop(child.pid, None)
-            return None if first_sight else total
         except (psutil.NoSuchProcess, psutil.AccessDenied, ValueError):
             # ValueError: psutil rejects non-positive PIDs.
             self._procs.pop(pid, None)
             return None
+        for child_pid in process_table().descendants(pid):
+            cached = self._procs.get(child_pid)
+            try:
+                if cached is None:
+                    # New descendant: cache + prime now so the next sample reads real usage.
+                    child = psutil.Process(child_pid)
+                    self._procs[child_pid] = child
+                    child.cpu_percent(interval=None)
+                else:
+                    total += cached.cpu_percent(interval=None)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                self._procs.pop(child_pid, None)
+        return None if first_sight else total
+
+    def forget(self, pid: int) -> None:
+        """Drop the cached handle for root *pid* once it is no longer sampled."""
+        self._procs.pop(pid, None)
+
+
+class ResourcePeaks:
+    """Peak CPU, memory and commit of one test process, held in shared memory.
+
+    Created by the controller and handed to the test process when it is constructed.  The
+    controller's :class:`ResourceSampler` raises the peaks while the test runs; the test
+    process reads them (:func:`final_peaks`) for its final record.  A value that was never
+    sampled reads as ``None``.
+    """
 
-
-class ProcessMonitor(Process):
+    def __init__(self) -> None:
+        # spawn-context lock: a fork-context one cannot be handed to a spawned/forkserver test process
+        self._values = get_context("spawn").Array("d", [nan, nan, nan])  # cpu_percent, memory_percent, commit_bytes
+
+    def record(self, cpu_percent: float | None, memory_percent: float | None, commit_bytes: int | None) -> None:
+        """Raise each peak to the given reading (``None`` readings are ignored)."""
+        with self._values.get_lock():
+            for index, value in enumerate((cpu_percent, memory_percent, commit_bytes)):
+                if value is not None and not (value <= self._values[index]):  # NaN compares false: first reading
+                    self._values[index] = value
+
+    def take(self, reset: bool = False) -> tuple[float | None, float | None, int | None]:
+        """Return ``(cpu_percent, memory_percent, commit_bytes)`` peaks; with *reset*, start a new measurement."""
+        with self._values.get_lock():
+            cpu_percent, memory_percent, commit_bytes = (None if isnan(value) else value for value in self._values)
+            if reset:
+                for index in range(len(self._values)):
+                    self._values[index] = nan
+        return cpu_percent, memory_percent, None if commit_bytes is None else int(commit_bytes)
+
+
+def final_peaks(pid: int, peaks: ResourcePeaks | None) -> tuple[float | None, float | None, int | None]:
+    """Fold a last memory/commit reading of *pid* into *peaks* and return them (see :meth:`ResourcePeaks.take`).
+
+    Called by the test process itself as it writes its final record, so a test shorter than
+    the sampling interval still reports its memory. *peaks* may be ``None`` (no controller
+    sampler), in which case only that last reading is reported.
     """
-    Subprocess that periodically samples CPU and memory usage of a target
-    process and makes the readings available via a shared :class:`~multiprocessing.Queue`.
+    peaks = peaks or ResourcePeaks()
+    try:
+        memory_percent = psutil.Process(pid).memory_percent()  # rss of the test process
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        memory_percent = None
+    peaks.record(None, memory_percent, subtree_commit(pid) or None)
+    return peaks.take()
+
+
+class ResourceSampler(Thread):
+    """Controller-side thread sampling every in-flight test process in one pass per interval.
+
+    Each registered process's subtree CPU (raw psutil scale, via one shared
+    :class:`SubtreeCpuSampler`), memory percent (rss of the process itself) and subtree commit
+    charge are folded into its :class:`ResourcePeaks`.  Replaces a monitor process per test.
     """
 
     @typechecked()
-    def __init__(self, run_guid: str, name: str, pid: int, update_rate: float):
+    def __init__(self, interval: float) -> None:
         """
-        Monitor a process for things like CPU and memory usage.
-
-        :param run_guid: the pytest run GUID stamped onto every sample
-        :param name: the name of the process to monitor
-        :param pid: the process ID of the process to monitor
-        :param update_rate: the rate at which to send back updates
+        :param interval: Seconds between sampling passes.
         """
-        super().__init__()
-        self._run_guid = run_guid
-        self._name = name
-        self._pid = pid
-        self._update_rate = update_rate
+        super().__init__(name="resource_sampler", daemon=True)
+        self._interval = interval
         self._stop_event = Event()
-        self.process_monitor_queue = Queue()  # Queue to send back process monitor info
-
-    def run(self):
-        """Sample CPU and memory at ``_update_rate`` intervals until stop is requested."""
-        configure_child_logger(f"process_monitor-{self._pid}.log")
-
-        psutil_process = PsutilProcess(self._pid)
-
-        # Shared subtree sampler: persistent handles for the root and every descendant so
-        # interval=None CPU deltas stay valid (see SubtreeCpuSampler). Its first sample
-        # returns None (priming), so the first loop iteration enqueues nothing.
-        cpu_sampler = SubtreeCpuSampler()
-
-        def put_process_monitor_data():
-            """Take one CPU/memory sample and enqueue it."""
-            if psutil_process.is_running():
-                try:
-                    # memory percent default is "rss"
-                    memory_percent = psutil_process.memory_percent()
-                except NoSuchProcess:
-                    memory_percent = None
-                cpu_percent = cpu_sampler.sample(self._pid)
-                if cpu_percent is not None and memory_percent is not None:
-                    # Commit charge of the whole process subtree (the test may spawn children).
-                    commit_bytes = subtree_commit(self._pid)
-                    pytest_process_info = PytestProcessMonitorInfo(
-                        run_guid=self._run_guid, name=self._name, pid=self._pid, cpu_percent=cpu_percent, memory_percent=memory_percent, time_stamp=time.time(), commit_bytes=commit_bytes
-                    )
-                    self.process_monitor_queue.put(pytest_process_info)
-
+        self._lock = Lock()
+        self._targets: dict[int, ResourcePeaks] = {}
+        self._processes: dict[int, psutil.Process] = {}  # touched only by the sampling pass
+        self._cpu_sampler = SubtreeCpuSampler()
+
+    def register(self, pid: int, peaks: ResourcePeaks) -> None:
+        """Start sampling process *pid* into *peaks* (from the next pass)."""
+        with self._lock:
+            self._targets[pid] = peaks
+
+    def unregister(self, pid: int) -> None:
+        """Stop sampling process *pid*."""
+        with self._lock:
+            self._targets.pop(pid, None)
+
+    def sample_once(self) -> None:
+        """Take one reading of every registered process."""
+        with self._lock:
+            targets = dict(self._targets)
+        for pid in set(self._processes) - set(targets):
+            del self._processes[pid]
+            self._cpu_sampler.forget(pid)
+        for pid, peaks in targets.items():
+            try:
+                process = self._processes.get(pid) or self._processes.setdefault(pid, psutil.Process(pid))
+                memory_percent = process.memory_percent()
+            except (psutil.NoSuchProcess, psutil.AccessDenied, ValueError):
+                continue  # exited between registration and this pass (or not yet readable)
+            cpu_percent = self._cpu_sampler.sample(pid)  # None on first sight (priming)
+            peaks.record(cpu_percent, memory_percent, subtree_commit(pid) or None)
+
+    def run(self) -> None:
+        """Sample every registered process each interval until :meth:`request_stop`."""
         while not self._stop_event.is_set():
-            put_process_monitor_data()
-            self._stop_event.wait(self._update_rate)
-        put_process_monitor_data()
+            self.sample_once()
+            self._stop_event.wait(self._interval)
 
-    def request_stop(self):
-        """Signal the monitor loop to exit after the current sample."""
+    def request_stop(self) -> None:
+        """Signal the sampling loop to exit."""
         self._stop_event.set()
@@ -0,0 +1,139 @@
+"""
+Shared process-table snapshot.
+
+Several controller-side consumers walk the same process trees every interval — each
+worker's descendant snapshot (Part A), the :class:`ResourceSampler`, the stall watchdog's
+subtree CPU, the process-count admission gate and :func:`subtree_commit`.  psutil's
+``children(recursive=True)`` reads the ``ppid`` of *every* process on the system on each
+call, so that work scales with (consumers × trees × system process count).
+
+:func:`process_table` instead reads the whole table once (on Linux directly from ``/proc``,
+elsewhere via :func:`psutil.process_iter`) into a :class:`ProcessTableSnapshot` holding a
+parent → children index, and hands the same snapshot to every caller until it is older
+than the requested age.  Consumers look up pids in the snapshot and open
+:class:`psutil.Process` handles only for the processes they actually read.
+"""
+
+import os
+import sys
+import time
+from threading import Lock
+
+import psutil
+
+PROCESS_TABLE_MAX_AGE = 0.5  # seconds a snapshot is shared before the table is read again
+
+_PROC = "/proc"
+
+
+class ProcessTableSnapshot:
+    """One reading of the system process table, indexed parent → children.
+
+    :param parents: pid → parent pid for every process in the table.
+    :param taken_at: ``time.monotonic()`` when the table was read.
+    """
+
+    def __init__(self, parents: dict[int, int], taken_at: float) -> None:
+        self.parents = parents
+        self.taken_at = taken_at
+        self.children: dict[int, list[int]] = {}
+        for pid, ppid in parents.items():
+            if pid != ppid:  # pid 0 is its own parent on some platforms
+                self.children.setdefault(ppid, []).append(pid)
+
+    def __contains__(self, pid: int) -> bool:
+        return pid in self.parents
+
+    def descendants(self, pid: int) -> list[int]:
+        """Return every descendant of *pid* (breadth-first), not including *pid* itself."""
+        found: list[int] = []
+        seen = {pid}
+        frontier = self.children.get(pid, [])
+        while frontier:
+            level = [child for child in frontier if child not in seen]  # ppid cycles can appear mid-reparenting
+            seen.update(level)
+            found.extend(level)
+            frontier = [grandchild for child in level for grandchild in self.children.get(child, ())]
+        return found
+
+    def subtree(self, pid: int) -> list[int]:
+        """Return *pid* followed by its descendants; empty when *pid* is not in the table."""
+        if pid not in self.parents:
+            return []
+        return [pid, *self.descendants(pid)]
+
+
+def _read_proc_parents() -> dict[int, int] | None:
+    """Read pid → ppid for every process from ``/proc/<pid>/stat``; ``None`` if ``/proc`` is unusable."""
+    parents = {}
+    try:
+        entries = os.scandir(_PROC)
+    except OSError:
+        return None
+    with entries:
+        for entry in entries:
+            if not entry.name.isdigit():
+                continue
+            try:
+                with open(f"{_PROC}/{entry.name}/stat", "rb") as f:
+                    stat = f.read()
+            except OSError:
+                continue  # exited since the directory listing
+            # "pid (comm) state ppid ..." — comm may contain spaces and parentheses
+            fields = stat[stat.rfind(b")") + 2 :].split(maxsplit=2)
+            try:
+                parents[int(entry.name)] = int(fields[1])
+            except (IndexError, ValueError):
+                continue
+    return parents or None
+
+
+def _read_psutil_parents() -> dict[int, int]:
+    parents = {}
+    for proc in psutil.process_iter(["ppid"]):
+        ppid = proc.info["ppid"]
+        if ppid is not None:
+            parents[proc.pid] = ppid
+    return parents
+
+
+def read_process_table() -> ProcessTableSnapshot:
+    """Read the process table now (uncached)."""
+    parents = _read_proc_parents() if sys.platform.startswith("linux") else None
+    if parents is None:
+        parents = _read_psutil_parents()
+    return ProcessTableSnapshot(parents, time.monotonic())
+
+
+_lock = Lock()
+_snapshot: ProcessTableSnapshot | None = None
+
+
+def _reset_after_fork() -> None:
+    # a fork-started test process must not inherit a lock some controller thread was holding
+    global _lock, _snapshot
+    _lock = Lock()
+    _snapshot = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def invalidate_process_table() -> None:
+    """Make the next :func:`process_table` call read the table again (e.g. right after a test process exits)."""
+    global _snapshot
+    with _lock:
+        _snapshot = None
+
+
+def process_table(max_age: float = PROCESS_TABLE_MAX_AGE) -> ProcessTableSnapshot:
+    """Return the shared snapshot, reading the table again if it is older than *max_age* seconds.
+
+    Thread-safe; concurrent callers that find the snapshot stale wait for one read.
+    """
+    global _snapshot
+    with _lock:
+        if _snapshot is None or time.monotonic() - _snapshot.taken_at > max_age:
+            _snapshot = read_process_table()
+        return _snapshot
@@ -1,6 +1,6 @@
 """
-Single-test subprocess — runs one pytest module with coverage collection
-and a :class:`ProcessMonitor` that samples CPU/memory usage.
+Single-test subprocess — runs one pytest module with coverage collection.  Its peak
+CPU/memory usage is sampled by the controller's :class:`ResourceSampler`.
 """
 
 import contextlib
@@ -9,8 +9,8 @@ import shutil
 import time
 import traceback
 from multiprocessing import Process
+from multiprocessing.connection import Connection
 from pathlib import Path
-from queue import Empty
 from typing import TextIO
 
 import psutil
@@ -18,12 +18,13 @@ import pytest
 from coverage import Coverage
 from typeguard import typechecked
 
-from ..db import PytestProcessInfoDB
 from ..file_util import sanitize_test_name
 from ..interfaces import PyTestFlyExitCode, PytestProcessInfo, int_exit_code_to_pytest_fly_exit_code
 from ..logger import configure_child_logger, get_logger
+from .function_durations import FunctionDurationRecorder
 from .live_output import live_output_path
-from .process_monitor import ProcessMonitor
+from .process_monitor import ResourcePeaks, final_peaks
+from .result_writer import send_result
 
 log = get_logger()
 
@@ -199,16 +200,30 @@ class PytestProcess(Process):
     """
 
     @typechecked()
-    def __init__(self, run_guid: str, test: Path | str, data_dir: Path, update_rate: float, put_version: str = "", put_fingerprint: str = "") -> None:
+    def __init__(
+        self,
+        run_guid: str,
+        test: Path | str,
+        data_dir: Path,
+        update_rate: float,
+        put_version: str = "",
+        put_fingerprint: str = "",
+        resource_peaks: ResourcePeaks | None = None,
+        result_connection: Connection | None = None,
+    ) -> None:
         """
         Pytest process for a single pytest test.
 
         :param run_guid: the pytest run this process is associated with (same GUID for all tests in a pytest run)
         :param test: the test to run
         :param data_dir: the directory to store coverage data in
-        :param update_rate: the update rate for the process monitor
+        :param update_rate: the run's update rate (seconds)
         :param put_version: display label for the program under test (stamped on each DB record)
         :param put_fingerprint: program-under-test fingerprint for RunMode.CHECK comparison
+        :param resource_peaks: peaks the controller's :class:`ResourceSampler` raises while this process
+            runs; ``None`` reports only a final reading taken as the test finishes
+        :param result_connection: write end of this process's channel to the run's :class:`ResultWriter`
+            (from :meth:`ResultWriter.connect`); ``None`` writes the records to the DB directly
         """
         super().__init__(name=str(test))
         self.data_dir = data_dir
@@ -216,8 +231,8 @@ class PytestProcess(Process):
         self.update_rate = update_rate
         self.put_version = put_version
         self.put_fingerprint = put_fingerprint
-
-        self._process_monitor_process = None
+        self.resource_peaks = resource_peaks
+        self.result_connection = result_connection
 
     def _open_live_output(self, live_path: Path, retry_timeout: float = 5.0, retry_interval: float = 0.2) -> tuple[TextIO, Path]:
         """Open the per-test live-output log for writing, tolerating a transiently locked file.
@@ -252,23 +267,18 @@ class PytestProcess(Process):
 
         configure_child_logger(f"{sanitize_test_name(self.name)}.log")
 
-        # start the process monitor to monitor things like CPU and memory usage
-        self._process_monitor_process = ProcessMonitor(self.run_guid, self.name, self.pid, self.update_rate)
-        self._process_monitor_process.start()
-
         # update the pytest process info to show that the test is running
-        with PytestProcessInfoDB(self.data_dir) as db:
-            pytest_process_info = PytestProcessInfo(
-                self.run_guid,
-                self.name,
-                self.pid,
-                PyTestFlyExitCode.NONE,
-                None,
-                time_stamp=time.time(),
-                put_version=self.put_version,
-                put_fingerprint=self.put_fingerprint,
-            )
-            db.write(pytest_process_info)
+        pytest_process_info = PytestProcessInfo(
+            self.run_guid,
+            self.name,
+            self.pid,
+            PyTestFlyExitCode.NONE,
+            None,
+            time_stamp=time.time(),
+            put_version=self.put_version,
+            put_fingerprint=self.put_fingerprint,
+        )
+        send_result(self.result_connection, self.data_dir, pytest_process_info)
 
         # Finally, actually run pytest!
         # Redirect stdout and stderr into a per-test log file so the GUI can tail live output
@@ -289,10 +299,11 @@ class PytestProcess(Process):
                 coverage = Coverage(coverage_temp_file_path)
                 coverage.start()
 
+                function_durations = FunctionDurationRecorder()
                 try:
                     # -rA: show full short test summary (all outcomes, untruncated assertion messages)
                     # -s: disable pytest capture so stdout/stderr stream live to the log file
-                    pytest_exit_code = pytest.main([self.name, "-rA", "-s"])
+                    pytest_exit_code = pytest.main([self.name, "-rA", "-s"], plugins=[function_durations])
                     exit_code = int_exit_code_to_pytest_fly_exit_code(pytest_exit_code)
                 except Exception:  # deliberate broad catch — see comment
                     # pytest.main executes arbitrary user/plugin code, so no exception
@@ -312,6 +323,7 @@ class PytestProcess(Process):
                 shutil.move(coverage_temp_file_path, coverage_file_path)
 
         output: str = live_path.read_text(encoding="utf-8", errors="replace")
+        function_durations.save(self.data_dir, self.run_guid, self.name, self.result_connection)
 
         # Tests may have registered StreamHandlers pointing to live_file (now closed).
         # Remove them so subsequent log calls don't raise ValueError.
@@ -321,52 +333,22 @@ class PytestProcess(Process):
                     if hasattr(_handler, "stream") and getattr(_handler.stream, "closed", False):
                         _lgr.removeHandler(_handler)
 
-        # Stop the monitor and drain its queue while it exits. Draining as the
-        # producer shuts down keeps the OS pipe from filling, which would otherwise
-        # block the monitor's feeder thread and hang its process exit.
-        self._process_monitor_process.request_stop()
-        cpu_samples = []
-        memory_samples = []
-        commit_samples = []
-        drain_deadline = time.time() + 100.0
-        while True:
-            try:
-                monitor_info = self._process_monitor_process.process_monitor_queue.get(timeout=0.1)
-                if monitor_info.cpu_percent is not None:
-                    cpu_samples.append(monitor_info.cpu_percent)
-                if monitor_info.memory_percent is not None:
-                    memory_samples.append(monitor_info.memory_percent)
-                if monitor_info.commit_bytes is not None:
-                    commit_samples.append(monitor_info.commit_bytes)
-            except Empty:
-                if not self._process_monitor_process.is_alive():
-                    break
-                if time.time() >= drain_deadline:
-                    break
-        self._process_monitor_process.join(5.0)
-        if self._process_monitor_process.is_alive():
-            log.warning(f"{self._process_monitor_process} is alive")
-            self._process_monitor_process.kill()
-            self._process_monitor_process.join(5.0)
-        peak_cpu = max(cpu_samples) if cpu_samples else None
-        peak_memory = max(memory_samples) if memory_samples else None
-        peak_commit = max(commit_samples) if commit_samples else None
+        peak_cpu, peak_memory, peak_commit = final_peaks(self.pid, self.resource_peaks)
 
         # update the pytest process info to show that the test has finished
-        with PytestProcessInfoDB(self.data_dir) as db:
-            pytest_process_info = PytestProcessInfo(
-                self.run_guid,
-                self.name,
-                self.pid,
-                exit_code,
-                output,
-                time.time(),
-                peak_cpu,
-                peak_memory,
-                put_version=self.put_version,
-                put_fingerprint=self.put_fingerprint,
-                commit_bytes=peak_commit,
-            )
-            db.write(pytest_process_info)
+        pytest_process_info = PytestProcessInfo(
+            self.run_guid,
+            self.name,
+            self.pid,
+            exit_code,
+            output,
+            time.time(),
+            peak_cpu,
+            peak_memory,
+            put_version=self.put_version,
+            put_fingerprint=self.put_fingerprint,
+            commit_bytes=peak_commit,
+        )
+        send_result(self.result_connection, self.data_dir, pytest_process_info)
 
         log.debug(f"{self.name=},{self.name},{exit_code=},{output=}")
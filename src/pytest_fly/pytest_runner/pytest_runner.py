@@ -3,8 +3,9 @@ Test-run orchestration — coordinates a pool of worker threads that execute
 tests in parallel via :class:`PytestProcess` subprocesses.
 
 :class:`PytestRunner` is the top-level thread; each worker is a
-:class:`_TestRunner` thread that pulls from a shared queue.  Sibling modules hold the
-supporting pieces: :mod:`.run_state` (DB record → display-state classification),
+:class:`_TestRunner` thread that pulls from a shared :class:`DispatchScheduler` of dispatch
+units — a :class:`ScheduledTest`, or a :class:`ScheduledBatch` of short tests (:mod:`.batching`).
+Sibling modules hold the supporting pieces: :mod:`.run_state` (DB record → display-state classification),
 :mod:`.singleton_coordinator` (exclusive-test scheduling), and :mod:`.monitor_thread` /
 :mod:`.resource_guard` (run-scoped monitor daemons).
 
@@ -15,6 +16,7 @@ admission gates, Part D = the DB-backed run-completion view.
 
 import os
 import time
+from multiprocessing import Process
 from pathlib import Path
 from queue import Empty, Queue
 from threading import Event, Lock, Thread
@@ -22,18 +24,27 @@ from typing import Optional
 
 from typeguard import typechecked
 
-from ..db import PytestProcessInfoDB, PytestProcessInfoReader
-from ..interfaces import PyTestFlyExitCode, ScheduledTest, status_record
+from ..db import PytestProcessInfoDB, PytestProcessInfoReader, RetentionConfig, prune_results
+from ..interfaces import PyTestFlyExitCode, PytestProcessInfo, ScheduledBatch, ScheduledTest, status_record
 from ..logger import EVENT_EXTRA, get_logger
 from .admission import AdmissionGate, AdmissionGateConfig
+from .batching import DispatchUnit, plan_batches, unit_node_ids
 from .commit_memory import PSUTIL_READ_ERRORS, subtree_processes
 from .const import FAIL_OPEN_ERRORS, TIMEOUT
+from .execution import ExecutionConfig, resolve_process_class
+from .live_output import read_live_output
+from .process_monitor import ResourcePeaks, ResourceSampler
+from .process_table import invalidate_process_table
 from .pytest_process import PytestProcess, reap_pids, terminate_process_tree
 from .resource_guard import ResourceGuard, ResourceGuardConfig, ResourceGuardInfo
+from .result_writer import ResultRecord, ResultWriter, write_records
 from .run_state import TERMINAL_STATES, latest_info_per_name, latest_states
 from .run_state import PytestRunState as PytestRunState  # re-export: lived here before the run_state extraction
+from .scheduler import DispatchScheduler, SchedulerConfig
+from .session_worker import SessionWorker
 from .singleton_coordinator import SingletonCoordinator
 from .stall_watchdog import StallConfig, StallInfo, StallWatchdog
+from .wakeup import Wakeup
 
 log = get_logger()
 
@@ -67,6 +78,9 @@ class PytestRunner(Thread):
         gate_config: AdmissionGateConfig | None = None,
         stall_config: StallConfig | None = None,
         resource_guard_config: ResourceGuardConfig | None = None,
+        execution_config: ExecutionConfig | None = None,
+        scheduler_config: SchedulerConfig | None = None,
+        retention_config: RetentionConfig | None = None,
     ):
         self.run_guid = run_guid
         self.tests = tests
@@ -78,6 +92,10 @@ class PytestRunner(Thread):
         self.gate_config = gate_config or AdmissionGateConfig()
         self.stall_config = stall_config or StallConfig()
         self.resource_guard_config = resource_guard_config or ResourceGuardConfig()
+        self.execution_config = execution_config or ExecutionConfig()
+        self.scheduler_config = scheduler_config or SchedulerConfig()
+        self.retention_config = retention_config or RetentionConfig()
+        self._process_class: type[PytestProcess] = PytestProcess  # resolved from execution_config at the top of run()
         self._controller_pid = os.getpid()
 
         # Worker pool. _pool_lock guards _test_runners, _next_worker_id, and
@@ -86,11 +104,13 @@ class PytestRunner(Thread):
         self._pool_lock = Lock()
         self._test_runners = {}
         self._next_worker_id = 0
-        self._test_queue: Queue | None = None
+        self._test_queue: DispatchScheduler | None = None
         self._coordinator: SingletonCoordinator | None = None
         self._started_event = Event()
         self._watchdog: StallWatchdog | None = None
         self._resource_guard: ResourceGuard | None = None
+        self._resource_sampler = ResourceSampler(update_rate)  # peak CPU/memory of every in-flight test process
+        self._result_writer = ResultWriter(data_dir)  # the run's single DB writer for result records
         self._force_stopped = False  # one-way latch: user (or auto-escalation) force-stopped & reset
         self._stop_requested = False  # hard stop requested; suppresses pool healing and soft-stop cancel
         # Runner-owned so a pending soft stop can be canceled: workers share this single
@@ -98,32 +118,40 @@ class PytestRunner(Thread):
         # not by the first idle worker — that's what keeps the queued tests recoverable.
         self._soft_stop_event = Event()
         self._queue_finalized = False  # one-way latch: the run wound down; a soft stop can no longer be canceled
+        # Set whenever the supervision loop in run() has something to look at (a worker exited,
+        # a stop was requested or canceled, the pool was resized), so it reacts at once.
+        self._pool_changed_event = Event()
 
         super().__init__()
 
     def run(self):
         """Run the whole test-run lifecycle on this thread.
 
-        Enqueues every test (writing its QUEUED record), spins up the worker pool and the
+        Enqueues every test (writing its QUEUED record) — packing short tests into batches
+        when batching is enabled — spins up the worker pool and the
         optional monitor daemons (stall watchdog, resource guard), then supervises the pool
         until the run winds down — topping workers back up after a canceled soft stop or an
         unexpected worker death, and finalizing a soft stop by marking the still-queued
         tests STOPPED once every worker has exited.
         """
 
-        test_queue = Queue()
-        with PytestProcessInfoDB(self.data_dir) as db:
-            for test in self.tests:
-                test_queue.put(test)
-                db.write(status_record(self.run_guid, test.node_id, PyTestFlyExitCode.NONE, self.put_version, self.put_fingerprint))  # queued
+        # Set up the execution mode (e.g. start the warm forkserver template) before any
+        # worker can dispatch, so the first test already benefits from it.
+        self._process_class = resolve_process_class(self.execution_config)
+
+        units = plan_batches(self.tests, self.execution_config.batch_target_seconds) if self.execution_config.batching else self.tests
+        self._result_writer.start()
+        # queued
+        self._result_writer.write_many(status_record(self.run_guid, test.node_id, PyTestFlyExitCode.NONE, self.put_version, self.put_fingerprint) for test in self.tests)
 
         coordinator = SingletonCoordinator()
+        self._resource_sampler.start()
 
         # Publish the queue/coordinator and spawn the initial pool atomically so a
         # concurrent set_number_of_processes() either sees "not yet started" (and
         # just records the count for us to use here) or a fully-wired pool.
         with self._pool_lock:
-            self._test_queue = test_queue
+            self._test_queue = DispatchScheduler(units, self.number_of_processes, self.scheduler_config)
             self._coordinator = coordinator
             for _ in range(self.number_of_processes):
                 self._spawn_worker_locked()
@@ -166,9 +194,12 @@ class PytestRunner(Thread):
         # (covers the window where cancel_soft_stop's respawn undercounts a worker that
         # was still mid-exit) or died unexpectedly while tests remain queued.
         while True:
+            self._pool_changed_event.clear()  # before the checks, so a change made during them is seen next pass
             with self._pool_lock:
-                self._test_runners = {tid: r for tid, r in self._test_runners.items() if r.is_alive()}
-                if not self._test_runners:
+                # is_finished(): a worker signals as it exits, possibly before its thread is no longer alive
+                self._test_runners = {tid: r for tid, r in self._test_runners.items() if r.is_alive() and not r.is_finished()}
+                # (a queue refilled after the last worker exited — tests requeued by watch mode — gets a new pool below)
+                if not self._test_runners and (self._soft_stop_event.is_set() or self._stop_requested or self._test_queue.empty()):
                     if self._soft_stop_event.is_set() and not self._force_stopped:
                         self._mark_queued_tests_stopped()
                     self._queue_finalized = True
@@ -177,7 +208,24 @@ class PytestRunner(Thread):
                     active = [r for r in self._test_runners.values() if not r.is_retiring()]
                     for _ in range(self.number_of_processes - len(active)):
                         self._spawn_worker_locked()
-            time.sleep(min(self.update_rate, 1.0))
+            self._pool_changed_event.wait(min(self.update_rate, 1.0))  # the timeout only backs up the event
+
+        self._result_writer.close(TIMEOUT)  # durability point: every result of the run is committed
+        with PytestProcessInfoReader(self.data_dir) as reader:
+            storage = reader.query_output_storage()
+        log.info(
+            f"stored test output: {storage.output_count} distinct outputs for {storage.reference_count} records,"
+            f" {storage.stored_bytes} bytes stored for {storage.referenced_bytes} bytes of output"
+            f" (compression {storage.compression_ratio:.1f}x, overall {storage.overall_ratio:.1f}x)"
+        )
+        # Between runs: the workers are gone (is_running() is False), so a new run can start
+        # while this prunes; each step is a short transaction it will not wait long for.
+        try:
+            prune_results(self.data_dir, self.retention_config, should_stop=lambda: self._stop_requested)
+        except FAIL_OPEN_ERRORS as e:  # fail-open: retention must never turn a finished run into a failure
+            log.warning(f"retention pass failed: {e}")
+        self._resource_sampler.request_stop()
+        self._resource_sampler.join(TIMEOUT)
 
     def _spawn_worker_locked(self) -> None:
         """Start one worker thread pulling from the shared queue. Caller holds ``_pool_lock``."""
@@ -192,6 +240,11 @@ class PytestRunner(Thread):
             controller_pid=self._controller_pid,
             gate_config=self.gate_config,
             soft_stop_event=self._soft_stop_event,
+            process_class=self._process_class,
+            execution_config=self.execution_config,
+            resource_sampler=self._resource_sampler,
+            pool_changed_event=self._pool_changed_event,
+            result_writer=self._result_writer,
         )
         test_runner.start()
         self._test_runners[self._next_worker_id] = test_runner
@@ -204,7 +257,8 @@ class PytestRunner(Thread):
         Growing spawns additional workers that pull from the same shared queue;
         shrinking retires the most-recently-spawned workers — each finishes its
         current test, then exits *without* draining the queue, so its remaining
-        tests stay available to the surviving workers.
+        tests stay available to the surviving workers.  The scheduler is told the
+        new size so its dispatch decisions follow the pool.
 
         Reconciles against the count of live, non-retiring workers, so it is
         self-correcting and safe to call repeatedly.  If the pool has not been
@@ -216,6 +270,8 @@ class PytestRunner(Thread):
             return
         with self._pool_lock:
             self.number_of_processes = number_of_processes
+            if self._test_queue is not None:
+                self._test_queue.set_workers(number_of_processes)
             if not self._started_event.is_set():
                 # run() has not spawned the pool yet; it will use the updated count.
                 return
@@ -231,6 +287,7 @@ class PytestRunner(Thread):
                 # Retire the most-recently-spawned workers (dict preserves insertion order).
                 for test_runner in active[delta:]:
                     test_runner.retire()
+            self._pool_changed_event.set()
             log.info(f"resized worker pool to {number_of_processes} ({len(active)} active before, delta {delta}) ({self.run_guid=})", extra=EVENT_EXTRA)
 
     def is_running(self) -> bool:
@@ -316,6 +373,7 @@ class PytestRunner(Thread):
         """
         self._force_stopped = True
         self.stop()
+        self._result_writer.flush(TIMEOUT)  # so a result already sent is not overwritten with STOPPED
         try:
             with PytestProcessInfoDB(self.data_dir) as db:
                 infos = db.query(self.run_guid)
@@ -339,12 +397,7 @@ class PytestRunner(Thread):
         """
 
         # in case join is called right after .start(), wait until .run() has started all workers
-        if timeout_seconds is not None:
-            start = time.time()
-            while not self._started_event.is_set() and time.time() - start < timeout_seconds:
-                time.sleep(0.1)
-        else:
-            self._started_event.wait()
+        self._started_event.wait(timeout_seconds)
 
         with self._pool_lock:
             test_runners = list(self._test_runners.values())
@@ -363,6 +416,7 @@ class PytestRunner(Thread):
         the monitor daemons promptly instead of waiting for their next sample interval.
         """
         self._stop_requested = True
+        self._pool_changed_event.set()
         for monitor in (self._watchdog, self._resource_guard):
             if monitor is not None:
                 monitor.stop()
@@ -381,6 +435,11 @@ class PytestRunner(Thread):
         has exited and the still-queued tests have been marked STOPPED).
         """
         self._soft_stop_event.set()
+        with self._pool_lock:
+            test_runners = list(self._test_runners.values())
+        for test_runner in test_runners:
+            test_runner.wake()  # workers waiting for admission or a slot see the soft stop at once
+        self._pool_changed_event.set()
 
     def cancel_soft_stop(self) -> bool:
         """Cancel a pending soft stop so the still-queued tests keep running.
@@ -404,6 +463,7 @@ class PytestRunner(Thread):
                 for _ in range(self.number_of_processes - len(active)):
                     self._spawn_worker_locked()
             log.info(f"soft stop canceled ({self.run_guid=})", extra=EVENT_EXTRA)
+        self._pool_changed_event.set()
         return True
 
     def _mark_queued_tests_stopped(self) -> None:
@@ -411,13 +471,40 @@ class PytestRunner(Thread):
         test_queue = self._test_queue
         if test_queue is None:  # run() has not published the queue yet; nothing to drain
             return
-        with PytestProcessInfoDB(self.data_dir) as db:
-            while True:
-                try:
-                    scheduled_test = test_queue.get(False)
-                except Empty:
-                    break
-                db.write(status_record(self.run_guid, scheduled_test.node_id, PyTestFlyExitCode.STOPPED, self.put_version, self.put_fingerprint))
+        stopped = []
+        while True:
+            try:
+                unit = test_queue.get(False)
+            except Empty:
+                break
+            stopped.extend(status_record(self.run_guid, node_id, PyTestFlyExitCode.STOPPED, self.put_version, self.put_fingerprint) for node_id in unit_node_ids(unit))
+        self._result_writer.write_many(stopped)
+
+    @typechecked()
+    def requeue_tests(self, node_ids: set[str]) -> bool:
+        """Run *node_ids* again, ahead of the rest of the queue — watch mode, after a change that affects them.
+
+        An affected test in flight has its process tree terminated, and is queued again by the
+        scheduler once its worker is done with it; a pending one moves to the front; one this
+        run already finished is queued again in front.  Other tests in flight keep running.
+
+        :param node_ids: The affected tests (those not in this run are ignored).
+        :return: ``False`` if the run no longer takes tests (it wound down, or a stop is pending) — start a new run instead.
+        """
+        with self._pool_lock:
+            if self._test_queue is None or self._queue_finalized or self._stop_requested or self._force_stopped or self._soft_stop_event.is_set():
+                return False
+            tests = [test for test in self.tests if test.node_id in node_ids]
+            in_flight, queued_again = self._test_queue.requeue(tests)
+            self._result_writer.write_many(status_record(self.run_guid, node_id, PyTestFlyExitCode.NONE, self.put_version, self.put_fingerprint) for node_id in queued_again)
+            stopping = set(in_flight)
+            for test_runner in self._test_runners.values():
+                if (current_test := test_runner.current_test) in stopping:
+                    test_runner.requeue_current(current_test)
+        self._pool_changed_event.set()
+        if tests:
+            log.info(f"requeued {len(tests)} tests ahead of the queue ({len(in_flight)} stopped in flight, {len(queued_again)} queued again) ({self.run_guid=})", extra=EVENT_EXTRA)
+        return True
 
     def force_stop_test(self, test_name: str) -> bool:
         """Terminate a single running test identified by its node_id.
@@ -433,8 +520,7 @@ class PytestRunner(Thread):
         with self._pool_lock:
             test_runners = list(self._test_runners.values())
         for test_runner in test_runners:
-            proc = test_runner.process
-            if proc is not None and proc.name == test_name:
+            if test_runner.current_test == test_name:
                 test_runner.force_stop_current()
                 log.info(f'force stop requested for test "{test_name}" ({self.run_guid=})', extra=EVENT_EXTRA)
                 return True
@@ -445,7 +531,9 @@ class PytestRunner(Thread):
 class _TestRunner(Thread):
     """
     Worker thread that pulls tests from a shared queue and runs each one
-    in a dedicated :class:`PytestProcess`.  Singleton tests are run exclusively —
+    in a dedicated :class:`PytestProcess` — or, in the session-reuse execution mode, in
+    this worker's long-lived :class:`SessionWorker`.  A :class:`ScheduledBatch` runs in a
+    short-lived :class:`SessionWorker` of its own.  Singleton tests are run exclusively —
     no other workers execute concurrently.
     """
 
@@ -453,7 +541,7 @@ class _TestRunner(Thread):
     def __init__(
         self,
         run_guid: str,
-        pytest_test_queue: Queue,
+        pytest_test_queue: DispatchScheduler | Queue,
         data_dir: Path,
         update_rate: float,
         coordinator: SingletonCoordinator,
@@ -462,12 +550,18 @@ class _TestRunner(Thread):
         controller_pid: int | None = None,
         gate_config: "AdmissionGateConfig | None" = None,
         soft_stop_event: Event | None = None,
+        process_class: type[PytestProcess] = PytestProcess,
+        execution_config: ExecutionConfig | None = None,
+        resource_sampler: ResourceSampler | None = None,
+        pool_changed_event: Event | None = None,
+        result_writer: ResultWriter | None = None,
     ) -> None:
         """
         :param run_guid: GUID identifying the overall test run.
-        :param pytest_test_queue: Shared queue of :class:`ScheduledTest` to execute.
+        :param pytest_test_queue: Shared :class:`DispatchScheduler` (or plain queue) of
+            :class:`ScheduledTest` / :class:`ScheduledBatch` to execute.
         :param data_dir: Directory used for the results database.
-        :param update_rate: Polling / process-monitor sample interval in seconds.
+        :param update_rate: Polling interval in seconds.
         :param coordinator: Shared :class:`SingletonCoordinator` that gates
             singleton vs. parallel execution across all workers.
         :param controller_pid: PID of the pytest-fly controller process, used by the
@@ -475,6 +569,16 @@ class _TestRunner(Thread):
         :param gate_config: Admission-gate configuration (Part C). ``None`` disables both gates.
         :param soft_stop_event: Runner-owned soft-stop event shared by all workers, so a
             pending soft stop can be canceled centrally. ``None`` creates a private one.
+        :param process_class: :class:`PytestProcess` (sub)class to run each test in — e.g.
+            :class:`ForkserverPytestProcess` for the forkserver execution mode.
+        :param execution_config: Execution-mode configuration; in ``SESSION_REUSE`` mode tests
+            run in a per-worker :class:`SessionWorker` instead of *process_class*.
+        :param resource_sampler: The run's :class:`ResourceSampler`, which samples each test
+            process's peak CPU/memory while it runs. ``None`` records only a final reading.
+        :param pool_changed_event: Runner-owned event set when this worker exits, waking the
+            runner's supervision loop.
+        :param result_writer: The run's :class:`ResultWriter`; test processes send their records
+            to it and this worker hands it its own. ``None`` writes each record directly.
         """
         super().__init__()
 
@@ -487,12 +591,28 @@ class _TestRunner(Thread):
         self.controller_pid = controller_pid
         self.gate_config = gate_config or AdmissionGateConfig()
         self._admission_gate = AdmissionGate(self.gate_config, controller_pid)
-
-        self.process: Optional[PytestProcess] = None
+        self._process_class = process_class
+        self.execution_config = execution_config or ExecutionConfig()
+        self._resource_sampler = resource_sampler
+        self._result_writer = result_writer
+
+        self.process: Optional[Process] = None  # the PytestProcess (or SessionWorkerProcess) running the current test
+        self.current_test: str | None = None  # node id of the test in flight, or None between tests
+        self._session_worker: SessionWorker | None = None
+        # Descendants of the session worker, accumulated across all of its modules: a module's
+        # children may legitimately outlive it (session fixtures), so they are reaped only when
+        # the worker process exits.
+        self._session_descendant_snapshot: set[tuple[int, float]] = set()
         self._stop_event = Event()
         self._soft_stop_event = soft_stop_event if soft_stop_event is not None else Event()
         self._retire_event = Event()
         self._force_stop_current_event = Event()
+        self._requeue_test: str | None = None  # the test in flight to stop for requeueing (see requeue_current)
+        # Set alongside every stop/retire/force-stop request so the worker's waits (for its
+        # test process, session message or admission) return at once.
+        self._wakeup = Wakeup()
+        self._pool_changed_event = pool_changed_event
+        self._finished = False  # run() is done; set just before the thread ends
 
         self._coordinator = coordinator
 
@@ -500,12 +620,20 @@ class _TestRunner(Thread):
     # Process lifecycle helpers
     # ------------------------------------------------------------------
 
+    def _write_record(self, record: ResultRecord) -> None:
+        """Store a record this worker produced (TERMINATED, session crash) via the run's :class:`ResultWriter`."""
+        if self._result_writer is None:
+            write_records(self.data_dir, [record])
+        else:
+            self._result_writer.write(record)
+
     def _terminate_process(self, proc: PytestProcess, proc_name: str, test: str) -> None:
         """
         Terminate *proc* and all of its descendants.  ``terminate_process_tree``
         handles SIGTERM-then-SIGKILL escalation internally and waits for the
         processes to exit, so this method records the ``TERMINATED`` status to
-        the DB unconditionally.
+        the DB unconditionally — or, for a test stopped only to be requeued
+        (:meth:`requeue_current`), the queued status.
 
         :param proc: The running :class:`PytestProcess`.
         :param proc_name: Human-readable name for log messages.
@@ -522,8 +650,13 @@ class _TestRunner(Thread):
         else:
             log.info(f'process tree for test "{proc_name}" terminated ({self.run_guid=})')
 
-        with PytestProcessInfoDB(self.data_dir) as db:
-            db.write(status_record(self.run_guid, test, PyTestFlyExitCode.TERMINATED, self.put_version, self.put_fingerprint))
+        # a test stopped for requeueing is queued again (by the scheduler), not terminated
+        exit_code = PyTestFlyExitCode.NONE if self._is_requeue_stop(test) else PyTestFlyExitCode.TERMINATED
+        self._write_record(status_record(self.run_guid, test, exit_code, self.put_version, self.put_fingerprint))
+
+    def _is_requeue_stop(self, test: str) -> bool:
+        """``True`` when *test* is being stopped only to be requeued (no stop or force stop is pending)."""
+        return self._requeue_test == test and not (self._stop_event.is_set() or self._force_stop_current_event.is_set())
 
     def _handle_stop_request(self, test: str) -> None:
         """
@@ -558,19 +691,32 @@ class _TestRunner(Thread):
         # its children can no longer be enumerated from the (dead) parent. Reaped
         # on the normal-exit path so a finished test leaves no orphans (Part A).
         descendant_snapshot: set[tuple[int, float]] = set()
+        self._requeue_test = None  # a request that raced the previous test's end is not for this run of the test
+        self.current_test = test
         try:
-            self.process = PytestProcess(self.run_guid, test, self.data_dir, self.update_rate, self.put_version, self.put_fingerprint)
-            log.info(f'Starting process for test "{test}" ({self.run_guid=})')
-            self.process.start()
+            peaks = ResourcePeaks()
+            result_connection = self._result_writer.connect() if self._result_writer is not None else None
+            try:
+                self.process = self._process_class(
+                    self.run_guid, test, self.data_dir, self.update_rate, self.put_version, self.put_fingerprint, resource_peaks=peaks, result_connection=result_connection
+                )
+                log.info(f'Starting process for test "{test}" ({self.run_guid=})')
+                self.process.start()
+            finally:
+                if result_connection is not None:
+                    result_connection.close()  # the test process holds its own copy; EOF once it exits
+            if self._resource_sampler is not None:
+                self._resource_sampler.register(self.process.pid, peaks)
 
             while self.process.is_alive():
-                if self._stop_event.is_set() or self._force_stop_current_event.is_set():
+                if self._stop_event.is_set() or self._force_stop_current_event.is_set() or self._requeue_test == test:
                     self._handle_stop_request(test)
                     # terminate_process_tree already SIGKILL'd; don't loop and retry
                     break
 
                 self._refresh_descendant_snapshot(descendant_snapshot)
-                self.process.join(self.update_rate)
+                # returns when the process exits or a stop is requested; the timeout paces the snapshot refresh
+                self._wakeup.wait_any([self.process.sentinel], self.update_rate)
 
             self.process.join(TIMEOUT)  # should already be done, but just in case
             if self.process.is_alive():
@@ -578,14 +724,134 @@ class _TestRunner(Thread):
             else:
                 log.info(f'process for test "{self.process.name}" completed ({self.run_guid=})')
         finally:
+            if self._resource_sampler is not None and self.process is not None and self.process.pid is not None:
+                self._resource_sampler.unregister(self.process.pid)
             # Part A: reap any descendants left behind by a test that finished on its
             # own. Skip the stop branch — _terminate_process already tree-killed there —
             # and only reap once the parent is confirmed dead (so survivors are
             # unambiguous orphans, not a still-running test). Fail-open inside reap_pids.
-            stopped = self._stop_event.is_set() or self._force_stop_current_event.is_set()
+            stopped = self._stop_event.is_set() or self._force_stop_current_event.is_set() or self._requeue_test == test
             if not stopped and self.process is not None and not self.process.is_alive():
                 reap_pids(descendant_snapshot)
+            invalidate_process_table()  # so a dispatch waiting on the process-count gate sees the exit at once
+            self._force_stop_current_event.clear()
+            self.current_test = None
+            self._requeue_test = None
+
+    def _run_single_test_in_session(self, test: str, max_modules: int | None = None) -> None:
+        """Run a single test module in this worker's long-lived session process.  Caller owns the coordinator slot.
+
+        Starts a fresh :class:`SessionWorker` if there is none (first test, or the previous
+        one recycled / died).  The session process writes the module's RUNNING and final
+        records itself; this only writes a record when the module never got to finish — a
+        TERMINATED record on stop, an INTERNAL_ERROR record if the process died mid-module.
+
+        :param test: Node id to run.
+        :param max_modules: Module limit for a newly started worker; ``None`` uses the
+            session-reuse limits from the execution config (a batch passes its remaining size).
+        """
+        worker = self._session_worker
+        if worker is None or not worker.is_alive() or not worker.submit(test):
+            if worker is not None:
+                self._end_session_worker()
+            config = self.execution_config
+            worker = SessionWorker(
+                self.run_guid,
+                self.data_dir,
+                self.update_rate,
+                self.put_version,
+                self.put_fingerprint,
+                max_modules=config.session_max_modules if max_modules is None else max_modules,
+                max_rss_growth_mb=config.session_max_rss_growth_mb if max_modules is None else 0,
+                result_connection=self._result_writer.connect() if self._result_writer is not None else None,
+            )
+            worker.start()
+            if self._resource_sampler is not None:
+                self._resource_sampler.register(worker.process.pid, worker.resource_peaks)
+            log.info(f"started session worker pid={worker.process.pid} ({self.run_guid=})")
+            worker.submit(test)
+            self._session_worker = worker
+        self.process = worker.process
+        self._requeue_test = None  # a request that raced the previous test's end is not for this run of the test
+        self.current_test = test
+        log.info(f'Running test "{test}" in session worker pid={worker.process.pid} ({self.run_guid=})')
+
+        done = None
+        end_worker = False
+        try:
+            while done is None:
+                if self._stop_event.is_set() or self._force_stop_current_event.is_set() or self._requeue_test == test:
+                    self._handle_stop_request(test)  # tree-kills the whole session process
+                    self._session_descendant_snapshot.clear()  # already killed with the tree
+                    end_worker = True
+                    break
+                self._refresh_descendant_snapshot(self._session_descendant_snapshot)
+                self._wakeup.wait_any(worker.waitables(), self.update_rate)
+                done = worker.poll_done(0.0)
+                if done is None and not worker.is_alive():
+                    done = worker.poll_done(0.0)  # the done message may have raced the exit
+                    if done is None:
+                        self._record_session_crash(test, worker)
+                        end_worker = True
+                        break
+            if done is not None:
+                log.info(f'test "{test}" completed in session worker,exit_code={done[1].name} ({self.run_guid=})')
+                end_worker = end_worker or done[2]  # the worker asked to be recycled
+        finally:
             self._force_stop_current_event.clear()
+            self.current_test = None
+            self._requeue_test = None
+            if end_worker:
+                self._end_session_worker()
+
+    def _run_batch(self, batch: ScheduledBatch, should_abort) -> None:
+        """Run a batch of short tests back-to-back in one short-lived session process.  Caller owns the coordinator slot.
+
+        Each member gets its own records, output and coverage (written by the session
+        process).  A stop, soft stop or retire between members hands the members not yet
+        started back to the queue; a member that crashes or is force-stopped only ends the
+        process — the rest of the batch continues in a fresh one.  In ``SESSION_REUSE`` mode the
+        worker's long-lived session is set aside meanwhile, not ended, and carries on after the batch.
+        """
+        node_ids = batch.node_ids
+        log.info(f"Running batch of {len(node_ids)} tests in one process ({self.run_guid=})")
+        reusable_session = (self._session_worker, self._session_descendant_snapshot)
+        self._session_worker, self._session_descendant_snapshot = None, set()
+        try:
+            for index, test in enumerate(node_ids):
+                if index > 0 and should_abort():
+                    remaining = batch.tests[index:]
+                    self.pytest_test_queue.put(ScheduledBatch(remaining) if len(remaining) > 1 else remaining[0])
+                    break
+                self._run_single_test_in_session(test, max_modules=len(node_ids) - index)
+        finally:
+            self._end_session_worker()  # the batch's own process
+            self._session_worker, self._session_descendant_snapshot = reusable_session
+
+    def _record_session_crash(self, test: str, worker: SessionWorker) -> None:
+        """Write a final INTERNAL_ERROR record for a module whose session process died mid-run."""
+        exit_code = worker.process.exitcode
+        log.warning(f'session worker pid={worker.process.pid} died running "{test}" ({exit_code=}) ({self.run_guid=})')
+        output = read_live_output(self.data_dir, test) or ""
+        output += f"\n\nsession worker process exited unexpectedly (exit code {exit_code})\n"
+        self._write_record(
+            PytestProcessInfo(
+                self.run_guid, test, worker.process.pid, PyTestFlyExitCode.INTERNAL_ERROR, output, time.time(), put_version=self.put_version, put_fingerprint=self.put_fingerprint
+            )
+        )
+
+    def _end_session_worker(self) -> None:
+        """Shut down this worker's session process (if any) and reap what its modules left behind (Part A)."""
+        worker = self._session_worker
+        self._session_worker = None
+        if worker is None:
+            return
+        if self._resource_sampler is not None:
+            self._resource_sampler.unregister(worker.process.pid)
+        worker.shutdown(TIMEOUT)
+        if not worker.is_alive():
+            reap_pids(self._session_descendant_snapshot)
+        self._session_descendant_snapshot.clear()
 
     def _refresh_descendant_snapshot(self, snapshot: set[tuple[int, float]]) -> None:
         """Union the test process's current descendants into *snapshot* as ``(pid, create_time)``.
@@ -614,45 +880,77 @@ class _TestRunner(Thread):
             return self._stop_event.is_set() or self._soft_stop_event.is_set() or self._retire_event.is_set()
 
         while not should_abort():
-            try:
-                scheduled_test = self.pytest_test_queue.get(False)
-            except Empty:
-                break
-
-            test = scheduled_test.node_id
-            is_singleton = scheduled_test.singleton
-
-            # Part C: throttle BEFORE acquiring a coordinator slot. A worker that has
-            # dequeued but not yet acquired holds nothing, so deferring here can never
-            # starve a singleton or deadlock when every worker is waiting.
-            if not self._await_admission(should_abort, test):
-                self._handle_not_acquired(scheduled_test, test)
-                break
-
-            if is_singleton:
-                acquired = self._coordinator.acquire_singleton(should_abort, self.update_rate)
+            if isinstance(self.pytest_test_queue, DispatchScheduler):
+                # waits while the scheduler's memory budget holds back every queued unit
+                scheduled_test = self.pytest_test_queue.get_admitted(should_abort, self.update_rate)
+                if scheduled_test is None:
+                    break
             else:
-                acquired = self._coordinator.acquire_normal(should_abort, self.update_rate)
-
-            if not acquired:
-                self._handle_not_acquired(scheduled_test, test)
-                break
+                try:
+                    scheduled_test = self.pytest_test_queue.get(False)
+                except Empty:
+                    break
 
             try:
-                if is_singleton:
-                    log.info(f'Running singleton test "{test}" ({self.run_guid=})')
-                self._run_single_test(test)
+                if not self._dispatch(scheduled_test, should_abort):
+                    break
             finally:
-                if is_singleton:
-                    self._coordinator.release_singleton()
-                else:
-                    self._coordinator.release_normal()
+                if isinstance(self.pytest_test_queue, DispatchScheduler):
+                    self.pytest_test_queue.finished(scheduled_test)
+
+        self._end_session_worker()
+        self._wakeup.close()  # nothing waits on it any more; a late stop or retire request is a no-op
+        self._finished = True
+        if self._pool_changed_event is not None:
+            self._pool_changed_event.set()
 
         # On soft stop the worker just exits — it does NOT drain the queue. The queued
         # tests stay schedulable so the soft stop can be canceled; if it isn't, the
         # runner marks them STOPPED once every worker has exited (soft-stop finalization).
 
-    def _handle_not_acquired(self, scheduled_test: ScheduledTest, test: str) -> None:
+    def _dispatch(self, scheduled_test: DispatchUnit, should_abort) -> bool:
+        """Admit, acquire a coordinator slot for, and run one dequeued unit.
+
+        :return: ``False`` if the unit could not be started (stop, soft stop or retire while
+            waiting) — it has been disposed of and the worker should exit.
+        """
+        is_batch = isinstance(scheduled_test, ScheduledBatch)
+        test = f"batch of {len(scheduled_test.tests)} starting with {scheduled_test.tests[0].node_id}" if is_batch else scheduled_test.node_id
+        is_singleton = not is_batch and scheduled_test.singleton
+
+        # Part C: throttle BEFORE acquiring a coordinator slot. A worker that has
+        # dequeued but not yet acquired holds nothing, so deferring here can never
+        # starve a singleton or deadlock when every worker is waiting.
+        if not self._await_admission(should_abort, test):
+            self._handle_not_acquired(scheduled_test)
+            return False
+
+        if is_singleton:
+            acquired = self._coordinator.acquire_singleton(should_abort, self.update_rate)
+        else:
+            acquired = self._coordinator.acquire_normal(should_abort, self.update_rate)
+
+        if not acquired:
+            self._handle_not_acquired(scheduled_test)
+            return False
+
+        try:
+            if is_singleton:
+                log.info(f'Running singleton test "{test}" ({self.run_guid=})')
+            if is_batch:
+                self._run_batch(scheduled_test, should_abort)
+            elif self.execution_config.session_reuse:
+                self._run_single_test_in_session(test)
+            else:
+                self._run_single_test(test)
+        finally:
+            if is_singleton:
+                self._coordinator.release_singleton()
+            else:
+                self._coordinator.release_normal()
+        return True
+
+    def _handle_not_acquired(self, scheduled_test: DispatchUnit) -> None:
         """Dispose of a dequeued test when a slot could not be acquired or admission was aborted.
 
         Shared by the admission-gate-abort path and the coordinator-acquire-failure path:
@@ -661,7 +959,8 @@ class _TestRunner(Thread):
         it is either resumed (stop canceled) or marked STOPPED at finalization.
         """
         if self._stop_event.is_set():
-            self._handle_stop_request(test)
+            for test in unit_node_ids(scheduled_test):
+                self._handle_stop_request(test)
         elif self._soft_stop_event.is_set() or self._retire_event.is_set():
             self.pytest_test_queue.put(scheduled_test)
 
@@ -697,14 +996,22 @@ class _TestRunner(Thread):
             if defer_start is None:
                 defer_start = time.monotonic()
                 log.info(f'admission gate: deferring dispatch of "{test}" — at capacity: {", ".join(failing)}', extra=EVENT_EXTRA)
-            self._stop_event.wait(self.update_rate)  # interruptible defer
+            self._coordinator.wait_for_change(self.update_rate)  # re-check when a test finishes (or a stop wakes us)
         if defer_start is not None:
             log.info(f'admission gate: defer of "{test}" ended by stop/soft-stop/retire after {time.monotonic() - defer_start:.0f}s', extra=EVENT_EXTRA)
         return False
 
+    def wake(self) -> None:
+        """Interrupt this worker's current wait so it re-checks its stop / soft-stop / retire flags."""
+        self._wakeup.set()
+        self._coordinator.wake()
+        if isinstance(self.pytest_test_queue, DispatchScheduler):
+            self.pytest_test_queue.wake()
+
     def stop(self):
         """Signal all work to stop as soon as possible."""
         self._stop_event.set()
+        self.wake()
 
     def retire(self):
         """Signal the worker to finish its current test, then exit without draining the queue.
@@ -713,11 +1020,22 @@ class _TestRunner(Thread):
         queued tests are left for the surviving workers rather than marked STOPPED.
         """
         self._retire_event.set()
+        self.wake()
 
     def is_retiring(self) -> bool:
         """Return ``True`` if this worker has been asked to retire."""
         return self._retire_event.is_set()
 
+    def is_finished(self) -> bool:
+        """Return ``True`` once the worker has left its run loop (it may still be alive for a moment)."""
+        return self._finished
+
     def force_stop_current(self):
         """Signal this worker to terminate its currently running test."""
         self._force_stop_current_event.set()
+        self._wakeup.set()
+
+    def requeue_current(self, test: str) -> None:
+        """Signal this worker to terminate *test* if it is still running it, recording it queued rather than terminated (watch mode)."""
+        self._requeue_test = test
+        self._wakeup.set()
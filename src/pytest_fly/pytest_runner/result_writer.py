@@ -0,0 +1,252 @@
+"""
+Central, batched writing of result records.
+
+Without it every test process opens its own :class:`PytestProcessInfoDB` — which holds the
+database's EXCLUSIVE write lock for the whole ``with`` block — to write its RUNNING record,
+again for its final record (output blob included) and once more for its function durations,
+while the worker threads write QUEUED / STOPPED / TERMINATED records one connection at a
+time.  With many workers finishing together those writers queue up on the lock.
+
+A run instead owns one :class:`ResultWriter` thread.  Each test process gets the write end
+of its own one-way pipe (:meth:`ResultWriter.connect`) and sends its records down it with
+:func:`send_result`; controller threads hand theirs over with :meth:`ResultWriter.write`.
+The writer waits on every pipe at once and commits whatever has arrived in a single
+transaction per :data:`RESULT_FLUSH_INTERVAL`.  :meth:`ResultWriter.flush` is the explicit
+durability point — it returns once everything sent so far is committed — and the runner
+calls it as the run ends.
+
+A pipe per process (rather than one shared queue) keeps a test that is killed mid-send from
+corrupting, or holding a lock on, the channel every other test uses: the writer just sees
+EOF on that one pipe.  Anything sent without a writer — a process started outside a run,
+or one whose controller went away — is written directly, as before.
+"""
+
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from multiprocessing import Pipe
+from multiprocessing.connection import Connection
+from pathlib import Path
+from pickle import UnpicklingError
+from threading import Condition, Thread
+
+from ..db import FunctionDurationDB, PytestProcessInfoDB
+from ..interfaces import PytestProcessInfo
+from ..logger import get_logger
+from .const import FAIL_OPEN_ERRORS
+from .wakeup import Wakeup
+
+log = get_logger()
+
+RESULT_FLUSH_INTERVAL = 0.25  # seconds a received record may wait before its batch is committed
+WRITE_ATTEMPTS = 3  # tries of a whole batch before it is written record by record
+WRITE_RETRY_DELAY = 0.1  # seconds before the first retry, growing linearly
+
+
+@dataclass(frozen=True)
+class FunctionDurations:
+    """The passed functions' durations for one scheduled test (see :class:`FunctionDurationDB`)."""
+
+    run_guid: str
+    name: str
+    durations: dict[str, float]
+
+
+ResultRecord = PytestProcessInfo | FunctionDurations
+
+
+def _write_infos(data_dir: Path, infos: list[PytestProcessInfo]) -> None:
+    with PytestProcessInfoDB(data_dir) as db:
+        db.write_many(infos)
+
+
+def _write_durations(data_dir: Path, durations: list[FunctionDurations]) -> None:
+    with FunctionDurationDB(data_dir) as db:
+        for record in durations:
+            db.write(record.run_guid, record.name, record.durations)
+
+
+def _write_batch(write: Callable[[Path, list], None], data_dir: Path, records: list, kind: str) -> int:
+    """Commit *records* with *write* (one transaction), retrying, then record by record; return how many were lost.
+
+    The batch is retried :data:`WRITE_ATTEMPTS` times with a growing delay (a transient error —
+    typically the database locked by another writer — usually clears).  If it still fails,
+    each record is written on its own, so one bad record does not take the rest of the batch
+    (a test's final PASS / FAIL record among them) down with it.
+    """
+    for attempt in range(WRITE_ATTEMPTS):
+        try:
+            write(data_dir, records)
+            return 0
+        except FAIL_OPEN_ERRORS as e:
+            log.warning(f'writing {len(records)} {kind} to "{data_dir}" failed (attempt {attempt + 1} of {WRITE_ATTEMPTS}): {e}')
+            time.sleep(WRITE_RETRY_DELAY * (attempt + 1))
+    lost = 0
+    for record in records:
+        try:
+            write(data_dir, [record])
+        except FAIL_OPEN_ERRORS as e:
+            lost += 1
+            log.error(f'could not write {record!r:.200} to "{data_dir}": {e}', exc_info=True)
+    if lost:
+        log.error(f'lost {lost} of {len(records)} {kind} that could not be written to "{data_dir}"')
+    return lost
+
+
+def write_records(data_dir: Path, records: Iterable[ResultRecord]) -> int:
+    """Commit *records* to the run database: one transaction per table. Fail-open — retried, then written one by one, and what still fails is logged.
+
+    :return: The number of records that could not be written (lost).
+    """
+    infos = []
+    durations = []
+    for record in records:
+        (infos if isinstance(record, PytestProcessInfo) else durations).append(record)
+    lost = 0
+    if infos:
+        lost += _write_batch(_write_infos, data_dir, infos, "result records")
+    if durations:
+        lost += _write_batch(_write_durations, data_dir, durations, "duration sets")
+    return lost
+
+
+def send_result(connection: Connection | None, data_dir: Path, record: ResultRecord) -> None:
+    """Send *record* to the run's :class:`ResultWriter`, or write it directly when there is no working channel.
+
+    :param connection: Write end from :meth:`ResultWriter.connect`, or ``None`` outside a run.
+    :param data_dir: The run's data directory, for the direct-write fallback.
+    :param record: The record to store.
+    """
+    if connection is not None:
+        try:
+            connection.send(record)
+            return
+        except (OSError, ValueError) as e:  # BrokenPipeError (controller gone), closed connection
+            log.warning(f"result channel unavailable ({e}); writing {type(record).__name__} directly")
+    write_records(data_dir, [record])
+
+
+class ResultWriter(Thread):
+    """The run's single database writer for result records (see the module docstring)."""
+
+    def __init__(self, data_dir: Path, flush_interval: float = RESULT_FLUSH_INTERVAL) -> None:
+        """
+        :param data_dir: The run's data directory (holds the database).
+        :param flush_interval: Longest time a received record waits before its batch is committed.
+        """
+        super().__init__(name="result_writer", daemon=True)
+        self.data_dir = data_dir
+        self.flush_interval = flush_interval
+        self._condition = Condition()  # guards everything below
+        self._readers: list[Connection] = []
+        self._local: list[ResultRecord] = []  # handed over by controller threads
+        self._flush_requested = 0  # flush generations: requested / completed
+        self._flushed = 0
+        self._stop_requested = False
+        self._wakeup = Wakeup()
+        self.records_written = 0
+        self.batches_written = 0
+        self.records_lost = 0  # could not be written even record by record
+
+    def connect(self) -> Connection:
+        """Return the write end of a new pipe for one test process; pass it to the process and close this copy once it has started.
+
+        The writer reads the pipe until the process closes it or exits.
+        """
+        reader, writer = Pipe(duplex=False)
+        with self._condition:
+            self._readers.append(reader)
+        self._wakeup.set()
+        return writer
+
+    def write(self, record: ResultRecord) -> None:
+        """Queue a record from a controller thread for the next batch."""
+        self.write_many([record])
+
+    def write_many(self, records: Iterable[ResultRecord]) -> None:
+        """Queue several records from a controller thread for the next batch."""
+        records = list(records)
+        with self._condition:
+            if self.is_alive() and not self._stop_requested:
+                self._local.extend(records)
+                records = []
+        if records:
+            write_records(self.data_dir, records)  # not running: write through, so nothing is lost
+        else:
+            self._wakeup.set()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Commit everything sent or written so far and wait for it.
+
+        Records a test process has already sent are in its pipe, so they are included.
+
+        :param timeout: Longest wait in seconds; ``None`` waits indefinitely.
+        :return: ``True`` once committed, ``False`` on timeout.
+        """
+        with self._condition:
+            if not self.is_alive():
+                return True  # write() wrote through; nothing is pending
+            self._flush_requested += 1
+            generation = self._flush_requested
+        self._wakeup.set()
+        with self._condition:
+            return self._condition.wait_for(lambda: self._flushed >= generation or not self.is_alive(), timeout)
+
+    def close(self, timeout: float | None = None) -> None:
+        """Commit everything still pending and stop the thread."""
+        with self._condition:
+            self._stop_requested = True
+        self._wakeup.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def _receive(self, reader: Connection, pending: list[ResultRecord]) -> None:
+        """Move every record already readable on *reader* into *pending*; drop the pipe at EOF."""
+        try:
+            while reader.poll(0):
+                pending.append(reader.recv())
+        except (EOFError, OSError, UnpicklingError) as e:  # the process exited (or was killed mid-send)
+            if not isinstance(e, EOFError):
+                log.warning(f"dropping result channel after a read error: {e}")
+            with self._condition:
+                self._readers.remove(reader)
+            reader.close()
+
+    def run(self) -> None:
+        pending: list[ResultRecord] = []
+        oldest = 0.0  # when the oldest pending record arrived
+        while True:
+            with self._condition:
+                readers = list(self._readers)
+            timeout = None if not pending else max(oldest + self.flush_interval - time.monotonic(), 0.0)
+            ready = self._wakeup.wait_any(readers, timeout)
+
+            had_pending = bool(pending)
+            with self._condition:
+                flush_generation = self._flush_requested
+                stopping = self._stop_requested
+            # on a flush or stop, take what every pipe already holds, not just the ones that woke us
+            for reader in readers if flush_generation > self._flushed or stopping else ready:
+                self._receive(reader, pending)
+            with self._condition:
+                pending.extend(self._local)
+                self._local.clear()
+            if pending and not had_pending:
+                oldest = time.monotonic()
+
+            if pending and (stopping or flush_generation > self._flushed or time.monotonic() - oldest >= self.flush_interval):
+                lost = write_records(self.data_dir, pending)
+                self.records_lost += lost
+                self.records_written += len(pending) - lost
+                self.batches_written += 1
+                pending = []
+            with self._condition:
+                self._flushed = flush_generation
+                self._condition.notify_all()
+                if stopping:
+                    for reader in self._readers:
+                        reader.close()
+                    self._readers.clear()
+            if stopping:
+                self._wakeup.close()
+                return
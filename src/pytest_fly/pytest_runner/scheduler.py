@@ -0,0 +1,302 @@
+"""
+Dispatch-time test scheduling.
+
+:class:`DispatchScheduler` is the queue the :class:`_TestRunner` workers pull from.  It is a
+:class:`queue.Queue` subclass (overriding the ``_init``/``_qsize``/``_put``/``_get`` hooks,
+like :class:`queue.PriorityQueue`), so the workers' ``get(False)``/``put`` hand-off and the
+runner's soft-stop drain are unchanged.  Workers also report each unit they are done with
+via :meth:`DispatchScheduler.finished`, which lets the scheduler know what is in flight.
+
+With the default :class:`SchedulerConfig` it is a plain FIFO in the order produced by the
+ordering aspects.  With ``critical_path`` enabled it chooses the next unit when a worker
+asks for one:
+
+* **Longest predicted first (LPT).**  Each unit's prediction is its prior passing duration
+  (:attr:`ScheduledTest.duration`, or a batch's sum).  A test with no history is predicted
+  at the mean of the known durations, so it neither jumps the queue nor trails as a
+  surprise at the very end.  Ties keep the ordering-aspect order.
+* **Singleton windows.**  A singleton runs alone, so dispatching one while normal tests
+  are in flight idles every other worker until they drain.  Singletons are therefore
+  handed out only while no normal test is in flight (in practice, all together at the
+  start of the run) or once the normal work is exhausted.
+* **Pool-aware batch splitting.**  When there are more idle workers than units left, a
+  :class:`ScheduledBatch` is split so the idle workers can share its members.  The worker
+  count follows :meth:`PytestRunner.set_number_of_processes`.
+
+Tests requeued with :meth:`DispatchScheduler.requeue` (watch mode's, see :mod:`pytest_fly.watch`)
+go ahead of everything else, in the order they arrive: a pending one moves to the front, a
+finished one is queued there again, and one in flight is queued there once its worker is done
+with it.
+
+Independently of the order, a **memory budget** makes admission predictive.  Each unit's
+footprint is predicted from its historical peak commit (:attr:`ScheduledTest.peak_commit`,
+unknown at the mean of the known peaks) times a safety margin.  A unit is handed out only
+if its footprint plus the footprints already in flight fits the budget, so a worker reaches
+past a heavy unit at the head of the queue for the next one that fits, and waits in
+:meth:`DispatchScheduler.get_admitted` while none does.  Like the admission gates it only
+defers starts, and the min-1 rule applies: with nothing in flight the next unit is always
+handed out.  Singletons are exempt, as they run alone.
+"""
+
+import heapq
+import math
+import time
+from collections import Counter, deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from itertools import count
+from queue import Queue
+
+import psutil
+
+from ..interfaces import ScheduledBatch, ScheduledTest
+from ..logger import EVENT_EXTRA, get_logger
+from .batching import DispatchUnit, unit_node_ids
+
+log = get_logger()
+
+BYTES_PER_GB = 1024**3
+
+
+@dataclass(frozen=True)
+class SchedulerConfig:
+    """Configuration for dispatch-time scheduling.
+
+    Snapshotted from preferences at Run-click time, like the other run configs.
+    """
+
+    critical_path: bool = False  # opt-in: longest-predicted-first with singleton windows (else FIFO in ordering-aspect order)
+    memory_budget_bytes: int = 0  # predictive memory admission budget; 0 disables
+    memory_margin: float = 1.25  # safety factor applied to each unit's historical peak commit
+
+
+def memory_budget_bytes(budget_gb: float) -> int:
+    """Resolve the configured memory budget to bytes; ``0`` (or less) means the total physical RAM."""
+    if budget_gb > 0.0:
+        return int(budget_gb * BYTES_PER_GB)
+    return psutil.virtual_memory().total
+
+
+def _is_singleton(unit: DispatchUnit) -> bool:
+    return isinstance(unit, ScheduledTest) and unit.singleton
+
+
+def _describe(unit: DispatchUnit) -> str:
+    return f'"{unit.node_id}"' if isinstance(unit, ScheduledTest) else f'batch of {len(unit.tests)} starting with "{unit.tests[0].node_id}"'
+
+
+def known_mean_duration(units: list[DispatchUnit]) -> float:
+    """Mean prior duration over the units that have one (``0.0`` if none do) — the estimate for a unit with no history."""
+    known = [unit.duration for unit in units if unit.duration is not None]
+    return sum(known) / len(known) if known else 0.0
+
+
+def known_mean_peak_commit(units: list[DispatchUnit]) -> float:
+    """Mean historical peak commit over the units that have one (``0.0`` if none do) — the estimate for a unit with no history."""
+    known = [unit.peak_commit for unit in units if unit.peak_commit is not None]
+    return sum(known) / len(known) if known else 0.0
+
+
+class DispatchScheduler(Queue):
+    """Queue of :data:`DispatchUnit` that picks the next unit at dispatch time (see the module docstring)."""
+
+    def __init__(self, units: list[DispatchUnit], workers: int, config: SchedulerConfig | None = None) -> None:
+        """
+        :param units: Dispatch units in ordering-aspect order.
+        :param workers: Initial worker-pool size.
+        :param config: Scheduling policy; ``None`` is FIFO with no memory budget.
+        """
+        self.config = config or SchedulerConfig()
+        self._workers = workers
+        self._unknown_estimate = known_mean_duration(units)
+        self._unknown_peak_commit = known_mean_peak_commit(units)
+        super().__init__()
+        for unit in units:
+            self.put(unit)
+
+    # queue.Queue hooks — called with self.mutex held
+
+    def _init(self, maxsize: int) -> None:
+        self._pending: list[tuple[float, int, DispatchUnit]] = []  # heap of (key, sequence, unit); singletons too in FIFO mode
+        self._singletons: deque[DispatchUnit] = deque()  # critical-path mode only
+        self._sequence = count()
+        self._normal_in_flight = 0
+        self._singletons_in_flight = 0
+        self._footprint_in_flight = 0.0  # predicted bytes
+        self._node_ids_in_flight: Counter[str] = Counter()
+        self._requeue_when_finished: set[str] = set()  # in-flight node ids to queue again (in front) when finished
+
+    def _qsize(self) -> int:
+        return len(self._pending) + len(self._singletons)
+
+    def _put_front(self, unit: DispatchUnit) -> None:
+        if self.config.critical_path and _is_singleton(unit):
+            self._singletons.appendleft(unit)
+        else:
+            heapq.heappush(self._pending, (-math.inf, next(self._sequence), unit))  # ahead of any key, in arrival order
+
+    def _put(self, unit: DispatchUnit) -> None:
+        if not self.config.critical_path:
+            sequence = next(self._sequence)
+            heapq.heappush(self._pending, (float(sequence), sequence, unit))
+        elif _is_singleton(unit):
+            self._singletons.append(unit)
+        else:
+            heapq.heappush(self._pending, (-self._estimate(unit), next(self._sequence), unit))
+
+    def _get(self) -> DispatchUnit:
+        return self._take(fits_only=False)  # never None without fits_only
+
+    def _take(self, fits_only: bool) -> DispatchUnit | None:
+        """Remove and return the next unit, or ``None`` if *fits_only* and no pending unit fits the memory budget."""
+        if self.config.critical_path and self._singletons and (self._normal_in_flight == 0 or not self._pending):
+            unit = self._singletons.popleft()
+        else:
+            entry = self._pending[0]
+            if self._memory_limited() and not self._fits(entry[2]):
+                # reach past the head for the next unit (in priority order) that fits
+                entry = next((candidate for candidate in sorted(self._pending) if self._fits(candidate[2])), None)
+                if entry is None:
+                    if fits_only:
+                        return None
+                    entry = self._pending[0]
+            if entry is self._pending[0]:
+                heapq.heappop(self._pending)
+            else:
+                self._pending.remove(entry)
+                heapq.heapify(self._pending)
+            unit = entry[2]
+            idle_after = self._workers - self._normal_in_flight - self._singletons_in_flight - 1
+            if self.config.critical_path and isinstance(unit, ScheduledBatch) and idle_after > len(self._pending):
+                # more idle workers than work left: hand out the batch one member at a time
+                unit, rest = unit.tests[0], unit.tests[1:]
+                self._put(ScheduledBatch(rest) if len(rest) > 1 else rest[0])
+        if _is_singleton(unit):
+            self._singletons_in_flight += 1
+        else:
+            self._normal_in_flight += 1
+        self._footprint_in_flight += self._footprint(unit)
+        self._node_ids_in_flight.update(unit_node_ids(unit))
+        return unit
+
+    def _estimate(self, unit: DispatchUnit) -> float:
+        return self._unknown_estimate if unit.duration is None else unit.duration
+
+    def _footprint(self, unit: DispatchUnit) -> float:
+        """Predicted memory footprint of *unit* in bytes (``0.0`` when no budget is configured)."""
+        if self.config.memory_budget_bytes <= 0:
+            return 0.0
+        peak = self._unknown_peak_commit if unit.peak_commit is None else unit.peak_commit
+        return peak * self.config.memory_margin
+
+    def _memory_limited(self) -> bool:
+        """``True`` when a budget is configured and something is in flight (min-1: otherwise anything may start)."""
+        return self.config.memory_budget_bytes > 0 and self._normal_in_flight + self._singletons_in_flight > 0
+
+    def _fits(self, unit: DispatchUnit) -> bool:
+        return _is_singleton(unit) or self._footprint_in_flight + self._footprint(unit) <= self.config.memory_budget_bytes
+
+    # scheduler API
+
+    def get_admitted(self, should_abort: Callable[[], bool], poll_seconds: float) -> DispatchUnit | None:
+        """Like ``get(False)``, but while the memory budget holds back every pending unit, wait for units in flight to finish.
+
+        :param should_abort: Predicate polled while waiting; ``True`` ends the wait.
+        :param poll_seconds: Longest wait between checks of *should_abort*.
+        :return: The next unit, or ``None`` when the queue is empty or *should_abort* went true.
+        """
+        defer_start = None
+        with self.not_empty:
+            while not should_abort():
+                if not self._qsize():
+                    return None
+                unit = self._take(fits_only=True)
+                if unit is not None:
+                    if defer_start is not None:
+                        log.info(f"memory budget: admitted {_describe(unit)} after deferring {time.monotonic() - defer_start:.0f}s", extra=EVENT_EXTRA)
+                    return unit
+                if defer_start is None:
+                    defer_start = time.monotonic()
+                    head = self._pending[0][2]
+                    log.info(
+                        f"memory budget: deferring dispatch — {self._footprint_in_flight / BYTES_PER_GB:.2f} GB predicted in flight, "
+                        f"{_describe(head)} needs {self._footprint(head) / BYTES_PER_GB:.2f} GB of the {self.config.memory_budget_bytes / BYTES_PER_GB:.2f} GB budget",
+                        extra=EVENT_EXTRA,
+                    )
+                self.not_empty.wait(poll_seconds)
+        return None
+
+    def finished(self, unit: DispatchUnit) -> None:
+        """Record that a worker is done with *unit* — it ran, or was handed back with :meth:`put`."""
+        with self.mutex:
+            if _is_singleton(unit):
+                self._singletons_in_flight = max(self._singletons_in_flight - 1, 0)
+            else:
+                self._normal_in_flight = max(self._normal_in_flight - 1, 0)
+            self._footprint_in_flight = max(self._footprint_in_flight - self._footprint(unit), 0.0)
+            self._node_ids_in_flight.subtract(unit_node_ids(unit))
+            if self._requeue_when_finished:
+                pending = {node_id for _key, _sequence, pending_unit in self._pending for node_id in unit_node_ids(pending_unit)}
+                pending.update(node_id for singleton in self._singletons for node_id in unit_node_ids(singleton))
+                for test in unit.tests if isinstance(unit, ScheduledBatch) else [unit]:
+                    if test.node_id in self._requeue_when_finished and self._node_ids_in_flight[test.node_id] <= 0:
+                        self._requeue_when_finished.discard(test.node_id)
+                        if test.node_id not in pending:  # not handed back with put() already
+                            self._put_front(test)
+                            self.unfinished_tasks += 1
+            self.not_empty.notify_all()  # memory freed: wake workers waiting in get_admitted
+
+    def requeue(self, tests: list[ScheduledTest]) -> tuple[list[str], list[str]]:
+        """Queue *tests* to run (again) ahead of every other pending unit, in their order.
+
+        A pending test's unit moves to the front; a test in flight is queued in front when its
+        worker reports it :meth:`finished` (the caller may stop it sooner); any other test —
+        one that already ran — is queued in front now.
+
+        :param tests: Tests of this run.
+        :return: ``(in_flight, queued_again)`` — the node ids queued once finished, and those queued now.
+        """
+        with self.mutex:
+            node_ids = {test.node_id for test in tests}
+            pending = self._move_to_front(node_ids)
+            in_flight = [test.node_id for test in tests if test.node_id not in pending and self._node_ids_in_flight[test.node_id] > 0]
+            self._requeue_when_finished.update(in_flight)
+            queued_again = [test for test in tests if test.node_id not in pending and test.node_id not in in_flight]
+            for test in queued_again:
+                self._put_front(test)
+                self.unfinished_tasks += 1
+            self.not_empty.notify_all()
+            return in_flight, [test.node_id for test in queued_again]
+
+    def _move_to_front(self, node_ids: set[str]) -> set[str]:
+        """Move the pending units holding any of *node_ids* to the front; return the node ids among *node_ids* that are pending."""
+        moved = [entry[2] for entry in sorted(self._pending) if not node_ids.isdisjoint(unit_node_ids(entry[2]))]
+        singletons = [unit for unit in self._singletons if not node_ids.isdisjoint(unit_node_ids(unit))]
+        moved_ids = {id(unit) for unit in moved + singletons}
+        self._pending = [entry for entry in self._pending if id(entry[2]) not in moved_ids]
+        heapq.heapify(self._pending)
+        self._singletons = deque(unit for unit in self._singletons if id(unit) not in moved_ids)
+        for unit in moved:
+            self._put_front(unit)
+        self._singletons.extendleft(reversed(singletons))
+        return {node_id for unit in moved + singletons for node_id in unit_node_ids(unit) if node_id in node_ids}
+
+    def wake(self) -> None:
+        """Wake workers waiting in :meth:`get_admitted` so they re-check their abort predicate."""
+        with self.mutex:
+            self.not_empty.notify_all()
+
+    def set_workers(self, workers: int) -> None:
+        """Update the worker-pool size after a resize."""
+        with self.mutex:
+            self._workers = workers
+
+    def in_flight(self) -> int:
+        """Number of units handed out and not yet :meth:`finished`."""
+        with self.mutex:
+            return self._normal_in_flight + self._singletons_in_flight
+
+    def footprint_in_flight(self) -> float:
+        """Predicted memory footprint (bytes) of the units in flight."""
+        with self.mutex:
+            return self._footprint_in_flight
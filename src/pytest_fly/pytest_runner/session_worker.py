@@ -0,0 +1,210 @@
+"""
+Session-reuse execution mode — a long-lived worker process per :class:`_TestRunner`.
+
+In :attr:`ExecutionMode.SESSION_REUSE` each worker thread keeps one
+:class:`SessionWorkerProcess` alive and feeds it module node ids over a pipe.  The process
+runs them back-to-back inside a single pytest session (:mod:`.module_stream`), so
+interpreter startup, imports and session-scoped fixtures are paid once per worker rather
+than once per module.  Every module still gets its own RUNNING/final records, live output,
+exit code and coverage file.
+
+To bound leaks (and the blast radius of a test that corrupts global state), the process
+recycles itself after :attr:`SessionWorkerProcess.max_modules` modules or
+:attr:`SessionWorkerProcess.max_rss_growth_mb` MB of RSS growth, and after any module that
+left the session unusable (``-x``/``--maxfail`` tripped, internal error).  The controller
+then starts a fresh process for the worker's next module.
+
+Protocol (controller → worker): a node id per module, ``None`` to exit.
+Protocol (worker → controller): ``(node_id, exit_code, recycle)`` after each module.
+"""
+
+import contextlib
+import os
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Connection
+from pathlib import Path
+
+import psutil
+from typeguard import typechecked
+
+from ..interfaces import PyTestFlyExitCode
+from ..logger import configure_child_logger, get_logger
+from .module_stream import ModuleRecorder, SwitchableStream, run_module_stream
+from .process_monitor import ResourcePeaks
+from .pytest_process import terminate_process_tree
+
+log = get_logger()
+
+SESSION_MAX_MODULES_DEFAULT = 50
+SESSION_MAX_RSS_GROWTH_MB_DEFAULT = 1024
+
+
+def _rss_mb() -> float | None:
+    try:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except psutil.Error:
+        return None
+
+
+class SessionWorkerProcess(Process):
+    """A process that runs a stream of test modules in one pytest session."""
+
+    @typechecked()
+    def __init__(
+        self,
+        run_guid: str,
+        connection: Connection,
+        data_dir: Path,
+        update_rate: float,
+        put_version: str = "",
+        put_fingerprint: str = "",
+        max_modules: int = SESSION_MAX_MODULES_DEFAULT,
+        max_rss_growth_mb: int = SESSION_MAX_RSS_GROWTH_MB_DEFAULT,
+        resource_peaks: ResourcePeaks | None = None,
+        result_connection: Connection | None = None,
+    ) -> None:
+        """
+        :param run_guid: the pytest run this process is associated with
+        :param connection: child end of the controller pipe (node ids in, done messages out)
+        :param data_dir: the directory to store results, live output and coverage data in
+        :param update_rate: the run's update rate (seconds)
+        :param put_version: display label for the program under test (stamped on each DB record)
+        :param put_fingerprint: program-under-test fingerprint for RunMode.CHECK comparison
+        :param max_modules: recycle after this many modules (``0`` = no limit)
+        :param max_rss_growth_mb: recycle once RSS has grown this much past its level after the first module (``0`` = no limit)
+        :param resource_peaks: peaks the controller's :class:`ResourceSampler` raises while this process runs
+        :param result_connection: write end of this process's channel to the run's :class:`ResultWriter`; ``None`` writes records directly
+        """
+        super().__init__(name="session_worker")
+        self.run_guid = run_guid
+        self.data_dir = data_dir
+        self.update_rate = update_rate
+        self.put_version = put_version
+        self.put_fingerprint = put_fingerprint
+        self.max_modules = max_modules
+        self.max_rss_growth_mb = max_rss_growth_mb
+        self.resource_peaks = resource_peaks
+        self.result_connection = result_connection
+        self._connection = connection
+        self._recycle = False
+        self._baseline_rss_mb: float | None = None
+
+    def _should_recycle(self, modules_run: int, session_usable: bool) -> bool:
+        if not session_usable:
+            return True
+        if self.max_modules > 0 and modules_run >= self.max_modules:
+            log.info(f"session worker recycling after {modules_run} modules")
+            return True
+        rss = _rss_mb()
+        if self._baseline_rss_mb is None:
+            self._baseline_rss_mb = rss  # measured once the session (and its fixtures) is warm
+        elif self.max_rss_growth_mb > 0 and rss is not None and rss - self._baseline_rss_mb >= self.max_rss_growth_mb:
+            log.info(f"session worker recycling after RSS grew {rss - self._baseline_rss_mb:.0f} MB")
+            return True
+        return False
+
+    def _node_ids(self, first_node_id: str):
+        yield first_node_id
+        while not self._recycle:
+            try:
+                node_id = self._connection.recv()
+            except EOFError:
+                return  # controller went away
+            if node_id is None:
+                return
+            yield node_id
+
+    def run(self) -> None:
+        configure_child_logger(f"session_worker_{self.pid}.log")
+        try:
+            first_node_id = self._connection.recv()
+        except EOFError:
+            return
+        if first_node_id is None:
+            return
+
+        with open(os.devnull, "w") as idle_output:
+            stream = SwitchableStream(idle_output)
+
+            def on_finished(node_id: str, exit_code: PyTestFlyExitCode, session_usable: bool) -> None:
+                self._recycle = self._should_recycle(recorder.modules_started, session_usable)
+                self._connection.send((node_id, int(exit_code), self._recycle))
+
+            recorder = ModuleRecorder(self.run_guid, self.data_dir, self.update_rate, stream, self.put_version, self.put_fingerprint, on_finished, self.resource_peaks, self.result_connection)
+            with contextlib.redirect_stdout(stream), contextlib.redirect_stderr(stream):
+                exit_code = run_module_stream(first_node_id, self._node_ids(first_node_id), recorder, stream)
+        log.info(f"session worker exiting after {recorder.modules_started} modules,{exit_code=}")
+        self._connection.close()
+
+
+class SessionWorker:
+    """Controller-side handle for one :class:`SessionWorkerProcess` and its pipe."""
+
+    @typechecked()
+    def __init__(
+        self,
+        run_guid: str,
+        data_dir: Path,
+        update_rate: float,
+        put_version: str = "",
+        put_fingerprint: str = "",
+        max_modules: int = SESSION_MAX_MODULES_DEFAULT,
+        max_rss_growth_mb: int = SESSION_MAX_RSS_GROWTH_MB_DEFAULT,
+        result_connection: Connection | None = None,
+    ) -> None:
+        self._connection, child_connection = Pipe()
+        self.resource_peaks = ResourcePeaks()  # registered with the run's ResourceSampler once the process has started
+        self.process = SessionWorkerProcess(
+            run_guid, child_connection, data_dir, update_rate, put_version, put_fingerprint, max_modules, max_rss_growth_mb, self.resource_peaks, result_connection
+        )
+        self._child_connection = child_connection
+        self._result_connection = result_connection
+
+    def start(self) -> None:
+        try:
+            self.process.start()
+        finally:
+            # the child owns its ends now; EOF on ours means the child died
+            self._child_connection.close()
+            if self._result_connection is not None:
+                self._result_connection.close()
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def submit(self, node_id: str) -> bool:
+        """Send the next module to the worker. Returns ``False`` if the worker is gone."""
+        try:
+            self._connection.send(node_id)
+        except (OSError, ValueError) as e:  # BrokenPipeError, closed connection
+            log.info(f"session worker pid={self.process.pid} cannot accept {node_id}: {e}")
+            return False
+        return True
+
+    def waitables(self) -> list:
+        """Objects :func:`multiprocessing.connection.wait` can wait on for this worker: its pipe (done message) and process sentinel (exit)."""
+        return [self._connection, self.process.sentinel]
+
+    def poll_done(self, timeout: float) -> tuple[str, PyTestFlyExitCode, bool] | None:
+        """Wait up to *timeout* seconds for the current module's ``(node_id, exit_code, recycle)`` message."""
+        try:
+            if not self._connection.poll(timeout):
+                return None
+            node_id, exit_code, recycle = self._connection.recv()
+        except (EOFError, OSError, ValueError):
+            return None
+        return node_id, PyTestFlyExitCode(exit_code), recycle
+
+    def shutdown(self, timeout: float) -> None:
+        """Ask the worker to exit, wait up to *timeout* seconds, then tree-kill it if it is still alive."""
+        if self.process.is_alive():
+            try:
+                self._connection.send(None)
+            except (OSError, ValueError):
+                pass
+            self.process.join(timeout)
+        if self.process.is_alive():
+            log.warning(f"session worker pid={self.process.pid} did not exit; terminating")
+            terminate_process_tree(self.process.pid, reap_parent=False)
+            self.process.join(timeout)
+        self._connection.close()
@@ -0,0 +1,116 @@
+"""
+Automatic splitting of critical-path modules into shards.
+
+A parallel run can finish no sooner than its longest single test.  When one module's prior
+duration exceeds the ideal per-worker share of the run (total prior work ÷ processes), that
+module alone sets the critical path however many workers there are.  Only those modules are
+split — into class-level shards when that is fine enough, otherwise into function-level
+shards — so the rest of the suite keeps module granularity and pays no extra process
+startup.  Each shard is an ordinary pytest node id (``path::Class`` / ``path::function``)
+and flows through the runner, DB and GUI like any other scheduled test.
+
+Shard sizes (the :attr:`ScheduledTest.duration` the ordering aspects and ETA use) come from
+the per-function durations recorded by :class:`FunctionDurationRecorder`.  Functions with no
+recorded duration (new since the last pass, or never passed) share whatever part of the
+module's prior duration the recorded functions do not explain.
+"""
+
+from dataclasses import dataclass
+
+from typeguard import typechecked
+
+from ..interfaces import ScheduledTest, SchedulingGranularity
+from ..logger import EVENT_EXTRA, get_logger
+from .test_list import NODE_ID_DELIMITER, scheduling_node_id
+
+log = get_logger()
+
+
+@dataclass(frozen=True)
+class ShardingConfig:
+    """Configuration for automatic critical-path module splitting.
+
+    Snapshotted from preferences at Run-click time, like the other run configs.
+    """
+
+    enabled: bool = False  # opt-in: split modules whose prior duration exceeds the per-worker share
+
+
+@typechecked()
+def ideal_share(tests: list[ScheduledTest], prior_durations: dict[str, float], processes: int) -> float | None:
+    """Return the ideal per-worker share of the run's known prior work, or ``None`` if there is none."""
+    total = sum(prior_durations.get(test.node_id, 0.0) for test in tests)
+    if total <= 0.0 or processes < 1:
+        return None
+    return total / processes
+
+
+@typechecked()
+def shard_durations(module_duration: float, functions: list[str], function_durations: dict[str, float], level: SchedulingGranularity) -> dict[str, float]:
+    """Group a module's *functions* into shards at *level* and estimate each shard's duration.
+
+    :param module_duration: The module's prior (whole-module) duration in seconds.
+    :param functions: Function-level node ids currently collected in the module.
+    :param function_durations: Recorded function durations (function-level node id → seconds).
+    :param level: ``CLASS`` or ``FUNCTION``.
+    :return: Shard node id → estimated seconds, in collection order.
+    """
+    unknown = [function for function in functions if function not in function_durations]
+    known_total = sum(function_durations[function] for function in functions if function in function_durations)
+    unknown_each = max(module_duration - known_total, 0.0) / len(unknown) if unknown else 0.0
+    shards: dict[str, float] = {}
+    for function in functions:
+        shard = scheduling_node_id(function, level)
+        shards[shard] = shards.get(shard, 0.0) + function_durations.get(function, unknown_each)
+    return shards
+
+
+@typechecked()
+def split_critical_path_modules(
+    tests: list[ScheduledTest],
+    prior_durations: dict[str, float],
+    function_ids: dict[str, list[str]],
+    function_durations: dict[str, float],
+    processes: int,
+) -> list[ScheduledTest]:
+    """Replace each critical-path module in *tests* with its shards (in place, keeping order).
+
+    A module is split when it is module-granular, not a singleton, has recorded function
+    durations, and its prior duration exceeds :func:`ideal_share`.  Class-level shards are
+    used when every class-level shard fits within the share; otherwise function-level.  A
+    module that would yield fewer than two shards is left whole.
+
+    :param tests: Scheduled tests (any granularity; only whole modules are candidates).
+    :param prior_durations: Node id → most recent passing duration (``query_last_pass``).
+    :param function_ids: Node id → function-level ids currently collected under it (:meth:`GetTests.get_function_ids`).
+    :param function_durations: Function-level node id → recorded duration (``query_function_durations``).
+    :param processes: Number of worker processes.
+    :return: The new test list; shards carry their estimated duration.
+    """
+    share = ideal_share(tests, prior_durations, processes) if processes > 1 else None
+    if share is None:
+        return tests
+
+    result: list[ScheduledTest] = []
+    for test in tests:
+        module_duration = prior_durations.get(test.node_id)
+        functions = function_ids.get(test.node_id, [])
+        if NODE_ID_DELIMITER in test.node_id or test.singleton or module_duration is None or module_duration <= share or not any(function in function_durations for function in functions):
+            result.append(test)
+            continue
+
+        shards = shard_durations(module_duration, functions, function_durations, SchedulingGranularity.CLASS)
+        level = SchedulingGranularity.CLASS
+        if len(shards) < 2 or max(shards.values()) > share:
+            shards = shard_durations(module_duration, functions, function_durations, SchedulingGranularity.FUNCTION)
+            level = SchedulingGranularity.FUNCTION
+        if len(shards) < 2:
+            result.append(test)
+            continue
+
+        log.info(
+            f'splitting critical-path module "{test.node_id}" ({module_duration:.1f}s > {share:.1f}s per-worker share) into {len(shards)} {level.name.lower()}-level shards',
+            extra=EVENT_EXTRA,
+        )
+        result.extend(ScheduledTest(node_id=shard, singleton=False, duration=duration, coverage=test.coverage) for shard, duration in shards.items())
+    return result
@@ -19,8 +19,9 @@ class SingletonCoordinator:
     :class:`threading.Condition` so check-and-claim is atomic.  Waiting
     singletons block new normal acquisitions, preventing starvation.
 
-    Acquires are poll-interruptible via *stop_predicate* so a worker can
-    abandon its wait when a stop has been requested.
+    Acquires are interruptible via *stop_predicate* so a worker can abandon its
+    wait when a stop has been requested; whoever requests the stop calls
+    :meth:`wake` so waiters re-check it at once rather than at the next poll.
     """
 
     def __init__(self) -> None:
@@ -28,6 +29,7 @@ class SingletonCoordinator:
         self._active = 0
         self._singleton_running = False
         self._singleton_waiters = 0
+        self._changes = 0  # bumped on every release and wake, for wait_for_change
 
     def acquire_normal(self, stop_predicate, poll_interval: float) -> bool:
         """Claim a non-exclusive slot.  Returns ``False`` if *stop_predicate* went true while waiting."""
@@ -43,6 +45,7 @@ class SingletonCoordinator:
         """Release a slot claimed with :meth:`acquire_normal`."""
         with self._cond:
             self._active -= 1
+            self._changes += 1
             self._cond.notify_all()
 
     def acquire_singleton(self, stop_predicate, poll_interval: float) -> bool:
@@ -67,8 +70,24 @@ class SingletonCoordinator:
         with self._cond:
             self._singleton_running = False
             self._active -= 1
+            self._changes += 1
             self._cond.notify_all()
 
+    def wake(self) -> None:
+        """Wake every waiter so it re-checks its stop predicate (call after requesting a stop)."""
+        with self._cond:
+            self._changes += 1
+            self._cond.notify_all()
+
+    def wait_for_change(self, timeout: float) -> bool:
+        """Wait until a slot is released or :meth:`wake` is called, at most *timeout* seconds.
+
+        :return: ``True`` if woken by a release/wake, ``False`` on timeout.
+        """
+        with self._cond:
+            changes = self._changes
+            return self._cond.wait_for(lambda: self._changes != changes, timeout)
+
     def active_slot_count(self) -> int:
         """Return the number of in-flight slots (normal + singleton).
 
@@ -2,9 +2,8 @@
 System-wide resource monitor subprocess — periodically samples CPU, memory,
 disk I/O, and network I/O and makes readings available via a shared queue.
 
-Shares the same shape as :class:`pytest_fly.pytest_runner.process_monitor.ProcessMonitor`
-(a :class:`multiprocessing.Process` with a `Queue`-based drain and a `request_stop()`
-event) so the GUI can drain it with identical plumbing.
+A :class:`multiprocessing.Process` with a `Queue`-based drain and a `request_stop()`
+event, so the GUI drains it off the UI thread.
 """
 
 import time
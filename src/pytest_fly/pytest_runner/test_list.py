@@ -1,50 +1,97 @@
 """
-Test discovery subprocess — collects pytest test node IDs via
-``pytest --collect-only`` and returns them as :class:`ScheduledTest` objects.
+Test discovery subprocess — collects pytest test node IDs via a single (cached)
+``pytest --collect-only`` pass and returns them as :class:`ScheduledTest` objects.
+
+The collected item ids are reduced to the configured :class:`SchedulingGranularity`
+(module, class or function) — that reduced id is what gets scheduled, run, stored in the
+DB and shown in the GUI.
 """
 
 import os
-import sys
+import time
+from contextlib import redirect_stdout
 from io import StringIO
 from multiprocessing import Process, Queue
 from pathlib import Path
 from queue import Empty
 
-import pytest
 from typeguard import typechecked
 
-from ..interfaces import ScheduledTest
+from ..interfaces import ScheduledTest, SchedulingGranularity
 from ..logger import configure_child_logger, get_logger
+from .collection_cache import collect_tests
 
 log = get_logger()
 
+NODE_ID_DELIMITER = "::"
+
+
+@typechecked()
+def module_of(node_id: str) -> str:
+    """Return the module (file path) part of a node id — the node id itself at MODULE granularity."""
+    return node_id.split(NODE_ID_DELIMITER)[0]
+
+
+@typechecked()
+def scheduling_node_id(item_node_id: str, granularity: SchedulingGranularity = SchedulingGranularity.MODULE) -> str:
+    """Reduce a collected pytest item id to the node id scheduled at *granularity*.
+
+    ``tests/test_a.py::TestA::test_x[1-2]`` becomes ``tests/test_a.py`` (MODULE),
+    ``tests/test_a.py::TestA`` (CLASS) or ``tests/test_a.py::TestA::test_x`` (FUNCTION).
+    Parametrizations are never split: a function's cases always run together. At CLASS
+    granularity a function outside any class is scheduled on its own.
+
+    :param item_node_id: An item id as printed by ``pytest --collect-only -q``.
+    :param granularity: The scheduling unit.
+    :return: The node id to schedule (always a valid pytest node id).
+    """
+    # The parametrization starts at the first "[" after the module path (which may hold a "[" of its
+    # own; class and function names cannot) and may itself hold brackets, "::" or "/".
+    module, delimiter, rest = item_node_id.partition(NODE_ID_DELIMITER)
+    if delimiter and rest.endswith("]") and "[" in rest:
+        rest = rest[: rest.index("[")]
+        item_node_id = f"{module}{delimiter}{rest}"
+    parts = [module, *rest.split(NODE_ID_DELIMITER)] if delimiter else [module]
+    if granularity == SchedulingGranularity.MODULE:
+        return parts[0]
+    if granularity == SchedulingGranularity.CLASS and len(parts) > 2:
+        return NODE_ID_DELIMITER.join(parts[:2])  # the (outermost) class
+    return item_node_id
+
 
 class GetTests(Process):
     """Test-discovery subprocess: collects every pytest test under a directory (recursively).
 
-    Runs ``pytest --collect-only`` in a separate process (twice — non-singleton tests, then
-    ``@pytest.mark.singleton`` tests) and returns the node IDs as :class:`ScheduledTest`
-    objects via :meth:`get_tests` after :meth:`join`.
+    Runs a single ``pytest --collect-only`` pass in a separate process, with a plugin that reads
+    each item's ``@pytest.mark.singleton`` marker (see :mod:`.collection_cache`), and returns the
+    node IDs as :class:`ScheduledTest` objects via :meth:`get_tests` after :meth:`join`.  With a
+    *cache_dir*, unchanged test modules are not collected again.  The function-level ids under
+    each scheduled node id are available from :meth:`get_function_ids` (used to split modules).
     """
 
-    def __init__(self, test_dir: Path = Path("").resolve()):
+    def __init__(self, test_dir: Path = Path("").resolve(), granularity: SchedulingGranularity = SchedulingGranularity.MODULE, cache_dir: Path | None = None):
         """
         :param test_dir: Directory in which to discover pytest tests.
+        :param granularity: Scheduling unit the collected ids are reduced to (see :func:`scheduling_node_id`).
+        :param cache_dir: Directory holding the collection cache, or ``None`` to always collect every module.
         """
         self.test_dir = test_dir
+        self.granularity = granularity
+        self.cache_dir = cache_dir
         self.scheduled_tests: list[ScheduledTest] = []
+        self.function_ids: dict[str, list[str]] = {}
         self._scheduled_tests_queue = Queue()
+        self._function_ids_queue = Queue()
         super().__init__()
 
     @typechecked()
     def run(self):
         """Collect test node IDs and push them onto the result queue.
 
-        Two ``--collect-only`` passes (plain tests, then ``-m singleton``) with stdout
-        temporarily redirected so pytest's quiet collection output can be parsed.
+        pytest's quiet collection output is discarded; the items come from the collection plugin.
         Third-party plugin autoloading is disabled — auto-loaded plugins (pytest-xdist,
-        pytest-qt, pytest-randomly, ...) can deadlock or distort collection output in
-        this spawned child process.
+        pytest-qt, pytest-randomly, ...) can deadlock or distort collection in this spawned
+        child process.
         """
         configure_child_logger("get_tests.log")
         log.info(f"{self.test_dir=}")
@@ -54,63 +101,68 @@ class GetTests(Process):
         # --collect-only output when auto-loaded into this spawned child process.
         os.environ["PYTEST_DISABLE_PLUGIN_AUTOLOAD"] = "1"
 
-        # value is True if the test is marked with 'singleton', False otherwise
-        pytest_tests = {}  # type: dict[str, bool]
+        with redirect_stdout(StringIO()):
+            items = collect_tests(self.test_dir, self.cache_dir)
 
-        # singleton last
-        for collect_singleton in (False, True):
-            # Temporarily redirect stdout so we can parse pytest’s collection output.
-            original_stdout = sys.stdout
-            buffer = StringIO()
-            sys.stdout = buffer
-
-            try:
-                # Instruct pytest to only collect tests (no execution) quietly.
-                # -q (quiet) flag makes the output more predictable.
-                collect_parameters = ["--collect-only", "-q"]
-                # "-m singleton" is used to filter tests by the ‘singleton’ marker. "-m not singleton" is used to filter out tests with the ‘singleton’ marker.
-                if collect_singleton:
-                    collect_parameters.extend(["-m", "singleton"])
-                collect_parameters.append(str(self.test_dir))
-
-                pytest.main(collect_parameters)
-
-                # The buffer now contains lines with test node IDs plus possibly other text
-                buffer_value = buffer.getvalue()
-                lines = buffer_value.strip().split("\n")
-
-                # Filter out lines that don’t look like test node IDs.
-                # A simplistic approach is to keep lines containing ‘::’ (the typical pytest node-id pattern).
-                delimiter = "::"
-
-                for line in lines:
-                    if delimiter in line:
-                        # Extract the node ID from the line.
-                        # The node ID is typically the first part of the line before the delimiter.
-                        node_id = line.split(delimiter)[0]
-                        pytest_tests[node_id] = collect_singleton
-            finally:
-                # Restore the original stdout
-                sys.stdout = original_stdout
+        # value is True if any item under the node id is marked with 'singleton', False otherwise
+        pytest_tests = {}  # type: dict[str, bool]
+        function_ids = {}  # type: dict[str, list[str]]
+        for item_node_id, singleton in items:
+            # Reduce the item id to the scheduling unit (by default, the module).
+            node_id = scheduling_node_id(item_node_id, self.granularity)
+            pytest_tests[node_id] = pytest_tests.get(node_id, False) or singleton
+            function_id = scheduling_node_id(item_node_id, SchedulingGranularity.FUNCTION)
+            functions = function_ids.setdefault(node_id, [])
+            if function_id not in functions:
+                functions.append(function_id)
 
         # Duration and coverage are populated later by ControlWindow when coverage ordering is enabled.
         for node_id, singleton in pytest_tests.items():
             self._scheduled_tests_queue.put(ScheduledTest(node_id, singleton, None, None))
+            self._function_ids_queue.put((node_id, function_ids.get(node_id, [])))
 
         log.info(f'Discovered {len(pytest_tests)} pytest tests in "{self.test_dir}"')
 
-    def get_tests(self) -> list[ScheduledTest]:
-        """
-        Returns the list of scheduled tests after the process has run.
+    def join(self, timeout: float | None = None) -> None:
+        """Wait for the process to end (at most *timeout* seconds), receiving its results meanwhile.
+
+        The results travel through a pipe the process can only finish writing while it is read,
+        so waiting without reading would never end on a large project.
         """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.is_alive() and (deadline is None or time.monotonic() < deadline):
+            self._receive()
+            super().join(0.05)
+        self._receive()
+        super().join(0)
+
+    def _receive(self) -> None:
+        """Move the results sent so far from the queues to :attr:`scheduled_tests` and :attr:`function_ids`."""
         try:
             while test := self._scheduled_tests_queue.get(False):
                 self.scheduled_tests.append(test)
         except Empty:
             pass
+        try:
+            while entry := self._function_ids_queue.get(False):
+                node_id, functions = entry
+                self.function_ids[node_id] = functions
+        except Empty:
+            pass
+
+    def get_tests(self) -> list[ScheduledTest]:
+        """
+        Returns the list of scheduled tests after the process has run.
+        """
+        self._receive()
 
         # Deterministic discovery order — the final execution order is decided
         # later by :func:`pytest_fly.pytest_runner.ordering.apply_ordering_aspects`.
         self.scheduled_tests.sort(key=lambda t: t.node_id)
 
         return self.scheduled_tests
+
+    def get_function_ids(self) -> dict[str, list[str]]:
+        """Return scheduled node id → the function-level node ids collected under it (call after :meth:`join`)."""
+        self._receive()
+        return self.function_ids
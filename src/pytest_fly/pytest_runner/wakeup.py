@@ -0,0 +1,69 @@
+"""
+Readiness-based waiting for the worker threads.
+
+A :class:`_TestRunner` waits for several things at once — its test process exiting (the
+process *sentinel*), a session worker's "module done" message (a pipe), and a stop, soft
+stop, retire or force-stop request (a :class:`threading.Event` set from another thread).
+:func:`multiprocessing.connection.wait` can wait on the first two together but not on a
+``threading.Event``, so :class:`Wakeup` backs the flag with a one-way pipe whose read end
+is waitable, on Windows as well as POSIX.  Every wait therefore returns as soon as any of
+those happens, rather than at the next poll tick.
+"""
+
+from multiprocessing import Pipe
+from multiprocessing.connection import Connection, wait
+from threading import Lock
+
+
+class Wakeup:
+    """An event flag that :func:`multiprocessing.connection.wait` can wait on alongside process sentinels and pipes."""
+
+    def __init__(self) -> None:
+        self._reader, self._writer = Pipe(duplex=False)
+        self._lock = Lock()
+        self._set = False
+        self._closed = False
+
+    @property
+    def connection(self) -> Connection:
+        """The waitable read end: ready while the flag is set."""
+        return self._reader
+
+    def set(self) -> None:
+        """Set the flag, waking every :meth:`wait` / :func:`wait_any` that includes it."""
+        with self._lock:
+            if not self._set and not self._closed:  # once closed, there is no waiter left to wake
+                self._set = True
+                self._writer.send_bytes(b"\0")
+
+    def clear(self) -> None:
+        """Reset the flag."""
+        with self._lock:
+            if self._set and not self._closed:
+                self._reader.recv_bytes()
+                self._set = False
+
+    def is_set(self) -> bool:
+        with self._lock:
+            return self._set
+
+    def wait_any(self, objects: list, timeout: float | None) -> list:
+        """Wait until one of *objects* (sentinels / connections) is ready, the flag is set, or *timeout* expires.
+
+        The flag is cleared before returning, so callers re-check their stop conditions after
+        every wait — a request made while the caller was busy is then still seen, because the
+        request's own flag (e.g. a ``threading.Event``) is set before this one.
+
+        :return: The ready objects from *objects* (empty on timeout or wakeup).
+        """
+        ready = wait([*objects, self._reader], timeout)
+        self.clear()
+        return [obj for obj in ready if obj is not self._reader]
+
+    def close(self) -> None:
+        """Close the pipe (once its owner no longer waits); a later :meth:`set` is a no-op."""
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._reader.close()
+                self._writer.close()
@@ -0,0 +1,501 @@
+"""
+Per-test result cache — passes carried over for the tests whose inputs are unchanged since they passed.
+
+CHECK decides on one fingerprint for the whole program under test, so any edit reruns every
+test.  The result cache decides per scheduled test (a module, by default): when a test passes,
+:meth:`ResultCache.record` stores a key over everything the pass depended on —
+
+- the test module itself, and the ``conftest.py`` files and pytest configuration files from its
+  directory up to the rootdir (a missing ``conftest.py`` counts too, so adding one changes the key);
+- the source files its per-test coverage data (``data_dir/coverage/<safe>.coverage``) shows it
+  executed;
+- the Python version and platform, and the installed distributions (:func:`environment_digest`).
+
+Files inside the project enter the key by their path relative to the project root, so the
+same sources checked out anywhere give the same keys.  Passes are also published, with their
+output, to a content-addressed :class:`ResultStore` — in the data directory by default, or in
+a directory several machines share (e.g. a network mount), so a test that passed on one
+machine is a cache hit on every other.  A later run that finds the key of a test's current
+inputs (:meth:`ResultCache.lookup`) does not run the test: a pass recorded in this data
+directory has its records carried over into the new run, as RESUME carries over the prior
+run's; a pass from the store is written as a passing record holding the stored output
+(:func:`carry_over_hits`).  A pass is only recorded when none of its inputs was modified after
+the test started, so a key never describes sources the test did not run against.
+
+Like :mod:`pytest_fly.impact`, this sees only what coverage measures: data files, environment
+variables and modules imported without executing a line in the test's process (a fork server
+preloads them) do not take part in the key.  Kept free of Qt so it can be tested headless.
+"""
+
+import hashlib
+import json
+import os
+import platform
+import site
+import socket
+import sys
+import time
+from dataclasses import asdict, dataclass, replace
+from importlib import metadata
+from pathlib import Path
+
+from coverage import CoverageData
+from typeguard import typechecked
+
+from .db import PytestProcessInfoDB, PytestProcessInfoReader
+from .file_util import sanitize_test_name, write_atomically
+from .interfaces import PyTestFlyExitCode, PytestProcessInfo
+from .logger import get_logger
+from .pytest_runner.coverage import COVERAGE_READ_ERRORS
+from .pytest_runner.test_list import module_of
+
+log = get_logger()
+
+_RESULT_CACHE_DIR_NAME = "result_cache"
+_CONFIG_FILE_NAMES = ("pytest.ini", ".pytest.ini", "pyproject.toml", "tox.ini", "setup.cfg")  # any of them ends the walk up to the rootdir
+_COVERAGE_SLACK_NS = 5_000_000_000  # how long after its passing record a test's coverage file may have been written
+_MAX_INPUT_SETS = 8  # input sets kept per test in the store (one per version of the files it executes)
+_EVICT_TO_FRACTION = 0.9  # eviction frees space down to this fraction of the budget, so it does not run again on the next write
+_STALE_TEMP_SECONDS = 3600.0  # a temporary file this old was left behind by a writer that died
+
+
+@dataclass(frozen=True)
+class ResultCacheConfig:
+    """Whether and where passing results are cached (see :mod:`pytest_fly.result_cache`)."""
+
+    enabled: bool = False
+    directory: Path | None = None  # the result store, possibly shared by several machines; None keeps it in the data directory
+    max_mb: float = 1024.0  # the store's size budget, least recently used results are evicted beyond it (0 = unlimited)
+
+
+@dataclass(frozen=True)
+class CachedResult:
+    """A test's most recent pass in this data directory, and the key of the inputs it passed with."""
+
+    name: str  # the scheduled test's node id
+    key: str
+    run_guid: str  # the passing run, whose records a cache hit carries over
+    started: float  # when the pass started (carried-over copies of its records keep it)
+    duration: float  # how long the passing run took (seconds a hit saves)
+    inputs: tuple[str, ...]  # the files the key covers besides the environment (relative to the project root when inside it)
+
+
+@dataclass(frozen=True)
+class StoredResult:
+    """A pass in the :class:`ResultStore`."""
+
+    name: str
+    duration: float  # seconds
+    output: str  # the passing run's output
+    host: str  # the machine it passed on
+    time_stamp: float  # when it was stored
+
+
+@dataclass(frozen=True)
+class CacheHit:
+    """A test the result cache passes without running it."""
+
+    name: str
+    duration: float  # how long its pass took, i.e. the seconds the hit saves
+    run_guid: str | None  # the run in this data directory holding the pass's records, None for a pass from the store
+    output: str = ""  # the record written for a pass from the store
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _config_chain(module_path: Path) -> list[Path]:
+    """The ``conftest.py`` and pytest configuration files that apply to the test module at *module_path*."""
+    chain = []
+    for directory in module_path.parents:
+        chain.append(Path(directory, "conftest.py"))
+        config_files = [Path(directory, name) for name in _CONFIG_FILE_NAMES if Path(directory, name).is_file()]
+        if config_files:
+            chain.extend(config_files)
+            break
+    return chain
+
+
+@typechecked()
+def environment_digest() -> str:
+    """A digest of the Python version and platform and the installed distributions (name and version) the tests run with.
+
+    Where the interpreter is installed is left out, so machines with the same environment agree.
+    """
+    distributions = sorted({f"{dist.metadata['Name']}=={dist.version}" for dist in metadata.distributions() if dist.metadata["Name"]})
+    interpreter = [sys.implementation.name, platform.python_version(), sys.platform, platform.machine()]
+    return _digest("\n".join([*interpreter, *distributions]).encode())
+
+
+class ResultStore:
+    """Passes by key, and the input sets each test passed with, as files under *directory*.
+
+    Several data directories — on several machines — may share one store.  Every file is
+    written atomically under a unique temporary name, so a reader sees a whole file or none; a
+    file another writer evicted meanwhile is a miss.  Using a result refreshes its modification
+    time, the least-recently-used order :meth:`evict` follows.
+
+    :param directory: The store's directory (created on the first write).
+    :param max_bytes: The size budget, 0 for none.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = 0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._results_dir = Path(directory, "results")
+        self._inputs_dir = Path(directory, "inputs")
+
+    def get(self, key: str) -> StoredResult | None:
+        """The pass stored under *key* (marked used), or ``None``."""
+        path = self._result_path(key)
+        try:
+            result = StoredResult(**json.loads(path.read_text(encoding="utf-8")))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            log.info(f'stored result "{path}" unusable: {e}')
+            return None
+        self.touch(key)
+        return result
+
+    def touch(self, key: str) -> None:
+        """Mark the pass stored under *key* used."""
+        try:
+            os.utime(self._result_path(key))
+        except OSError:
+            pass  # not stored, or evicted meanwhile
+
+    def put(self, key: str, result: StoredResult) -> None:
+        """Store *result* under *key* (a pass already stored under it is kept, only marked used)."""
+        if self._result_path(key).exists():
+            self.touch(key)
+        else:
+            write_atomically(self._result_path(key), json.dumps(asdict(result)).encode())
+
+    def input_sets(self, name: str) -> list[tuple[str, ...]]:
+        """The input sets *name* passed with, most recent first."""
+        path = self._inputs_path(name)
+        try:
+            return [tuple(inputs) for inputs in json.loads(path.read_text(encoding="utf-8"))]
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError, TypeError) as e:
+            log.info(f'stored input sets "{path}" unusable: {e}')
+            return []
+
+    def add_input_set(self, name: str, inputs: tuple[str, ...]) -> None:
+        """Put *inputs* first among the input sets of *name*.
+
+        Two machines adding at once may lose one of the sets: a later miss, never a wrong hit.
+        """
+        input_sets = [inputs, *(other for other in self.input_sets(name) if other != inputs)][:_MAX_INPUT_SETS]
+        write_atomically(self._inputs_path(name), json.dumps(input_sets).encode())
+
+    def stamp(self) -> tuple:
+        """Changes when a pass or an input set is added or evicted, by any writer."""
+        stamp = []
+        for directory in (self._results_dir, self._inputs_dir):
+            try:
+                stamp.append(directory.stat().st_mtime_ns)
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def evict(self) -> int:
+        """Delete the least recently used files while the store is over its size budget, and stale temporary files.
+
+        :return: The number of files deleted.
+        """
+        files = []
+        now = time.time()
+        deleted = 0
+        for directory in (self._results_dir, self._inputs_dir):
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue  # evicted meanwhile
+                if not entry.name.endswith(".tmp"):
+                    files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                elif now - stat.st_mtime > _STALE_TEMP_SECONDS:
+                    Path(entry.path).unlink(missing_ok=True)
+                    deleted += 1
+        total = sum(size for _mtime, size, _path in files)
+        if 0 < self.max_bytes < total:
+            for _mtime, size, path in sorted(files):
+                if total <= self.max_bytes * _EVICT_TO_FRACTION:
+                    break
+                try:
+                    Path(path).unlink(missing_ok=True)
+                except OSError as e:
+                    log.info(f'could not evict "{path}" from the result store: {e}')
+                    continue
+                total -= size
+                deleted += 1
+            log.info(f'result store "{self.directory}": {total / 1e6:.1f} MB after eviction (budget {self.max_bytes / 1e6:.1f} MB)')
+        return deleted
+
+    def _result_path(self, key: str) -> Path:
+        return Path(self._results_dir, f"{key}.json")
+
+    def _inputs_path(self, name: str) -> Path:
+        return Path(self._inputs_dir, f"{_digest(name.encode())}.json")
+
+
+class ResultCache:
+    """The recorded passes of a project's tests: this data directory's, one JSON file per test in ``data_dir/result_cache``, and the store's.
+
+    Kept across plans: file digests are reused while a file's size and modification time are
+    unchanged, and the environment digest while the site-packages directories are.
+
+    :param data_dir: Directory holding the results database and the per-test coverage data.
+    :param project_root: The program under test's root (files inside it are keyed by their path relative to it).
+    :param config: Where the result store is, and its size budget.
+    """
+
+    def __init__(self, data_dir: Path, project_root: Path, config: ResultCacheConfig = ResultCacheConfig()):
+        self.data_dir = data_dir
+        self.project_root = Path(os.path.realpath(project_root))
+        self.coverage_dir = Path(data_dir, "coverage")
+        self.cache_dir = Path(data_dir, _RESULT_CACHE_DIR_NAME)
+        store_dir = Path(self.cache_dir, "store") if config.directory is None else config.directory
+        self.store = ResultStore(store_dir, int(config.max_mb * 1e6))
+        self._entries: dict[str, CachedResult] | None = None
+        self._digests: dict[str, tuple[tuple[int, int], str]] = {}  # path -> ((size, mtime_ns), content digest)
+        self._environment: tuple[tuple, str] | None = None  # (site-packages stamp, environment_digest())
+        self._unrecordable: set[tuple[str, str]] = set()  # (name, run GUID) of passes found not recordable (that stays so)
+
+    def entries(self) -> dict[str, CachedResult]:
+        """The recorded pass of each test in this data directory, by name."""
+        if self._entries is None:
+            self._entries = {}
+            try:
+                paths = list(self.cache_dir.glob("*.json"))
+            except OSError:
+                paths = []
+            for path in paths:
+                try:
+                    fields = json.loads(path.read_text(encoding="utf-8"))
+                    entry = CachedResult(**{**fields, "inputs": tuple(fields["inputs"])})
+                except (OSError, ValueError, TypeError, KeyError) as e:
+                    log.info(f'result cache entry "{path}" unusable: {e}')
+                    continue
+                self._entries[entry.name] = entry
+        return self._entries
+
+    @typechecked()
+    def record(self, last_pass: dict[str, tuple[float, float]], last_pass_runs: dict[str, str]) -> int:
+        """Record the passes not recorded yet (those whose passing run changed since), and publish them to the store.
+
+        A pass carried over into a later run (by RESUME or a cache hit) keeps its key; the
+        entry only moves to the run now holding its records.
+
+        :param last_pass: Each test's most recent pass, ``(start time stamp, duration)`` (see :meth:`PytestProcessInfoReader.query_last_pass`).
+        :param last_pass_runs: The run GUID of each test's most recent pass.
+        :return: The number of passes recorded.
+        """
+        entries = self.entries()
+        recorded = 0
+        published = []
+        for name, (start, duration) in last_pass.items():
+            run_guid = last_pass_runs.get(name)
+            entry = entries.get(name)
+            if run_guid is None or (name, run_guid) in self._unrecordable or (entry is not None and entry.run_guid == run_guid):
+                continue
+            if entry is not None and entry.started == start:
+                entry = replace(entry, run_guid=run_guid)  # the recorded pass, carried over into a later run
+            else:
+                inputs = self._pass_inputs(name, int(start * 1e9), int((start + duration) * 1e9))
+                if inputs is None or (key := self._key(name, inputs)) is None:
+                    self._unrecordable.add((name, run_guid))
+                    continue
+                entry = CachedResult(name, key, run_guid, start, duration, inputs)
+                published.append(entry)
+            try:
+                write_atomically(Path(self.cache_dir, f"{_digest(name.encode())}.json"), json.dumps(asdict(entry)).encode())
+            except OSError as e:
+                log.warning(f"could not record the pass of {name} in the result cache: {e}")
+                continue
+            entries[name] = entry
+            recorded += 1
+        if published:
+            self._publish(published)
+        if recorded:
+            log.info(f"result cache: recorded {recorded} passes")
+        return recorded
+
+    @typechecked()
+    def lookup(self, names: list[str], last_pass_runs: dict[str, str]) -> dict[str, CacheHit]:
+        """The tests among *names* that passed with their current inputs, here or on another machine sharing the store.
+
+        :param names: The tests a run would run.
+        :param last_pass_runs: The run GUID of each test's most recent pass: a pass recorded
+            here is carried over only while its records are the test's latest passing ones.
+        :return: The cache hits, by name.
+        """
+        entries = self.entries()
+        hits = {}
+        for name in names:
+            entry = entries.get(name)
+            if entry is not None and last_pass_runs.get(name) == entry.run_guid and self._key(name, entry.inputs) == entry.key:
+                hits[name] = CacheHit(name, entry.duration, entry.run_guid)
+                self.store.touch(entry.key)
+                continue
+            candidates = dict.fromkeys(([] if entry is None else [entry.inputs]) + self.store.input_sets(name))
+            for inputs in candidates:
+                if (key := self._key(name, inputs)) is not None and (stored := self.store.get(key)) is not None:
+                    note = f"Result cache hit: passed with the same inputs on {stored.host} at {time.ctime(stored.time_stamp)}."
+                    hits[name] = CacheHit(name, stored.duration, None, f"{note}\n\n{stored.output}")
+                    break
+        return hits
+
+    def stamp(self) -> tuple:
+        """The sizes and modification times of the recorded inputs, the site-packages directories' and the store's.
+
+        Edits inside the project change the planner's tree signature; this catches the rest
+        (an executed file elsewhere, an installed or upgraded distribution, a pass another
+        machine published).
+        """
+        stamp = [self._environment_stamp(), self.store.stamp()]
+        for path in sorted({path for entry in self.entries().values() for path in entry.inputs}):
+            try:
+                stat = os.stat(self._local(path))
+                stamp.append((stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def _publish(self, entries: list[CachedResult]) -> None:
+        """Store the passes of *entries* with their output, then keep the store within its budget."""
+        names_by_run: dict[str, list[str]] = {}
+        for entry in entries:
+            names_by_run.setdefault(entry.run_guid, []).append(entry.name)
+        outputs = {}
+        with PytestProcessInfoReader(self.data_dir) as reader:
+            for run_guid, names in names_by_run.items():
+                outputs.update({name: output for name, (_time_stamp, output) in reader.query_outputs(run_guid, names).items()})
+        host = socket.gethostname()
+        try:
+            for entry in entries:
+                self.store.put(entry.key, StoredResult(entry.name, entry.duration, outputs.get(entry.name, ""), host, time.time()))
+                self.store.add_input_set(entry.name, entry.inputs)
+            self.store.evict()
+        except OSError as e:
+            log.warning(f'could not publish to the result store "{self.store.directory}": {e}')
+
+    def _pass_inputs(self, name: str, start_ns: int, end_ns: int) -> tuple[str, ...] | None:
+        """The files the pass of *name* that ran from *start_ns* to *end_ns* depended on, or ``None`` if it cannot be recorded.
+
+        ``None`` when the test's coverage file is missing or from another run, or when an
+        input was modified after the test started (it may not be what the test ran against).
+        """
+        path = Path(self.coverage_dir, f"{sanitize_test_name(name)}.coverage")
+        try:
+            written_ns = path.stat().st_mtime_ns
+            if not start_ns - _COVERAGE_SLACK_NS <= written_ns <= end_ns + _COVERAGE_SLACK_NS:
+                return None  # written by a later (failing) run of the test
+            data = CoverageData(basename=str(path))
+            data.read()
+            executed = set(data.measured_files())
+        except COVERAGE_READ_ERRORS as e:
+            log.info(f"coverage of {name} unreadable: {e}")
+            return None
+        module_suffix = f"{os.sep}{os.path.normpath(module_of(name))}"
+        module_path = next((Path(source) for source in executed if source.endswith(module_suffix)), None)
+        if module_path is None:
+            return None  # the module did not run under coverage
+        inputs = executed | {str(path) for path in _config_chain(module_path)}
+        for input_path in inputs:
+            try:
+                if os.stat(input_path).st_mtime_ns >= start_ns:
+                    return None
+            except FileNotFoundError:
+                continue  # a conftest.py that does not exist (yet)
+            except OSError:
+                return None
+        return tuple(sorted(self._portable(input_path) for input_path in inputs))
+
+    def _portable(self, path: str) -> str:
+        """*path* relative to the project root (with ``/`` separators) when inside it, else as is."""
+        try:
+            return Path(path).relative_to(self.project_root).as_posix()
+        except ValueError:
+            return path
+
+    def _local(self, path: str) -> str:
+        """The file a :meth:`_portable` path names here."""
+        return path if os.path.isabs(path) else os.path.join(self.project_root, path)
+
+    def _key(self, name: str, inputs: tuple[str, ...]) -> str | None:
+        """The key of *name* with its *inputs* as they are now (``None`` if one is unreadable)."""
+        parts = [name, self._environment_digest()]
+        for path in inputs:
+            if (digest := self._file_digest(self._local(path))) is None:
+                return None
+            parts.append(f"{path}\0{digest}")
+        return _digest("\n".join(parts).encode())
+
+    def _file_digest(self, path: str) -> str | None:
+        """The content digest of *path* (``"-"`` if it does not exist), ``None`` if it is unreadable."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return "-"
+        except OSError:
+            return None
+        file_key = (stat.st_size, stat.st_mtime_ns)
+        cached = self._digests.get(path)
+        if cached is None or cached[0] != file_key:
+            try:
+                cached = (file_key, _digest(Path(path).read_bytes()))
+            except OSError:
+                return None
+            self._digests[path] = cached
+        return cached[1]
+
+    def _environment_stamp(self) -> tuple:
+        """Modification times of the site-packages directories (installing, upgrading or removing a distribution changes one)."""
+        stamp = []
+        for directory in sorted({*site.getsitepackages(), site.getusersitepackages()}):
+            try:
+                stamp.append(os.stat(directory).st_mtime_ns)
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def _environment_digest(self) -> str:
+        stamp = self._environment_stamp()
+        if self._environment is None or self._environment[0] != stamp:
+            self._environment = (stamp, environment_digest())
+        return self._environment[1]
+
+
+@typechecked()
+def carry_over_hits(db: PytestProcessInfoDB, run_guid: str, hits: dict[str, CacheHit], put_version: str | None = "", put_fingerprint: str | None = "") -> None:
+    """Enter the result cache's *hits* into run *run_guid* as passes.
+
+    A pass recorded in this data directory has its records copied (see
+    :meth:`PytestProcessInfoDB.copy_run_records`); a pass from the store is written as one
+    passing record holding its stored output.
+
+    :param db: The open results database.
+    :param run_guid: The run the hits are entered into.
+    :param hits: The cache hits, by name.
+    :param put_version: The run's program-under-test label, for the written records.
+    :param put_fingerprint: The run's program-under-test fingerprint, for the written records.
+    """
+    names_by_run: dict[str, list[str]] = {}
+    written = []
+    for name, hit in hits.items():
+        if hit.run_guid is None:
+            written.append(PytestProcessInfo(run_guid, name, None, PyTestFlyExitCode.OK, hit.output, time.time(), put_version=put_version, put_fingerprint=put_fingerprint))
+        else:
+            names_by_run.setdefault(hit.run_guid, []).append(name)
+    for source_run_guid, names in names_by_run.items():
+        db.copy_run_records(source_run_guid, run_guid, names)
+    db.write_many(written)
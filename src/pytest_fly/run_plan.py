@@ -0,0 +1,481 @@
+"""
+Speculative run planning — keeps the next run's plan warm while the app is idle.
+
+Preparing a run means detecting the PUT's version (several git calls), discovering its tests
+(a ``pytest --collect-only`` pass in a spawned process), reading the prior runs' results
+and, for coverage-efficiency ordering, loading every test's coverage file — often tens of
+seconds on a large project before the first test starts.  None of that changes while the
+project and the results database do not, so a :class:`RunPlanner` thread prepares a
+:class:`RunPlan` in the background while the app is idle, and Run starts from it.
+
+A plan is built in three layers, each rebuilt only when its inputs changed:
+
+- discovery — the discovered tests, keyed by the project, the scheduling granularity and the
+  :func:`tree_signature` of the project's files;
+- history — the prior-run results, keyed by the results DB's change token and the coverage
+  directory (see :func:`history_stamp`);
+- schedule — the resolved run mode and the ordered tests, keyed by the run configuration and
+  the PUT version (and
+  in AFFECTED mode by the executed files outside the project, see :mod:`pytest_fly.impact`;
+  with the result cache by the files its recorded passes depend on, see :mod:`pytest_fly.result_cache`).
+
+Run validates the plan by recomputing the signature, the stamp and the PUT version (a few git
+calls — the signature does not cover every file that can make the tree dirty), so a stale
+plan is never used: a layer whose inputs changed is rebuilt on the spot.  The side effects of
+starting a run (clearing coverage, copying RESUME records, starting the runner) are left to
+the caller.  Kept free of Qt so it can be tested headless.
+"""
+
+import hashlib
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from threading import Event, Lock, Thread
+
+from typeguard import typechecked
+
+from .db import PytestProcessInfoReader, RetentionConfig
+from .file_util import iter_project_files
+from .impact import ImpactIndex
+from .interfaces import OrderingAspect, PutVersionInfo, PyTestFlyExitCode, PytestProcessInfo, RunMode, ScheduledTest, SchedulingGranularity
+from .logger import get_logger
+from .put_version import detect_put_version
+from .pytest_runner.admission import AdmissionGateConfig
+from .pytest_runner.const import FAIL_OPEN_ERRORS
+from .pytest_runner.coverage import compute_per_test_coverage
+from .pytest_runner.execution import ExecutionConfig
+from .pytest_runner.ordering import OrderingContext, apply_ordering_aspects
+from .pytest_runner.resource_guard import ResourceGuardConfig
+from .pytest_runner.scheduler import SchedulerConfig
+from .pytest_runner.sharding import ShardingConfig, split_critical_path_modules
+from .pytest_runner.stall_watchdog import StallConfig
+from .pytest_runner.test_list import GetTests, module_of
+from .result_cache import CacheHit, ResultCache, ResultCacheConfig
+
+log = get_logger()
+
+# Run modes that carry the prior run's passed tests over instead of running them again (and so keep the per-test coverage).
+CARRY_OVER_MODES = (RunMode.RESUME, RunMode.AFFECTED)
+
+# Files whose changes can change what pytest collects (or the detected PUT version).
+_SIGNATURE_SUFFIXES = {".py"}
+_SIGNATURE_FILE_NAMES = {"pytest.ini", "pyproject.toml", "setup.cfg", "tox.ini"}
+
+
+@dataclass(frozen=True)
+class RunPrepConfig:
+    """Everything run preparation needs, gathered on the GUI thread from the preferences.
+
+    The preparation (and the background planner) works only from this snapshot plus the data
+    dir, so it never touches preferences or Qt.
+    """
+
+    project_root: Path
+    run_guid: str
+    refresh_rate: float
+    run_mode: RunMode
+    processes: int
+    enabled_aspects: list[OrderingAspect]
+    gate_config: AdmissionGateConfig
+    stall_config: StallConfig
+    resource_guard_config: ResourceGuardConfig
+    execution_config: ExecutionConfig = field(default_factory=ExecutionConfig)
+    granularity: SchedulingGranularity = SchedulingGranularity.MODULE
+    sharding_config: ShardingConfig = field(default_factory=ShardingConfig)
+    scheduler_config: SchedulerConfig = field(default_factory=SchedulerConfig)
+    retention_config: RetentionConfig = field(default_factory=RetentionConfig)
+    reuse_plan: bool = True  # start from a still-valid plan (False: always discover afresh)
+    cache_collection: bool = True  # reuse the collected items of unchanged test modules
+    result_cache_config: ResultCacheConfig = field(default_factory=ResultCacheConfig)  # pass the tests whose inputs are unchanged since a pass (not in RESTART mode)
+
+
+@dataclass(frozen=True)
+class RunPlan:
+    """A prepared run: the ordered tests the runner is started with and what Run applies first."""
+
+    put_version_info: PutVersionInfo
+    effective_mode: RunMode  # RunMode.CHECK resolved to RESUME or RESTART
+    tests: list[ScheduledTest]  # to run, in the order of the enabled ordering aspects
+    prior_durations: dict[str, float]  # for the ETA
+    prior_run_guid: str | None  # the most recent run, which RESUME carries records over from
+    carried_over: list[str]  # the tests RESUME does not re-run; their records are copied into the new run
+    planned_at: float  # when the plan was built (time.time())
+    cache_hits: dict[str, CacheHit] = field(default_factory=dict)  # tests the result cache does not re-run; their passes are entered into the new run
+
+
+@dataclass(frozen=True)
+class _Discovery:
+    project_root: Path
+    granularity: SchedulingGranularity
+    signature: str
+    tests: list[ScheduledTest]
+    function_ids: dict[str, list[str]]
+
+
+@dataclass(frozen=True)
+class _History:
+    stamp: tuple
+    prior_results: list[PytestProcessInfo]  # the most recent run's records, without output
+    last_pass: dict[str, tuple[float, float]]
+    last_pass_runs: dict[str, str]
+    ever_run: set[str]
+    function_durations: dict[str, float]
+    peak_commits: dict[str, int]
+
+
+@typechecked()
+def tree_signature(project_root: Path) -> str:
+    """A digest of the path, size and modification time of every file that can affect test discovery.
+
+    Covers the Python files and pytest/packaging configuration under *project_root* (outside
+    hidden directories and the ones pytest does not recurse into) and the git ``HEAD``, so
+    editing, adding or removing such a file, or committing, changes the signature.  Only file
+    metadata is read (and the git ``HEAD`` itself), so it stays cheap on a large tree.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for entry in iter_project_files(project_root, _SIGNATURE_SUFFIXES, _SIGNATURE_FILE_NAMES):
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue  # removed while walking
+        digest.update(f"{entry.path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    for git_path in _git_head_paths(project_root):
+        try:
+            stat = git_path.stat()
+        except OSError:
+            continue
+        digest.update(f"{git_path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def _git_head_paths(project_root: Path) -> list[Path]:
+    """The files that change when the git repository holding *project_root* moves to another commit."""
+    for directory in (project_root, *project_root.parents):
+        git_dir = Path(directory, ".git")
+        if git_dir.is_dir():
+            paths = [Path(git_dir, "HEAD"), Path(git_dir, "packed-refs")]
+            try:
+                head = paths[0].read_text(encoding="utf-8").strip()
+            except OSError:
+                return paths
+            if head.startswith("ref: "):
+                paths.append(Path(git_dir, head.removeprefix("ref: ")))
+            return paths
+        if git_dir.exists():
+            return [git_dir]  # a worktree's ".git" file
+    return []
+
+
+@typechecked()
+def history_stamp(data_dir: Path) -> tuple:
+    """A cheap token that changes whenever the prior-run inputs of a plan do.
+
+    The results DB's change token (see :meth:`PytestProcessInfoReader.query_change_token`) plus
+    the modification time of the per-test coverage directory.
+    """
+    with PytestProcessInfoReader(data_dir) as reader:
+        change_token = reader.query_change_token()
+    try:
+        coverage_mtime = Path(data_dir, "coverage").stat().st_mtime_ns
+    except OSError:
+        coverage_mtime = None
+    return change_token, coverage_mtime
+
+
+def filter_for_resume(tests: list[ScheduledTest], prior_results: list[PytestProcessInfo], effective_mode: RunMode) -> list[ScheduledTest]:
+    """Drop the tests that passed in the prior run when running in RESUME mode.
+
+    :param tests: The discovered tests.
+    :param prior_results: The most recent run's records.
+    :param effective_mode: The resolved run mode (CHECK already collapsed, see :func:`resolve_check_mode`).
+    :return: The tests to run.
+    """
+    original_count = len(tests)
+    if effective_mode == RunMode.RESUME:
+        passed = {r.name for r in prior_results if r.exit_code == PyTestFlyExitCode.OK}
+        tests = [t for t in tests if t.node_id not in passed]
+        log.info(f"RESUME filter: {original_count} discovered, {len(passed)} passed in prior run, {len(tests)} to re-run")
+    else:
+        log.info(f"run_mode={effective_mode!r} (not RESUME), skipping filter — all {original_count} tests will run")
+    return tests
+
+
+def filter_for_affected(tests: list[ScheduledTest], prior_results: list[PytestProcessInfo], impact_index: ImpactIndex) -> list[ScheduledTest]:
+    """Drop the tests that passed in the prior run and that no change since can affect (:attr:`RunMode.AFFECTED`).
+
+    :param tests: The discovered tests.
+    :param prior_results: The most recent run's records.
+    :param impact_index: Maps the changes since each test's last run to the tests they affect.
+    :return: The tests to run: the failed, new and never-run ones, plus the passed ones a change affects.
+    """
+    passed = {r.name for r in prior_results if r.exit_code == PyTestFlyExitCode.OK}
+    affected = impact_index.select_affected([t.node_id for t in tests if t.node_id in passed])
+    filtered = [t for t in tests if t.node_id not in passed or t.node_id in affected]
+    log.info(f"AFFECTED filter: {len(tests)} discovered, {len(passed)} passed in prior run, {len(affected)} of those affected by changes, {len(filtered)} to run")
+    return filtered
+
+
+def resolve_check_mode(prior_results: list[PytestProcessInfo], put_version_info: PutVersionInfo | None) -> RunMode:
+    """Collapse :attr:`RunMode.CHECK` into either RESUME or RESTART based on the PUT fingerprint.
+
+    If the prior run's PUT fingerprint matches the current one, behave like RESUME;
+    otherwise restart.  A dirty working tree always changes the fingerprint (because
+    :meth:`PutVersionInfo.fingerprint` incorporates ``git_dirty``) so developers
+    iterating on code get fresh runs.
+
+    :param prior_results: Records from the most recent prior run, or an empty list.
+    :param put_version_info: PUT metadata for the run being prepared.
+    :return: Either :attr:`RunMode.RESUME` or :attr:`RunMode.RESTART`.
+    """
+    current_fp = put_version_info.fingerprint() if put_version_info else ""
+    prior_fp = None
+    for record in prior_results:
+        if record.put_fingerprint:
+            prior_fp = record.put_fingerprint
+            break
+    if prior_fp is None:
+        log.info("CHECK: no prior PUT fingerprint recorded, restarting")
+        return RunMode.RESTART
+    if prior_fp != current_fp:
+        log.info(f"CHECK: PUT fingerprint changed ({prior_fp!r} -> {current_fp!r}), restarting")
+        return RunMode.RESTART
+    log.info(f"CHECK: PUT fingerprint unchanged ({current_fp!r}), resuming")
+    return RunMode.RESUME
+
+
+def _discover(config: RunPrepConfig, signature: str, data_dir: Path, should_abort: Callable[[], bool]) -> _Discovery | None:
+    """Discover the PUT's tests (``None`` if aborted)."""
+    cache_dir = Path(data_dir, "collection") if config.cache_collection else None
+    get_tests = GetTests(test_dir=config.project_root, granularity=config.granularity, cache_dir=cache_dir)
+    get_tests.start()
+    while get_tests.is_alive():
+        get_tests.join(1.0)
+        if should_abort():
+            get_tests.terminate()
+            get_tests.join(5.0)
+            return None
+    get_tests.join()
+    return _Discovery(config.project_root, config.granularity, signature, get_tests.get_tests(), get_tests.get_function_ids())
+
+
+def _read_history(data_dir: Path, stamp: tuple) -> _History:
+    """Query the prior-run inputs of a plan (read-only; the records without their output)."""
+    with PytestProcessInfoReader(data_dir) as db:
+        return _History(
+            stamp=stamp,
+            prior_results=db.query(),  # most recent run
+            last_pass=db.query_last_pass(),  # most recent passing run per test
+            last_pass_runs=db.query_last_pass_runs(),
+            ever_run=db.query_ever_run_names(),  # names of tests that have ever run (any PUT version)
+            function_durations=db.query_function_durations(),
+            peak_commits=db.query_peak_commit(),
+        )
+
+
+def _plan_schedule(
+    config: RunPrepConfig, discovery: _Discovery, put_version_info: PutVersionInfo, history: _History, data_dir: Path, impact_index: ImpactIndex, result_cache: ResultCache | None
+) -> RunPlan:
+    """Resolve the run mode and order the tests to run, from the discovered tests and the prior runs."""
+    tests = discovery.tests
+    prior_results = history.prior_results
+
+    # Use last-pass durations for ETA estimation (from the most recent passing run)
+    prior_durations = {name: duration for name, (_unused_start, duration) in history.last_pass.items()}
+
+    # Split critical-path modules into shards. Done before the RESUME filter so shards that
+    # passed in a prior (split) run are resumed like any other test.
+    if config.sharding_config.enabled:
+        tests = split_critical_path_modules(tests, prior_durations, discovery.function_ids, history.function_durations, config.processes)
+        for test in tests:
+            if test.duration is not None:
+                prior_durations.setdefault(test.node_id, test.duration)  # shard estimate until the shard itself has passed
+
+    # CHECK mode: behave like RESUME if the PUT fingerprint matches the prior run, else RESTART.
+    effective_mode = config.run_mode
+    if config.run_mode == RunMode.CHECK:
+        effective_mode = resolve_check_mode(prior_results, put_version_info)
+
+    all_node_ids = {t.node_id for t in tests}
+    if effective_mode == RunMode.AFFECTED:
+        tests = filter_for_affected(tests, prior_results, impact_index)
+    else:
+        tests = filter_for_resume(tests, prior_results, effective_mode)
+    carried_over = sorted(all_node_ids - {t.node_id for t in tests}) if effective_mode in CARRY_OVER_MODES else []
+
+    # The result cache passes the tests whose inputs are unchanged since their last pass — in any mode but an explicit RESTART.
+    cache_hits: dict[str, CacheHit] = {}
+    if result_cache is not None and config.run_mode != RunMode.RESTART:
+        cache_hits = result_cache.lookup([t.node_id for t in tests], history.last_pass_runs)
+        tests = [t for t in tests if t.node_id not in cache_hits]
+        log.info(f"result cache: {len(cache_hits)} hits, {len(tests)} tests to run")
+
+    # Apply the user's ordered list of ordering aspects (see Configuration tab).
+    # Prior-run data still informs execution *order* even in RESTART mode — RESTART only
+    # means "rerun every test," not "forget the durations/failures we know about."
+    # Per-test coverage only survives into a RESUME or AFFECTED run (any other run starts by clearing it).
+    per_test_cov: dict[str, float] = {}
+    if OrderingAspect.COVERAGE_EFFICIENCY in config.enabled_aspects and effective_mode in CARRY_OVER_MODES:
+        per_test_cov = compute_per_test_coverage(data_dir, [t.node_id for t in tests])
+    peak_commits = history.peak_commits if config.scheduler_config.memory_budget_bytes > 0 else {}
+    # Coverage-efficiency ordering, short-test batching and the scheduler read duration/coverage/peak
+    # commit off the ScheduledTest itself, so rebuild the list with those fields populated.
+    tests = [
+        ScheduledTest(
+            node_id=t.node_id,
+            singleton=t.singleton,
+            duration=prior_durations.get(t.node_id),
+            coverage=per_test_cov.get(t.node_id),
+            peak_commit=peak_commits.get(t.node_id, peak_commits.get(module_of(t.node_id))),  # a shard is predicted at its module's peak
+        )
+        for t in tests
+    ]
+
+    failed_names: set[str] = set()
+    if prior_results:
+        passed = {r.name for r in prior_results if r.exit_code == PyTestFlyExitCode.OK}
+        failed_names = {r.name for r in prior_results} - passed
+
+    ctx = OrderingContext(
+        failed_names=failed_names,
+        ever_run_names=history.ever_run,
+        prior_durations=prior_durations,
+        per_test_coverage=per_test_cov,
+    )
+    tests = apply_ordering_aspects(tests, config.enabled_aspects, ctx)
+
+    prior_run_guid = prior_results[0].run_guid if prior_results else None
+    return RunPlan(put_version_info, effective_mode, tests, prior_durations, prior_run_guid, carried_over, time.time(), cache_hits)
+
+
+class RunPlanner:
+    """Keeps the :class:`RunPlan` for the next run warm on a background thread while the app is idle.
+
+    The GUI hands the planner the configuration a Run click would use, every few seconds
+    while no run is active (:meth:`set_idle_config`, ``None`` while a run is prepared or
+    running); the planner thread then refreshes whichever layer of the plan went stale, at
+    most once per ``poll_seconds``.  Run preparation calls :meth:`take`, which validates the
+    plan — waiting for a background refresh in flight rather than duplicating it — and logs
+    whether it was used as planned or (partly) rebuilt, and how old it was.
+    """
+
+    @typechecked()
+    def __init__(self, data_dir: Path, poll_seconds: float = 5.0):
+        """
+        :param data_dir: Directory holding the results database (and the coverage data).
+        :param poll_seconds: How often the idle planner checks the project and the DB for changes.
+        """
+        self.data_dir = data_dir
+        self.poll_seconds = poll_seconds
+        self._lock = Lock()  # held for a whole refresh: one at a time, and take() waits for one in flight
+        self._discovery: _Discovery | None = None
+        self._put_version_info: PutVersionInfo | None = None
+        self._history: _History | None = None
+        self._schedule: tuple[tuple, RunPlan] | None = None  # ((config without its run GUID, PUT version, AFFECTED's external-file stamp, the result cache's stamp), plan)
+        self._impact_index = ImpactIndex(data_dir)  # kept across plans: only changed coverage files are read again
+        self._result_cache: tuple[tuple, ResultCache] | None = None  # ((project root, store config), cache) kept across plans: only changed files are hashed again
+        self._idle_config: RunPrepConfig | None = None
+        self._wake = Event()
+        self._stop = Event()
+        self._thread: Thread | None = None
+
+    def set_idle_config(self, config: RunPrepConfig | None) -> None:
+        """Plan for *config* while idle, or stop planning (``None``) — e.g. because a run starts."""
+        changed = config != self._idle_config
+        self._idle_config = config
+        if config is not None and self._thread is None and not self._stop.is_set():
+            self._thread = Thread(target=self._run, name="run_planner", daemon=True)
+            self._thread.start()
+        if changed:
+            self._wake.set()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the planner thread, ending a discovery in progress."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def take(self, config: RunPrepConfig, should_abort: Callable[[], bool]) -> RunPlan | None:
+        """Return the plan for *config*, rebuilding whatever is stale (called by run preparation).
+
+        :param config: The Run click's configuration.
+        :param should_abort: Polled during discovery; returning ``True`` abandons the plan.
+        :return: The validated plan, or ``None`` if aborted.
+        """
+        start = time.monotonic()
+        with self._lock:
+            if not config.reuse_plan:
+                self._discovery = self._history = self._schedule = None
+            previous = self._schedule[1] if self._schedule is not None else None
+            plan, rebuilt = self._refresh(config, lambda: should_abort() or self._stop.is_set())
+        if plan is None:
+            return None
+        elapsed = time.monotonic() - start
+        if not rebuilt:
+            log.info(f"run plan: hit, planned {time.time() - plan.planned_at:.1f} s ago ({len(plan.tests)} tests, validated in {elapsed:.2f} s)")
+        else:
+            age = f"previous plan {time.time() - previous.planned_at:.1f} s old" if previous is not None else "no previous plan"
+            log.info(f"run plan: rebuilt {', '.join(rebuilt)} ({age}; {len(plan.tests)} tests, prepared in {elapsed:.1f} s)")
+        return plan
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+            config = self._idle_config
+            if config is None or self._stop.is_set():
+                continue
+            try:
+                with self._lock:
+                    plan, rebuilt = self._refresh(config, self._stop.is_set)
+            except FAIL_OPEN_ERRORS as e:
+                log.warning(f"background run planning failed: {e}")
+                continue
+            if plan is not None and rebuilt:
+                log.info(f"run plan: refreshed {', '.join(rebuilt)} in the background ({len(plan.tests)} tests)")
+
+    def _refresh(self, config: RunPrepConfig, should_abort: Callable[[], bool]) -> tuple[RunPlan | None, list[str]]:
+        """Bring each layer of the plan up to date for *config* (called with the lock held).
+
+        :return: ``(plan, rebuilt)`` — the plan (``None`` if aborted) and the layers rebuilt.
+        """
+        rebuilt = []
+        signature = tree_signature(config.project_root)
+        discovery = self._discovery
+        if discovery is None or (discovery.project_root, discovery.granularity, discovery.signature) != (config.project_root, config.granularity, signature):
+            discovery = _discover(config, signature, self.data_dir, should_abort)
+            if discovery is None:
+                return None, rebuilt
+            self._discovery = discovery
+            rebuilt.append("tests")
+        # Detected on every refresh, not with discovery: the tree signature does not see every file
+        # that makes the working tree dirty (a data fixture, a C source), and CHECK compares this.
+        put_version_info = detect_put_version(config.project_root)
+        if put_version_info != self._put_version_info:
+            log.info(f"PUT detected: {put_version_info}")
+            self._put_version_info = put_version_info
+        stamp = history_stamp(self.data_dir)
+        if self._history is None or self._history.stamp != stamp:
+            self._history = _read_history(self.data_dir, stamp)
+            rebuilt.append("history")
+        result_cache = self._get_result_cache(config) if config.result_cache_config.enabled else None
+        if result_cache is not None:
+            result_cache.record(self._history.last_pass, self._history.last_pass_runs)  # only passes not recorded yet
+        affected = config.run_mode == RunMode.AFFECTED
+        cached = result_cache is not None and config.run_mode != RunMode.RESTART
+        schedule_key = (replace(config, run_guid=""), put_version_info, self._impact_index.external_stamp() if affected else None, result_cache.stamp() if cached else None)
+        if rebuilt or self._schedule is None or self._schedule[0] != schedule_key:
+            plan = _plan_schedule(config, discovery, put_version_info, self._history, self.data_dir, self._impact_index, result_cache)
+            if affected:
+                schedule_key = (*schedule_key[:2], self._impact_index.external_stamp(), schedule_key[3])  # the files the selection just read
+            self._schedule = (schedule_key, plan)
+            rebuilt.append("schedule")
+        return self._schedule[1], rebuilt
+
+    def _get_result_cache(self, config: RunPrepConfig) -> ResultCache:
+        """The result cache for *config*'s project and result store (a new one when either changed)."""
+        cache_key = (config.project_root, config.result_cache_config)
+        if self._result_cache is None or self._result_cache[0] != cache_key:
+            self._result_cache = (cache_key, ResultCache(self.data_dir, config.project_root, config.result_cache_config))
+        return self._result_cache[1]
@@ -0,0 +1,75 @@
+"""
+Incrementally maintained records of the run the GUI is displaying.
+
+Re-querying every record of the run on each refresh tick makes the DB phase of the tick grow
+with the run: at ten thousand tests most of each query re-reads rows that have not changed
+since the previous tick.  :class:`RunRecordCache` keeps the run's records in memory instead and,
+per tick, reads only the rows written since the last one (:meth:`PytestProcessInfoReader.query_since`,
+keyed on the monotonically increasing SQLite rowid).  A tick on which nothing was written is
+detected from the cheap :meth:`PytestProcessInfoReader.query_change_token` and skips the record
+query entirely.  Kept free of Qt so it can be tested headless.
+"""
+
+from .db import PytestProcessInfoReader
+from .interfaces import PyTestFlyExitCode, PytestProcessInfo
+
+
+class RunRecordCache:
+    """The displayed run's records, kept in step with the DB one delta at a time.
+
+    Each record is read exactly once, with its ``output`` column: output is only stored on a
+    test's final records, so reading it as the row arrives replaces a separate per-test fetch.
+
+    The cache reloads the run from scratch when the displayed run changes or when rows were
+    deleted (the change token's row count grew by less than its max rowid, or shrank).
+    """
+
+    def __init__(self) -> None:
+        self.run_guid: str | None = None  # the run the records belong to (resolved when the most recent run was requested)
+        self.process_infos: list[PytestProcessInfo] = []  # every record of the run, in write order
+        self.new_infos: list[PytestProcessInfo] = []  # records added by the most recent refresh
+        self.reloaded = False  # True when the most recent refresh rebuilt the records from scratch
+        self.pass_count = 0  # records with exit_code OK
+        self._requested_run_guid: str | None = None
+        self._change_token: tuple[int, int] | None = None
+        self._last_rowid = 0  # greatest rowid read for run_guid
+
+    def refresh(self, db: PytestProcessInfoReader, run_guid: str | None) -> bool:
+        """Bring the records up to date with the database.
+
+        :param db: An open reader.
+        :param run_guid: The run to display, or ``None`` for the most recent run.
+        :return: ``True`` when the records changed (see :attr:`new_infos` and :attr:`reloaded`).
+        """
+        self.new_infos = []
+        self.reloaded = False
+        change_token = db.query_change_token()
+        if change_token == self._change_token and run_guid == self._requested_run_guid:
+            return False  # nothing written since the previous refresh
+
+        resolved_guid = run_guid if run_guid is not None else db.query_latest_run_guid()
+        rows_deleted = False
+        if self._change_token is not None:
+            # Without deletions every insert takes the next rowid, so the row count and the max
+            # rowid grow in lockstep; anything else means rows were removed under us.
+            count_growth = change_token[0] - self._change_token[0]
+            rowid_growth = change_token[1] - self._change_token[1]
+            rows_deleted = count_growth < 0 or count_growth != rowid_growth
+        if resolved_guid != self.run_guid or rows_deleted:
+            self._reset(resolved_guid)
+            self.reloaded = True
+        self._requested_run_guid = run_guid
+        self._change_token = change_token
+
+        if resolved_guid is not None:
+            self.new_infos, self._last_rowid = db.query_since(resolved_guid, self._last_rowid, include_output=True)
+        self.process_infos.extend(self.new_infos)
+        self.pass_count += sum(1 for info in self.new_infos if info.exit_code == PyTestFlyExitCode.OK)
+        return self.reloaded or len(self.new_infos) > 0
+
+    def _reset(self, run_guid: str | None) -> None:
+        """Forget every record and start over for *run_guid*."""
+        self.run_guid = run_guid
+        self.process_infos = []
+        self.pass_count = 0
+        self._last_rowid = 0
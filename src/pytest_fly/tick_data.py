@@ -43,6 +43,7 @@ class TickData:
     soft_stop_requested: bool = False
     singleton_names: set[str] = field(default_factory=set)  # node_ids of tests marked with @pytest.mark.singleton — displayed last in test-listing tabs
     put_version_info: PutVersionInfo | None = None  # program-under-test metadata detected at the start of the current run
+    cache_hits: dict[str, float] = field(default_factory=dict)  # tests the result cache passed in the current run -> seconds saved
     # Stall watchdog snapshot (typed loosely as `object` to avoid a hard dependency on pytest_runner). None when no watchdog is running.
     stall_info: object | None = None
     # Resource guard snapshot (typed loosely as `object`, as above). None when the guard is not enabled/running.
@@ -54,6 +55,15 @@ class TickData:
     # True while background run preparation (PUT detection, test discovery, RESUME copying) is
     # in flight — the Status panel shows "please wait" instead of the idle press-Run prompt.
     run_prep_active: bool = False
+    # Running aggregates kept by TickDataBuilder. None on hand-built ticks; read them through
+    # get_state_counts() / get_running_names(), which fall back to scanning run_states.
+    state_counts: dict[PytestRunnerState, int] | None = None
+    running_names: list[str] | None = None  # RUNNING tests, in display order
+    remaining_work_seconds: float | None = None  # prior-duration estimate of the queued and running tests' remaining work
+    remaining_work_priors: dict[str, float] | None = None  # the prior_durations mapping remaining_work_seconds was computed from
+    # Tests whose records changed since the previous tick, so tabs can skip untouched rows.
+    # None means "treat every test as changed" (first tick, rebuild, or a hand-built tick).
+    changed_names: set[str] | None = None
 
     @property
     def effective_min_time_stamp(self) -> float | None:
@@ -62,6 +72,25 @@ class TickData:
         to the earliest observed record timestamp."""
         return self.current_run_start if self.current_run_start is not None else self.min_time_stamp
 
+    def get_state_counts(self) -> dict[PytestRunnerState, int]:
+        """Number of tests in each state (missing states count 0)."""
+        if self.state_counts is not None:
+            return self.state_counts
+        return count_test_states(self.run_states)
+
+    def get_running_names(self) -> list[str]:
+        """Names of the RUNNING tests, in display order."""
+        if self.running_names is not None:
+            return self.running_names
+        return [name for name, run_state in self.run_states.items() if run_state.get_state() == PytestRunnerState.RUNNING]
+
+    def get_remaining_work_seconds(self) -> float | None:
+        """The precomputed remaining-work estimate, or ``None`` when the caller must compute it
+        (hand-built tick, or ``prior_durations`` replaced after the tick was built)."""
+        if self.remaining_work_seconds is not None and self.remaining_work_priors is self.prior_durations:
+            return self.remaining_work_seconds
+        return None
+
 
 def group_process_infos_by_name(process_infos: list[PytestProcessInfo]) -> dict[str, list[PytestProcessInfo]]:
     """
@@ -174,12 +203,8 @@ def build_tick_data(
     """
     Build a :class:`TickData` bundle from a flat list of process info records.
 
-    Performs grouping, time-window computation, and run-state construction
-    once so that all tabs can share the pre-computed results.
-
-    ``infos_by_name`` and ``run_states`` are ordered alphabetically by test name
-    with singleton tests last, so all tabs that iterate these dicts render in
-    the same order (matching the runner's execution order).
+    One-shot form of :class:`TickDataBuilder`; the GUI keeps a builder across ticks so each
+    tick only applies the records added since the previous one.
 
     :param process_infos: Flat list of :class:`PytestProcessInfo` objects from the DB.
     :param prior_durations: Optional mapping of test name to prior run duration (seconds), used for ETA.
@@ -194,7 +219,135 @@ def build_tick_data(
         surfaced to the tabs via :attr:`TickData.put_version_info`.
     :return: A fully populated :class:`TickData` instance.
     """
-    singletons = singleton_names if singleton_names is not None else set()
+    return TickDataBuilder().update(process_infos, prior_durations, num_processes, current_run_start, singleton_names, put_version_info)
+
+
+class TickDataBuilder:
+    """
+    Maintain a run's :class:`TickData` across refresh ticks, applying only the records added since the previous tick.
+
+    Each :meth:`update` receives the run's full record list, which only grows between calls
+    (see :class:`pytest_fly.run_records.RunRecordCache`).  The builder consumes the records
+    past the ones it has already seen, re-derives the state of just the tests they belong
+    to, and keeps the tabs' aggregates — state counts, time windows, the parallelism
+    integral and the remaining-work sum — as running totals.  A tick therefore costs
+    O(new records + running tests) instead of O(all records).  It starts over when told to
+    (``reset``), when the list shrank, or when an input that shapes every test changed (the
+    run start, the singleton set, the prior durations, or a RESUME-carried record that moves
+    the carried-record shift).
+
+    ``infos_by_name`` and ``run_states`` are ordered alphabetically by test name with
+    singleton tests last, so all tabs that iterate these dicts render in the same order
+    (matching the runner's execution order).  The builder updates the returned dicts and
+    lists in place on later ticks, so a tab holding a previous tick's containers sees the
+    latest records.
+    """
+
+    def __init__(self) -> None:
+        self._start_over(None, set(), None)
+
+    def _start_over(self, current_run_start: float | None, singleton_names: set[str], prior_durations: dict[str, float] | None) -> None:
+        """Forget every record; the next update applies the whole list."""
+        self._current_run_start = current_run_start
+        self._singleton_names = set(singleton_names)
+        self._prior_durations_source = prior_durations  # as passed, to notice a replaced mapping
+        self._prior_durations = prior_durations if prior_durations is not None else {}
+        self._consumed = 0  # records of the caller's list already applied
+        self._earliest_carried: float | None = None  # earliest RESUME-carried timestamp, and the shift applied to carried records
+        self._carry_delta = 0.0
+        self._process_infos: list[PytestProcessInfo] = []  # shifted records, in arrival order
+        self._infos_by_name: dict[str, list[PytestProcessInfo]] = {}
+        self._run_states: dict[str, PytestRunState] = {}
+        self._state_counts: dict[PytestRunnerState, int] = defaultdict(int)
+        self._running: set[str] = set()
+        self._min_ts: float | None = None
+        self._max_ts: float | None = None
+        self._min_ts_started: float | None = None
+        self._max_ts_started: float | None = None
+        # Parallelism integral: per started test its (start, end) span; finished spans are summed,
+        # open ones (started, not finished) are measured against now at each tick.
+        self._spans: dict[str, tuple[float | None, float | None]] = {}
+        self._finished_time = 0.0
+        self._open_starts: dict[str, float] = {}
+        self._n_started = 0
+        self._min_start: float | None = None
+        self._max_end: float | None = None
+        self._queued_prior = 0.0  # sum of prior durations over QUEUED tests
+
+    def update(
+        self,
+        process_infos: list,
+        prior_durations: dict[str, float] | None = None,
+        num_processes: int = 1,
+        current_run_start: float | None = None,
+        singleton_names: set[str] | None = None,
+        put_version_info: PutVersionInfo | None = None,
+        reset: bool = False,
+    ) -> TickData:
+        """
+        Apply the records added to *process_infos* since the previous call and return this tick's :class:`TickData`.
+
+        :param process_infos: The run's records so far; earlier calls' records must still be its prefix.
+        :param reset: Start over, e.g. because the records were reloaded for another run.
+        :return: The tick data; :attr:`TickData.changed_names` lists the tests whose records changed
+            (``None`` after starting over).
+        """
+        singletons = singleton_names if singleton_names is not None else set()
+        new_infos = process_infos[self._consumed :]
+        if (
+            reset
+            or len(process_infos) < self._consumed
+            or current_run_start != self._current_run_start
+            or singletons != self._singleton_names
+            or prior_durations is not self._prior_durations_source
+            or self._moves_carried_shift(new_infos)
+        ):
+            self._start_over(current_run_start, singletons, prior_durations)
+            self._carry_delta_from(process_infos)
+            new_infos = process_infos
+        # After starting over (or before any record was applied) every test counts as changed.
+        changed_names: set[str] | None = set() if self._consumed > 0 else None
+        self._consumed = len(process_infos)
+
+        touched_names = self._apply(new_infos)
+        names_added = False
+        for name in touched_names:
+            names_added |= self._refresh_test(name)
+        if names_added:
+            ordered_names = sorted(self._infos_by_name, key=lambda n: (n in self._singleton_names, n))
+            self._infos_by_name = {name: self._infos_by_name[name] for name in ordered_names}
+            self._run_states = {name: self._run_states[name] for name in ordered_names}
+        if changed_names is not None:
+            changed_names = touched_names
+
+        now = time.time()
+        max_ts = self._max_ts
+        # While any test is running, anchor the time-axis right edge to wall-clock now.
+        # Otherwise max_ts is frozen at the latest STARTED record's timestamp, so running-test
+        # bars (whose right edge is time.time()) overflow far past the chart and get clipped.
+        if max_ts is not None and self._state_counts[PytestRunnerState.RUNNING] > 0:
+            max_ts = max(max_ts, now)
+
+        return TickData(
+            process_infos=self._process_infos,
+            infos_by_name=self._infos_by_name,
+            run_states=self._run_states,
+            min_time_stamp=self._min_ts,
+            max_time_stamp=max_ts,
+            min_time_stamp_started=self._min_ts_started,
+            max_time_stamp_started=self._max_ts_started,
+            prior_durations=self._prior_durations,
+            num_processes=num_processes,
+            average_parallelism=self._average_parallelism(now),
+            current_run_start=current_run_start,
+            singleton_names=singletons,
+            put_version_info=put_version_info,
+            state_counts=self._state_counts,
+            running_names=sorted(self._running, key=lambda n: (n in self._singleton_names, n)),
+            remaining_work_seconds=self._remaining_work(now),
+            remaining_work_priors=self._prior_durations,
+            changed_names=changed_names,
+        )
 
     # RESUME mode copies prior-run records for already-passed tests into the current run so
     # they appear in every GUI tab.  Those copies keep their genuine historical timestamps in
@@ -204,37 +357,104 @@ def build_tick_data(
     # predating the run's start) onto the current run's timeline here, at render time, preserving
     # their relative spacing and leaving the DB untouched.  Durations are delta-invariant, so the
     # table's Runtime column is unaffected.
-    if current_run_start is not None:
-        earliest_carried = min((info.time_stamp for info in process_infos if info.time_stamp < current_run_start), default=None)
-        if earliest_carried is not None:
-            delta = current_run_start - earliest_carried
-            process_infos = [replace(info, time_stamp=info.time_stamp + delta) if info.time_stamp < current_run_start else info for info in process_infos]
-
-    grouped = group_process_infos_by_name(process_infos)
-    ordered_names = sorted(grouped, key=lambda n: (n in singletons, n))
-    infos_by_name = {name: grouped[name] for name in ordered_names}
-    run_states = {name: PytestRunState(infos_by_name[name]) for name in ordered_names}
-    min_ts, max_ts = compute_time_window(process_infos)
-    min_ts_s, max_ts_s = compute_time_window(process_infos, require_pid=True)
-
-    # While any test is running, anchor the time-axis right edge to wall-clock now.
-    # Otherwise max_ts is frozen at the latest STARTED record's timestamp, so running-test
-    # bars (whose right edge is time.time()) overflow far past the chart and get clipped.
-    if max_ts is not None and any(rs.get_state() == PytestRunnerState.RUNNING for rs in run_states.values()):
-        max_ts = max(max_ts, time.time())
-
-    return TickData(
-        process_infos=process_infos,
-        infos_by_name=infos_by_name,
-        run_states=run_states,
-        min_time_stamp=min_ts,
-        max_time_stamp=max_ts,
-        min_time_stamp_started=min_ts_s,
-        max_time_stamp_started=max_ts_s,
-        prior_durations=prior_durations if prior_durations is not None else {},
-        num_processes=num_processes,
-        average_parallelism=compute_average_parallelism(infos_by_name),
-        current_run_start=current_run_start,
-        singleton_names=singletons,
-        put_version_info=put_version_info,
-    )
+
+    def _carry_delta_from(self, process_infos: list[PytestProcessInfo]) -> None:
+        """Derive the carried-record shift from the earliest record predating the run's start."""
+        if self._current_run_start is not None:
+            self._earliest_carried = min((info.time_stamp for info in process_infos if info.time_stamp < self._current_run_start), default=None)
+            if self._earliest_carried is not None:
+                self._carry_delta = self._current_run_start - self._earliest_carried
+
+    def _moves_carried_shift(self, new_infos: list[PytestProcessInfo]) -> bool:
+        """True when a new carried record predates every earlier one, which changes the shift of all of them."""
+        if self._current_run_start is None:
+            return False
+        for info in new_infos:
+            if info.time_stamp < self._current_run_start and (self._earliest_carried is None or info.time_stamp < self._earliest_carried):
+                return True
+        return False
+
+    def _apply(self, new_infos: list[PytestProcessInfo]) -> set[str]:
+        """Shift, group and window the new records; return the names they belong to."""
+        touched_names = set()
+        for info in new_infos:
+            if self._earliest_carried is not None and info.time_stamp < self._current_run_start:
+                info = replace(info, time_stamp=info.time_stamp + self._carry_delta)
+            self._process_infos.append(info)
+            self._infos_by_name.setdefault(info.name, []).append(info)
+            touched_names.add(info.name)
+            time_stamp = info.time_stamp
+            if self._min_ts is None or time_stamp < self._min_ts:
+                self._min_ts = time_stamp
+            if self._max_ts is None or time_stamp > self._max_ts:
+                self._max_ts = time_stamp
+            if info.pid is not None:
+                if self._min_ts_started is None or time_stamp < self._min_ts_started:
+                    self._min_ts_started = time_stamp
+                if self._max_ts_started is None or time_stamp > self._max_ts_started:
+                    self._max_ts_started = time_stamp
+        return touched_names
+
+    def _refresh_test(self, name: str) -> bool:
+        """Re-derive one test's state and its share of the aggregates; return True if the test is new."""
+        infos = self._infos_by_name[name]
+        prior = self._prior_durations.get(name, 0.0)
+        old_run_state = self._run_states.get(name)
+        if old_run_state is not None:
+            old_state = old_run_state.get_state()
+            self._state_counts[old_state] -= 1
+            if old_state == PytestRunnerState.QUEUED:
+                self._queued_prior -= prior
+            self._running.discard(name)
+        run_state = PytestRunState(infos)
+        self._run_states[name] = run_state
+        state = run_state.get_state()
+        self._state_counts[state] += 1
+        if state == PytestRunnerState.QUEUED:
+            self._queued_prior += prior
+        elif state == PytestRunnerState.RUNNING:
+            self._running.add(name)
+
+        old_start, old_end = self._spans.get(name, (None, None))
+        if old_start is not None:
+            self._n_started -= 1
+            if old_end is not None:
+                self._finished_time -= old_end - old_start
+            else:
+                del self._open_starts[name]
+        start, end = extract_test_duration(infos)
+        self._spans[name] = (start, end)
+        if start is not None:
+            self._n_started += 1
+            if end is not None:
+                self._finished_time += end - start
+                # a test's end only moves later as its records are appended, so a running max suffices
+                if self._max_end is None or end > self._max_end:
+                    self._max_end = end
+            else:
+                self._open_starts[name] = start
+            if self._min_start is None or start < self._min_start:
+                self._min_start = start
+        return old_run_state is None
+
+    def _average_parallelism(self, now: float) -> float | None:
+        """Average number of simultaneously running tests; see :func:`compute_average_parallelism`."""
+        if self._n_started == 0:
+            return None
+        total_test_time = self._finished_time + sum(now - start for start in self._open_starts.values())
+        ends = [end for end in (self._max_end, now if self._open_starts else None) if end is not None]
+        wall_clock = max(ends) - self._min_start
+        if wall_clock <= 0:
+            return None
+        return total_test_time / wall_clock
+
+    def _remaining_work(self, now: float) -> float:
+        """Estimated seconds of work left: queued tests' prior durations plus running tests' unfinished share."""
+        if self._state_counts[PytestRunnerState.QUEUED] == 0:
+            self._queued_prior = 0.0  # drop the rounding residue of the running sum
+        remaining = self._queued_prior
+        for name in self._running:
+            start = self._spans[name][0]
+            if start is not None:
+                remaining += max(0.0, self._prior_durations.get(name, 0.0) - (now - start))
+        return remaining
@@ -0,0 +1,176 @@
+"""
+Watch mode — rerun the tests an edit affects as soon as the edit is saved.
+
+A :class:`ProjectWatcher` follows the program under test's tree with watchdog (inotify,
+FSEvents or ReadDirectoryChangesW, so no polling) and reports the Python sources, ``conftest.py``
+files and pytest configuration files that changed, coalescing the burst of events one save
+produces (editors write, rename and touch) into a single report after a short debounce.
+
+What a report does depends on the app's state (see the Run tab's control window):
+
+- idle — an AFFECTED run starts (see :mod:`pytest_fly.impact`), so only the tests the edit
+  can affect run, at line level;
+- running — :func:`affected_tests` picks the run's tests the changed files can affect and
+  :meth:`PytestRunner.requeue_tests` runs them again ahead of the rest of the queue: an
+  affected test in flight is stopped (its process tree terminated) and requeued, an unaffected
+  one keeps running.
+
+The check during a run is file level — a test is affected when it executed a changed file, or
+a changed ``conftest.py`` or configuration file applies to it — since the run is rewriting the
+coverage data a line-level check would compare against.  A test without coverage data is
+always affected.  Kept free of Qt so it can be tested headless.
+"""
+
+import os
+import time
+from collections.abc import Callable
+from pathlib import Path
+from threading import Event, Lock, Thread
+
+from typeguard import typechecked
+from watchdog.events import EVENT_TYPE_CLOSED, EVENT_TYPE_CREATED, EVENT_TYPE_DELETED, EVENT_TYPE_MODIFIED, EVENT_TYPE_MOVED, FileSystemEvent, FileSystemEventHandler
+from watchdog.observers import Observer
+
+from .file_util import is_skipped_directory
+from .impact import ImpactIndex
+from .logger import get_logger
+from .pytest_runner.const import FAIL_OPEN_ERRORS
+from .pytest_runner.test_list import module_of
+
+log = get_logger()
+
+DEBOUNCE_SECONDS = 0.25  # quiet time after the last event before a change is reported
+CONFIG_FILE_NAMES = {"pytest.ini", ".pytest.ini", "pyproject.toml", "tox.ini", "setup.cfg"}
+_CONFTEST_FILE_NAME = "conftest.py"
+# Events that can change a file's content (opening or reading one — a running test does — is not one of them).
+_CHANGE_EVENT_TYPES = {EVENT_TYPE_CREATED, EVENT_TYPE_MODIFIED, EVENT_TYPE_DELETED, EVENT_TYPE_MOVED, EVENT_TYPE_CLOSED}
+
+
+class _ChangeHandler(FileSystemEventHandler):
+    """Hands the paths of the file events that can change a file's content to *on_path*."""
+
+    def __init__(self, on_path: Callable[[str], None]):
+        super().__init__()
+        self._on_path = on_path
+
+    def on_any_event(self, event: FileSystemEvent) -> None:
+        if event.is_directory or event.event_type not in _CHANGE_EVENT_TYPES:
+            return
+        self._on_path(os.fsdecode(event.src_path))
+        if event.event_type == EVENT_TYPE_MOVED:
+            self._on_path(os.fsdecode(event.dest_path))  # e.g. an editor's temporary file renamed over the source
+
+
+class ProjectWatcher:
+    """Reports the changed sources and test configuration under a project, debounced.
+
+    :param project_root: Directory to watch (recursively, skipping the directories test discovery skips).
+    :param on_change: Called on the watcher's thread with the files changed (or deleted) since the last report.
+    :param debounce_seconds: Quiet time after the last event before the changes are reported.
+    """
+
+    @typechecked()
+    def __init__(self, project_root: Path, on_change: Callable[[set[Path]], None], debounce_seconds: float = DEBOUNCE_SECONDS):
+        self.project_root = Path(os.path.realpath(project_root))
+        self.debounce_seconds = debounce_seconds
+        self._on_change = on_change
+        self._lock = Lock()
+        self._changed: set[Path] = set()
+        self._deadline = 0.0  # monotonic time at which the changes are reported
+        self._wake = Event()
+        self._stop = Event()
+        self._observer: Observer | None = None
+        self._thread: Thread | None = None
+
+    def start(self) -> None:
+        """Start watching."""
+        observer = Observer()
+        observer.daemon = True
+        observer.schedule(_ChangeHandler(self._add), str(self.project_root), recursive=True)
+        observer.start()
+        self._observer = observer
+        self._thread = Thread(target=self._run, name="project_watcher", daemon=True)
+        self._thread.start()
+        log.info(f"watching {self.project_root} for changes")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop watching (changes not reported yet are dropped)."""
+        self._stop.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def is_watched(self, path: str) -> bool:
+        """``True`` when a change to *path* can change test results: a Python file or a pytest configuration file, outside the skipped directories."""
+        name = os.path.basename(path)
+        if not (name.endswith(".py") or name in CONFIG_FILE_NAMES):
+            return False
+        directory = str(self.project_root)
+        for part in Path(os.path.relpath(os.path.dirname(path), directory)).parts:
+            if part == os.pardir:
+                return False  # outside the project
+            if part == os.curdir:
+                continue
+            directory = os.path.join(directory, part)
+            if is_skipped_directory(directory):
+                return False
+        return True
+
+    def _add(self, path: str) -> None:
+        """Note a change to *path* (watchdog's thread), pushing the report back by the debounce time."""
+        if not self.is_watched(path):
+            return
+        with self._lock:
+            self._changed.add(Path(path))
+            self._deadline = time.monotonic() + self.debounce_seconds
+        self._wake.set()
+
+    def _run(self) -> None:
+        """Report the changes once they have been quiet for the debounce time."""
+        while not self._stop.is_set():
+            with self._lock:
+                remaining = self._deadline - time.monotonic() if self._changed else None
+                changed = None
+                if remaining is not None and remaining <= 0.0:
+                    changed, self._changed = self._changed, set()
+            if changed:
+                try:
+                    self._on_change(changed)
+                except FAIL_OPEN_ERRORS as e:
+                    log.warning(f"handling changed files failed: {e}", exc_info=True)
+                continue
+            self._wake.wait(remaining)
+            self._wake.clear()
+
+
+@typechecked()
+def affected_tests(changed: set[Path], test_names: list[str], impact_index: ImpactIndex, project_root: Path) -> set[str]:
+    """The tests among *test_names* that changes to the files *changed* can affect (file level).
+
+    A test is affected when one of the files it executed changed (its module included), when a
+    changed ``conftest.py`` or pytest configuration file is in its module's directory or above,
+    or when it has no coverage data.
+
+    :param changed: Files changed or deleted.
+    :param test_names: The candidate tests' node ids.
+    :param impact_index: Reads the tests' per-test coverage data.
+    :param project_root: The program under test's root (for tests whose module is not in their coverage data).
+    :return: The affected tests.
+    """
+    changed_paths = {os.path.realpath(path) for path in changed}
+    config_dirs = [os.path.dirname(path) for path in changed_paths if os.path.basename(path) == _CONFTEST_FILE_NAME or os.path.basename(path) in CONFIG_FILE_NAMES]
+    coverage = impact_index.coverage(test_names)
+    affected = set()
+    for name in test_names:
+        if (test_coverage := coverage.get(name)) is None:
+            affected.add(name)
+            continue
+        module = os.path.normpath(module_of(name))
+        module_suffix = f"{os.sep}{module}"
+        module_path = next((source for source in test_coverage.lines if source.endswith(module_suffix)), os.path.realpath(Path(project_root, module)))
+        if module_path in changed_paths or not changed_paths.isdisjoint(test_coverage.lines) or any(module_path.startswith(f"{directory}{os.sep}") for directory in config_dirs):
+            affected.add(name)
+    return affected
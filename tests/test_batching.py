@@ -0,0 +1,77 @@
+"""Tests for adaptive batching of short tests into a single test process."""
+
+from pathlib import Path
+
+from pytest_fly.db import PytestProcessInfoDB
+from pytest_fly.file_util import sanitize_test_name
+from pytest_fly.guid import generate_uuid
+from pytest_fly.interfaces import PyTestFlyExitCode, ScheduledBatch, ScheduledTest
+from pytest_fly.pytest_runner import PytestRunner
+from pytest_fly.pytest_runner.batching import plan_batches
+from pytest_fly.pytest_runner.execution import ExecutionConfig
+from pytest_fly.pytest_runner.run_state import latest_info_per_name
+
+from .paths import get_temp_dir
+
+
+def _test(node_id: str, duration: float | None, singleton: bool = False) -> ScheduledTest:
+    return ScheduledTest(node_id=node_id, singleton=singleton, duration=duration, coverage=None)
+
+
+def test_plan_batches():
+    tests = [
+        _test("a", 0.5),
+        _test("b", 0.5),
+        _test("c", 1.5),  # would overflow the 2 s target -> starts a new batch
+        _test("d", 0.1),
+        _test("long", 5.0),  # too long to batch
+        _test("e", 0.1),
+        _test("never_passed", None),  # unknown cost
+        _test("solo", 0.1, singleton=True),
+        _test("f", 0.1),
+    ]
+    units = plan_batches(tests, 2.0)
+    assert [unit.node_ids if isinstance(unit, ScheduledBatch) else unit.node_id for unit in units] == [
+        ["a", "b"],
+        ["c", "d"],
+        "long",
+        "e",
+        "never_passed",
+        "solo",
+        "f",
+    ]
+    assert units[1].duration == 1.6
+
+    assert plan_batches(tests, 0.0) == tests  # disabled
+
+
+def test_batched_run_keeps_per_module_results(app):
+    """A batch runs in one process, but every module still gets its own records, output and coverage."""
+    data_dir = get_temp_dir("test_batched_run_keeps_per_module_results")
+    with PytestProcessInfoDB(data_dir) as db:
+        db.delete()
+    test_dir = Path(data_dir, "suite")
+    test_dir.mkdir(exist_ok=True)
+    node_ids = []
+    for index in range(3):
+        path = Path(test_dir, f"test_tiny_{index}.py")
+        path.write_text(f"def test_tiny_{index}():\n    print('tiny {index} output')\n    assert {index} != 2\n")
+        node_ids.append(path.as_posix())
+
+    run_guid = generate_uuid()
+    scheduled_tests = [_test(node_id, 0.1) for node_id in node_ids]
+    runner = PytestRunner(run_guid, scheduled_tests, 1, data_dir, 1.0, execution_config=ExecutionConfig(batch_target_seconds=2.0))
+    runner.start()
+    assert runner.join(120.0)
+
+    with PytestProcessInfoDB(data_dir) as db:
+        results = db.query(run_guid)
+    latest = latest_info_per_name(results)
+    for index, node_id in enumerate(node_ids):
+        assert f"tiny {index} output" in latest[node_id].output
+        assert f"tiny {index + 1} output" not in latest[node_id].output
+        assert Path(data_dir, "coverage", f"{sanitize_test_name(node_id)}.coverage").exists()
+    assert [latest[node_id].exit_code for node_id in node_ids] == [PyTestFlyExitCode.OK, PyTestFlyExitCode.OK, PyTestFlyExitCode.TESTS_FAILED]
+
+    running_pids = {info.pid for info in results if info.exit_code == PyTestFlyExitCode.NONE and info.pid is not None}
+    assert len(running_pids) == 1
@@ -0,0 +1,95 @@
+"""Tests for the single-pass, cached test collection (pytest_runner.collection_cache)."""
+
+import json
+import os
+from pathlib import Path
+
+from pytest_fly.pytest_runner.collection_cache import CollectionCache
+from pytest_fly.pytest_runner.test_list import GetTests
+
+from .paths import get_temp_dir
+
+
+def _touch(path: Path, text: str) -> None:
+    path.write_text(text)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))  # a distinct mtime on coarse-grained file systems
+
+
+def _discover(project_root: Path, cache_dir: Path) -> dict[str, bool]:
+    """Scheduled node id (by file name) -> singleton."""
+    get_tests = GetTests(test_dir=project_root, cache_dir=cache_dir)
+    get_tests.start()
+    get_tests.join(60.0)
+    return {Path(test.node_id).name: test.singleton for test in get_tests.get_tests()}
+
+
+def _plant(cache: CollectionCache, module_name: str, item_name: str) -> None:
+    """Add an item to a cached module that its file does not have, so a reuse of the cached module shows."""
+    cached = json.loads(cache.path.read_text())
+    path, module = next((path, module) for path, module in cached["modules"].items() if Path(path).name == module_name)
+    module["items"].append([f"{module['items'][0][0].split('::')[0].replace(module_name, item_name)}::test_planted", False])
+    cache.path.write_text(json.dumps(cached))
+
+
+def test_only_changed_modules_are_collected_again():
+    """Unchanged modules come from the cache; edited and new ones are collected, removed ones dropped."""
+    root = get_temp_dir("test_only_changed_modules_are_collected_again")
+    project_root = Path(root, "project").absolute()
+    Path(project_root, "pkg").mkdir(parents=True)
+    Path(project_root, "conftest.py").write_text("def pytest_configure(config):\n    config.addinivalue_line('markers', 'singleton: run this module alone')\n")
+    Path(project_root, "test_alpha.py").write_text("def test_a():\n    assert True\n")
+    Path(project_root, "pkg", "test_solo.py").write_text("import pytest\n@pytest.mark.singleton\ndef test_solo():\n    assert True\n")
+    cache_dir = Path(root, "cache")
+    cache = CollectionCache(cache_dir, project_root)
+
+    assert _discover(project_root, cache_dir) == {"test_alpha.py": False, "test_solo.py": True}  # one pass, singletons from the markers
+    assert cache.path.exists()
+
+    _plant(cache, "test_solo.py", "test_planted.py")
+    _touch(Path(project_root, "test_alpha.py"), "def test_a():\n    assert 1\n")  # edited: collected again
+    Path(project_root, "pkg", "test_new.py").write_text("def test_new():\n    assert True\n")
+    assert _discover(project_root, cache_dir) == {"test_alpha.py": False, "test_new.py": False, "test_planted.py": False, "test_solo.py": True}
+
+    _touch(Path(project_root, "test_alpha.py"), "def test_a():\n    assert 1\n")  # touched only: the content is unchanged
+    Path(project_root, "pkg", "test_new.py").unlink()
+    assert _discover(project_root, cache_dir) == {"test_alpha.py": False, "test_planted.py": False, "test_solo.py": True}
+
+    _touch(Path(project_root, "conftest.py"), Path(project_root, "conftest.py").read_text() + "\n")  # configuration: everything again
+    assert _discover(project_root, cache_dir) == {"test_alpha.py": False, "test_solo.py": True}
+
+
+def test_new_directory_collects_everything_again():
+    """A new directory pytest would recurse into is collected afresh (its conftest files are unknown)."""
+    root = get_temp_dir("test_new_directory_collects_everything_again")
+    project_root = Path(root, "project").absolute()
+    project_root.mkdir()
+    Path(project_root, "test_alpha.py").write_text("def test_a():\n    assert True\n")
+    cache_dir = Path(root, "cache")
+    cache = CollectionCache(cache_dir, project_root)
+    assert _discover(project_root, cache_dir) == {"test_alpha.py": False}
+
+    _plant(cache, "test_alpha.py", "test_planted.py")
+    Path(project_root, ".hidden").mkdir()  # not recursed into: the cache still holds
+    assert _discover(project_root, cache_dir) == {"test_alpha.py": False, "test_planted.py": False}
+
+    Path(project_root, "sub").mkdir()
+    Path(project_root, "sub", "test_beta.py").write_text("def test_b():\n    assert True\n")
+    assert _discover(project_root, cache_dir) == {"test_alpha.py": False, "test_beta.py": False}
+
+
+def test_collection_errors_are_not_cached():
+    """A module that fails to import leaves no cache behind, so the next discovery collects the whole tree."""
+    root = get_temp_dir("test_collection_errors_are_not_cached")
+    project_root = Path(root, "project").absolute()
+    project_root.mkdir()
+    Path(project_root, "test_alpha.py").write_text("def test_a():\n    assert True\n")
+    Path(project_root, "test_broken.py").write_text("import a_module_that_does_not_exist\n")
+    cache_dir = Path(root, "cache")
+
+    assert _discover(project_root, cache_dir) == {"test_alpha.py": False}
+    assert not CollectionCache(cache_dir, project_root).path.exists()
+
+    _touch(Path(project_root, "test_broken.py"), "def test_fixed():\n    assert True\n")
+    assert _discover(project_root, cache_dir) == {"test_alpha.py": False, "test_broken.py": False}
+    assert CollectionCache(cache_dir, project_root).path.exists()
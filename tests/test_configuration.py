@@ -8,7 +8,7 @@ from PySide6.QtWidgets import QFileDialog
 
 from pytest_fly.gui.configuration_tab import configuration as configuration_module
 from pytest_fly.gui.configuration_tab.configuration import Configuration, OrderingAspectsWidget
-from pytest_fly.interfaces import OrderingAspect, RunMode
+from pytest_fly.interfaces import ExecutionMode, OrderingAspect, RunMode, SchedulingGranularity
 from pytest_fly.paths import get_workspace_dir, init_workspace
 from pytest_fly.preferences import (
     cpu_gate_threshold_default,
@@ -167,6 +167,59 @@ def test_update_cpu_gate_prefs(app):
     assert get_pref().cpu_gate_threshold == 0.75
 
 
+def test_update_memory_budget_gate_prefs(app):
+    cfg = Configuration()
+
+    cfg.memory_budget_gate_enabled_checkbox.setChecked(True)
+    cfg.update_memory_budget_gate_enabled()
+    assert get_pref().memory_budget_gate_enabled is True
+
+    cfg.update_memory_budget_gb("12.5")
+    assert get_pref().memory_budget_gb == 12.5
+    cfg.update_memory_budget_gb("-1")  # clamped up to 0 (= physical RAM)
+    assert get_pref().memory_budget_gb == 0.0
+
+
+def test_update_execution_prefs(app):
+    cfg = Configuration()
+
+    cfg.execution_mode_combo.setCurrentIndex(cfg.execution_mode_combo.findData(int(ExecutionMode.FORKSERVER)))
+    assert get_pref().execution_mode == ExecutionMode.FORKSERVER
+
+    cfg.scheduling_granularity_combo.setCurrentIndex(cfg.scheduling_granularity_combo.findData(int(SchedulingGranularity.FUNCTION)))
+    assert get_pref().scheduling_granularity == SchedulingGranularity.FUNCTION
+
+    cfg.auto_split_critical_modules_checkbox.setChecked(True)
+    cfg.update_auto_split_critical_modules()
+    assert get_pref().auto_split_critical_modules is True
+
+    cfg.critical_path_scheduling_checkbox.setChecked(True)
+    cfg.update_critical_path_scheduling()
+    assert get_pref().critical_path_scheduling is True
+
+    cfg.batch_short_tests_checkbox.setChecked(True)
+    cfg.update_batch_short_tests()
+    cfg.update_batch_target_seconds("3.5")
+    assert get_pref().batch_short_tests is True
+    assert get_pref().batch_target_seconds == 3.5
+    cfg.update_batch_target_seconds("-1")  # clamped up to 0
+    assert get_pref().batch_target_seconds == 0.0
+
+    cfg.forkserver_preload_modules_lineedit.setText("  mypackage, mypackage.models ")
+    cfg.update_forkserver_preload_modules()
+    assert get_pref().forkserver_preload_modules == "mypackage, mypackage.models"
+
+    cfg._apply_defaults()
+    assert get_pref().execution_mode == ExecutionMode.SPAWN
+    assert get_pref().forkserver_preload_modules == ""
+    assert cfg.execution_mode_combo.currentData() == int(ExecutionMode.SPAWN)
+    assert get_pref().scheduling_granularity == SchedulingGranularity.MODULE
+    assert get_pref().auto_split_critical_modules is False
+    assert get_pref().batch_short_tests is False
+    assert get_pref().critical_path_scheduling is False
+    assert get_pref().batch_target_seconds == 2.0
+
+
 def test_update_resource_guard_prefs(app):
     cfg = Configuration()
 
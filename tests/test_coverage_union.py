@@ -0,0 +1,98 @@
+"""Tests for incremental coverage combination (pytest_fly.coverage_union) against ``coverage report``."""
+
+import io
+import os
+from pathlib import Path
+
+import pytest
+from coverage import Coverage, CoverageData
+
+from pytest_fly.coverage_union import CoverageUnion
+from pytest_fly.file_util import sanitize_test_name
+
+from .paths import get_temp_dir
+
+CALC = '''"""A module."""
+
+TOTAL = sum(
+    [1, 2, 3],
+)
+
+
+def add(a, b):
+    return a + b
+
+
+def mul(a, b):  # pragma: no cover
+    return a * b
+
+
+def div(a, b):
+    if b == 0:
+        raise ZeroDivisionError
+    return a / b
+'''
+
+EXTRA = "X = 1\nY = 2\n"
+
+
+def _write_coverage(data_dir: Path, name: str, lines: dict[Path, list[int]]) -> None:
+    path = Path(data_dir, "coverage", f"{sanitize_test_name(name)}.coverage")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+    data = CoverageData(basename=str(path))
+    data.add_lines({os.path.realpath(source): executed for source, executed in lines.items()})
+    data.write()
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))  # a rewrite is seen even on a coarse clock
+
+
+def _coverage_report(data_dir: Path, names: list[str]) -> tuple[float, int, int]:
+    """``(fraction, covered, total)`` from ``coverage combine`` and ``coverage report`` over *names*' coverage files."""
+    cov = Coverage(data_file=str(Path(data_dir, "combined.coverage")))
+    cov.combine([str(Path(data_dir, "coverage", f"{sanitize_test_name(name)}.coverage")) for name in names], keep=True)
+    fraction = cov.report(ignore_errors=True, output_format="total", file=io.StringIO()) / 100.0
+    covered = total = 0
+    for source in cov.get_data().measured_files():
+        if os.path.exists(source):
+            _, statements, _, missing, _ = cov.analysis2(source)
+            covered += len(statements) - len(missing)
+            total += len(statements)
+    return fraction, covered, total
+
+
+def test_union_matches_coverage_report():
+    root = get_temp_dir("test_union_matches_coverage_report")
+    data_dir = Path(root, "data")
+    calc = Path(root, "calc.py")
+    calc.write_text(CALC)
+    extra = Path(root, "extra.py")
+    extra.write_text(EXTRA)
+    _write_coverage(data_dir, "test_add.py", {calc: [3, 4, 8, 9, 12, 16]})  # 4 is inside the multi-line statement at 3
+    union = CoverageUnion(data_dir)
+    union.update(["test_add.py"])
+    fraction, covered, total = _coverage_report(data_dir, ["test_add.py"])
+    assert union.totals() == (covered, total)
+    assert union.fraction() == pytest.approx(fraction)
+
+    _write_coverage(data_dir, "test_div.py", {calc: [3, 8, 12, 16, 17, 19], extra: [1]})
+    union.update(["test_add.py", "test_div.py"])
+    names = ["test_add.py", "test_div.py"]
+    fraction, covered, total = _coverage_report(data_dir, names)
+    assert union.totals() == (covered, total)
+    assert union.fraction() == pytest.approx(fraction)
+    per_test = union.per_test_fractions(names)
+    assert per_test["test_add.py"] == pytest.approx(_coverage_report(data_dir, ["test_add.py"])[1] / total)
+
+    _write_coverage(data_dir, "test_div.py", {calc: [3, 8, 12, 16, 17, 18]})  # run again: no longer executes extra.py or line 19
+    extra.unlink()  # and the source that is gone is skipped, as with ignore_errors
+    calc.write_text(CALC + "\n\ndef neg(a):\n    return -a\n")  # a source edited since it was parsed
+    union.update(names)
+    fraction, covered, total = _coverage_report(data_dir, names)
+    assert union.totals() == (covered, total)
+    assert union.fraction() == pytest.approx(fraction)
+
+    union.reset()
+    assert union.fraction() is None
+    union.update(["test_add.py"])
+    assert union.totals() == _coverage_report(data_dir, ["test_add.py"])[1:]
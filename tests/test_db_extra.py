@@ -2,9 +2,16 @@
 
 import sqlite3
 import time
+import zlib
+from dataclasses import replace
+from types import SimpleNamespace
+
+import pytest
 
 from pytest_fly.__version__ import application_name
-from pytest_fly.db import PytestProcessInfoDB
+from pytest_fly.const import PYTEST_FLY_OUTPUT_ZSTD_STRING
+from pytest_fly.db import OutputStorageStats, PytestProcessInfoDB, PytestProcessInfoReader
+from pytest_fly.db import db as db_module
 from pytest_fly.guid import generate_uuid
 from pytest_fly.interfaces import PyTestFlyExitCode, PytestProcessInfo
 
@@ -39,10 +46,27 @@ def test_delete_all_drops_table():
         # The table is gone; query_ever_run_names catches the OperationalError and returns empty.
         assert db.query_ever_run_names() == set()
         assert db.query_last_pass() == {}
+        assert db.query_peak_commit() == {}
+
+
+def test_query_peak_commit_uses_most_recent_measured_run():
+    """query_peak_commit returns each test's largest commit sample from its latest run that measured one."""
+    db_dir = get_temp_dir("test_query_peak_commit")
+    older, newer = generate_uuid(), generate_uuid()
+    now = time.time()
+    with PytestProcessInfoDB(db_dir) as db:
+        db.delete()
+        db.write(PytestProcessInfo(older, "test_a", 1, PyTestFlyExitCode.OK, None, now, commit_bytes=900))
+        db.write(PytestProcessInfo(older, "test_b", 2, PyTestFlyExitCode.OK, None, now, commit_bytes=300))
+        db.write(PytestProcessInfo(newer, "test_a", 3, PyTestFlyExitCode.NONE, None, now, commit_bytes=100))
+        db.write(PytestProcessInfo(newer, "test_a", 3, PyTestFlyExitCode.OK, None, now + 1, commit_bytes=200))
+        db.write(_info(newer, "test_b", 4, PyTestFlyExitCode.OK, now))  # not measured: the older run's peak stands
+    with PytestProcessInfoReader(db_dir) as reader:
+        assert reader.query_peak_commit() == {"test_a": 200, "test_b": 300}
 
 
 def test_schema_change_drops_and_recreates(tmp_path):
-    """An on-disk table with a stale schema is dropped and recreated on open."""
+    """A legacy table with an unrecognizable schema is dropped, and the current schema created, on open."""
     db_path = tmp_path / f"{application_name}.db"
     # Seed a table whose columns don't match the current dataclass-derived schema.
     conn = sqlite3.connect(db_path)
@@ -61,3 +85,177 @@ def test_schema_change_drops_and_recreates(tmp_path):
         rows = db.query(guid)
     assert len(rows) == 1
     assert rows[0].name == "test_a"
+
+
+def test_legacy_table_is_migrated(tmp_path):
+    """A schema-version-1 table's records, outputs and last passes survive the move to the normalized tables."""
+    db_path = tmp_path / f"{application_name}.db"
+    now = time.time()
+    legacy_rows = [
+        ("run-a", "test_x", 100, int(PyTestFlyExitCode.NONE), None, now),
+        ("run-a", "test_x", 100, int(PyTestFlyExitCode.OK), "passed A", now + 5),
+        ("run-b", "test_x", None, int(PyTestFlyExitCode.NONE), None, now + 100),
+        ("run-b", "test_x", 200, int(PyTestFlyExitCode.TESTS_FAILED), "failed B", now + 103),
+    ]
+    conn = sqlite3.connect(db_path)
+    try:
+        # the v1 layout before commit_bytes existed, so the migration also has to fill a missing column
+        conn.execute("CREATE TABLE pytest_process_info (run_guid TEXT, name TEXT, pid INTEGER, exit_code INTEGER, output TEXT, time_stamp REAL)")
+        conn.executemany("INSERT INTO pytest_process_info VALUES (?, ?, ?, ?, ?, ?)", legacy_rows)
+        conn.commit()
+    finally:
+        conn.close()
+    PytestProcessInfoDB._initialized_paths.discard(db_path)
+
+    with PytestProcessInfoDB(tmp_path) as db:
+        rows = db.query("run-a")
+        assert [(row.exit_code, row.output) for row in rows] == [(PyTestFlyExitCode.NONE, None), (PyTestFlyExitCode.OK, "passed A")]
+        assert rows[0].commit_bytes is None
+        assert db.query_last_pass() == {"test_x": (now, pytest.approx(5.0))}  # run B failed, so run A is still the last pass
+        assert db.query_ever_run_names() == {"test_x"}
+    with PytestProcessInfoReader(tmp_path) as reader:
+        assert reader.query_latest_run_guid() == "run-b"
+        assert reader.query_outputs("run-b", ["test_x"]) == {"test_x": (now + 103, "failed B")}
+
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'pytest_process_info'").fetchall() == []
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == 4
+    finally:
+        conn.close()
+
+
+def test_last_pass_falls_back_when_run_is_deleted():
+    """Deleting the run holding a test's last pass makes its previous passing run the last pass."""
+    db_dir = get_temp_dir("test_last_pass_falls_back_when_run_is_deleted")
+    now = time.time()
+    with PytestProcessInfoDB(db_dir) as db:
+        db.delete()
+        for run_guid, start in (("run-a", now), ("run-b", now + 100)):
+            db.write(_info(run_guid, "test_x", 1, PyTestFlyExitCode.NONE, start))
+            db.write(_info(run_guid, "test_x", 1, PyTestFlyExitCode.OK, start + 2))
+        assert db.query_last_pass() == {"test_x": (now + 100, pytest.approx(2.0))}
+        assert db.query_last_pass_runs() == {"test_x": "run-b"}
+        db.delete("run-b")
+        assert db.query_last_pass() == {"test_x": (now, pytest.approx(2.0))}
+        assert db.query_last_pass_runs() == {"test_x": "run-a"}
+        db.delete("run-a")
+        assert db.query_last_pass() == {}
+        assert db.query_last_pass_runs() == {}
+
+
+def test_identical_outputs_are_stored_once():
+    """The same output written by several runs is stored once, compressed, and shared until its last run is deleted."""
+    db_dir = get_temp_dir("test_identical_outputs_are_stored_once")
+    now = time.time()
+    output = "test_x.py::test_one PASSED\n" * 1000
+    with PytestProcessInfoDB(db_dir) as db:
+        db.delete()
+        for run_guid in ("run-a", "run-b"):
+            db.write(PytestProcessInfo(run_guid, "test_x", 1, PyTestFlyExitCode.OK, output, now))
+        db.write(PytestProcessInfo("run-b", "test_y", 1, PyTestFlyExitCode.OK, "é" * 10, now))  # too short to compress
+        storage = db.query_output_storage()
+        assert (storage.output_count, storage.reference_count) == (2, 3)
+        assert storage.raw_bytes == len(output) + 20
+        assert storage.referenced_bytes == 2 * len(output) + 20
+        assert storage.compression_ratio > 10.0
+        assert storage.overall_ratio > storage.compression_ratio
+
+        db.delete("run-b")
+        assert db.query_output_storage().output_count == 1  # test_y's output went with run-b, test_x's is still referenced
+        assert [info.output for info in db.query("run-a")] == [output]
+        db.delete("run-a")
+        assert db.query_output_storage() == OutputStorageStats(0, 0, 0, 0, 0)
+
+
+def test_outputs_round_trip_through_reader():
+    """Records that share an output get it back decompressed from every read path."""
+    db_dir = get_temp_dir("test_outputs_round_trip_through_reader")
+    now = time.time()
+    with PytestProcessInfoDB(db_dir) as db:
+        db.delete()
+        db.write_many(PytestProcessInfo("run-a", name, 1, PyTestFlyExitCode.OK, f"same output\n{'-' * 500}", now) for name in ("test_a", "test_b"))
+        db.write(_info("run-a", "test_c", 1, PyTestFlyExitCode.NONE, now))
+    with PytestProcessInfoReader(db_dir) as reader:
+        records = reader.query("run-a", include_output=True)
+        assert [info.output for info in records] == [f"same output\n{'-' * 500}"] * 2 + [None]
+        assert records[0].output is records[1].output  # decoded once per query
+        assert [info.output for info in reader.query("run-a")] == [None] * 3
+        since, _max_rowid = reader.query_since("run-a", 0, include_output=True)
+        assert since[1].output == records[1].output
+        assert reader.query_outputs("run-a", ["test_b", "test_c"]) == {"test_b": (now, records[1].output)}
+
+
+def test_outputs_are_zstd_compressed_only_when_opted_into(monkeypatch):
+    """zlib by default, so every supported Python can read the outputs; zstd only when asked for."""
+    db_dir = get_temp_dir("test_outputs_are_zstd_compressed_only_when_opted_into")
+    monkeypatch.setattr(db_module, "zstd", SimpleNamespace(compress=zlib.compress, decompress=zlib.decompress))  # as on Python 3.14+
+    monkeypatch.delenv(PYTEST_FLY_OUTPUT_ZSTD_STRING, raising=False)
+    now = time.time()
+    with PytestProcessInfoDB(db_dir) as db:
+        db.delete()
+        db.write(PytestProcessInfo("run-a", "test_a", 1, PyTestFlyExitCode.OK, "default\n" * 100, now))
+        monkeypatch.setenv(PYTEST_FLY_OUTPUT_ZSTD_STRING, "1")
+        db.write(PytestProcessInfo("run-a", "test_b", 1, PyTestFlyExitCode.OK, "opted in\n" * 100, now))
+        assert [row[0] for row in db.execute("SELECT codec FROM outputs ORDER BY output_id")] == [1, 2]  # zlib, zstd
+        assert [info.output for info in db.query("run-a")] == ["default\n" * 100, "opted in\n" * 100]
+
+
+def test_copy_run_records_references_outputs():
+    """RESUME's copy duplicates the chosen tests' records into the new run, sharing their stored outputs."""
+    db_dir = get_temp_dir("test_copy_run_records_references_outputs")
+    now = time.time()
+    with PytestProcessInfoDB(db_dir) as db:
+        db.delete()
+        for name, exit_code in (("test_a", PyTestFlyExitCode.OK), ("test_b", PyTestFlyExitCode.OK), ("test_c", PyTestFlyExitCode.TESTS_FAILED)):
+            db.write(_info("run-a", name, None, PyTestFlyExitCode.NONE, now))
+            db.write(_info("run-a", name, 1, PyTestFlyExitCode.NONE, now + 1))
+            db.write(PytestProcessInfo("run-a", name, 1, exit_code, f"{name} output\n{'-' * 500}", now + 3))
+        storage = db.query_output_storage()
+
+        copied_at = time.time()
+        assert db.copy_run_records("run-a", "run-b", {"test_b", "test_a", "test_missing"}) == 6
+        assert db.copy_run_records("run-a", "run-c", []) == 0
+        copied = db.query("run-b")
+        original = [info for info in db.query("run-a") if info.name != "test_c"]
+        assert [replace(info, run_guid="run-a") for info in copied] == original  # every field but the run, timestamps included
+        assert db.query_output_storage().output_count == storage.output_count
+        assert db.query_output_storage().reference_count == storage.reference_count + 2
+        assert db.query_last_pass() == {"test_a": (now + 1, pytest.approx(2.0)), "test_b": (now + 1, pytest.approx(2.0))}
+        db.delete("run-a")
+        assert [info.output for info in db.query("run-b") if info.output is not None] == [f"test_a output\n{'-' * 500}", f"test_b output\n{'-' * 500}"]
+    with PytestProcessInfoReader(db_dir) as reader:
+        [(run_guid, start)] = reader.query_runs()
+        assert run_guid == "run-b" and copied_at <= start <= time.time()  # the run started when it was copied into, not when its records were written
+        assert reader.query_change_token()[0] == 6
+
+
+def test_v2_outputs_are_compressed_on_migration(tmp_path):
+    """A schema-version-2 database's uncompressed outputs are deduplicated and compressed in place."""
+    db_path = tmp_path / f"{application_name}.db"
+    now = time.time()
+    with PytestProcessInfoDB(tmp_path) as db:
+        db.write_many(PytestProcessInfo(run_guid, "test_x", 1, PyTestFlyExitCode.OK, "shared " * 100, now) for run_guid in ("run-a", "run-b"))
+        db.write(PytestProcessInfo("run-b", "test_y", 1, PyTestFlyExitCode.TESTS_FAILED, "failed", now))
+    conn = sqlite3.connect(db_path)
+    try:
+        # put the outputs back in the version-2 layout: one uncompressed row per record
+        conn.execute("DROP TABLE outputs")
+        conn.execute("CREATE TABLE outputs (output_id INTEGER PRIMARY KEY, output TEXT)")
+        conn.execute("UPDATE test_events SET output_id = rowid + 100")
+        conn.executemany("INSERT INTO outputs (output_id, output) VALUES (?, ?)", [(101, "shared " * 100), (102, "shared " * 100), (103, "failed")])
+        conn.execute("PRAGMA user_version = 2")
+        conn.commit()
+    finally:
+        conn.close()
+    PytestProcessInfoDB._initialized_paths.discard(db_path)
+
+    with PytestProcessInfoDB(tmp_path) as db:
+        assert [(info.name, info.output) for info in db.query("run-b")] == [("test_x", "shared " * 100), ("test_y", "failed")]
+        assert db.query_output_storage().output_count == 2
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'outputs_v2'").fetchall() == []
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == 4
+    finally:
+        conn.close()
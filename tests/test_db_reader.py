@@ -1,13 +1,18 @@
 """PytestProcessInfoReader — lock-free read-only DB access used by the GUI thread.
 
 Verifies parity with the msqlite-backed writer's queries, the default omission of the
-output column (with on-demand fetch via query_outputs), and fail-open behavior when the
-database does not exist yet.
+output column (with on-demand fetch via query_outputs), fail-open behavior when the
+database does not exist yet, and the per-thread pooling of its connection.
 """
 
+import sys
 import time
+from threading import Thread
 
-from pytest_fly.db import PytestProcessInfoDB, PytestProcessInfoReader
+import pytest
+
+from pytest_fly.__version__ import application_name
+from pytest_fly.db import PytestProcessInfoDB, PytestProcessInfoReader, close_pooled_connections
 from pytest_fly.interfaces import PyTestFlyExitCode, PytestProcessInfo
 
 from .paths import get_temp_dir
@@ -27,6 +32,8 @@ def test_reader_missing_db_fails_open():
         assert reader.query_ever_run_names() == set()
         assert reader.query_recent_runs(5) == []
         assert reader.query_change_token() == (0, 0)
+        assert reader.query_since("some-guid", 0) == ([], 0)
+        assert reader.query_latest_run_guid() is None
 
 
 def test_reader_query_omits_output_by_default():
@@ -92,6 +99,7 @@ def test_reader_matches_writer_for_last_pass_and_ever_run():
         writer_ever_run = db.query_ever_run_names()
     with PytestProcessInfoReader(data_dir) as reader:
         assert reader.query_last_pass() == writer_last_pass
+        assert reader.query_last_pass_runs() == {"tests/test_a.py": "run-1"}
         assert reader.query_ever_run_names() == writer_ever_run
     assert "tests/test_a.py" in writer_last_pass
     assert writer_ever_run == {"tests/test_a.py"}
@@ -127,9 +135,81 @@ def test_reader_change_token_tracks_writes():
         assert reader.query_change_token() != token_before
 
 
+def test_reader_query_since_returns_only_newer_rows():
+    data_dir = get_temp_dir("reader_query_since")
+    now = time.time()
+    with PytestProcessInfoDB(data_dir) as db:
+        db.write(_record("run-1", "tests/test_a.py", PyTestFlyExitCode.NONE, None, now))
+        db.write(_record("run-2", "tests/test_x.py", PyTestFlyExitCode.NONE, None, now))
+        db.write(_record("run-1", "tests/test_a.py", PyTestFlyExitCode.OK, "out A", now + 1))
+
+    with PytestProcessInfoReader(data_dir) as reader:
+        assert reader.query_latest_run_guid() == "run-2"
+        infos, last_rowid = reader.query_since("run-1", 0)
+        assert [info.exit_code for info in infos] == [PyTestFlyExitCode.NONE, PyTestFlyExitCode.OK]  # write order
+        assert all(info.output is None for info in infos)
+        assert reader.query_since("run-1", last_rowid) == ([], last_rowid)
+
+    with PytestProcessInfoDB(data_dir) as db:
+        db.write(_record("run-1", "tests/test_b.py", PyTestFlyExitCode.TESTS_FAILED, "out B", now + 2))
+    with PytestProcessInfoReader(data_dir) as reader:
+        infos, newer_rowid = reader.query_since("run-1", last_rowid, include_output=True)
+        assert [(info.name, info.output) for info in infos] == [("tests/test_b.py", "out B")]
+        assert newer_rowid > last_rowid
+
+
 def test_reader_does_not_create_db_file():
     """Opening the reader must not create an empty database file as a side effect."""
     data_dir = get_temp_dir("reader_no_create")
     with PytestProcessInfoReader(data_dir) as reader:
         reader.query()
     assert not reader.db_path.exists()
+
+
+def test_reader_connection_is_pooled_per_thread():
+    """Readers on one thread share a read-only connection, which is replaced when the database file is."""
+    data_dir = get_temp_dir("reader_connection_pool")
+    now = time.time()
+    with PytestProcessInfoDB(data_dir) as db:
+        db.write(_record("run-1", "tests/test_a.py", PyTestFlyExitCode.OK, None, now))
+    with PytestProcessInfoReader(data_dir) as reader:
+        first_conn = reader._conn
+    with PytestProcessInfoReader(data_dir) as reader:
+        assert reader._conn is first_conn
+        assert reader._conn.execute("PRAGMA query_only").fetchone()[0] == 1
+        assert reader.query_latest_run_guid() == "run-1"
+
+    other_thread_conns = []
+    thread = Thread(target=lambda: other_thread_conns.append(_open_reader_conn(data_dir)))
+    thread.start()
+    thread.join()
+    assert other_thread_conns[0] is not first_conn
+    close_pooled_connections()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="a file with an open connection cannot be deleted on Windows")
+def test_reader_connection_follows_recreated_db():
+    """A database re-created under the same path is not read through the old pooled connection."""
+    data_dir = get_temp_dir("reader_connection_recreated")
+    now = time.time()
+    with PytestProcessInfoDB(data_dir) as db:
+        db.write(_record("run-1", "tests/test_a.py", PyTestFlyExitCode.OK, None, now))
+    with PytestProcessInfoReader(data_dir) as reader:
+        first_conn = reader._conn
+        assert reader.query_latest_run_guid() == "run-1"
+
+    get_temp_dir("reader_connection_recreated")  # removes the directory
+    PytestProcessInfoDB._initialized_paths.discard(data_dir / f"{application_name}.db")
+    with PytestProcessInfoReader(data_dir) as reader:
+        assert reader.query_latest_run_guid() is None
+    with PytestProcessInfoDB(data_dir) as db:
+        db.write(_record("run-2", "tests/test_a.py", PyTestFlyExitCode.OK, None, now))
+    with PytestProcessInfoReader(data_dir) as reader:
+        assert reader._conn is not first_conn
+        assert reader.query_latest_run_guid() == "run-2"
+    close_pooled_connections()
+
+
+def _open_reader_conn(data_dir):
+    with PytestProcessInfoReader(data_dir) as reader:
+        return reader._conn
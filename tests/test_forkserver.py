@@ -0,0 +1,100 @@
+"""Tests for the forkserver execution mode (warm, preloaded template process)."""
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from pytest_fly.db import PytestProcessInfoDB
+from pytest_fly.guid import generate_uuid
+from pytest_fly.interfaces import ExecutionMode, PyTestFlyExitCode, ScheduledTest
+from pytest_fly.pytest_runner import PytestRunner
+from pytest_fly.pytest_runner.execution import ExecutionConfig, resolve_process_class
+from pytest_fly.pytest_runner.forkserver import BASE_PRELOAD_MODULES, ForkserverPytestProcess, _stop_forkserver, forkserver_available, parse_module_list, preload_modules
+from pytest_fly.pytest_runner.pytest_process import PytestProcess
+
+from .paths import get_temp_dir
+
+requires_forkserver = pytest.mark.skipif(not forkserver_available(), reason="forkserver start method is POSIX-only")
+
+
+def test_parse_module_list():
+    assert parse_module_list("") == []
+    assert parse_module_list("a, b.c,,  d a") == ["a", "b.c", "d"]
+
+
+def test_preload_modules_base_first_and_deduplicated():
+    modules = preload_modules(["mypackage", "pytest", "mypackage"])
+    assert modules[: len(BASE_PRELOAD_MODULES)] == list(BASE_PRELOAD_MODULES)
+    assert modules.count("pytest") == 1
+    assert modules[-1] == "mypackage"
+
+
+def test_stop_forkserver_without_the_internal_stop():
+    assert _stop_forkserver(SimpleNamespace()) is False  # a Python whose forkserver has no _stop: the template keeps running
+    stopped = []
+    assert _stop_forkserver(SimpleNamespace(_forkserver=SimpleNamespace(_stop=lambda: stopped.append(True)))) is True
+    assert stopped == [True]
+
+
+def test_resolve_process_class_spawn_default():
+    assert resolve_process_class(ExecutionConfig()) is PytestProcess
+
+
+def test_resolve_process_class_forkserver_unavailable_falls_back(monkeypatch):
+    monkeypatch.setattr("pytest_fly.pytest_runner.forkserver.forkserver_available", lambda: False)
+    assert resolve_process_class(ExecutionConfig(mode=ExecutionMode.FORKSERVER)) is PytestProcess
+
+
+@requires_forkserver
+def test_forkserver_process_runs_test(app):
+    """A forkserver-started test writes the same RUNNING + final records as a spawned one."""
+    data_dir = get_temp_dir("test_forkserver_process_runs_test")
+    with PytestProcessInfoDB(data_dir) as db:
+        db.delete()
+
+    assert resolve_process_class(ExecutionConfig(mode=ExecutionMode.FORKSERVER)) is ForkserverPytestProcess
+
+    run_guid = generate_uuid()
+    scheduled_tests = [ScheduledTest(node_id="tests/test_no_operation.py", singleton=False, duration=None, coverage=None)]
+    runner = PytestRunner(run_guid, scheduled_tests, 1, data_dir, 3.0, execution_config=ExecutionConfig(mode=ExecutionMode.FORKSERVER))
+    runner.start()
+    assert runner.join(60.0)
+
+    with PytestProcessInfoDB(data_dir) as db:
+        results = db.query(run_guid)
+    assert [r.exit_code for r in results] == [PyTestFlyExitCode.NONE, PyTestFlyExitCode.NONE, PyTestFlyExitCode.OK]
+    assert results[-1].memory_percent is not None  # peaks are shared with the forkserver child
+    assert Path(data_dir, "coverage", "tests_test_no_operation.py.coverage").exists()
+
+
+_ISOLATION_PROBE = """import pytest
+
+
+def test_probe():
+    assert not hasattr(pytest, "_fly_isolation_probe")  # set by the other probe if they shared a process
+    pytest._fly_isolation_probe = True
+"""
+
+
+@requires_forkserver
+def test_forkserver_children_are_isolated(app):
+    """Each forked test gets its own process — module state one test sets in a preloaded module never leaks into the next."""
+    data_dir = get_temp_dir("test_forkserver_children_are_isolated")
+    probes = []
+    for index in range(2):
+        probe = Path(data_dir, f"test_probe_{index}.py")
+        probe.write_text(_ISOLATION_PROBE)
+        probes.append(str(probe))
+
+    run_guid = generate_uuid()
+    scheduled_tests = [ScheduledTest(node_id=probe, singleton=False, duration=None, coverage=None) for probe in probes]
+    runner = PytestRunner(run_guid, scheduled_tests, 1, data_dir, 1.0, execution_config=ExecutionConfig(mode=ExecutionMode.FORKSERVER))
+    runner.start()
+    assert runner.join(60.0)
+
+    with PytestProcessInfoDB(data_dir) as db:
+        results = db.query(run_guid)
+    for probe in probes:
+        assert [r.exit_code for r in results if r.name == probe][-1] == PyTestFlyExitCode.OK, probe
+    assert len({r.pid for r in results if r.pid is not None}) == 2  # one forked child per test
@@ -9,7 +9,7 @@ from pytest_fly.db import PytestProcessInfoDB
 from pytest_fly.gui.about_tab.about import About
 from pytest_fly.gui.configuration_tab.configuration import Configuration
 from pytest_fly.gui.coverage_tab import CoverageTab
-from pytest_fly.gui.graph_tab.graph_tab import GraphTab
+from pytest_fly.gui.graph_tab.graph_tab import GraphTab, grouped_layout
 from pytest_fly.gui.graph_tab.progress_bar import PytestProgressBar
 from pytest_fly.gui.graph_tab.time_axis import TimeAxisWidget
 from pytest_fly.gui.gui_main import build_tick_data
@@ -332,6 +332,28 @@ def test_graph_tab_reuses_bars(app):
         assert bar is first_bars[name], f"bar for {name} was recreated instead of reused"
 
 
+def test_graph_tab_groups_shards(app):
+    """Shards of a split module are listed together under a header for their module."""
+    names = ["tests/test_big.py::test_x", "tests/test_a.py", "tests/test_big.py::TestY"]
+    assert grouped_layout(names) == [
+        ("header", "tests/test_big.py"),
+        ("bar", "tests/test_big.py::test_x"),
+        ("bar", "tests/test_big.py::TestY"),
+        ("bar", "tests/test_a.py"),
+    ]
+
+    guid = "test-guid-shards"
+    now = time.time()
+    graph = GraphTab()
+    graph.update_tick(build_tick_data([_make_process_info(guid, name, None, PyTestFlyExitCode.NONE, time_stamp=now) for name in names]))
+    assert len(graph.progress_bars) == 3
+    assert list(graph.group_headers) == ["tests/test_big.py"]
+
+    # once the module is no longer split its header goes away
+    graph.update_tick(build_tick_data([_make_process_info(guid, "tests/test_a.py", None, PyTestFlyExitCode.NONE, time_stamp=now)]))
+    assert graph.group_headers == {}
+
+
 # ---------------------------------------------------------------------------
 # CoverageTab tests
 # ---------------------------------------------------------------------------
@@ -0,0 +1,128 @@
+"""Tests for coverage-based test impact analysis (pytest_fly.impact) and the AFFECTED run mode."""
+
+import os
+import time
+from pathlib import Path
+
+from coverage import CoverageData
+
+from pytest_fly.db import PytestProcessInfoDB
+from pytest_fly.file_util import sanitize_test_name
+from pytest_fly.impact import ImpactIndex, SourceSnapshot, SourceSnapshots, changed_lines
+from pytest_fly.interfaces import PyTestFlyExitCode, PytestProcessInfo, RunMode
+from pytest_fly.pytest_runner.admission import AdmissionGateConfig
+from pytest_fly.pytest_runner.resource_guard import ResourceGuardConfig
+from pytest_fly.pytest_runner.stall_watchdog import StallConfig
+from pytest_fly.run_plan import RunPlanner, RunPrepConfig
+
+from .paths import get_temp_dir
+
+CALC = "def add(a, b):\n    return a + b\n\n\ndef mul(a, b):\n    return a * b\n"
+
+
+def _edit(path: Path, text: str) -> None:
+    path.write_text(text)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))  # clearly after the runs that came before
+
+
+def _record_coverage(data_dir: Path, name: str, lines: dict[Path, list[int]], snapshot: SourceSnapshot) -> None:
+    """Store *name*'s per-test coverage as a run against *snapshot* would."""
+    path = Path(data_dir, "coverage", f"{sanitize_test_name(name)}.coverage")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = CoverageData(basename=str(path))
+    data.add_lines({os.path.realpath(source): executed for source, executed in lines.items()})
+    data.write()
+    os.utime(path, ns=(snapshot.taken_ns + 1, snapshot.taken_ns + 1))  # the run ended after the snapshot (file system clocks are coarse)
+
+
+def _project(name: str) -> tuple[Path, Path, Path]:
+    root = get_temp_dir(name)
+    project_root = Path(root, "project")
+    project_root.mkdir()
+    calc = Path(project_root, "calc.py")
+    calc.write_text(CALC)
+    data_dir = Path(root, "data")
+    data_dir.mkdir()
+    return project_root, data_dir, calc
+
+
+def test_changed_lines():
+    old = ["def f():", "    a = 1", "    return a", "", "X = 1"]
+    assert changed_lines(old, old) == (frozenset(), False)
+    assert changed_lines(old, ["def f():", "    a = 2", "    return a", "", "X = 1"]) == (frozenset({2}), False)
+    assert changed_lines(old, ["def f():", "    a = 1", "    b = 2", "    return a", "", "X = 1"]) == (frozenset({2, 3}), False)  # around the insertion
+    assert changed_lines(old, ["def f():", "    return a", "", "X = 1"]) == (frozenset({2}), False)
+    assert changed_lines(old, ["def f():", "    a = 1", "    return a", "", "X = 2"]) == (frozenset({5}), True)
+    assert changed_lines(old, ["def f():", "    a = 1", "    return a", "", "# a comment", "X = 1"])[1] is False
+
+
+def test_snapshots_reuse_unchanged_files_and_keep_baselines():
+    project_root, data_dir, calc = _project("test_snapshots_reuse_unchanged_files_and_keep_baselines")
+    snapshots = SourceSnapshots(data_dir)
+    first = snapshots.take(project_root)
+    assert list(first.files) == [os.path.realpath(calc)]
+    assert snapshots.source(first.files[os.path.realpath(calc)].digest) == CALC.splitlines()
+    _record_coverage(data_dir, "test_calc.py", {calc: [1, 2]}, first)
+
+    second = snapshots.take(project_root)
+    assert second.files == first.files
+    assert snapshots.taken() == [first.taken_ns, second.taken_ns]  # the first is still a coverage file's baseline
+    assert snapshots.baseline(second.taken_ns - 1).taken_ns == first.taken_ns
+
+    _record_coverage(data_dir, "test_calc.py", {calc: [1, 2]}, second)  # the test ran again
+    _edit(calc, CALC.replace("a + b", "b + a"))
+    third = snapshots.take(project_root)
+    assert snapshots.taken() == [second.taken_ns, third.taken_ns]
+    assert third.files[os.path.realpath(calc)].digest != first.files[os.path.realpath(calc)].digest
+    assert len(list(Path(data_dir, "impact", "sources").iterdir())) == 2
+
+
+def test_select_affected_by_executed_lines():
+    project_root, data_dir, calc = _project("test_select_affected_by_executed_lines")
+    test_add = Path(project_root, "test_add.py")
+    test_add.write_text("from calc import add\n\n\ndef test_add():\n    assert add(1, 2) == 3\n")
+    snapshot = SourceSnapshots(data_dir).take(project_root)
+    _record_coverage(data_dir, "test_add.py", {calc: [1, 2, 5], test_add: [1, 4, 5]}, snapshot)  # import-time lines 1 and 5, and add's body
+    _record_coverage(data_dir, "test_mul.py", {calc: [1, 5, 6]}, snapshot)
+    index = ImpactIndex(data_dir)
+    candidates = ["test_add.py", "test_mul.py", "test_new.py"]
+    assert index.select_affected(candidates) == {"test_new.py"}  # nothing changed; no coverage for the new test
+
+    _edit(calc, CALC.replace("a * b", "b * a"))
+    assert index.select_affected(candidates) == {"test_mul.py", "test_new.py"}
+
+    _edit(calc, CALC)  # reverted: touched only
+    assert index.select_affected(candidates) == {"test_new.py"}
+
+    _edit(calc, CALC + "\n\nSCALE = 2\n")  # top-level code
+    assert index.select_affected(candidates) == {"test_add.py", "test_mul.py", "test_new.py"}
+
+    _edit(calc, CALC)
+    _edit(test_add, test_add.read_text().replace("== 3", "== 1 + 2"))
+    assert index.select_affected(candidates) == {"test_add.py", "test_new.py"}
+
+
+def test_affected_run_mode_runs_only_affected_tests():
+    """AFFECTED reruns the passed tests a change affects, carries the others over, and runs new ones."""
+    project_root, data_dir, calc = _project("test_affected_run_mode_runs_only_affected_tests")
+    Path(project_root, "test_add.py").write_text("from calc import add\n\n\ndef test_add():\n    assert add(1, 2) == 3\n")
+    Path(project_root, "test_mul.py").write_text("from calc import mul\n\n\ndef test_mul():\n    assert mul(2, 3) == 6\n")
+    planner = RunPlanner(data_dir)
+    config = RunPrepConfig(project_root, "run", 1.0, RunMode.AFFECTED, 1, [], AdmissionGateConfig(), StallConfig(), ResourceGuardConfig(), reuse_plan=False, cache_collection=False)
+    names = {Path(test.node_id).name: test.node_id for test in planner.take(config, lambda: False).tests}  # as collected, relative to the rootdir
+    assert sorted(names) == ["test_add.py", "test_mul.py"]  # nothing ran yet
+
+    snapshot = SourceSnapshots(data_dir).take(project_root)
+    with PytestProcessInfoDB(data_dir) as db:
+        for name in names.values():
+            db.write(PytestProcessInfo("run-1", name, 1, PyTestFlyExitCode.OK, None, time.time()))
+    _record_coverage(data_dir, names["test_add.py"], {calc: [1, 2, 5]}, snapshot)
+    _record_coverage(data_dir, names["test_mul.py"], {calc: [1, 5, 6]}, snapshot)
+    assert planner.take(config, lambda: False).tests == []
+
+    _edit(calc, CALC.replace("a * b", "b * a"))
+    Path(project_root, "test_sub.py").write_text("def test_sub():\n    assert 3 - 1 == 2\n")
+    plan = planner.take(config, lambda: False)
+    assert sorted(Path(test.node_id).name for test in plan.tests) == ["test_mul.py", "test_sub.py"]
+    assert plan.carried_over == [names["test_add.py"]]
@@ -2,12 +2,11 @@
 
 import os
 import time
-from queue import Empty
 
-from pytest_fly.guid import generate_uuid
 from pytest_fly.pytest_runner.process_monitor import (
-    ProcessMonitor,
-    PytestProcessMonitorInfo,
+    ResourcePeaks,
+    ResourceSampler,
+    final_peaks,
     normalize_cpu_percent,
 )
 
@@ -29,29 +28,53 @@ def test_normalize_cpu_percent_zero_cores_guarded():
     assert normalize_cpu_percent(50.0, 0) == 50.0
 
 
-def test_process_monitor_samples_own_process():
-    run_guid = generate_uuid()
-    monitor = ProcessMonitor(run_guid, name="self", pid=os.getpid(), update_rate=0.1)
-    monitor.start()
+def test_resource_sampler_samples_own_process():
+    peaks = ResourcePeaks()
+    sampler = ResourceSampler(interval=0.1)
+    sampler.register(os.getpid(), peaks)
+    sampler.start()
     try:
         time.sleep(0.5)
     finally:
-        monitor.request_stop()
-        monitor.join(10.0)
-
-    assert not monitor.is_alive()
-
-    samples: list[PytestProcessMonitorInfo] = []
-    while True:
-        try:
-            samples.append(monitor.process_monitor_queue.get_nowait())
-        except Empty:
-            break
-
-    assert samples, "expected at least one sample"
-    sample = samples[0]
-    assert sample.run_guid == run_guid
-    assert sample.pid == os.getpid()
-    assert sample.cpu_percent is not None
-    assert sample.memory_percent is not None
-    assert sample.commit_bytes is not None and sample.commit_bytes > 0
+        sampler.request_stop()
+        sampler.join(10.0)
+
+    assert not sampler.is_alive()
+
+    cpu_percent, memory_percent, commit_bytes = peaks.take()
+    assert cpu_percent is not None
+    assert memory_percent is not None
+    assert commit_bytes is not None and commit_bytes > 0
+
+
+def test_resource_sampler_unregister_stops_sampling():
+    peaks = ResourcePeaks()
+    sampler = ResourceSampler(interval=0.1)
+    sampler.register(os.getpid(), peaks)
+    sampler.unregister(os.getpid())
+    sampler.sample_once()
+    assert peaks.take() == (None, None, None)
+
+
+def test_resource_peaks_record_take_reset():
+    peaks = ResourcePeaks()
+    assert peaks.take() == (None, None, None)
+    peaks.record(10.0, None, 100)
+    peaks.record(5.0, 2.5, 300)
+    peaks.record(None, 1.0, 200)
+    assert peaks.take(reset=True) == (10.0, 2.5, 300)
+    assert peaks.take() == (None, None, None)
+
+
+def test_final_peaks_without_sampler_reads_memory():
+    cpu_percent, memory_percent, _commit_bytes = final_peaks(os.getpid(), None)
+    assert cpu_percent is None  # only the controller's sampler measures CPU
+    assert memory_percent is not None and memory_percent > 0.0
+
+
+def test_final_peaks_keeps_sampled_peaks():
+    peaks = ResourcePeaks()
+    peaks.record(42.0, 99.0, None)
+    cpu_percent, memory_percent, _commit_bytes = final_peaks(os.getpid(), peaks)
+    assert cpu_percent == 42.0
+    assert memory_percent == 99.0
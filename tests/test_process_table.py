@@ -0,0 +1,51 @@
+"""Tests for pytest_runner.process_table."""
+
+import os
+import subprocess
+import sys
+import time
+
+import psutil
+
+from pytest_fly.pytest_runner import process_table as process_table_module
+from pytest_fly.pytest_runner.process_table import ProcessTableSnapshot, process_table, read_process_table
+
+
+def test_snapshot_index_and_descendants():
+    # 1 -> 10 -> 100, 1 -> 11; 0 is its own parent
+    snapshot = ProcessTableSnapshot({0: 0, 1: 0, 10: 1, 11: 1, 100: 10}, 0.0)
+    assert sorted(snapshot.children[1]) == [10, 11]
+    assert sorted(snapshot.descendants(1)) == [10, 11, 100]
+    assert snapshot.subtree(10) == [10, 100]
+    assert snapshot.subtree(999) == []
+    assert 100 in snapshot and 999 not in snapshot
+
+
+def test_snapshot_tolerates_ppid_cycle():
+    snapshot = ProcessTableSnapshot({1: 2, 2: 1}, 0.0)
+    assert snapshot.descendants(1) == [2]
+
+
+def test_read_process_table_matches_psutil():
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        snapshot = read_process_table()
+        assert snapshot.parents[child.pid] == os.getpid()
+        assert child.pid in snapshot.descendants(os.getpid())
+        assert set(snapshot.descendants(os.getpid())) >= {p.pid for p in psutil.Process().children(recursive=True) if p.pid in snapshot}
+    finally:
+        child.kill()
+        child.wait(10)
+
+
+def test_read_process_table_psutil_fallback(monkeypatch):
+    monkeypatch.setattr(process_table_module, "_read_proc_parents", lambda: None)
+    snapshot = read_process_table()
+    assert snapshot.parents[os.getpid()] == os.getppid()
+
+
+def test_process_table_is_shared_until_stale():
+    first = process_table(max_age=60.0)
+    assert process_table(max_age=60.0) is first
+    time.sleep(0.01)
+    assert process_table(max_age=0.0) is not first
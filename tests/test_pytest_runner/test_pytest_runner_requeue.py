@@ -0,0 +1,52 @@
+import time
+
+from pytest_fly.db import PytestProcessInfoDB
+from pytest_fly.guid import generate_uuid
+from pytest_fly.interfaces import PyTestFlyExitCode, ScheduledTest
+from pytest_fly.pytest_runner import PytestRunner
+
+from ..paths import get_temp_dir
+
+_QUEUED = "queued"
+_RUNNING = "running"
+
+
+def _states(data_dir, run_guid: str, name: str) -> list:
+    """*name*'s records in order: queued and running (both without an exit code yet), or the exit code."""
+    with PytestProcessInfoDB(data_dir) as db:
+        records = [record for record in db.query(run_guid) if record.name == name]
+    return [record.exit_code if record.exit_code != PyTestFlyExitCode.NONE else _QUEUED if record.pid is None else _RUNNING for record in records]
+
+
+def test_pytest_runner_requeue(app):
+    """Requeued tests run again: the finished one is queued again, the running one is stopped and requeued."""
+
+    test_name = "test_pytest_runner_requeue"
+
+    data_dir = get_temp_dir(test_name)
+    run_guid = generate_uuid()
+
+    no_operation = "tests/test_no_operation.py"
+    three_sec = "tests/test_3_sec_operation.py"
+    scheduled_tests = [
+        ScheduledTest(node_id=no_operation, singleton=False, duration=None, coverage=None),
+        ScheduledTest(node_id=three_sec, singleton=False, duration=None, coverage=None),
+    ]
+
+    runner = PytestRunner(run_guid, scheduled_tests, number_of_processes=1, data_dir=data_dir, update_rate=0.5)
+    runner.start()
+    deadline = time.monotonic() + 60.0
+    while _RUNNING not in _states(data_dir, run_guid, three_sec) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert _states(data_dir, run_guid, no_operation)[-1] == PyTestFlyExitCode.OK
+    assert runner.requeue_tests({no_operation, three_sec}) is True
+    assert runner.join(60.0)
+    assert runner.requeue_tests({no_operation}) is False  # the run wound down
+
+    for name in (no_operation, three_sec):
+        states = _states(data_dir, run_guid, name)
+        assert states.count(_RUNNING) == 2, (name, states)
+        assert states[-1] == PyTestFlyExitCode.OK, (name, states)
+        assert PyTestFlyExitCode.TERMINATED not in states, (name, states)
+    states = _states(data_dir, run_guid, three_sec)
+    assert states[states.index(_RUNNING) + 1] == _QUEUED  # stopped and queued again, not finished
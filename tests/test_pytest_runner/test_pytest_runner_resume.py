@@ -1,7 +1,5 @@
 """Test RESUME mode: after all tests pass, a Resume run should not re-run any tests."""
 
-from dataclasses import replace
-
 from pytest_fly.db import PytestProcessInfoDB
 from pytest_fly.guid import generate_uuid
 from pytest_fly.interfaces import PyTestFlyExitCode, PytestRunnerState, ScheduledTest
@@ -19,14 +17,10 @@ def _filter_for_resume(tests: list[ScheduledTest], prior_results: list) -> list[
 
 
 def _copy_prior_records(run_guid, prior_results, skipped_node_ids, data_dir):
-    """Replicate the RESUME record-copying logic from ControlWindow.run."""
-    prior_by_name = {}
-    for r in prior_results:
-        prior_by_name.setdefault(r.name, []).append(r)
-    with PytestProcessInfoDB(data_dir) as db:
-        for node_id in sorted(skipped_node_ids):
-            for record in prior_by_name.get(node_id, []):
-                db.write(replace(record, run_guid=run_guid))
+    """Replicate the RESUME record-copying logic from ControlWindow._build_runner."""
+    if skipped_node_ids and prior_results:
+        with PytestProcessInfoDB(data_dir) as db:
+            db.copy_run_records(prior_results[0].run_guid, run_guid, skipped_node_ids)
 
 
 def test_resume_after_all_pass(app):
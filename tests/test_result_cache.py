@@ -0,0 +1,177 @@
+"""Tests for the per-test result cache (pytest_fly.result_cache) and its use in run planning."""
+
+import os
+import time
+from dataclasses import replace
+from pathlib import Path
+
+from coverage import CoverageData
+
+from pytest_fly.db import PytestProcessInfoDB, PytestProcessInfoReader
+from pytest_fly.file_util import sanitize_test_name
+from pytest_fly.interfaces import PyTestFlyExitCode, PytestProcessInfo, RunMode
+from pytest_fly.pytest_runner.admission import AdmissionGateConfig
+from pytest_fly.pytest_runner.resource_guard import ResourceGuardConfig
+from pytest_fly.pytest_runner.stall_watchdog import StallConfig
+from pytest_fly.result_cache import ResultCache, ResultCacheConfig, ResultStore, StoredResult, carry_over_hits
+from pytest_fly.run_plan import RunPlanner, RunPrepConfig
+
+from .paths import get_temp_dir
+
+CALC = "def add(a, b):\n    return a + b\n\n\ndef mul(a, b):\n    return a * b\n"
+
+
+def _write(path: Path, text: str, age: float = 60.0) -> None:
+    """Write *path* with a modification time *age* seconds ago (before the test runs that follow)."""
+    path.write_text(text)
+    mtime_ns = time.time_ns() - int(age * 1e9)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _project(name: str) -> tuple[Path, Path]:
+    root = get_temp_dir(name)
+    project_root = Path(root, "project")
+    project_root.mkdir()
+    _write(Path(project_root, "pytest.ini"), "[pytest]\n")
+    _write(Path(project_root, "calc.py"), CALC)
+    _write(Path(project_root, "test_add.py"), "from calc import add\n\n\ndef test_add():\n    assert add(1, 2) == 3\n")
+    _write(Path(project_root, "test_mul.py"), "from calc import mul\n\n\ndef test_mul():\n    assert mul(2, 3) == 6\n")
+    data_dir = Path(root, "data")
+    data_dir.mkdir()
+    return project_root, data_dir
+
+
+def _record_coverage(data_dir: Path, name: str, executed: list[Path]) -> None:
+    """Store the per-test coverage a run of *name* ending now would leave."""
+    path = Path(data_dir, "coverage", f"{sanitize_test_name(name)}.coverage")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = CoverageData(basename=str(path))
+    data.add_lines({os.path.realpath(source): [1] for source in executed})
+    data.write()
+
+
+def test_record_and_lookup_follow_the_inputs():
+    project_root, data_dir = _project("test_record_and_lookup_follow_the_inputs")
+    calc = Path(project_root, "calc.py")
+    _record_coverage(data_dir, "test_add.py", [calc, Path(project_root, "test_add.py")])
+    _record_coverage(data_dir, "test_mul.py", [calc])  # the module did not run under coverage: not recordable
+    start = time.time() - 1.0
+    last_pass = {"test_add.py": (start, 1.0), "test_mul.py": (start, 1.0)}
+    runs = {"test_add.py": "run-1", "test_mul.py": "run-1"}
+    cache = ResultCache(data_dir, project_root)
+    assert cache.record(last_pass, runs) == 1
+    assert cache.record(last_pass, runs) == 0  # already recorded
+    assert list(cache.lookup(["test_add.py", "test_mul.py"], runs)) == ["test_add.py"]
+    assert list(ResultCache(data_dir, project_root).lookup(["test_add.py"], runs)) == ["test_add.py"]  # persisted
+
+    _write(calc, CALC.replace("a + b", "b + a"))
+    assert cache.lookup(["test_add.py"], runs) == {}
+    _write(calc, CALC, age=30.0)  # the same content again
+    assert list(cache.lookup(["test_add.py"], runs)) == ["test_add.py"]
+
+    _write(Path(project_root, "conftest.py"), "")  # a new conftest.py applies to the module
+    assert cache.lookup(["test_add.py"], runs) == {}
+    Path(project_root, "conftest.py").unlink()
+    hits = cache.lookup(["test_add.py"], {"test_add.py": "run-0"})  # its last pass is another run's (e.g. pruned) ...
+    assert hits["test_add.py"].run_guid is None  # ... but the result store still has it
+
+    assert cache.record({"test_add.py": (start, 1.0)}, {"test_add.py": "run-2"}) == 1  # carried over into run-2
+    assert cache.lookup(["test_add.py"], {"test_add.py": "run-2"})["test_add.py"].run_guid == "run-2"
+
+
+def test_inputs_modified_during_the_run_are_not_recorded():
+    project_root, data_dir = _project("test_inputs_modified_during_the_run_are_not_recorded")
+    start = time.time() - 1.0
+    _write(Path(project_root, "calc.py"), CALC.replace("a * b", "b * a"), age=0.5)  # edited while the test ran
+    _record_coverage(data_dir, "test_mul.py", [Path(project_root, "calc.py"), Path(project_root, "test_mul.py")])
+    cache = ResultCache(data_dir, project_root)
+    assert cache.record({"test_mul.py": (start, 1.0)}, {"test_mul.py": "run-1"}) == 0
+    assert cache.entries() == {}
+
+
+def test_planner_carries_over_cache_hits():
+    """With the result cache, a CHECK run that would restart runs only the tests whose inputs changed."""
+    project_root, data_dir = _project("test_planner_carries_over_cache_hits")
+    calc = Path(project_root, "calc.py")
+    planner = RunPlanner(data_dir)
+    config = RunPrepConfig(
+        project_root=project_root,
+        run_guid="run",
+        refresh_rate=1.0,
+        run_mode=RunMode.CHECK,
+        processes=1,
+        enabled_aspects=[],
+        gate_config=AdmissionGateConfig(),
+        stall_config=StallConfig(),
+        resource_guard_config=ResourceGuardConfig(),
+        reuse_plan=False,
+        cache_collection=False,
+        result_cache_config=ResultCacheConfig(enabled=True),
+    )
+    names = {Path(test.node_id).name: test.node_id for test in planner.take(config, lambda: False).tests}  # as collected, relative to the rootdir
+    assert sorted(names) == ["test_add.py", "test_mul.py"]
+
+    with PytestProcessInfoDB(data_dir) as db:
+        for name in names:
+            db.write(PytestProcessInfo("run-1", names[name], 1, PyTestFlyExitCode.NONE, None, time.time() - 1.0))
+            _record_coverage(data_dir, names[name], [calc, Path(project_root, name)])
+            db.write(PytestProcessInfo("run-1", names[name], 1, PyTestFlyExitCode.OK, None, time.time()))
+    plan = planner.take(config, lambda: False)
+    assert plan.effective_mode == RunMode.RESTART  # no PUT fingerprint recorded
+    assert plan.tests == []
+    assert sorted(plan.cache_hits) == sorted(names.values())
+
+    test_mul = Path(project_root, "test_mul.py")
+    _write(test_mul, test_mul.read_text().replace("== 6", "== 2 * 3"), age=0.0)
+    plan = planner.take(config, lambda: False)
+    assert [Path(test.node_id).name for test in plan.tests] == ["test_mul.py"]
+    assert list(plan.cache_hits) == [names["test_add.py"]]
+
+    _write(calc, CALC.replace("a * b", "b * a"), age=0.0)  # a source both executed
+    assert planner.take(config, lambda: False).cache_hits == {}
+
+    plan = planner.take(replace(config, run_mode=RunMode.RESTART), lambda: False)  # Restart runs everything
+    assert sorted(Path(test.node_id).name for test in plan.tests) == ["test_add.py", "test_mul.py"]
+    assert plan.cache_hits == {}
+
+
+def test_shared_store_hits_on_another_data_dir():
+    """A pass recorded by one agent is a cache hit for another agent (its own checkout and data dir) sharing the store."""
+    store_dir = get_temp_dir("test_shared_store_hits_on_another_data_dir")
+    config = ResultCacheConfig(enabled=True, directory=store_dir)
+    project_a, data_a = _project("test_shared_store_hits_on_another_data_dir_a")
+    project_b, data_b = _project("test_shared_store_hits_on_another_data_dir_b")
+    start = time.time() - 1.0
+    with PytestProcessInfoDB(data_a) as db:
+        db.write(PytestProcessInfo("run-a", "test_add.py", 1, PyTestFlyExitCode.OK, "1 passed", start + 1.0))
+    _record_coverage(data_a, "test_add.py", [Path(project_a, "calc.py"), Path(project_a, "test_add.py")])
+    assert ResultCache(data_a, project_a, config).record({"test_add.py": (start, 1.0)}, {"test_add.py": "run-a"}) == 1
+
+    cache_b = ResultCache(data_b, project_b, config)
+    hits = cache_b.lookup(["test_add.py", "test_mul.py"], {})  # agent B has no history
+    assert list(hits) == ["test_add.py"]
+    assert hits["test_add.py"].run_guid is None
+    assert hits["test_add.py"].output.endswith("1 passed")
+    with PytestProcessInfoDB(data_b) as db:
+        carry_over_hits(db, "run-b", hits)
+    with PytestProcessInfoReader(data_b) as reader:
+        assert reader.query_last_pass_runs() == {"test_add.py": "run-b"}
+
+    _write(Path(project_b, "calc.py"), CALC.replace("a + b", "b + a"))  # agent B's checkout differs
+    assert cache_b.lookup(["test_add.py"], {}) == {}
+
+
+def test_store_evicts_least_recently_used():
+    store = ResultStore(get_temp_dir("test_store_evicts_least_recently_used"))
+    for index in range(4):
+        store.put(f"key-{index}", StoredResult(f"test_{index}.py", 1.0, "x" * 200, "host", time.time()))
+        path = Path(store.directory, "results", f"key-{index}.json")
+        os.utime(path, ns=(index * 1_000_000_000, index * 1_000_000_000))  # stored in index order
+    store.max_bytes = int(path.stat().st_size * 4.5)  # room for four results
+    store.get("key-0")  # used again: now the most recent
+    assert store.evict() == 0  # within the budget
+    store.put("key-4", StoredResult("test_4.py", 1.0, "x" * 200, "host", time.time()))
+    assert store.evict() > 0
+    assert store.get("key-0") is not None and store.get("key-4") is not None
+    assert store.get("key-1") is None  # the least recently used went first
+    assert sum(path.stat().st_size for path in Path(store.directory, "results").iterdir()) <= store.max_bytes * 0.9
@@ -0,0 +1,113 @@
+"""Tests for pytest_runner.result_writer — the run's central, batched result-record writer."""
+
+import os
+import sqlite3
+import time
+from dataclasses import replace
+from multiprocessing import Process
+
+from pytest_fly.db import FunctionDurationDB, PytestProcessInfoDB, PytestProcessInfoReader
+from pytest_fly.db import db as db_module
+from pytest_fly.guid import generate_uuid
+from pytest_fly.interfaces import PyTestFlyExitCode, status_record
+from pytest_fly.pytest_runner import result_writer
+from pytest_fly.pytest_runner.result_writer import FunctionDurations, ResultWriter, send_result, write_records
+
+from .paths import get_temp_dir
+
+
+def _send_records(connection, data_dir, run_guid: str, name: str, count: int) -> None:
+    for _ in range(count):
+        send_result(connection, data_dir, status_record(run_guid, name, PyTestFlyExitCode.NONE))
+    send_result(connection, data_dir, FunctionDurations(run_guid, name, {f"{name}::test_a": 1.5}))
+
+
+def _exit_without_sending(connection) -> None:
+    os._exit(0)
+
+
+def test_result_writer_batches_records_from_processes():
+    data_dir = get_temp_dir("test_result_writer_batches_records_from_processes")
+    run_guid = generate_uuid()
+    writer = ResultWriter(data_dir, flush_interval=0.5)
+    writer.start()
+
+    processes = []
+    for index in range(4):
+        connection = writer.connect()
+        process = Process(target=_send_records, args=(connection, data_dir, run_guid, f"test_{index}.py", 5))
+        process.start()
+        connection.close()  # the child holds its own copy
+        processes.append(process)
+    writer.write(status_record(run_guid, "test_controller.py", PyTestFlyExitCode.STOPPED))
+    for process in processes:
+        process.join(30.0)
+
+    assert writer.flush(30.0)
+    with PytestProcessInfoReader(data_dir) as db:
+        infos = db.query(run_guid)
+    assert len(infos) == 4 * 5 + 1
+    with FunctionDurationDB(data_dir) as db:
+        durations = db.query_function_durations()
+    assert durations == {f"test_{index}.py::test_a": 1.5 for index in range(4)}
+    assert writer.batches_written < writer.records_written, "records are committed in batches, not one transaction each"
+
+    writer.close(30.0)
+    assert not writer.is_alive()
+
+
+def test_result_writer_drops_channel_at_process_exit():
+    data_dir = get_temp_dir("test_result_writer_drops_channel_at_process_exit")
+    writer = ResultWriter(data_dir)
+    writer.start()
+    connection = writer.connect()
+    process = Process(target=_exit_without_sending, args=(connection,))
+    process.start()
+    connection.close()
+    process.join(30.0)
+
+    deadline = time.monotonic() + 30.0
+    while writer._readers and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert writer._readers == []
+    writer.close(30.0)
+
+
+def test_result_writer_writes_through_when_not_running():
+    data_dir = get_temp_dir("test_result_writer_writes_through_when_not_running")
+    run_guid = generate_uuid()
+    writer = ResultWriter(data_dir)  # never started
+    writer.write(status_record(run_guid, "test_a.py", PyTestFlyExitCode.NONE))
+    assert writer.flush(1.0)
+    with PytestProcessInfoDB(data_dir) as db:
+        assert [info.name for info in db.query(run_guid)] == ["test_a.py"]
+
+
+def test_send_result_without_channel_writes_directly():
+    data_dir = get_temp_dir("test_send_result_without_channel_writes_directly")
+    run_guid = generate_uuid()
+    send_result(None, data_dir, status_record(run_guid, "test_a.py", PyTestFlyExitCode.OK))
+    with PytestProcessInfoDB(data_dir) as db:
+        assert [info.exit_code for info in db.query(run_guid)] == [PyTestFlyExitCode.OK]
+
+
+def test_write_records_retries_then_writes_record_by_record(monkeypatch):
+    data_dir = get_temp_dir("test_write_records_retries_then_writes_record_by_record")
+    run_guid = generate_uuid()
+    store_output = db_module._store_output
+
+    def store_output_rejecting_bad(conn, output):
+        if output == "bad":
+            raise sqlite3.OperationalError("disk I/O error")  # mid-batch: the run row and earlier outputs are already written
+        return store_output(conn, output)
+
+    monkeypatch.setattr(db_module, "_store_output", store_output_rejecting_bad)
+    monkeypatch.setattr(result_writer, "WRITE_RETRY_DELAY", 0.0)
+    records = [replace(status_record(run_guid, name, PyTestFlyExitCode.OK), output=name) for name in ("test_a.py", "test_bad.py", "test_b.py")]
+    records[1] = replace(records[1], output="bad")
+    lost = write_records(data_dir, records)
+    assert lost == 1
+    with PytestProcessInfoDB(data_dir) as db:
+        assert sorted(info.name for info in db.query(run_guid)) == ["test_a.py", "test_b.py"]  # once each
+    with PytestProcessInfoReader(data_dir) as reader:
+        assert reader.query_change_token()[0] == 2  # the failed attempts' run counts were rolled back too
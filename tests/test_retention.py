@@ -0,0 +1,120 @@
+"""Tests for pytest_fly.db.retention — pruning the results DB's history, its size cap and compaction."""
+
+import os
+import time
+
+from pytest_fly.db import FunctionDurationDB, PytestProcessInfoDB, PytestProcessInfoReader, RetentionConfig, prune_results, query_database_size
+from pytest_fly.db.retention import expired_runs
+from pytest_fly.interfaces import PyTestFlyExitCode, PytestProcessInfo
+
+from .paths import get_temp_dir
+
+
+def _write_run(db_dir, run_guid: str, start: float, results: dict[str, PyTestFlyExitCode], output_size: int = 100) -> None:
+    """One run: a queued, a started and a final record (with an output unique to the run, of about *output_size* bytes) per test."""
+    records = []
+    for name, exit_code in results.items():
+        records.append(PytestProcessInfo(run_guid, name, None, PyTestFlyExitCode.NONE, None, start))
+        records.append(PytestProcessInfo(run_guid, name, 1, PyTestFlyExitCode.NONE, None, start + 1.0))
+        records.append(PytestProcessInfo(run_guid, name, 1, exit_code, f"{run_guid} {name} " + os.urandom(output_size // 2).hex(), start + 3.0))
+    with PytestProcessInfoDB(db_dir) as db:
+        db.write_many(records)
+
+
+def _history(test_name: str, runs: int, output_size: int = 100) -> tuple:
+    """*runs* runs a minute apart; test_a passes in every run, test_b only in the first and test_c only ever fails."""
+    db_dir = get_temp_dir(test_name)
+    start = time.time() - runs * 60.0
+    for index in range(runs):
+        test_b = PyTestFlyExitCode.OK if index == 0 else PyTestFlyExitCode.TESTS_FAILED
+        _write_run(db_dir, f"run-{index:03d}", start + index * 60.0, {"test_a": PyTestFlyExitCode.OK, "test_b": test_b, "test_c": PyTestFlyExitCode.TESTS_FAILED}, output_size)
+    return db_dir, start
+
+
+def test_expired_runs_window():
+    now = 1_000_000.0
+    day = 24 * 60 * 60
+    runs = [("run-3", now - 1.0), ("run-2", now - 2 * day), ("run-1", now - 3 * day), ("run-0", now - 4 * day)]  # newest first
+    assert expired_runs(runs, RetentionConfig(enabled=True, keep_runs=2), now) == ["run-0", "run-1"]  # oldest first
+    assert expired_runs(runs, RetentionConfig(enabled=True, keep_runs=0, keep_days=2.5), now) == ["run-0", "run-1"]
+    assert expired_runs(runs, RetentionConfig(enabled=True, keep_runs=1, keep_days=3.5), now) == ["run-0"]  # kept by either window
+    assert expired_runs(runs, RetentionConfig(enabled=True, keep_runs=0, keep_days=0.0), now) == []  # no window
+    assert expired_runs(runs, RetentionConfig(enabled=True, keep_runs=0, keep_days=0.001), now) == ["run-0", "run-1", "run-2"]  # the most recent run stays
+
+
+def test_prune_keeps_last_pass_and_ever_run():
+    db_dir, start = _history("test_prune_keeps_last_pass_and_ever_run", 6)
+    with PytestProcessInfoReader(db_dir) as reader:
+        last_pass_before = reader.query_last_pass()
+        ever_run_before = reader.query_ever_run_names()
+
+    assert prune_results(db_dir, RetentionConfig(enabled=False, keep_runs=2)).runs_pruned == 0  # disabled: nothing happens
+    result = prune_results(db_dir, RetentionConfig(enabled=True, keep_runs=2))
+    assert result.runs_pruned == 4
+    assert result.records_deleted == 4 * 9 - 3  # run-000 keeps test_b's records: its only pass
+
+    with PytestProcessInfoReader(db_dir) as reader:
+        assert reader.query_last_pass() == last_pass_before
+        assert reader.query_ever_run_names() == ever_run_before == {"test_a", "test_b", "test_c"}
+        assert [run_guid for run_guid, _start in reader.query_runs()] == ["run-005", "run-004", "run-000"]
+        assert {info.name for info in reader.query("run-000")} == {"test_b"}
+        assert reader.query_outputs("run-000", ["test_b"])["test_b"][1].startswith("run-000 test_b ")
+        assert reader.query_output_storage().output_count == 2 * 3 + 1
+
+    # test_b passes again: its old records are no longer needed and the old run goes entirely
+    _write_run(db_dir, "run-006", start + 6 * 60.0, {"test_b": PyTestFlyExitCode.OK})
+    prune_results(db_dir, RetentionConfig(enabled=True, keep_runs=2))
+    with PytestProcessInfoReader(db_dir) as reader:
+        assert [run_guid for run_guid, _start in reader.query_runs()] == ["run-006", "run-005"]
+        assert reader.query_last_pass()["test_b"][0] == start + 6 * 60.0 + 1.0
+
+
+def test_prune_whole_runs_without_keep_last_pass():
+    db_dir, _start = _history("test_prune_whole_runs_without_keep_last_pass", 4)
+    result = prune_results(db_dir, RetentionConfig(enabled=True, keep_runs=1, keep_last_pass=False))
+    assert (result.runs_pruned, result.records_deleted) == (3, 3 * 9)
+    with PytestProcessInfoReader(db_dir) as reader:
+        assert [run_guid for run_guid, _start in reader.query_runs()] == ["run-003"]
+        assert set(reader.query_last_pass()) == {"test_a"}  # test_b's only pass was pruned with its run
+        assert reader.query_ever_run_names() == {"test_a", "test_b", "test_c"}  # but it still counts as having run
+
+
+def test_prune_keeps_each_functions_latest_duration():
+    db_dir, _start = _history("test_prune_keeps_each_functions_latest_duration", 4)
+    with FunctionDurationDB(db_dir) as db:
+        db.write("run-000", "test_b", {"test_b::test_only_then": 9.0})
+        for index in range(4):
+            db.write(f"run-{index:03d}", "test_a", {"test_a::test_one": float(index), "test_a::test_two": 10.0 + index})
+        latest = db.query_function_durations()
+    result = prune_results(db_dir, RetentionConfig(enabled=True, keep_runs=1, keep_last_pass=False))
+    assert result.durations_deleted == 3 * 2
+    with FunctionDurationDB(db_dir) as db:
+        assert db.query_function_durations() == latest == {"test_b::test_only_then": 9.0, "test_a::test_one": 3.0, "test_a::test_two": 13.0}
+
+
+def test_carried_over_run_is_as_old_as_the_copy():
+    """A RESUME run's copied records keep their historical timestamps, but the run's age is its own."""
+    db_dir = get_temp_dir("test_carried_over_run_is_as_old_as_the_copy")
+    ten_days_ago = time.time() - 10 * 24 * 60 * 60
+    _write_run(db_dir, "run-000", ten_days_ago, {"test_a": PyTestFlyExitCode.OK, "test_b": PyTestFlyExitCode.TESTS_FAILED})
+    with PytestProcessInfoDB(db_dir) as db:
+        db.copy_run_records("run-000", "run-001", ["test_a"])
+    _write_run(db_dir, "run-001", time.time(), {"test_b": PyTestFlyExitCode.OK})
+    _write_run(db_dir, "run-002", time.time(), {"test_a": PyTestFlyExitCode.OK, "test_b": PyTestFlyExitCode.OK})
+    result = prune_results(db_dir, RetentionConfig(enabled=True, keep_runs=0, keep_days=1.0, keep_last_pass=False))
+    assert result.runs_pruned == 1
+    with PytestProcessInfoReader(db_dir) as reader:
+        assert [run_guid for run_guid, _start in reader.query_runs()] == ["run-002", "run-001"]
+
+
+def test_size_cap_prunes_oldest_runs_and_compacts():
+    db_dir, _start = _history("test_size_cap_prunes_oldest_runs_and_compacts", 8, output_size=100_000)
+    max_bytes = query_database_size(db_dir).used_bytes / 2
+    result = prune_results(db_dir, RetentionConfig(enabled=True, keep_runs=0, max_db_mb=max_bytes / (1024 * 1024)))
+    assert 0 < result.runs_pruned < 8
+    size_after = query_database_size(db_dir)
+    assert size_after.used_bytes <= max_bytes
+    assert size_after.free_bytes == 0  # compacted
+    assert result.bytes_after == size_after.file_bytes < result.bytes_before
+    with PytestProcessInfoReader(db_dir) as reader:
+        assert reader.query_latest_run_guid() == "run-007"
@@ -0,0 +1,165 @@
+"""Tests for the speculative run plan (pytest_fly.run_plan)."""
+
+import os
+import subprocess
+import time
+from pathlib import Path
+
+from pytest_fly.db import PytestProcessInfoDB
+from pytest_fly.interfaces import PyTestFlyExitCode, PytestProcessInfo, RunMode, status_record
+from pytest_fly.pytest_runner.admission import AdmissionGateConfig
+from pytest_fly.pytest_runner.resource_guard import ResourceGuardConfig
+from pytest_fly.pytest_runner.stall_watchdog import StallConfig
+from pytest_fly.run_plan import RunPlanner, RunPrepConfig, tree_signature
+
+from .paths import get_temp_dir
+
+
+def _config(project_root: Path, run_mode: RunMode = RunMode.RESUME, **kwargs) -> RunPrepConfig:
+    return RunPrepConfig(
+        project_root=project_root,
+        run_guid=kwargs.pop("run_guid", "run"),
+        refresh_rate=1.0,
+        run_mode=run_mode,
+        processes=1,
+        enabled_aspects=[],
+        gate_config=AdmissionGateConfig(),
+        stall_config=StallConfig(),
+        resource_guard_config=ResourceGuardConfig(),
+        **kwargs,
+    )
+
+
+def _project(name: str) -> tuple[Path, Path]:
+    root = get_temp_dir(name)
+    project_root = Path(root, "project")
+    project_root.mkdir()
+    Path(project_root, "test_alpha.py").write_text("def test_a():\n    assert True\n")
+    Path(project_root, "test_beta.py").write_text("def test_b():\n    assert True\n")
+    data_dir = Path(root, "data")
+    data_dir.mkdir()
+    return project_root, data_dir
+
+
+def _names(tests) -> list[str]:
+    return sorted(Path(test.node_id).name for test in tests)
+
+
+def _touch(path: Path, text: str) -> None:
+    path.write_text(text)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))  # a distinct mtime on coarse-grained file systems
+
+
+def test_tree_signature_tracks_collected_files():
+    """Editing, adding or removing a Python file changes the signature; caches, hidden dirs and other files do not."""
+    project_root, _data_dir = _project("test_tree_signature_tracks_collected_files")
+    signature = tree_signature(project_root)
+    assert tree_signature(project_root) == signature
+
+    for ignored in ("__pycache__", ".venv"):
+        Path(project_root, ignored).mkdir()
+        Path(project_root, ignored, "module.py").write_text("x = 1\n")
+    Path(project_root, "notes.txt").write_text("not collected\n")
+    assert tree_signature(project_root) == signature
+
+    _touch(Path(project_root, "test_alpha.py"), "def test_a():\n    assert 1\n")
+    edited = tree_signature(project_root)
+    assert edited != signature
+    Path(project_root, "pkg").mkdir()
+    Path(project_root, "pkg", "conftest.py").write_text("")
+    added = tree_signature(project_root)
+    assert added != edited
+    Path(project_root, "pkg", "conftest.py").unlink()
+    assert tree_signature(project_root) == edited
+
+
+def test_plan_is_reused_until_its_inputs_change():
+    """A plan is taken as is while nothing changed; a file change redoes discovery, a DB change only the history."""
+    project_root, data_dir = _project("test_plan_is_reused_until_its_inputs_change")
+    planner = RunPlanner(data_dir)
+
+    plan = planner.take(_config(project_root), lambda: False)
+    assert _names(plan.tests) == ["test_alpha.py", "test_beta.py"]
+    assert plan.effective_mode == RunMode.RESUME
+    assert plan.carried_over == []
+    discovery = planner._discovery
+
+    assert planner.take(_config(project_root, run_guid="another run"), lambda: False) is plan  # a new run GUID alone is no change
+
+    alpha = next(test.node_id for test in plan.tests if test.node_id.endswith("test_alpha.py"))  # as collected, relative to the rootdir
+    with PytestProcessInfoDB(data_dir) as db:
+        db.write(PytestProcessInfo("run-1", alpha, 1, PyTestFlyExitCode.OK, None, time.time()))
+    resumed = planner.take(_config(project_root), lambda: False)
+    assert planner._discovery is discovery  # the project did not change
+    assert _names(resumed.tests) == ["test_beta.py"]
+    assert (resumed.prior_run_guid, resumed.carried_over) == ("run-1", [alpha])
+
+    restarted = planner.take(_config(project_root, RunMode.RESTART), lambda: False)
+    assert planner._discovery is discovery
+    assert _names(restarted.tests) == ["test_alpha.py", "test_beta.py"]
+    assert restarted.carried_over == []
+
+    Path(project_root, "test_gamma.py").write_text("def test_c():\n    assert True\n")
+    rediscovered = planner.take(_config(project_root, RunMode.RESTART), lambda: False)
+    assert planner._discovery is not discovery
+    assert _names(rediscovered.tests) == ["test_alpha.py", "test_beta.py", "test_gamma.py"]
+
+    fresh = planner.take(_config(project_root, RunMode.RESTART, reuse_plan=False), lambda: False)
+    assert fresh is not rediscovered
+
+
+def test_plan_follows_a_dirty_tree_the_signature_does_not_see():
+    """Editing a tracked non-Python file changes the PUT fingerprint, so CHECK restarts though discovery is reused."""
+    project_root, data_dir = _project("test_plan_follows_a_dirty_tree_the_signature_does_not_see")
+    Path(project_root, "pyproject.toml").write_text('[project]\nname = "demo"\nversion = "1.0"\n')  # the PUT, rather than the repository around the temp dir
+    fixture = Path(project_root, "expected.json")
+    fixture.write_text("{}\n")
+    for command in (["init", "-q"], ["add", "-A"], ["-c", "user.name=test", "-c", "user.email=test@example.com", "commit", "-q", "-m", "initial"]):
+        subprocess.run(["git", *command], cwd=project_root, check=True)
+    planner = RunPlanner(data_dir)
+
+    clean = planner.take(_config(project_root, RunMode.CHECK), lambda: False)
+    with PytestProcessInfoDB(data_dir) as db:
+        for test in clean.tests:
+            db.write(status_record("run-1", test.node_id, PyTestFlyExitCode.OK, clean.put_version_info.short_label(), clean.put_version_info.fingerprint()))
+    resumed = planner.take(_config(project_root, RunMode.CHECK), lambda: False)
+    assert resumed.effective_mode == RunMode.RESUME
+    assert resumed.tests == []
+    discovery = planner._discovery
+
+    fixture.write_text('{"changed": true}\n')
+    dirty = planner.take(_config(project_root, RunMode.CHECK), lambda: False)
+    assert planner._discovery is discovery  # not a change discovery depends on
+    assert dirty.put_version_info.git_dirty
+    assert dirty.effective_mode == RunMode.RESTART
+    assert _names(dirty.tests) == ["test_alpha.py", "test_beta.py"]
+
+
+def test_planner_prepares_the_plan_in_the_background():
+    """An idle planner builds the plan on its own thread, so Run only validates it."""
+    project_root, data_dir = _project("test_planner_prepares_the_plan_in_the_background")
+    planner = RunPlanner(data_dir, poll_seconds=0.1)
+    try:
+        planner.set_idle_config(_config(project_root, run_guid=""))
+        deadline = time.monotonic() + 60.0
+        while planner._schedule is None and time.monotonic() < deadline:
+            time.sleep(0.1)
+        planned = planner._schedule[1]
+        planner.set_idle_config(None)
+
+        start = time.monotonic()
+        plan = planner.take(_config(project_root), lambda: False)
+        assert plan is planned
+        assert time.monotonic() - start < 5.0  # no discovery
+    finally:
+        planner.stop()
+    assert not planner._thread.is_alive()
+
+
+def test_take_is_abandoned_on_abort():
+    """An aborted discovery returns no plan and leaves none behind."""
+    project_root, data_dir = _project("test_take_is_abandoned_on_abort")
+    planner = RunPlanner(data_dir)
+    assert planner.take(_config(project_root), lambda: True) is None
+    assert planner._discovery is None and planner._schedule is None
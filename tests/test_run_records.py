@@ -0,0 +1,74 @@
+"""Tests for run_records.RunRecordCache — the GUI's incrementally refreshed view of one run's records."""
+
+import time
+
+from pytest_fly.db import PytestProcessInfoDB, PytestProcessInfoReader
+from pytest_fly.interfaces import PyTestFlyExitCode, PytestProcessInfo
+from pytest_fly.run_records import RunRecordCache
+
+from .paths import get_temp_dir
+
+
+def _record(run_guid: str, name: str, exit_code: PyTestFlyExitCode, output: str | None = None) -> PytestProcessInfo:
+    return PytestProcessInfo(run_guid=run_guid, name=name, pid=1234, exit_code=exit_code, output=output, time_stamp=time.time())
+
+
+def _write(data_dir, *infos: PytestProcessInfo) -> None:
+    with PytestProcessInfoDB(data_dir) as db:
+        db.write_many(infos)
+
+
+def _refresh(cache: RunRecordCache, data_dir, run_guid: str | None) -> bool:
+    with PytestProcessInfoReader(data_dir) as reader:
+        return cache.refresh(reader, run_guid)
+
+
+def test_run_record_cache_reads_only_new_rows():
+    data_dir = get_temp_dir("test_run_record_cache_reads_only_new_rows")
+    cache = RunRecordCache()
+    _write(data_dir, _record("run-1", "test_a.py", PyTestFlyExitCode.NONE), _record("run-1", "test_b.py", PyTestFlyExitCode.NONE))
+
+    assert _refresh(cache, data_dir, "run-1")
+    assert cache.reloaded
+    assert len(cache.process_infos) == 2
+
+    assert not _refresh(cache, data_dir, "run-1"), "nothing written, so nothing to read"
+    assert cache.new_infos == []
+
+    _write(data_dir, _record("run-1", "test_a.py", PyTestFlyExitCode.OK, "output A"), _record("run-2", "test_x.py", PyTestFlyExitCode.NONE))
+    assert _refresh(cache, data_dir, "run-1")
+    assert not cache.reloaded
+    assert [(info.name, info.output) for info in cache.new_infos] == [("test_a.py", "output A")]  # another run's rows are not read
+    assert len(cache.process_infos) == 3
+    assert cache.pass_count == 1
+
+
+def test_run_record_cache_follows_most_recent_run():
+    data_dir = get_temp_dir("test_run_record_cache_follows_most_recent_run")
+    cache = RunRecordCache()
+    _write(data_dir, _record("run-1", "test_a.py", PyTestFlyExitCode.OK))
+    _refresh(cache, data_dir, None)
+    assert cache.run_guid == "run-1"
+
+    _write(data_dir, _record("run-2", "test_b.py", PyTestFlyExitCode.NONE))
+    _refresh(cache, data_dir, None)
+    assert cache.reloaded
+    assert cache.run_guid == "run-2"
+    assert [info.name for info in cache.process_infos] == ["test_b.py"]
+    assert cache.pass_count == 0
+
+
+def test_run_record_cache_reloads_after_deletion():
+    data_dir = get_temp_dir("test_run_record_cache_reloads_after_deletion")
+    cache = RunRecordCache()
+    _write(data_dir, _record("run-1", "test_a.py", PyTestFlyExitCode.OK), _record("run-1", "test_b.py", PyTestFlyExitCode.OK))
+    _refresh(cache, data_dir, "run-1")
+    assert cache.pass_count == 2
+
+    with PytestProcessInfoDB(data_dir) as db:
+        db.delete("run-1")
+    _write(data_dir, _record("run-1", "test_c.py", PyTestFlyExitCode.NONE))
+    _refresh(cache, data_dir, "run-1")
+    assert cache.reloaded
+    assert [info.name for info in cache.process_infos] == ["test_c.py"]
+    assert cache.pass_count == 0
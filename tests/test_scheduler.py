@@ -0,0 +1,138 @@
+"""Tests for the dispatch-time test scheduler."""
+
+import time
+from queue import Empty
+from threading import Thread
+
+import pytest
+
+from pytest_fly.interfaces import ScheduledBatch, ScheduledTest
+from pytest_fly.pytest_runner.scheduler import DispatchScheduler, SchedulerConfig
+
+_CRITICAL_PATH = SchedulerConfig(critical_path=True)
+
+
+def _test(node_id: str, duration: float | None, singleton: bool = False, peak_commit: int | None = None) -> ScheduledTest:
+    return ScheduledTest(node_id=node_id, singleton=singleton, duration=duration, coverage=None, peak_commit=peak_commit)
+
+
+def _drain(scheduler: DispatchScheduler) -> list[str]:
+    node_ids = []
+    while True:
+        try:
+            unit = scheduler.get(False)
+        except Empty:
+            return node_ids
+        node_ids.append(unit.node_id)
+        scheduler.finished(unit)
+
+
+def test_fifo_by_default():
+    tests = [_test("a", 1.0), _test("b", 5.0), _test("solo", 9.0, singleton=True), _test("c", None)]
+    assert _drain(DispatchScheduler(tests, 4)) == ["a", "b", "solo", "c"]
+
+
+def test_critical_path_longest_first_with_unknown_at_mean():
+    tests = [_test("a", 1.0), _test("b", 5.0), _test("new", None), _test("c", 3.0)]
+    # "new" is predicted at the mean of the known durations (3 s) and ties keep the input order
+    assert _drain(DispatchScheduler(tests, 4, _CRITICAL_PATH)) == ["b", "new", "c", "a"]
+
+
+def test_critical_path_singletons_only_while_no_normal_test_in_flight():
+    tests = [_test("a", 1.0), _test("b", 2.0), _test("solo", 9.0, singleton=True)]
+    scheduler = DispatchScheduler(tests, 2, _CRITICAL_PATH)
+    assert scheduler.get(False).node_id == "solo"  # nothing in flight: the singleton window opens first
+
+    scheduler = DispatchScheduler(tests, 2, _CRITICAL_PATH)
+    scheduler.put(_test("late_solo", 1.0, singleton=True))
+    first = scheduler.get(False)
+    assert first.node_id == "solo"
+    scheduler.finished(first)
+    second = scheduler.get(False)
+    assert second.node_id == "late_solo"  # still no normal test in flight
+    scheduler.finished(second)
+    assert scheduler.get(False).node_id == "b"
+    assert scheduler.get(False).node_id == "a"  # a normal test is in flight, so "a" is next, not a singleton
+    assert scheduler.in_flight() == 2
+
+
+@pytest.mark.parametrize("workers, expected", [(1, ["big", "batch"]), (4, ["big", "x", "y", "z"])])
+def test_critical_path_splits_batches_for_idle_workers(workers: int, expected: list[str]):
+    batch = ScheduledBatch((_test("x", 0.5), _test("y", 0.5), _test("z", 0.5)))
+    scheduler = DispatchScheduler([batch, _test("big", 10.0)], workers, _CRITICAL_PATH)
+    handed_out = []
+    while True:
+        try:
+            unit = scheduler.get(False)  # never finished: every unit stays in flight on its own worker
+        except Empty:
+            break
+        handed_out.append("batch" if isinstance(unit, ScheduledBatch) else unit.node_id)
+    assert handed_out == expected
+
+
+def test_set_workers_changes_batch_splitting():
+    batch = ScheduledBatch((_test("x", 0.5), _test("y", 0.5)))
+    scheduler = DispatchScheduler([batch], 1, _CRITICAL_PATH)
+    scheduler.set_workers(3)
+    assert isinstance(scheduler.get(False), ScheduledTest)
+
+
+_BUDGET_10 = SchedulerConfig(memory_budget_bytes=10, memory_margin=1.0)
+
+
+def test_memory_budget_reaches_past_a_heavy_head():
+    scheduler = DispatchScheduler([_test("a", 1.0, peak_commit=6), _test("b", 1.0, peak_commit=6), _test("c", 1.0, peak_commit=2)], 4, _BUDGET_10)
+    a = scheduler.get_admitted(lambda: False, 0.01)
+    assert a.node_id == "a"  # nothing in flight: the head always starts (min-1)
+    assert scheduler.get_admitted(lambda: False, 0.01).node_id == "c"  # "b" would exceed the budget
+    assert scheduler.footprint_in_flight() == 8
+
+    aborted = iter([False, True])
+    assert scheduler.get_admitted(lambda: next(aborted), 0.01) is None  # only "b" left and it does not fit
+    scheduler.finished(a)
+    assert scheduler.get_admitted(lambda: False, 0.01).node_id == "b"
+
+
+def test_memory_budget_predicts_unknown_at_mean_with_margin():
+    config = SchedulerConfig(memory_budget_bytes=100, memory_margin=1.5)
+    scheduler = DispatchScheduler([_test("a", 1.0, peak_commit=40), _test("new", 1.0), _test("b", 1.0, peak_commit=20)], 4, config)
+    assert scheduler.get_admitted(lambda: False, 0.01).node_id == "a"  # 60 predicted in flight
+    assert scheduler.get_admitted(lambda: False, 0.01).node_id == "b"  # "new" is predicted at 30 x 1.5 = 45: over budget
+    assert scheduler.footprint_in_flight() == 90
+
+
+def test_memory_budget_wait_is_woken_by_finished():
+    scheduler = DispatchScheduler([_test("a", 1.0, peak_commit=8), _test("b", 1.0, peak_commit=8)], 2, _BUDGET_10)
+    a = scheduler.get_admitted(lambda: False, 0.01)
+    result = []
+    waiter = Thread(target=lambda: result.append(scheduler.get_admitted(lambda: False, 10.0)))
+    waiter.start()
+    time.sleep(0.2)
+    assert result == []  # deferred while "a" is in flight
+    scheduler.finished(a)
+    waiter.join(5.0)
+    assert [unit.node_id for unit in result] == ["b"]
+
+
+def test_requeue_pending_finished_and_in_flight():
+    tests = [_test("a", 1.0), _test("b", 1.0), _test("c", 1.0), _test("d", 1.0)]
+    scheduler = DispatchScheduler(tests, 2)
+    a = scheduler.get(False)
+    scheduler.finished(a)
+    b = scheduler.get(False)  # in flight
+    assert scheduler.requeue([tests[3], tests[0], tests[1]]) == (["b"], ["a"])
+    assert [scheduler.get(False).node_id for _ in range(2)] == ["d", "a"]  # pending "d" moved to the front, then "a" queued again
+    scheduler.finished(b)  # "b" goes in front once its worker is done with it
+    assert scheduler.get(False).node_id == "b"
+    assert scheduler.get(False).node_id == "c"
+    assert scheduler.qsize() == 0
+
+
+def test_requeue_in_flight_handed_back_is_not_queued_twice():
+    tests = [_test("a", 1.0), _test("b", 1.0)]
+    scheduler = DispatchScheduler(tests, 1, _CRITICAL_PATH)
+    a = scheduler.get(False)
+    assert scheduler.requeue([tests[0]]) == (["a"], [])
+    scheduler.put(a)  # e.g. a soft stop handed it back
+    scheduler.finished(a)
+    assert sorted(_drain(scheduler)) == ["a", "b"]  # "a" once
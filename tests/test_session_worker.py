@@ -0,0 +1,124 @@
+"""Tests for the session-reuse execution mode (many modules per long-lived pytest session)."""
+
+from pathlib import Path
+from queue import Queue
+
+from pytest_fly.db import PytestProcessInfoDB
+from pytest_fly.file_util import sanitize_test_name
+from pytest_fly.guid import generate_uuid
+from pytest_fly.interfaces import ExecutionMode, PyTestFlyExitCode, ScheduledBatch, ScheduledTest
+from pytest_fly.pytest_runner import PytestRunner
+from pytest_fly.pytest_runner.execution import ExecutionConfig
+from pytest_fly.pytest_runner.pytest_runner import _SingletonCoordinator, _TestRunner
+from pytest_fly.pytest_runner.run_state import latest_info_per_name
+
+from .paths import get_temp_dir
+
+_CONFTEST = """
+import os
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def session_resource():
+    # one line per build, so the test can count how many times the session fixture was set up
+    with open(Path(__file__).parent / "session_builds.txt", "a") as f:
+        f.write(f"{os.getpid()}\\n")
+    return "resource"
+"""
+
+
+def _write_suite(test_dir: Path) -> list[str]:
+    """Write a conftest with a session fixture plus three passing modules and one failing module; return their node ids."""
+    Path(test_dir, "session_builds.txt").unlink(missing_ok=True)
+    Path(test_dir, "conftest.py").write_text(_CONFTEST)
+    node_ids = []
+    for index in range(3):
+        path = Path(test_dir, f"test_reuse_{index}.py")
+        path.write_text(f"def test_reuse_{index}(session_resource):\n    print('module {index} output')\n    assert session_resource == 'resource'\n")
+        node_ids.append(path.as_posix())
+    failing = Path(test_dir, "test_reuse_fails.py")
+    failing.write_text("def test_reuse_fails(session_resource):\n    assert False\n")
+    node_ids.append(failing.as_posix())
+    return node_ids
+
+
+def _run(test_name: str, execution_config: ExecutionConfig) -> tuple[Path, list[str], dict]:
+    data_dir = get_temp_dir(test_name)
+    with PytestProcessInfoDB(data_dir) as db:
+        db.delete()
+    test_dir = Path(data_dir, "suite")
+    test_dir.mkdir(exist_ok=True)
+    node_ids = _write_suite(test_dir)
+
+    run_guid = generate_uuid()
+    scheduled_tests = [ScheduledTest(node_id=node_id, singleton=False, duration=None, coverage=None) for node_id in node_ids]
+    runner = PytestRunner(run_guid, scheduled_tests, 1, data_dir, 1.0, execution_config=execution_config)
+    runner.start()
+    assert runner.join(120.0)
+
+    with PytestProcessInfoDB(data_dir) as db:
+        results = db.query(run_guid)
+    return data_dir, node_ids, {"results": results, "latest": latest_info_per_name(results), "builds": Path(test_dir, "session_builds.txt").read_text().split()}
+
+
+def test_session_reuse_runs_modules_in_one_session(app):
+    """Each module gets its own records, output and coverage, while the session fixture is built once."""
+    data_dir, node_ids, run = _run("test_session_reuse_runs_modules_in_one_session", ExecutionConfig(mode=ExecutionMode.SESSION_REUSE))
+
+    latest = run["latest"]
+    for index, node_id in enumerate(node_ids[:3]):
+        assert latest[node_id].exit_code == PyTestFlyExitCode.OK
+        assert f"module {index} output" in latest[node_id].output
+        assert "1 passed" in latest[node_id].output
+        assert f"module {index + 1} output" not in latest[node_id].output  # output is per module
+        assert latest[node_id].memory_percent is not None
+        assert Path(data_dir, "coverage", f"{sanitize_test_name(node_id)}.coverage").exists()
+    assert latest[node_ids[3]].exit_code == PyTestFlyExitCode.TESTS_FAILED
+    assert "1 failed" in latest[node_ids[3]].output
+
+    # every module: QUEUED, RUNNING, final — the RUNNING records all come from one process
+    running_pids = {info.pid for info in run["results"] if info.exit_code == PyTestFlyExitCode.NONE and info.pid is not None}
+    assert len(running_pids) == 1
+    assert len(run["builds"]) == 1
+
+
+def test_session_reuse_recycles_worker(app):
+    """With a module limit of 2 the worker process is replaced after every second module."""
+    _unused_data_dir, node_ids, run = _run("test_session_reuse_recycles_worker", ExecutionConfig(mode=ExecutionMode.SESSION_REUSE, session_max_modules=2))
+
+    assert all(run["latest"][node_id].exit_code in (PyTestFlyExitCode.OK, PyTestFlyExitCode.TESTS_FAILED) for node_id in node_ids)
+    running_pid = {info.name: info.pid for info in run["results"] if info.exit_code == PyTestFlyExitCode.NONE and info.pid is not None}
+    assert running_pid[node_ids[0]] == running_pid[node_ids[1]]
+    assert running_pid[node_ids[2]] == running_pid[node_ids[3]]
+    assert running_pid[node_ids[0]] != running_pid[node_ids[2]]
+    assert len(run["builds"]) == 2
+
+
+def test_batch_leaves_the_reusable_session_running(app):
+    """A batch runs in a session process of its own; the modules around it share the worker's long-lived session."""
+    data_dir = get_temp_dir("test_batch_leaves_the_reusable_session_running")
+    with PytestProcessInfoDB(data_dir) as db:
+        db.delete()
+    test_dir = Path(data_dir, "suite")
+    test_dir.mkdir(exist_ok=True)
+    node_ids = _write_suite(test_dir)
+    tests = [ScheduledTest(node_id=node_id, singleton=False, duration=None, coverage=None) for node_id in node_ids]
+    queue = Queue()
+    for unit in (tests[0], ScheduledBatch((tests[1], tests[2])), tests[3]):
+        queue.put(unit)
+
+    run_guid = generate_uuid()
+    worker = _TestRunner(run_guid, queue, data_dir, 1.0, _SingletonCoordinator(), execution_config=ExecutionConfig(mode=ExecutionMode.SESSION_REUSE))
+    worker.start()
+    worker.join(120.0)
+    assert not worker.is_alive()
+
+    with PytestProcessInfoDB(data_dir) as db:
+        results = db.query(run_guid)
+    running_pid = {info.name: info.pid for info in results if info.exit_code == PyTestFlyExitCode.NONE and info.pid is not None}
+    assert running_pid[node_ids[1]] == running_pid[node_ids[2]]  # the batch
+    assert running_pid[node_ids[0]] == running_pid[node_ids[3]] != running_pid[node_ids[1]]
+    assert len(Path(test_dir, "session_builds.txt").read_text().split()) == 2
@@ -0,0 +1,71 @@
+"""Tests for automatic critical-path module splitting and per-function duration recording."""
+
+from pytest_fly.db import FunctionDurationDB
+from pytest_fly.guid import generate_uuid
+from pytest_fly.interfaces import ScheduledTest, SchedulingGranularity
+from pytest_fly.pytest_runner.function_durations import FunctionDurationRecorder
+from pytest_fly.pytest_runner.sharding import shard_durations, split_critical_path_modules
+
+from .paths import get_temp_dir
+
+_BIG = "tests/test_big.py"
+_FUNCTIONS = [f"{_BIG}::TestA::test_1", f"{_BIG}::TestA::test_2", f"{_BIG}::TestB::test_3", f"{_BIG}::test_4"]
+
+
+def _tests(*node_ids: str) -> list[ScheduledTest]:
+    return [ScheduledTest(node_id=node_id, singleton=False, duration=None, coverage=None) for node_id in node_ids]
+
+
+def test_shard_durations_unknown_functions_share_remainder():
+    function_durations = {_FUNCTIONS[0]: 4.0, _FUNCTIONS[1]: 2.0}
+    shards = shard_durations(10.0, _FUNCTIONS, function_durations, SchedulingGranularity.CLASS)
+    assert shards == {f"{_BIG}::TestA": 6.0, f"{_BIG}::TestB": 2.0, f"{_BIG}::test_4": 2.0}
+
+
+def test_split_critical_path_modules():
+    tests = _tests(_BIG, "tests/test_small.py")
+    prior_durations = {_BIG: 30.0, "tests/test_small.py": 2.0}
+    function_ids = {_BIG: _FUNCTIONS}
+
+    # class-level shards fit in the 16 s share -> split by class
+    function_durations = {_FUNCTIONS[0]: 5.0, _FUNCTIONS[1]: 5.0, _FUNCTIONS[2]: 10.0, _FUNCTIONS[3]: 10.0}
+    split = split_critical_path_modules(tests, prior_durations, function_ids, function_durations, 2)
+    assert [(test.node_id, test.duration) for test in split] == [
+        (f"{_BIG}::TestA", 10.0),
+        (f"{_BIG}::TestB", 10.0),
+        (f"{_BIG}::test_4", 10.0),
+        ("tests/test_small.py", None),
+    ]
+
+    # one class exceeds the share -> split by function
+    function_durations = {_FUNCTIONS[0]: 12.0, _FUNCTIONS[1]: 12.0, _FUNCTIONS[2]: 3.0, _FUNCTIONS[3]: 3.0}
+    split = split_critical_path_modules(tests, prior_durations, function_ids, function_durations, 2)
+    assert [test.node_id for test in split[:4]] == _FUNCTIONS
+
+    # a single process, or no function history, leaves the modules whole
+    assert split_critical_path_modules(tests, prior_durations, function_ids, function_durations, 1) == tests
+    assert split_critical_path_modules(tests, prior_durations, function_ids, {}, 2) == tests
+
+
+def test_function_duration_recorder_round_trip():
+    data_dir = get_temp_dir("test_function_duration_recorder_round_trip")
+
+    class _Report:
+        def __init__(self, nodeid: str, duration: float, failed: bool = False):
+            self.nodeid = nodeid
+            self.duration = duration
+            self.failed = failed
+
+    recorder = FunctionDurationRecorder()
+    for nodeid, duration, failed in [
+        (f"{_BIG}::TestA::test_1[a]", 1.0, False),
+        (f"{_BIG}::TestA::test_1[b]", 2.0, False),  # parametrized cases sum into their function
+        (f"{_BIG}::TestB::test_3", 5.0, True),  # failed functions are not recorded
+    ]:
+        recorder.pytest_runtest_logreport(_Report(nodeid, duration, failed))
+    recorder.save(data_dir, generate_uuid(), _BIG)
+
+    with FunctionDurationDB(data_dir) as db:
+        durations = db.query_function_durations()
+    assert durations[_FUNCTIONS[0]] == 3.0
+    assert _FUNCTIONS[2] not in durations
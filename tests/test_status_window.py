@@ -141,3 +141,18 @@ def test_status_window_preparing_with_resume_copies(app):
     window.update_tick(tick)
     assert "please wait" in window.status_widget.toPlainText()
     assert window.progress_bar.maximum() == 100  # counts are real, keep the determinate bar
+
+
+def test_status_window_counts_cache_hits_apart(app):
+    """Result cache hits are listed apart from the tests that ran and passed, with the hit rate and time saved."""
+    now = time.time()
+    infos = [_info(name, 1, PyTestFlyExitCode.OK, now) for name in ("test_a.py", "test_b.py", "test_c.py")] + [_info("test_d.py", None, PyTestFlyExitCode.NONE, now)]
+    tick = build_tick_data(infos)
+    tick.cache_hits = {"test_a.py": 60.0, "test_b.py": 30.0}
+    window = StatusWindow(None)
+    window.update_tick(tick)
+    text = window.status_widget.toPlainText()
+    assert "Pass: 1 (25.00%)" in text
+    assert "Cached: 2 (50.00%)" in text
+    assert "Cache hit rate: 2/4 (50.00%), saved 1 minute and 30 seconds" in text
+    assert "Pass rate: 3/3" in window.pass_rate_label.text()  # a cache hit is still a pass
@@ -3,8 +3,8 @@
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
-from pytest_fly.interfaces import ScheduledTest
-from pytest_fly.pytest_runner.test_list import GetTests
+from pytest_fly.interfaces import ScheduledTest, SchedulingGranularity
+from pytest_fly.pytest_runner.test_list import GetTests, scheduling_node_id
 
 
 def test_get_tests_discovers_node_ids():
@@ -60,3 +60,45 @@ def test_get_tests_empty_dir():
         collector.join(60.0)
 
         assert collector.get_tests() == []
+
+
+def test_scheduling_node_id_granularity():
+    item = "tests/test_a.py::TestA::test_x[1-2]"
+    assert scheduling_node_id(item) == "tests/test_a.py"
+    assert scheduling_node_id(item, SchedulingGranularity.CLASS) == "tests/test_a.py::TestA"
+    assert scheduling_node_id(item, SchedulingGranularity.FUNCTION) == "tests/test_a.py::TestA::test_x"
+    # a function outside any class is its own unit at CLASS granularity
+    assert scheduling_node_id("tests/test_a.py::test_y", SchedulingGranularity.CLASS) == "tests/test_a.py::test_y"
+
+
+def test_scheduling_node_id_with_delimiters_outside_and_inside_the_parametrization():
+    item = "tests/cases[v2]/test_a.py::TestA::test_x[a[0]-b]"
+    assert scheduling_node_id(item) == "tests/cases[v2]/test_a.py"
+    assert scheduling_node_id(item, SchedulingGranularity.CLASS) == "tests/cases[v2]/test_a.py::TestA"
+    assert scheduling_node_id(item, SchedulingGranularity.FUNCTION) == "tests/cases[v2]/test_a.py::TestA::test_x"
+    assert scheduling_node_id("tests/cases[v2]/test_a.py::test_y", SchedulingGranularity.FUNCTION) == "tests/cases[v2]/test_a.py::test_y"
+    item = "tests/test_a.py::test_x[a::b/c]"  # "::" inside the parametrize id
+    assert scheduling_node_id(item) == "tests/test_a.py"
+    assert scheduling_node_id(item, SchedulingGranularity.CLASS) == "tests/test_a.py::test_x"
+    assert scheduling_node_id(item, SchedulingGranularity.FUNCTION) == "tests/test_a.py::test_x"
+    assert scheduling_node_id("tests/test_a.py::TestA::test_x[a::b]", SchedulingGranularity.CLASS) == "tests/test_a.py::TestA"
+
+
+def test_get_tests_function_granularity():
+    """At FUNCTION granularity each function is its own scheduled test; parametrizations stay together."""
+    with TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        (tmp_path / "test_fine.py").write_text(
+            "import pytest\n"
+            "def test_one():\n    assert True\n"
+            "@pytest.mark.parametrize('n', [1, 2, 3])\n"
+            "def test_many(n):\n    assert n\n"
+            "class TestGroup:\n    def test_a(self):\n        assert True\n    def test_b(self):\n        assert True\n"
+        )
+
+        collector = GetTests(test_dir=tmp_path, granularity=SchedulingGranularity.FUNCTION)
+        collector.start()
+        collector.join(60.0)
+
+        suffixes = sorted(t.node_id.split("test_fine.py")[1] for t in collector.get_tests())
+        assert suffixes == ["::TestGroup::test_a", "::TestGroup::test_b", "::test_many", "::test_one"]
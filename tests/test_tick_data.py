@@ -1,6 +1,11 @@
-"""Tests for :class:`pytest_fly.tick_data.TickData`."""
+"""Tests for :class:`pytest_fly.tick_data.TickData` and :class:`pytest_fly.tick_data.TickDataBuilder`."""
 
-from pytest_fly.tick_data import TickData
+import time
+
+import pytest
+
+from pytest_fly.interfaces import PyTestFlyExitCode, PytestProcessInfo
+from pytest_fly.tick_data import TickData, TickDataBuilder, build_tick_data, compute_average_parallelism, count_test_states
 
 
 def test_effective_min_time_stamp_prefers_run_start():
@@ -19,3 +24,74 @@ def test_effective_min_time_stamp_none_when_both_unset():
     """No run start and no records -> None."""
     tick = TickData(process_infos=[])
     assert tick.effective_min_time_stamp is None
+
+
+def _info(name: str, pid: int | None, exit_code: PyTestFlyExitCode, time_stamp: float) -> PytestProcessInfo:
+    return PytestProcessInfo(run_guid="g", name=name, pid=pid, exit_code=exit_code, output=None, time_stamp=time_stamp)
+
+
+def _run_records(now: float) -> list[PytestProcessInfo]:
+    """Three tests' records in write order: a passes, b is still running, c is queued."""
+    return [
+        _info("test_a.py", None, PyTestFlyExitCode.NONE, now - 10),
+        _info("test_b.py", None, PyTestFlyExitCode.NONE, now - 10),
+        _info("test_c.py", None, PyTestFlyExitCode.NONE, now - 10),
+        _info("test_a.py", 1, PyTestFlyExitCode.NONE, now - 9),
+        _info("test_b.py", 2, PyTestFlyExitCode.NONE, now - 8),
+        _info("test_a.py", 1, PyTestFlyExitCode.OK, now - 5),
+    ]
+
+
+def test_builder_incremental_matches_full_build():
+    """Feeding records a few at a time ends in the same tick as one full build."""
+    now = time.time()
+    records = _run_records(now)
+    prior_durations = {"test_a.py": 4.0, "test_b.py": 20.0, "test_c.py": 3.0}
+    builder = TickDataBuilder()
+    for end in range(1, len(records) + 1):
+        tick = builder.update(records[:end], prior_durations, num_processes=2)
+    full = build_tick_data(records, prior_durations, num_processes=2)
+
+    assert list(tick.run_states) == list(full.run_states)
+    assert {name: run_state.get_state() for name, run_state in tick.run_states.items()} == {name: run_state.get_state() for name, run_state in full.run_states.items()}
+    assert tick.process_infos == full.process_infos
+    assert (tick.min_time_stamp, tick.min_time_stamp_started, tick.max_time_stamp_started) == (full.min_time_stamp, full.min_time_stamp_started, full.max_time_stamp_started)
+    assert tick.get_state_counts() == count_test_states(full.run_states)
+    assert tick.get_running_names() == ["test_b.py"]
+    assert tick.average_parallelism == pytest.approx(compute_average_parallelism(tick.infos_by_name), rel=1e-3)
+    # c queued (3 s) plus what is left of b's 20 s after running ~8 s
+    assert tick.get_remaining_work_seconds() == pytest.approx(3.0 + 12.0, abs=0.5)
+
+
+def test_builder_reports_changed_names():
+    """Only the tests with new records are reported as changed; starting over reports None."""
+    now = time.time()
+    records = _run_records(now)
+    builder = TickDataBuilder()
+    assert builder.update(records[:3]).changed_names is None  # first tick: everything is new
+    assert builder.update(records[:5]).changed_names == {"test_a.py", "test_b.py"}
+    assert builder.update(records[:5]).changed_names == set()
+    assert builder.update(records, reset=True).changed_names is None
+
+
+def test_builder_restarts_when_carried_record_moves_shift():
+    """A RESUME-carried record older than every earlier one re-shifts all carried records."""
+    run_start = time.time()
+    builder = TickDataBuilder()
+    records = [_info("test_a.py", 1, PyTestFlyExitCode.OK, run_start - 100)]
+    tick = builder.update(records, current_run_start=run_start)
+    assert tick.process_infos[0].time_stamp == pytest.approx(run_start)
+
+    records.append(_info("test_b.py", 2, PyTestFlyExitCode.OK, run_start - 200))
+    tick = builder.update(records, current_run_start=run_start)
+    assert tick.changed_names is None
+    assert [info.time_stamp for info in tick.process_infos] == pytest.approx([run_start + 100, run_start])
+    assert records[0].time_stamp == pytest.approx(run_start - 100), "the caller's records are left untouched"
+
+
+def test_remaining_work_ignores_replaced_prior_durations():
+    """Replacing prior_durations on a built tick invalidates the precomputed estimate."""
+    tick = TickDataBuilder().update(_run_records(time.time()), {"test_c.py": 3.0})
+    assert tick.get_remaining_work_seconds() == pytest.approx(3.0)
+    tick.prior_durations = {"test_c.py": 5.0}
+    assert tick.get_remaining_work_seconds() is None
@@ -0,0 +1,88 @@
+"""Tests for pytest_runner.wakeup and the event-driven waits built on it."""
+
+import time
+from multiprocessing import Process
+from pathlib import Path
+from queue import Queue
+from threading import Thread, Timer
+
+from pytest_fly.pytest_runner.pytest_runner import _SingletonCoordinator, _TestRunner
+from pytest_fly.pytest_runner.singleton_coordinator import SingletonCoordinator
+from pytest_fly.pytest_runner.wakeup import Wakeup
+
+
+def test_wakeup_set_and_clear():
+    wakeup = Wakeup()
+    assert not wakeup.is_set()
+    wakeup.set()
+    wakeup.set()  # idempotent
+    assert wakeup.is_set()
+    wakeup.clear()
+    assert not wakeup.is_set()
+    wakeup.close()
+    wakeup.set()  # a late request after the owner stopped waiting is a no-op
+    wakeup.close()
+    assert wakeup.connection.closed
+
+
+def test_worker_closes_its_wakeup_when_it_exits():
+    worker = _TestRunner("run-guid", Queue(), Path("."), 0.01, _SingletonCoordinator())
+    worker.start()
+    worker.join(30.0)
+    assert worker.is_finished()
+    assert worker._wakeup.connection.closed
+    worker.stop()  # e.g. the runner stopping a pool that already drained
+
+
+def test_wait_any_returns_promptly_when_set_from_another_thread():
+    wakeup = Wakeup()
+    Timer(0.1, wakeup.set).start()
+    start = time.monotonic()
+    assert wakeup.wait_any([], 30.0) == []
+    assert time.monotonic() - start < 5.0
+    assert not wakeup.is_set(), "wait_any clears the flag"
+
+
+def test_wait_any_returns_on_process_exit():
+    wakeup = Wakeup()
+    process = Process(target=time.sleep, args=(0.1,))
+    process.start()
+    start = time.monotonic()
+    assert wakeup.wait_any([process.sentinel], 30.0) == [process.sentinel]
+    assert time.monotonic() - start < 5.0
+    process.join()
+
+
+def test_wait_any_times_out():
+    wakeup = Wakeup()
+    assert wakeup.wait_any([], 0.05) == []
+
+
+def test_coordinator_wait_for_change_woken_by_release():
+    coordinator = SingletonCoordinator()
+    coordinator.acquire_normal(lambda: False, 0.01)
+    Timer(0.1, coordinator.release_normal).start()
+    start = time.monotonic()
+    assert coordinator.wait_for_change(30.0) is True
+    assert time.monotonic() - start < 5.0
+    assert coordinator.wait_for_change(0.01) is False
+
+
+def test_coordinator_wake_interrupts_acquire():
+    coordinator = SingletonCoordinator()
+    coordinator.acquire_normal(lambda: False, 0.01)  # a singleton now has to wait
+    stop = {"requested": False}
+    result = {}
+
+    def acquire():
+        result["acquired"] = coordinator.acquire_singleton(lambda: stop["requested"], 30.0)
+
+    thread = Thread(target=acquire)
+    start = time.monotonic()
+    thread.start()
+    time.sleep(0.1)
+    stop["requested"] = True
+    coordinator.wake()
+    thread.join(10.0)
+    assert result == {"acquired": False}
+    assert time.monotonic() - start < 5.0
@@ -0,0 +1,79 @@
+"""Tests for watch mode's project watcher and affected-test selection (pytest_fly.watch)."""
+
+import os
+import time
+from pathlib import Path
+from threading import Event
+
+from coverage import CoverageData
+
+from pytest_fly.file_util import sanitize_test_name
+from pytest_fly.impact import ImpactIndex
+from pytest_fly.watch import ProjectWatcher, affected_tests
+
+from .paths import get_temp_dir
+
+
+def _record_coverage(data_dir: Path, name: str, executed: list[Path]) -> None:
+    path = Path(data_dir, "coverage", f"{sanitize_test_name(name)}.coverage")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = CoverageData(basename=str(path))
+    data.add_lines({os.path.realpath(source): [1] for source in executed})
+    data.write()
+
+
+def test_watcher_reports_a_burst_of_changes_once():
+    project_root = get_temp_dir("test_watcher_reports_a_burst_of_changes_once")
+    Path(project_root, "venv").mkdir()
+    Path(project_root, "venv", "pyvenv.cfg").write_text("")
+    reports = []
+    reported = Event()
+
+    def on_change(changed: set[Path]):
+        reports.append(changed)
+        reported.set()
+
+    watcher = ProjectWatcher(project_root, on_change, debounce_seconds=0.5)
+    watcher.start()
+    try:
+        time.sleep(0.2)
+        calc = Path(project_root, "calc.py")
+        for value in range(3):
+            calc.write_text(f"X = {value}\n")
+            time.sleep(0.05)
+        Path(project_root, "notes.txt").write_text("not a source")
+        Path(project_root, "venv", "site.py").write_text("")  # in a virtual environment
+        Path(project_root, "pytest.ini").write_text("[pytest]\n")
+        start = time.monotonic()
+        assert reported.wait(10.0)
+        assert time.monotonic() - start < 2.0
+        time.sleep(1.0)  # no second report for the same burst
+    finally:
+        watcher.stop()
+    assert len(reports) == 1
+    assert {Path(path).name for path in reports[0]} == {"calc.py", "pytest.ini"}
+
+
+def test_affected_tests_by_executed_files_and_configuration():
+    root = get_temp_dir("test_affected_tests_by_executed_files_and_configuration")
+    project_root = Path(root, "project")
+    Path(project_root, "tests", "unit").mkdir(parents=True)
+    calc = Path(project_root, "calc.py")
+    calc.write_text("X = 1\n")
+    other = Path(project_root, "other.py")
+    other.write_text("Y = 1\n")
+    test_calc = Path(project_root, "tests", "unit", "test_calc.py")
+    test_other = Path(project_root, "tests", "test_other.py")
+    for path in (test_calc, test_other):
+        path.write_text("def test():\n    pass\n")
+    data_dir = Path(root, "data")
+    _record_coverage(data_dir, "tests/unit/test_calc.py", [calc, test_calc])
+    _record_coverage(data_dir, "tests/test_other.py", [other, test_other])
+    names = ["tests/unit/test_calc.py", "tests/test_other.py", "tests/test_new.py"]
+    index = ImpactIndex(data_dir)
+
+    assert affected_tests({calc}, names, index, project_root) == {"tests/unit/test_calc.py", "tests/test_new.py"}  # the new test has no coverage
+    assert affected_tests({test_other}, names[:2], index, project_root) == {"tests/test_other.py"}
+    assert affected_tests({Path(project_root, "tests", "unit", "conftest.py")}, names[:2], index, project_root) == {"tests/unit/test_calc.py"}
+    assert affected_tests({Path(project_root, "pyproject.toml")}, names[:2], index, project_root) == set(names[:2])
+    assert affected_tests({Path(project_root, "unused.py")}, names[:2], index, project_root) == set()